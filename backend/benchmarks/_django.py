@@ -0,0 +1,42 @@
+"""
+Inicialização do Django para os scripts de benchmark
+Localização: backend/benchmarks/_django.py
+
+Os benchmarks usam o banco configurado no .env (Postgres), assim como o servidor.
+"""
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup():
+    """Configura o Django a partir de backend/ (pode ser chamado mais de uma vez)."""
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+
+def percentis(amostras, pontos=(50, 95, 99)):
+    """Percentis (nearest-rank) de uma lista de latências."""
+    if not amostras:
+        return {f'p{p}': None for p in pontos}
+    ordenadas = sorted(amostras)
+    resultado = {}
+    for p in pontos:
+        indice = max(0, min(len(ordenadas) - 1, int(round(p / 100 * len(ordenadas))) - 1))
+        resultado[f'p{p}'] = ordenadas[indice]
+    return resultado
+
+
+def cronometrar(func, repeticoes):
+    """Executa func() `repeticoes` vezes e retorna a lista de durações (ms)."""
+    duracoes = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        duracoes.append((time.perf_counter() - inicio) * 1000)
+    return duracoes
@@ -0,0 +1,57 @@
+"""
+Dados temporários para micro-benchmarks
+Localização: backend/benchmarks/_fixtures.py
+
+Cria um conjunto pequeno e realista (autores, tags, likes, comentários)
+dentro de uma transação que é desfeita ao final: nada fica no banco.
+"""
+import contextlib
+import random
+
+from django.db import transaction
+
+
+@contextlib.contextmanager
+def dados_temporarios(total_momentos=24, total_usuarios=8, seed=42):
+    """Yield: dict com 'usuarios', 'momentos' e 'tags' (tudo desfeito no fim)."""
+    from django.contrib.auth import get_user_model
+    from momentos.models import Comentario, Like, Momento, Tag
+
+    Usuario = get_user_model()
+    rnd = random.Random(seed)
+
+    with transaction.atomic():
+        usuarios = [
+            Usuario.objects.create_user(
+                username=f'bench_{i}', email=f'bench_{i}@example.com', password=None,
+                first_name=f'Atleta {i}', bio='Jogador amador — “lances” e ações ✨'
+            )
+            for i in range(total_usuarios)
+        ]
+        tags = [
+            Tag.objects.create(nome=f'bench-{nome}', slug=f'bench-{nome}')
+            for nome in ('futebol', 'basquete', 'vôlei', 'golaço', 'defesa', 'drible')
+        ]
+        momentos = []
+        for i in range(total_momentos):
+            momento = Momento.objects.create(
+                usuario=rnd.choice(usuarios),
+                titulo=f'Lance #{i} — golaço de bicicleta',
+                descricao='Descrição com acentuação, “aspas” e emoji ⚽ ' * 3,
+                video=f'videos/2025/01/bench_{i}.mp4',
+                thumbnail=f'thumbnails/2025/01/bench_{i}.jpg',
+                duracao=rnd.randint(5, 60),
+                views=rnd.randint(0, 5000),
+            )
+            momento.tags.set(rnd.sample(tags, rnd.randint(1, 3)))
+            curtidores = rnd.sample(usuarios, rnd.randint(0, len(usuarios)))
+            Like.objects.bulk_create([Like(usuario=u, momento=momento) for u in curtidores])
+            Momento.objects.filter(pk=momento.pk).update(likes_count=len(curtidores))
+            Comentario.objects.bulk_create([
+                Comentario(usuario=rnd.choice(usuarios), momento=momento, texto=f'Que lance! #{j}')
+                for j in range(rnd.randint(0, 12))
+            ])
+            momentos.append(momento)
+
+        yield {'usuarios': usuarios, 'momentos': momentos, 'tags': tags}
+        transaction.set_rollback(True)
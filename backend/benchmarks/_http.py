@@ -0,0 +1,124 @@
+"""
+Cliente HTTP/1.1 mínimo (asyncio, keep-alive) e utilitários de servidor para os benchmarks
+Localização: backend/benchmarks/_http.py
+
+Sem dependências externas: gera carga com centenas de conexões simultâneas
+a partir de um único processo.
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from benchmarks._django import BACKEND_DIR
+
+
+class Conexao:
+    """Uma conexão keep-alive com o servidor (reconecta se o servidor fechar)."""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def _abrir(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def fechar(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            self.writer = None
+
+    async def requisitar(self, metodo, caminho, corpo=b'', headers=None):
+        """Retorna (status, headers, corpo)."""
+        if self.writer is None:
+            await self._abrir()
+
+        linhas = [f'{metodo} {caminho} HTTP/1.1', f'Host: {self.host}:{self.port}', 'Connection: keep-alive']
+        for nome, valor in (headers or {}).items():
+            linhas.append(f'{nome}: {valor}')
+        if corpo:
+            linhas.append(f'Content-Length: {len(corpo)}')
+        self.writer.write(('\r\n'.join(linhas) + '\r\n\r\n').encode('latin-1') + corpo)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            # Servidor fechou a conexão ociosa: reabre e tenta de novo
+            await self.fechar()
+            return await self.requisitar(metodo, caminho, corpo, headers)
+        status = int(status_line.split()[1])
+
+        resposta_headers = {}
+        while True:
+            linha = await self.reader.readline()
+            if linha in (b'\r\n', b''):
+                break
+            nome, _, valor = linha.decode('latin-1').partition(':')
+            resposta_headers.setdefault(nome.strip().lower(), []).append(valor.strip())
+
+        if 'content-length' in resposta_headers:
+            dados = await self.reader.readexactly(int(resposta_headers['content-length'][0]))
+        elif 'chunked' in resposta_headers.get('transfer-encoding', [''])[0]:
+            dados = b''
+            while True:
+                tamanho = int((await self.reader.readline()).strip(), 16)
+                if tamanho == 0:
+                    await self.reader.readline()
+                    break
+                dados += await self.reader.readexactly(tamanho)
+                await self.reader.readline()
+        else:
+            dados = await self.reader.read()
+
+        if resposta_headers.get('connection', [''])[0].lower() == 'close':
+            await self.fechar()
+        return status, resposta_headers, dados
+
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def aguardar_porta(port, timeout=30):
+    limite = time.time() + timeout
+    while time.time() < limite:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Servidor não respondeu na porta {port}')
+
+
+def iniciar_servidor(tipo, port, workers, env_extra=None):
+    """
+    Sobe o app real: 'gunicorn' (WSGI, workers síncronos) ou 'uvicorn' (ASGI).
+    Retorna o subprocess.Popen (encerrar com .terminate()).
+    """
+    env = {**os.environ, **(env_extra or {})}
+    if tipo == 'gunicorn':
+        cmd = [sys.executable, '-m', 'gunicorn', 'config.wsgi:application',
+               '--workers', str(workers), '--bind', f'127.0.0.1:{port}', '--log-level', 'warning']
+    elif tipo == 'uvicorn':
+        cmd = [sys.executable, '-m', 'uvicorn', 'config.asgi:application',
+               '--workers', str(workers), '--host', '127.0.0.1', '--port', str(port),
+               '--log-level', 'warning', '--no-access-log']
+    else:
+        raise ValueError(tipo)
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env)
+    try:
+        aguardar_porta(port)
+    except RuntimeError:
+        proc.terminate()
+        raise
+    return proc
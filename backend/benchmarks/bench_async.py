@@ -0,0 +1,107 @@
+"""
+Benchmark: uvicorn (ASGI, ASYNC_VIEWS=True) x gunicorn (WSGI, workers síncronos)
+Localização: backend/benchmarks/bench_async.py
+
+Uso (a partir de backend/, com o .env apontando para o Postgres local já populado):
+    python benchmarks/bench_async.py [--concorrencia 200] [--duracao 15] [--workers 4]
+
+Sobe cada servidor com o app real e dispara GETs com N conexões simultâneas
+nos caminhos de leitura que têm versão assíncrona (feed, detalhe, perfil).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._django import percentis, setup  # noqa: E402
+from benchmarks._http import Conexao, iniciar_servidor, porta_livre  # noqa: E402
+
+SERVIDORES = {
+    'gunicorn-sync': ('gunicorn', {'ASYNC_VIEWS': 'False'}),
+    'uvicorn-async': ('uvicorn', {'ASYNC_VIEWS': 'True'}),
+}
+
+
+def caminhos_de_leitura():
+    """Escolhe um momento e um perfil públicos existentes para os caminhos de detalhe/perfil."""
+    setup()
+    from momentos.models import Momento
+
+    momento = Momento.objects.visible_to(None).select_related('usuario').order_by('-views').first()
+    if momento is None:
+        raise SystemExit('Nenhum momento público no banco. Popule o banco antes de rodar o benchmark.')
+    return [
+        '/api/momentos/',
+        '/api/momentos/?sort=trending&page=2',
+        f'/api/momentos/{momento.pk}/',
+        f'/api/auth/profile/{momento.usuario.username}/',
+    ]
+
+
+async def gerar_carga(port, caminhos, concorrencia, duracao):
+    latencias = {c: [] for c in caminhos}
+    erros = 0
+    fim = time.perf_counter() + duracao
+
+    async def cliente(indice):
+        nonlocal erros
+        conexao = Conexao('127.0.0.1', port)
+        i = indice
+        try:
+            while time.perf_counter() < fim:
+                caminho = caminhos[i % len(caminhos)]
+                i += 1
+                inicio = time.perf_counter()
+                try:
+                    status, _, _ = await conexao.requisitar('GET', caminho)
+                except (ConnectionError, OSError, asyncio.IncompleteReadError):
+                    erros += 1
+                    await conexao.fechar()
+                    continue
+                if status >= 500:
+                    erros += 1
+                latencias[caminho].append((time.perf_counter() - inicio) * 1000)
+        finally:
+            await conexao.fechar()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(i) for i in range(concorrencia)))
+    return latencias, erros, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concorrencia', type=int, default=200)
+    parser.add_argument('--duracao', type=float, default=15, help='Segundos por servidor')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--servidores', nargs='+', default=list(SERVIDORES), choices=list(SERVIDORES))
+    args = parser.parse_args()
+
+    caminhos = caminhos_de_leitura()
+
+    for nome in args.servidores:
+        tipo, env = SERVIDORES[nome]
+        port = porta_livre()
+        proc = iniciar_servidor(tipo, port, args.workers, env)
+        try:
+            latencias, erros, duracao = asyncio.run(
+                gerar_carga(port, caminhos, args.concorrencia, args.duracao)
+            )
+        finally:
+            proc.terminate()
+            proc.wait()
+
+        total = sum(len(v) for v in latencias.values())
+        print(f'\n== {nome} ({args.workers} workers, {args.concorrencia} conexões) ==')
+        print(f'  total: {total / duracao:.1f} req/s, erros: {erros}')
+        for caminho, amostras in latencias.items():
+            p = percentis(amostras)
+            if amostras:
+                print(f"  {caminho:<42} p50 {p['p50']:>8.1f} ms   p95 {p['p95']:>8.1f} ms   p99 {p['p99']:>8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: carga inicial do SPA (csrf/ + user/) x bootstrap/
+Localização: backend/benchmarks/bench_bootstrap.py
+
+Uso (a partir de backend/):
+    python benchmarks/bench_bootstrap.py [--repeticoes 300]
+
+Simula o boot "a frio" do frontend (sem cookie csrftoken), para visitante e
+usuário logado, e compara requisições, consultas ao banco e latência total.
+O usuário temporário tem momentos e likes, para os agregados do
+UsuarioSerializer pesarem como em produção. Tudo é desfeito ao final.
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._django import cronometrar, setup  # noqa: E402
+
+FLUXOS = {
+    'antes (csrf/ + user/)': ['/api/auth/csrf/', '/api/auth/user/'],
+    'depois (bootstrap/)': ['/api/auth/bootstrap/'],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticoes', type=int, default=300)
+    args = parser.parse_args()
+
+    setup()
+    # O fluxo antigo recebe 403 em user/ para visitantes: não poluir a saída
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    from django.conf import settings
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from benchmarks._fixtures import dados_temporarios
+
+    with dados_temporarios(total_momentos=24) as dados:
+        usuario = dados['usuarios'][0]
+        logado = Client()
+        logado.force_login(usuario)
+        cookie_sessao = logado.cookies[settings.SESSION_COOKIE_NAME].value
+
+        def cliente(perfil):
+            # Boot a frio: só o cookie de sessão (se logado), sem csrftoken
+            client = Client()
+            if perfil == 'logado':
+                client.cookies[settings.SESSION_COOKIE_NAME] = cookie_sessao
+            return client
+
+        for perfil in ('visitante', 'logado'):
+            print(f'\n== {perfil} ==')
+            for nome, caminhos in FLUXOS.items():
+                def carga():
+                    client = cliente(perfil)
+                    for caminho in caminhos:
+                        client.get(caminho)
+
+                consultas = 0
+                client = cliente(perfil)
+                for caminho in caminhos:
+                    with CaptureQueriesContext(connection) as capturadas:
+                        client.get(caminho)
+                    consultas += len(capturadas)
+
+                duracoes = cronometrar(carga, args.repeticoes)
+                print(f'  {nome:<24} {len(caminhos)} req   {consultas:>2} consultas   '
+                      f'mediana {statistics.median(duracoes):7.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+"""
+Teste de carga em malha fechada contra o app real, com mix de tráfego
+Localização: backend/benchmarks/bench_carga.py
+
+Uso (a partir de backend/, com o .env apontando para o Postgres local):
+    python manage.py gerar_dados --usuarios 5000 --momentos 50000   # uma vez
+    python benchmarks/bench_carga.py [--servidor gunicorn|uvicorn] [--workers 4]
+        [--usuarios-virtuais 100] [--logados 0.6] [--duracao 30]
+        [--mix feed=70,view=15,like=10,upload=5] [--quentes 20] [--saida carga.json]
+
+Cada usuário virtual repete: escolhe uma operação do mix, espera a resposta,
+pensa (--pensar ms) e recomeça. Os logados fazem login de verdade com os
+usuários do gerar_dados ('{prefixo}_N', --senha); os anônimos só leem (as
+operações que exigem login viram leituras do feed). Views e likes se
+concentram em --quentes momentos para forçar concorrência nas mesmas linhas.
+
+Ao final compara o banco com as respostas: views contadas pelo servidor x
+delta de views, likes criados/removidos x delta de likes_count, e
+likes_count x linhas de Like. Diferença = atualização perdida (sai com código 1).
+Por padrão o servidor sobe sem limites de requisição e sem deduplicação de
+views (as escritas vão todas ao banco); uploads são apagados no fim.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._django import percentis, setup  # noqa: E402
+from benchmarks._http import Conexao, iniciar_servidor, porta_livre  # noqa: E402
+
+MIX_PADRAO = 'feed=70,view=15,like=10,upload=5'
+EXIGEM_LOGIN = {'view', 'like', 'upload'}
+FEED = [f'/api/momentos/?sort={sort}&page={page}' for sort in ('recent', 'trending', 'popular') for page in (1, 2, 3)]
+SEM_LIMITES = {
+    'THROTTLE_VIEWS': '1000000/min',
+    'THROTTLE_LIKES': '1000000/min',
+    'VIEWS_JANELA_DEDUP_MINUTOS': '0',
+}
+# Um log por view/like no console do servidor distorceria as latências
+LOGS_SILENCIOSOS = {'LOG_LEVEL': 'WARNING', 'LOG_LEVEL_ACESSO': 'WARNING'}
+
+
+def ler_mix(texto):
+    mix = {}
+    for parte in texto.split(','):
+        nome, _, peso = parte.partition('=')
+        if nome not in ('feed', 'view', 'like', 'upload'):
+            raise SystemExit(f'Operação desconhecida no mix: {nome}')
+        mix[nome] = float(peso)
+    return mix
+
+
+def preparar_alvos(quentes, prefixo):
+    """Momentos quentes (públicos), estado inicial deles e usuários sintéticos disponíveis"""
+    from django.contrib.auth import get_user_model
+    from momentos.models import Momento, Tag
+
+    ids = list(Momento.objects.visible_to(None).order_by('-likes_count').values_list('pk', flat=True)[:quentes])
+    usuarios = list(get_user_model().objects.filter(username__startswith=f'{prefixo}_')
+                    .values_list('username', flat=True))
+    if not ids or not usuarios:
+        raise SystemExit(f'Banco sem momentos públicos ou usuários "{prefixo}_*": rode gerar_dados antes.')
+    tags = list(Tag.objects.values_list('nome', flat=True)[:20])
+    return ids, usuarios, tags
+
+
+def curtidas_atuais(usernames, ids):
+    """{username: momentos quentes que ele já curtiu}, para o estado local começar certo"""
+    from momentos.models import Like
+
+    curtidos = {username: set() for username in usernames}
+    for username, momento in (Like.objects.filter(usuario__username__in=usernames, momento__in=ids)
+                              .values_list('usuario__username', 'momento_id')):
+        curtidos[username].add(momento)
+    return curtidos
+
+
+def estado(ids):
+    from django.db.models import Count
+    from momentos.models import Momento
+
+    return {
+        linha['pk']: linha
+        for linha in Momento.objects.filter(pk__in=ids).annotate(likes_reais=Count('likes'))
+        .values('pk', 'views', 'likes_count', 'likes_reais')
+    }
+
+
+def multipart(campos, arquivo):
+    limite = uuid.uuid4().hex
+    partes = []
+    for nome, valor in campos.items():
+        partes.append(f'--{limite}\r\nContent-Disposition: form-data; name="{nome}"\r\n\r\n{valor}\r\n'.encode())
+    nome, nome_arquivo, conteudo = arquivo
+    partes.append(
+        f'--{limite}\r\nContent-Disposition: form-data; name="{nome}"; filename="{nome_arquivo}"\r\n'
+        f'Content-Type: video/mp4\r\n\r\n'.encode() + conteudo + b'\r\n'
+    )
+    partes.append(f'--{limite}--\r\n'.encode())
+    return b''.join(partes), f'multipart/form-data; boundary={limite}'
+
+
+class UsuarioVirtual:
+    """Uma conexão keep-alive com seus próprios cookies (sessão e CSRF)"""
+
+    def __init__(self, port, curtidos=()):
+        self.conexao = Conexao('127.0.0.1', port)
+        self.cookies = {}
+        self.curtidos = set(curtidos)
+
+    async def requisitar(self, metodo, caminho, corpo=b'', content_type=None):
+        headers = {}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{k}={v}' for k, v in self.cookies.items())
+        if metodo != 'GET' and 'csrftoken' in self.cookies:
+            headers['X-CSRFToken'] = self.cookies['csrftoken']
+        if content_type:
+            headers['Content-Type'] = content_type
+        status, resposta_headers, dados = await self.conexao.requisitar(metodo, caminho, corpo, headers)
+        for cookie in resposta_headers.get('set-cookie', []):
+            nome, _, valor = cookie.split(';', 1)[0].partition('=')
+            self.cookies[nome.strip()] = valor.strip()
+        return status, dados
+
+    async def login(self, username, senha):
+        corpo = json.dumps({'username': username, 'password': senha}).encode()
+        status, _ = await self.requisitar('POST', '/api/auth/login/', corpo, 'application/json')
+        if status != 200:
+            raise SystemExit(f'Login de {username} falhou ({status}): confira --senha.')
+
+
+async def gerar_carga(port, args, mix, ids, curtidos, tags, execucao):
+    latencias = defaultdict(list)
+    status_por_operacao = defaultdict(Counter)
+    contadores = Counter()
+    rnd = random.Random(args.seed)
+
+    virtuais = []
+    for username, momentos in curtidos.items():
+        virtual = UsuarioVirtual(port, momentos)
+        await virtual.login(username, args.senha)
+        virtuais.append(virtual)
+    logados = set(map(id, virtuais))
+    virtuais += [UsuarioVirtual(port) for _ in range(args.usuarios_virtuais - len(virtuais))]
+
+    operacoes, pesos = list(mix), list(mix.values())
+    video = b'\0' * args.tamanho_upload * 1024
+    fim = time.perf_counter() + args.duracao
+
+    async def executar(virtual, operacao):
+        if operacao == 'feed':
+            return await virtual.requisitar('GET', rnd.choice(FEED))
+        if operacao == 'view':
+            return await virtual.requisitar('POST', f'/api/momentos/{rnd.choice(ids)}/view/')
+        if operacao == 'like':
+            # Alterna: curte o que ainda não curtiu, descurte o que já curtiu
+            momento = rnd.choice(ids)
+            if momento in virtual.curtidos:
+                virtual.curtidos.discard(momento)
+                return await virtual.requisitar('DELETE', f'/api/momentos/{momento}/like/')
+            virtual.curtidos.add(momento)
+            return await virtual.requisitar('POST', f'/api/momentos/{momento}/like/')
+        contadores['uploads'] += 1
+        corpo, content_type = multipart(
+            {'titulo': f'Carga {execucao} #{contadores["uploads"]}', 'descricao': 'teste de carga',
+             'duracao': 10, 'is_private': 'false', 'tags': json.dumps(rnd.sample(tags, min(2, len(tags))))},
+            ('video', 'carga.mp4', video),
+        )
+        return await virtual.requisitar('POST', '/api/momentos/', corpo, content_type)
+
+    async def ciclo(virtual):
+        try:
+            while time.perf_counter() < fim:
+                operacao = rnd.choices(operacoes, weights=pesos)[0]
+                if operacao in EXIGEM_LOGIN and id(virtual) not in logados:
+                    operacao = 'feed'
+                inicio = time.perf_counter()
+                try:
+                    status, dados = await executar(virtual, operacao)
+                except (ConnectionError, OSError, asyncio.IncompleteReadError):
+                    status_por_operacao[operacao]['erro de conexão'] += 1
+                    await virtual.conexao.fechar()
+                    continue
+                latencias[operacao].append((time.perf_counter() - inicio) * 1000)
+                status_por_operacao[operacao][status] += 1
+
+                # O que o servidor diz ter gravado, para conferir com o banco no fim
+                if operacao in ('view', 'like') and status in (200, 201):
+                    mensagem = json.loads(dados).get('message')
+                    if mensagem == 'View incrementada':
+                        contadores['views'] += 1
+                    elif status == 201:
+                        contadores['likes'] += 1
+                    elif mensagem == 'Like removido':
+                        contadores['likes'] -= 1
+                if args.pensar:
+                    await asyncio.sleep(rnd.expovariate(1000 / args.pensar))
+        finally:
+            await virtual.conexao.fechar()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(ciclo(virtual) for virtual in virtuais))
+    return latencias, status_por_operacao, contadores, time.perf_counter() - inicio
+
+
+def conferir(antes, depois, contadores):
+    """Retorna a lista de problemas de consistência encontrados"""
+    problemas = []
+    delta_views = sum(depois[pk]['views'] - antes[pk]['views'] for pk in antes)
+    if delta_views != contadores['views']:
+        problemas.append(f'views: servidor contou {contadores["views"]}, banco mudou {delta_views}')
+    delta_likes = sum(depois[pk]['likes_count'] - antes[pk]['likes_count'] for pk in antes)
+    if delta_likes != contadores['likes']:
+        problemas.append(f'likes_count: respostas somam {contadores["likes"]:+}, banco mudou {delta_likes:+}')
+    for pk, linha in depois.items():
+        if linha['likes_count'] != linha['likes_reais']:
+            problemas.append(f'momento {pk}: likes_count={linha["likes_count"]}, linhas de Like={linha["likes_reais"]}')
+    return problemas
+
+
+def apagar_uploads(execucao):
+    """Remove os momentos enviados pela carga; o delete libera a referência do vídeo (momentos/conteudo.py)"""
+    from momentos.models import Momento
+    from momentos.tasks import aguardar_fila
+
+    momentos = list(Momento.objects.filter(titulo__startswith=f'Carga {execucao} #'))
+    for momento in momentos:
+        momento.delete()
+    aguardar_fila()  # a remoção dos arquivos roda na thread de tarefas
+    return len(momentos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--servidor', choices=['gunicorn', 'uvicorn'], default='gunicorn')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--porta', type=int, help='Usa um servidor já rodando nesta porta (não sobe outro)')
+    parser.add_argument('--usuarios-virtuais', type=int, default=100)
+    parser.add_argument('--logados', type=float, default=0.6, help='Fração de usuários virtuais logados')
+    parser.add_argument('--duracao', type=float, default=30, help='Segundos de carga')
+    parser.add_argument('--pensar', type=float, default=0, help='Tempo médio de "pensar" entre requisições (ms)')
+    parser.add_argument('--mix', default=MIX_PADRAO, help='Pesos por operação: feed, view, like, upload')
+    parser.add_argument('--quentes', type=int, default=20, help='Momentos que recebem views e likes')
+    parser.add_argument('--tamanho-upload', type=int, default=256, help='KB por vídeo enviado')
+    parser.add_argument('--prefixo', default='sint', help='Prefixo dos usuários do gerar_dados')
+    parser.add_argument('--senha', default='sintetico123')
+    parser.add_argument('--com-limites', action='store_true',
+                        help='Mantém throttling e deduplicação de views do .env')
+    parser.add_argument('--manter-uploads', action='store_true')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--saida', help='Arquivo JSON do relatório')
+    args = parser.parse_args()
+
+    mix = ler_mix(args.mix)
+    setup()
+    ids, usuarios, tags = preparar_alvos(args.quentes, args.prefixo)
+    execucao = uuid.uuid4().hex[:8]
+    total_logados = min(round(args.usuarios_virtuais * args.logados), len(usuarios))
+    curtidos = curtidas_atuais(random.Random(args.seed).sample(usuarios, total_logados), ids)
+    antes = estado(ids)
+
+    proc = None
+    port = args.porta
+    if port is None:
+        port = porta_livre()
+        env = {**LOGS_SILENCIOSOS, 'ASYNC_VIEWS': str(args.servidor == 'uvicorn')}
+        if not args.com_limites:
+            env.update(SEM_LIMITES)
+        proc = iniciar_servidor(args.servidor, port, args.workers, env)
+    try:
+        latencias, status_por_operacao, contadores, duracao = asyncio.run(
+            gerar_carga(port, args, mix, ids, curtidos, tags, execucao)
+        )
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    depois = estado(ids)
+    problemas = conferir(antes, depois, contadores)
+
+    total = sum(len(v) for v in latencias.values())
+    servidor = f'porta {args.porta}' if args.porta else f'{args.servidor}, {args.workers} workers'
+    print(f'\n== {servidor}, {args.usuarios_virtuais} usuários virtuais ({args.logados:.0%} logados) ==')
+    print(f'  total: {total / duracao:.1f} req/s em {duracao:.1f}s')
+    relatorio = {'execucao': execucao, 'req_s': round(total / duracao, 1), 'operacoes': {}, 'problemas': problemas,
+                 'parametros': {k: v for k, v in vars(args).items() if k != 'senha'}}
+    for operacao, amostras in sorted(latencias.items()):
+        p = percentis(amostras)
+        codigos = dict(sorted(status_por_operacao[operacao].items(), key=str))
+        relatorio['operacoes'][operacao] = {
+            'n': len(amostras), 'req_s': round(len(amostras) / duracao, 1),
+            **{k: round(v, 2) for k, v in p.items()}, 'status': {str(k): v for k, v in codigos.items()},
+        }
+        print(f"  {operacao:<7} {len(amostras) / duracao:8.1f} req/s   p50 {p['p50']:8.1f}   p95 {p['p95']:8.1f}   "
+              f"p99 {p['p99']:8.1f} ms   {codigos}")
+
+    print(f"\n  views contadas: {contadores['views']}, saldo de likes: {contadores['likes']:+}")
+    for problema in problemas:
+        print(f'  ATUALIZAÇÃO PERDIDA: {problema}')
+    if not problemas:
+        print('  Nenhuma atualização perdida.')
+
+    if contadores['uploads'] and not args.manter_uploads:
+        print(f'  {apagar_uploads(execucao)} uploads de teste apagados.')
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, indent=2, sort_keys=True, ensure_ascii=False)
+            arquivo.write('\n')
+    sys.exit(1 if problemas else 0)
+
+
+if __name__ == '__main__':
+    main()
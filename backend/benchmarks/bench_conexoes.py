@@ -0,0 +1,150 @@
+"""
+Benchmark: custo de conexão com o banco (sem persistência x persistente x pool)
+Localização: backend/benchmarks/bench_conexoes.py
+
+Uso (a partir de backend/, com o .env apontando para o Postgres local):
+    python benchmarks/bench_conexoes.py [--requisicoes 500] [--threads 8]
+
+Cada cenário roda em um subprocesso com as variáveis DB_* correspondentes.
+As requisições passam por toda a pilha de middlewares (django.test.Client) e,
+como o handler WSGI real, chamam close_old_connections() no início e no fim
+de cada requisição, então o handshake com o Postgres é medido de verdade.
+O cenário "pool" requer `pip install "psycopg[binary,pool]"`.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._django import percentis, setup  # noqa: E402
+
+# Sem limite de views nem deduplicação: cada POST /view/ chega ao banco (senão, a partir
+# da 2ª requisição do mesmo usuário, mediríamos o cache e os 429 do throttle)
+SEM_LIMITES = {'THROTTLE_VIEWS': '1000000/min', 'VIEWS_JANELA_DEDUP_MINUTOS': '0'}
+CENARIOS = {
+    'sem_persistencia': {'DB_CONN_MAX_AGE': '0', 'DB_CONN_HEALTH_CHECKS': 'False', 'DB_POOL': 'False', **SEM_LIMITES},
+    'persistente': {'DB_CONN_MAX_AGE': '60', 'DB_CONN_HEALTH_CHECKS': 'True', 'DB_POOL': 'False', **SEM_LIMITES},
+    'pool': {'DB_POOL': 'True', **SEM_LIMITES},
+}
+
+USERNAME = 'bench_conexoes'
+
+
+def preparar():
+    """Cria (se necessário) o usuário e o momento usados pelo benchmark."""
+    from django.contrib.auth import get_user_model
+    from momentos.models import Momento
+
+    Usuario = get_user_model()
+    usuario, _ = Usuario.objects.get_or_create(
+        username=USERNAME, defaults={'email': f'{USERNAME}@example.com'}
+    )
+    dono, _ = Usuario.objects.get_or_create(
+        username=f'{USERNAME}_dono', defaults={'email': f'{USERNAME}_dono@example.com'}
+    )
+    momento, _ = Momento.objects.get_or_create(
+        usuario=dono, titulo='bench_conexoes', defaults={'video': 'videos/bench.mp4'}
+    )
+    return usuario, momento
+
+
+def limpar():
+    from django.contrib.auth import get_user_model
+    get_user_model().objects.filter(username__startswith=USERNAME).delete()
+
+
+def worker(requisicoes, threads):
+    """Executado dentro do subprocesso de cada cenário."""
+    setup()
+    from django.db import close_old_connections, connections
+    from django.test import Client
+
+    usuario, momento = preparar()
+    endpoints = {
+        'GET /api/auth/csrf/': ('get', '/api/auth/csrf/'),
+        'GET /api/momentos/tags/': ('get', '/api/momentos/tags/'),
+        'POST /api/momentos/{id}/view/': ('post', f'/api/momentos/{momento.pk}/view/'),
+    }
+    resultados = {}
+
+    for nome, (metodo, url) in endpoints.items():
+        latencias, falhas = [], [0]
+        lock = threading.Lock()
+        por_thread = max(1, requisicoes // threads)
+
+        def trabalhar():
+            client = Client(HTTP_HOST='localhost')
+            client.force_login(usuario)
+            locais, falhas_locais = [], 0
+            for _ in range(por_thread):
+                inicio = time.perf_counter()
+                close_old_connections()  # request_started
+                resposta = getattr(client, metodo)(url)
+                close_old_connections()  # request_finished
+                locais.append((time.perf_counter() - inicio) * 1000)
+                falhas_locais += resposta.status_code >= 300
+            connections.close_all()
+            with lock:
+                latencias.extend(locais)
+                falhas[0] += falhas_locais
+
+        pool = [threading.Thread(target=trabalhar) for _ in range(threads)]
+        inicio = time.perf_counter()
+        for t in pool:
+            t.start()
+        for t in pool:
+            t.join()
+        duracao = time.perf_counter() - inicio
+
+        resultados[nome] = {
+            'requisicoes': len(latencias),
+            'req_s': round(len(latencias) / duracao, 1),
+            'falhas': falhas[0],
+            **{k: round(v, 2) for k, v in percentis(latencias).items()},
+        }
+
+    print(json.dumps(resultados))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requisicoes', type=int, default=500, help='Requisições por endpoint')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--cenarios', nargs='+', default=list(CENARIOS), choices=list(CENARIOS))
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.requisicoes, args.threads)
+        return
+
+    relatorio = {}
+    for cenario in args.cenarios:
+        env = {**os.environ, **CENARIOS[cenario]}
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--worker',
+             '--requisicoes', str(args.requisicoes), '--threads', str(args.threads)],
+            env=env, capture_output=True, text=True
+        )
+        if proc.returncode != 0:
+            print(f'[{cenario}] falhou:\n{proc.stderr.strip().splitlines()[-1] if proc.stderr else ""}')
+            continue
+        relatorio[cenario] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    for cenario, endpoints in relatorio.items():
+        print(f'\n== {cenario} ==')
+        for nome, r in endpoints.items():
+            print(f"  {nome:<32} {r['req_s']:>8} req/s   p50 {r['p50']:>7} ms   p95 {r['p95']:>7} ms"
+                  + (f"   {r['falhas']} resposta(s) não 2xx" if r['falhas'] else ''))
+
+    setup()
+    limpar()
+
+
+if __name__ == '__main__':
+    main()
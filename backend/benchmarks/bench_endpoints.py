@@ -0,0 +1,349 @@
+"""
+Benchmark: latência e consultas de todos os endpoints da API, com relatório JSON
+Localização: backend/benchmarks/bench_endpoints.py
+
+Uso (a partir de backend/):
+    python manage.py gerar_dados --usuarios 10000 --momentos 100000   # uma vez
+    python benchmarks/bench_endpoints.py [--repeticoes 50] [--saida relatorio.json]
+    python benchmarks/bench_endpoints.py --comparar relatorio.json    # depois da mudança
+
+Cobre cada rota de momentos/urls.py e usuarios/urls.py (avisa se alguma
+ficar sem caso) com o banco atual; sem momentos públicos, ou com
+--temporario, usa um conjunto pequeno temporário. Escritas (likes, views,
+comentários, upload, cadastro...) rodam dentro de uma transação desfeita ao
+final, com os uploads em memória e os limites de requisição desligados.
+O JSON tem chaves ordenadas e um caso por linha de tabela: dá para versionar
+e comparar entre commits (--comparar).
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._django import BACKEND_DIR, percentis, setup  # noqa: E402
+
+SENHA = 'bench-senha-123'
+
+
+@dataclass
+class Caso:
+    nome: str
+    metodo: str
+    caminho: str            # formatado com o contexto: '/api/momentos/{momento}/'
+    rota: str               # nome da rota ('momentos:momento-detail'), para a cobertura
+    usuario: str = 'leitor'  # cliente: 'leitor', 'autor', 'anonimo' ou 'descartavel'
+    corpo: object = None    # dict ou função(contexto) -> dict
+    multipart: bool = False
+    preparar: object = None  # função(contexto) chamada antes de cada requisição, fora da medição
+
+
+def casos():
+    from django.core.cache import cache
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.utils import timezone
+    from momentos import relacionados, timeline
+    from momentos.models import Comentario, Like, Momento
+
+    def sem_like(ctx):
+        Like.objects.filter(usuario=ctx['leitor_obj'], momento_id=ctx['momento']).delete()
+
+    def com_like(ctx):
+        Like.objects.get_or_create(usuario=ctx['leitor_obj'], momento_id=ctx['momento'])
+
+    def view_nova(ctx):
+        cache.delete(f"view:{ctx['momento']}:{ctx['leitor_obj'].pk}")
+
+    def novo_comentario(ctx):
+        ctx['comentario'] = Comentario.objects.create(
+            usuario=ctx['leitor_obj'], momento_id=ctx['momento'], texto='bench').pk
+
+    def novo_momento(ctx):
+        ctx['momento_proprio'] = Momento.objects.create(
+            usuario=ctx['leitor_obj'], titulo='bench', video='videos/bench.mp4').pk
+
+    def nao_seguindo(ctx):
+        timeline.deixar_de_seguir(ctx['leitor_obj'], ctx['autor_obj'])
+
+    def seguindo(ctx):
+        timeline.seguir(ctx['leitor_obj'], ctx['autor_obj'])
+
+    def indexado(ctx):
+        if not ctx.get('relacionados'):
+            relacionados.atualizar(ctx['momento'])
+            ctx['relacionados'] = True
+
+    def codigo_valido(ctx):
+        type(ctx['leitor_obj']).objects.filter(pk=ctx['leitor_obj'].pk).update(
+            password_reset_code='123456', password_reset_sent_at=timezone.now(), password_reset_attempts=0)
+
+    def logar(ctx):
+        # Cliente próprio: o logout não derruba a sessão usada pelos outros casos
+        ctx['clientes']['descartavel'].force_login(ctx['leitor_obj'])
+
+    contador = iter(range(10 ** 9))
+
+    def cadastro(ctx):
+        n = next(contador)
+        return {'username': f'bench_novo_{n}', 'email': f'bench_novo_{n}@example.com',
+                'password': SENHA, 'password2': SENHA, 'first_name': 'Bench'}
+
+    def upload(ctx):
+        return {'titulo': 'Upload bench', 'descricao': 'bench', 'duracao': 10, 'tags': '["bench"]',
+                'video': SimpleUploadedFile('lance.mp4', b'\0' * 64 * 1024, content_type='video/mp4')}
+
+    return [
+        # momentos/urls.py
+        Caso('feed recentes (anônimo)', 'GET', '/api/momentos/', 'momentos:momento-list-create', 'anonimo'),
+        Caso('feed recentes', 'GET', '/api/momentos/', 'momentos:momento-list-create'),
+        Caso('feed trending', 'GET', '/api/momentos/?sort=trending', 'momentos:momento-list-create'),
+        Caso('feed popular', 'GET', '/api/momentos/?sort=popular', 'momentos:momento-list-create'),
+        Caso('feed por tag', 'GET', '/api/momentos/?tag={tag}', 'momentos:momento-list-create'),
+        Caso('feed busca', 'GET', '/api/momentos/?search={busca_momento}', 'momentos:momento-list-create'),
+        Caso('timeline', 'GET', '/api/momentos/timeline/', 'momentos:timeline', preparar=seguindo),
+        Caso('upload de momento', 'POST', '/api/momentos/', 'momentos:momento-list-create',
+             corpo=upload, multipart=True),
+        Caso('detalhe (anônimo)', 'GET', '/api/momentos/{momento}/', 'momentos:momento-detail', 'anonimo'),
+        Caso('detalhe', 'GET', '/api/momentos/{momento}/', 'momentos:momento-detail'),
+        Caso('editar momento', 'PATCH', '/api/momentos/{momento_proprio}/', 'momentos:momento-detail',
+             corpo={'titulo': 'Editado'}, preparar=novo_momento),
+        Caso('excluir momento', 'DELETE', '/api/momentos/{momento_proprio}/', 'momentos:momento-detail',
+             preparar=novo_momento),
+        Caso('sugestões', 'GET', '/api/momentos/{momento}/suggestions/', 'momentos:momento-suggestions',
+             preparar=indexado),
+        Caso('playlist HLS', 'GET', '/api/momentos/{momento}/hls/1/master.m3u8', 'momentos:momento-hls'),
+        Caso('view', 'POST', '/api/momentos/{momento}/view/', 'momentos:momento-increment-view',
+             preparar=view_nova),
+        Caso('view repetida', 'POST', '/api/momentos/{momento}/view/', 'momentos:momento-increment-view'),
+        Caso('like', 'POST', '/api/momentos/{momento}/like/', 'momentos:momento-like', preparar=sem_like),
+        Caso('descurtir', 'DELETE', '/api/momentos/{momento}/like/', 'momentos:momento-like', preparar=com_like),
+        Caso('comentários', 'GET', '/api/momentos/{momento}/comentarios/', 'momentos:comentario-list-create'),
+        Caso('comentar', 'POST', '/api/momentos/{momento}/comentarios/', 'momentos:comentario-list-create',
+             corpo={'texto': 'Que lance!'}),
+        Caso('excluir comentário', 'DELETE', '/api/momentos/comentarios/{comentario}/',
+             'momentos:comentario-delete', preparar=novo_comentario),
+        Caso('tags', 'GET', '/api/momentos/tags/', 'momentos:tag-list', 'anonimo'),
+        Caso('notificações', 'GET', '/api/momentos/notificacoes/', 'momentos:notificacao-list', 'autor'),
+        Caso('marcar lidas', 'POST', '/api/momentos/notificacoes/marcar-lidas/',
+             'momentos:notificacao-marcar-lidas', 'autor'),
+        # usuarios/urls.py
+        Caso('cadastro', 'POST', '/api/auth/register/', 'usuarios:register', 'anonimo', corpo=cadastro),
+        Caso('login', 'POST', '/api/auth/login/', 'usuarios:login', 'anonimo',
+             corpo=lambda ctx: {'username': ctx['leitor'], 'password': SENHA}),
+        Caso('logout', 'POST', '/api/auth/logout/', 'usuarios:logout', 'descartavel', preparar=logar),
+        Caso('usuário atual', 'GET', '/api/auth/user/', 'usuarios:current-user'),
+        Caso('editar perfil', 'PATCH', '/api/auth/user/', 'usuarios:current-user', corpo={'bio': 'Bench'}),
+        Caso('csrf', 'GET', '/api/auth/csrf/', 'usuarios:csrf', 'anonimo'),
+        Caso('bootstrap (anônimo)', 'GET', '/api/auth/bootstrap/', 'usuarios:bootstrap', 'anonimo'),
+        Caso('bootstrap', 'GET', '/api/auth/bootstrap/', 'usuarios:bootstrap'),
+        Caso('perfil público', 'GET', '/api/auth/profile/{perfil}/', 'usuarios:public-profile', 'anonimo'),
+        Caso('seguir', 'POST', '/api/auth/profile/{perfil}/seguir/', 'usuarios:seguir', preparar=nao_seguindo),
+        Caso('deixar de seguir', 'DELETE', '/api/auth/profile/{perfil}/seguir/', 'usuarios:seguir',
+             preparar=seguindo),
+        Caso('busca de usuários', 'GET', '/api/auth/search/?search={busca_usuario}', 'usuarios:user-search'),
+        Caso('código de senha', 'POST', '/api/auth/password-reset-code/', 'usuarios:password-reset-code',
+             'anonimo', corpo=lambda ctx: {'email': ctx['leitor_email']}),
+        Caso('verificar código', 'POST', '/api/auth/password-reset-verify/', 'usuarios:password-reset-verify',
+             'anonimo', corpo=lambda ctx: {'email': ctx['leitor_email'], 'code': '123456'},
+             preparar=codigo_valido),
+        Caso('redefinir senha', 'POST', '/api/auth/password-reset/', 'usuarios:password-reset', 'anonimo',
+             corpo=lambda ctx: {'email': ctx['leitor_email'], 'code': '123456', 'new_password': SENHA},
+             preparar=codigo_valido),
+    ]
+
+
+def rotas_sem_caso(lista):
+    from momentos import urls as momentos_urls
+    from usuarios import urls as usuarios_urls
+
+    cobertas = {caso.rota for caso in lista}
+    todas = {f'{modulo.app_name}:{padrao.name}'
+             for modulo in (momentos_urls, usuarios_urls) for padrao in modulo.urlpatterns}
+    return sorted(todas - cobertas)
+
+
+def contexto_dos_dados():
+    """Alvos realistas: o momento público mais curtido, seu autor, uma tag e termos de busca"""
+    from django.contrib.auth.models import AnonymousUser
+    from django.db.models import Count
+    from momentos.models import Momento, Tag
+
+    momento = (Momento.objects.visible_to(AnonymousUser()).select_related('usuario')
+               .order_by('-likes_count', '-views').first())
+    if momento is None:
+        return None
+    tag = Tag.objects.annotate(total=Count('momentos')).order_by('-total').first()
+    return {
+        'momento': momento.pk,
+        'autor_obj': momento.usuario,
+        'perfil': momento.usuario.username,
+        'tag': tag.slug if tag else 'sem-tag',
+        'busca_momento': momento.titulo.split()[0],
+        'busca_usuario': momento.usuario.username[:3],
+    }
+
+
+def medir(caso, ctx, repeticoes):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    client = ctx['clientes'][caso.usuario]
+    funcao = getattr(client, caso.metodo.lower())
+
+    def requisicao():
+        if caso.preparar:
+            caso.preparar(ctx)
+        caminho = caso.caminho.format(**ctx)
+        corpo = caso.corpo(ctx) if callable(caso.corpo) else caso.corpo
+        if caso.multipart:
+            return lambda: funcao(caminho, corpo)
+        return lambda: funcao(caminho, corpo, content_type='application/json')
+
+    requisicao()()  # aquece
+    chamada = requisicao()
+    with CaptureQueriesContext(connection) as consultas:
+        resposta = chamada()
+    # Lido já: com DEBUG=True o log de consultas é zerado a cada requisição
+    total_consultas = len(consultas)
+
+    duracoes = []
+    for _ in range(repeticoes):
+        chamada = requisicao()
+        inicio = time.perf_counter()
+        chamada()
+        duracoes.append((time.perf_counter() - inicio) * 1000)
+
+    p = percentis(duracoes)
+    return {
+        'endpoint': f'{caso.metodo} {caso.caminho.split("?")[0]}',
+        'status': resposta.status_code,
+        'consultas': total_consultas,
+        'p50_ms': round(p['p50'], 3),
+        'p95_ms': round(p['p95'], 3),
+        'p99_ms': round(p['p99'], 3),
+        'media_ms': round(statistics.mean(duracoes), 3),
+    }
+
+
+def metadados(repeticoes, temporario):
+    from django.conf import settings
+    from django.db import connection
+    from django.contrib.auth import get_user_model
+    from momentos.models import Comentario, Like, Momento
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'banco': connection.vendor,
+        'dados': 'temporario' if temporario else {
+            'usuarios': get_user_model().objects.count(),
+            'momentos': Momento.objects.count(),
+            'likes': Like.objects.count(),
+            'comentarios': Comentario.objects.count(),
+        },
+        'repeticoes': repeticoes,
+        'settings': {
+            'ASYNC_VIEWS': settings.ASYNC_VIEWS,
+            'RENDERER': settings.REST_FRAMEWORK.get('DEFAULT_RENDERER_CLASSES', ['padrão'])[0],
+            'SESSION_ENGINE': settings.SESSION_ENGINE,
+            'CACHE': settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1],
+        },
+    }
+
+
+def comparar(base, atual):
+    print(f'\nComparação com {base["meta"].get("commit")} -> {atual["meta"].get("commit")}')
+    print(f'  {"caso":<28} {"p50 base":>9} {"p50 atual":>9} {"Δ":>7}   consultas')
+    for nome, dados in atual['casos'].items():
+        anterior = base['casos'].get(nome)
+        if anterior is None:
+            print(f'  {nome:<28} (novo)')
+            continue
+        delta = (dados['p50_ms'] / anterior['p50_ms'] - 1) * 100 if anterior['p50_ms'] else 0
+        alerta = ' !' if dados['consultas'] > anterior['consultas'] or delta > 20 else ''
+        print(f'  {nome:<28} {anterior["p50_ms"]:>9.3f} {dados["p50_ms"]:>9.3f} {delta:>+6.0f}%   '
+              f'{anterior["consultas"]:>3} -> {dados["consultas"]:<3}{alerta}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticoes', type=int, default=50)
+    parser.add_argument('--saida', help='Arquivo JSON do relatório')
+    parser.add_argument('--comparar', help='Relatório JSON anterior para comparar')
+    parser.add_argument('--temporario', action='store_true', help='Usa um conjunto pequeno temporário')
+    parser.add_argument('--caso', action='append', help='Mede só os casos com este nome (repetível)')
+    args = parser.parse_args()
+
+    setup()
+    import logging
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+    from django.test import Client, override_settings
+    from benchmarks._fixtures import dados_temporarios
+    from config.throttling import JanelaDeslizanteThrottle
+
+    # 4xx esperados (ex.: logout sem sessão) não devem poluir a saída
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+    logging.getLogger('config.acesso').setLevel(logging.WARNING)
+
+    lista = casos()
+    faltando = rotas_sem_caso(lista)
+    if faltando:
+        print(f'AVISO: rotas sem caso de benchmark: {", ".join(faltando)}')
+    if args.caso:
+        lista = [caso for caso in lista if caso.nome in args.caso]
+
+    storages = {**settings.STORAGES, 'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'}}
+    sem_limites = mock.patch.object(JanelaDeslizanteThrottle, 'THROTTLE_RATES', defaultdict(lambda: '1000000/s'))
+
+    ctx = None if args.temporario else contexto_dos_dados()
+    temporario = ctx is None
+    if temporario and not args.temporario:
+        print('Nenhum momento público no banco (rode gerar_dados): usando dados temporários.')
+
+    resultados = {}
+    with override_settings(STORAGES=storages), sem_limites, transaction.atomic():
+        dados = dados_temporarios(total_momentos=48) if temporario else contextlib.nullcontext()
+        with dados:
+            ctx = ctx or contexto_dos_dados()
+            leitor = get_user_model().objects.create_user(
+                username='bench_leitor', email='bench_leitor@example.com', password=SENHA)
+            ctx.update(leitor=leitor.username, leitor_obj=leitor, leitor_email=leitor.email)
+            ctx['clientes'] = {nome: Client() for nome in ('anonimo', 'leitor', 'autor', 'descartavel')}
+            ctx['clientes']['leitor'].force_login(leitor)
+            ctx['clientes']['autor'].force_login(ctx['autor_obj'])
+            meta = metadados(args.repeticoes, temporario)
+
+            for caso in lista:
+                resultados[caso.nome] = medir(caso, ctx, args.repeticoes)
+                r = resultados[caso.nome]
+                print(f'  {caso.nome:<28} {r["status"]:>3}  {r["consultas"]:>3} consultas   '
+                      f'p50 {r["p50_ms"]:8.3f}  p95 {r["p95_ms"]:8.3f}  p99 {r["p99_ms"]:8.3f} ms')
+        transaction.set_rollback(True)
+
+    relatorio = {'meta': meta, 'casos': resultados}
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, indent=2, sort_keys=True, ensure_ascii=False)
+            arquivo.write('\n')
+        print(f'Relatório salvo em {args.saida}')
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            comparar(json.load(arquivo), relatorio)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Micro-benchmark: MomentoListSerializer x caminho rápido do feed (momentos/feed.py)
+Localização: backend/benchmarks/bench_feed.py
+
+Uso (a partir de backend/):
+    python benchmarks/bench_feed.py [--repeticoes 200] [--itens 24]
+
+Mede uma página completa do feed (consultas + serialização) sobre dados
+temporários (desfeitos ao final), para um visitante anônimo e um usuário
+logado, e confere que as duas saídas são idênticas byte a byte.
+"""
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._django import cronometrar, setup  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticoes', type=int, default=200)
+    parser.add_argument('--itens', type=int, default=24, help='Itens por página')
+    args = parser.parse_args()
+
+    setup()
+    from django.contrib.auth.models import AnonymousUser
+    from django.db import connection
+    from django.test import RequestFactory
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.request import Request
+    from benchmarks._fixtures import dados_temporarios
+    from momentos.feed import serializar_feed, valores_feed
+    from momentos.models import Momento
+    from momentos.serializers import MomentoListSerializer
+
+    with dados_temporarios(total_momentos=args.itens) as dados:
+        pks = [m.pk for m in dados['momentos']]
+
+        for rotulo, user in (('anônimo', AnonymousUser()), ('logado', dados['usuarios'][0])):
+            request = Request(RequestFactory().get('/api/momentos/', HTTP_HOST='localhost'))
+            request.user = user
+            queryset = (
+                Momento.objects.visible_to(user).filter(pk__in=pks)
+                .select_related('usuario').prefetch_related('tags').order_by('-created_at')
+            )
+
+            def serializer():
+                return MomentoListSerializer(list(queryset), many=True, context={'request': request}).data
+
+            def rapido():
+                return serializar_feed(list(valores_feed(queryset)), request)
+
+            identico = JSONRenderer().render(serializer()) == JSONRenderer().render(rapido())
+            print(f"\n== página de {args.itens} itens, {rotulo} (saída idêntica: {'sim' if identico else 'NÃO'}) ==")
+
+            medianas = {}
+            for nome, func in (('MomentoListSerializer', serializer), ('serializar_feed', rapido)):
+                with CaptureQueriesContext(connection) as consultas:
+                    func()
+                duracoes = cronometrar(func, args.repeticoes)
+                medianas[nome] = statistics.median(duracoes)
+                print(f'  {nome:<22} mediana {medianas[nome]:8.2f} ms   {len(consultas)} consultas')
+            print(f"  ganho: {medianas['MomentoListSerializer'] / medianas['serializar_feed']:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
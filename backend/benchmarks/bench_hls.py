@@ -0,0 +1,106 @@
+"""
+Benchmark: bytes por view, arquivo progressivo x HLS adaptativo
+Localização: backend/benchmarks/bench_hls.py
+
+Uso (a partir de backend/, com ffmpeg no PATH ou em HLS_FFMPEG):
+    python benchmarks/bench_hls.py [--video lance.mp4] [--duracao 30] [--buffer 30]
+
+Empacota o vídeo (por padrão, um clipe sintético 1080p a 8 Mbps, como um
+upload de celular) com o mesmo comando do momentos/hls.py e simula views:
+- progressivo: o <video> baixa o arquivo original inteiro (clipes curtos
+  são baixados até o fim bem antes de a pessoa parar de assistir);
+- HLS: o player escolhe o maior degrau com BANDWIDTH <= 80% da banda e baixa
+  as playlists + os segmentos até o ponto assistido + --buffer segundos.
+Mostra os bytes por view para cada banda e fração assistida.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._django import setup  # noqa: E402
+
+BANDAS_KBPS = (1500, 4000, 10000)
+FRACOES_ASSISTIDAS = (0.25, 0.5, 1.0)
+
+
+def gerar_clipe(ffmpeg, destino, duracao):
+    subprocess.run(
+        [ffmpeg, '-hide_banner', '-loglevel', 'error', '-y',
+         '-f', 'lavfi', '-i', 'testsrc2=size=1920x1080:rate=30', '-f', 'lavfi', '-i', 'sine=frequency=440',
+         '-t', str(duracao), '-c:v', 'libx264', '-b:v', '8M', '-c:a', 'aac', '-b:a', '128k', '-shortest',
+         str(destino)],
+        check=True,
+    )
+
+
+def ler_pacote(pasta, master):
+    """[(bandwidth, tamanho das playlists, [(duração, bytes) por segmento])] por degrau"""
+    texto = (pasta / master).read_text()
+    variantes = re.findall(r'#EXT-X-STREAM-INF:.*?BANDWIDTH=(\d+).*\n(\S+)', texto)
+    degraus = []
+    for bandwidth, playlist in variantes:
+        linhas = (pasta / playlist).read_text().splitlines()
+        segmentos = []
+        for linha, proxima in zip(linhas, linhas[1:]):
+            if linha.startswith('#EXTINF:'):
+                segmentos.append((float(linha[8:].rstrip(',')), (pasta / proxima).stat().st_size))
+        tamanho_playlists = (pasta / master).stat().st_size + (pasta / playlist).stat().st_size
+        degraus.append((int(bandwidth), tamanho_playlists, segmentos))
+    return sorted(degraus)
+
+
+def bytes_hls(degraus, banda_kbps, assistido, buffer):
+    """Bytes baixados por um player ABR simples até `assistido` segundos (+ buffer)"""
+    cabem = [degrau for degrau in degraus if degrau[0] <= banda_kbps * 1000 * 0.8] or degraus[:1]
+    bandwidth, playlists, segmentos = cabem[-1]
+    total, tempo = playlists, 0.0
+    for duracao, tamanho in segmentos:
+        if tempo >= assistido + buffer:
+            break
+        total += tamanho
+        tempo += duracao
+    return total, bandwidth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--video', help='Vídeo de entrada (padrão: clipe sintético 1080p)')
+    parser.add_argument('--duracao', type=float, default=30, help='Duração do clipe sintético (s)')
+    parser.add_argument('--buffer', type=float, default=30, help='Segundos que o player HLS baixa à frente')
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+    from momentos import hls
+
+    with tempfile.TemporaryDirectory(prefix='bench-hls-') as temporario:
+        temporario = Path(temporario)
+        entrada = Path(args.video) if args.video else temporario / 'entrada.mp4'
+        if not args.video:
+            gerar_clipe(settings.HLS_FFMPEG, entrada, args.duracao)
+        saida = temporario / 'saida'
+        saida.mkdir()
+
+        altura, tem_audio = hls._sondar(entrada)
+        subprocess.run(hls.comando_ffmpeg(entrada, saida, altura, tem_audio), check=True)
+        degraus = ler_pacote(saida, hls.MASTER)
+        original = entrada.stat().st_size
+        duracao = sum(d for d, _ in degraus[0][2])
+
+        print(f'\n== original {original / 1e6:.1f} MB ({altura}p, {original * 8 / duracao / 1e6:.1f} Mbps), '
+              f'{len(degraus)} degraus, segmentos de {settings.HLS_SEGUNDOS}s, buffer {args.buffer:.0f}s ==')
+        for banda in BANDAS_KBPS:
+            for fracao in FRACOES_ASSISTIDAS:
+                total, bandwidth = bytes_hls(degraus, banda, duracao * fracao, args.buffer)
+                print(f'  banda {banda / 1000:4.1f} Mbps, assistiu {fracao:4.0%}:   progressivo {original / 1e6:6.2f} MB   '
+                      f'HLS {total / 1e6:6.2f} MB (degrau {bandwidth / 1e6:.1f} Mbps)   {1 - total / original:5.0%} menos')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Micro-benchmark: JSONRenderer/JSONParser do DRF x ORJSONRenderer/ORJSONParser
+Localização: backend/benchmarks/bench_json.py
+
+Uso (a partir de backend/):
+    python benchmarks/bench_json.py [--repeticoes 2000]
+
+Os payloads são gerados pelos serializers reais (página de 24 itens do
+MomentoListSerializer e um MomentoDetailSerializer) sobre dados temporários
+(desfeitos ao final). Também confere que as duas saídas são idênticas byte a byte.
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._django import cronometrar, setup  # noqa: E402
+
+
+def gerar_payloads():
+    from django.test import RequestFactory
+    from rest_framework.request import Request
+    from benchmarks._fixtures import dados_temporarios
+    from momentos.models import Momento
+    from momentos.serializers import MomentoDetailSerializer, MomentoListSerializer
+
+    with dados_temporarios(total_momentos=24) as dados:
+        request = Request(RequestFactory().get('/api/momentos/', HTTP_HOST='localhost'))
+        request.user = dados['usuarios'][0]
+        contexto = {'request': request}
+        pks = [m.pk for m in dados['momentos']]
+        momentos = Momento.objects.filter(pk__in=pks).select_related('usuario').prefetch_related('tags')
+        lista = {
+            'count': 24, 'next': None, 'previous': None,
+            'results': MomentoListSerializer(momentos, many=True, context=contexto).data,
+        }
+        detalhe = MomentoDetailSerializer(momentos[0], context=contexto).data
+    return {'lista (24 itens)': lista, 'detalhe': detalhe}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticoes', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup()
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from config.renderers import ORJSONParser, ORJSONRenderer, orjson
+
+    if orjson is None:
+        print('Aviso: orjson não instalado; ORJSONRenderer está usando o fallback (json da stdlib).')
+
+    for nome, payload in gerar_payloads().items():
+        padrao = JSONRenderer().render(payload)
+        rapido = ORJSONRenderer().render(payload)
+        identico = 'sim' if padrao == rapido else 'NÃO'
+        print(f'\n== {nome}: {len(padrao)} bytes, saída idêntica: {identico} ==')
+
+        for rotulo, func in (
+            ('render  DRF', lambda: JSONRenderer().render(payload)),
+            ('render  orjson', lambda: ORJSONRenderer().render(payload)),
+            ('parse   DRF', lambda: JSONParser().parse(io.BytesIO(padrao))),
+            ('parse   orjson', lambda: ORJSONParser().parse(io.BytesIO(padrao))),
+        ):
+            duracoes = cronometrar(func, args.repeticoes)
+            print(f'  {rotulo:<16} mediana {statistics.median(duracoes) * 1000:8.1f} µs')
+
+
+if __name__ == '__main__':
+    main()
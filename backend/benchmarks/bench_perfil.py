@@ -0,0 +1,55 @@
+"""
+Benchmark: custo do PerfilMiddleware por requisição
+Localização: backend/benchmarks/bench_perfil.py
+
+Uso (a partir de backend/):
+    python benchmarks/bench_perfil.py [--requisicoes 500]
+
+Mede GET /api/momentos/ (feed, algumas consultas) e GET /api/auth/csrf/
+(quase sem trabalho, onde o custo relativo do middleware aparece mais) com o
+perfil desligado, amostrando 1% e medindo todas as requisições.
+Tudo é desfeito ao final; os histogramas gerados não são descarregados no cache.
+"""
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._django import cronometrar, percentis, setup  # noqa: E402
+
+MODOS = {
+    'desligado': 0.0,
+    'amostra 1%': 0.01,
+    'todas': 1.0,
+}
+CAMINHOS = ['/api/momentos/', '/api/auth/csrf/']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requisicoes', type=int, default=500)
+    args = parser.parse_args()
+
+    setup()
+    from django.test import Client, override_settings
+    from benchmarks._fixtures import dados_temporarios
+    from config import perfil
+
+    with dados_temporarios(total_momentos=24):
+        for caminho in CAMINHOS:
+            print(f'\n== GET {caminho} ==')
+            for nome, taxa in MODOS.items():
+                # O intervalo longo mantém os histogramas em memória (sem I/O de cache na medição)
+                with override_settings(PERFIL_AMOSTRAGEM=taxa, PERFIL_INTERVALO_SEGUNDOS=10 ** 9):
+                    client = Client()
+                    client.get(caminho)  # aquece (carrega os middlewares)
+                    duracoes = cronometrar(lambda: client.get(caminho), args.requisicoes)
+                print(f'  {nome:<12} mediana {statistics.median(duracoes):7.3f} ms   '
+                      f'p95 {percentis(duracoes, (95,))["p95"]:7.3f} ms')
+    perfil.agregador.contagens.clear()
+
+
+if __name__ == '__main__':
+    main()
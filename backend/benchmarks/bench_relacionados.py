@@ -0,0 +1,114 @@
+"""
+Benchmark: sugestões do player, filtro por tag x índice de relacionados
+Localização: backend/benchmarks/bench_relacionados.py
+
+Uso (a partir de backend/):
+    python benchmarks/bench_relacionados.py [--momentos 50000] [--tags 500] [--tags-por-momento 3]
+                                            [--repeticoes 30]
+
+Monta, em uma transação desfeita ao final, --momentos momentos com tags
+sorteadas de um vocabulário com distribuição de Zipf (poucas tags enormes,
+como "futebol", e uma cauda de tags raras) e compara, para um momento de
+tag popular:
+- por tag: o que o player fazia antes (feed filtrado pela primeira tag,
+  ordenado por popularidade, 10 itens);
+- índice: momentos.relacionados.sugestoes() (K linhas pré-computadas).
+Mede também a atualização incremental de um momento e a reconstrução
+completa (reconstruir_relacionados).
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from io import StringIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._django import cronometrar, percentis, setup  # noqa: E402
+
+PAGINA = 10
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--momentos', type=int, default=50000)
+    parser.add_argument('--tags', type=int, default=500, help='Tamanho do vocabulário de tags')
+    parser.add_argument('--tags-por-momento', type=int, default=3)
+    parser.add_argument('--repeticoes', type=int, default=30)
+    args = parser.parse_args()
+
+    setup()
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.db import connection, transaction
+    from django.test.utils import CaptureQueriesContext
+    from momentos import relacionados
+    from momentos.feed import valores_feed
+    from momentos.models import Momento, MomentoRelacionado, Tag
+
+    Usuario = get_user_model()
+    aleatorio = random.Random(42)
+
+    with transaction.atomic():
+        inicio = time.perf_counter()
+        autor = Usuario.objects.create_user(username='bench_rel_autor', email='bench_rel_autor@example.com')
+        Tag.objects.bulk_create([Tag(nome=f'bench_rel_{i}', slug=f'bench-rel-{i}') for i in range(args.tags)])
+        tags = list(Tag.objects.filter(slug__startswith='bench-rel-').order_by('pk').values_list('pk', flat=True))
+        zipf = [1 / (posicao + 1) for posicao in range(len(tags))]
+        Momento.objects.bulk_create(
+            [
+                Momento(usuario=autor, titulo=f'Lance {i}', video=f'videos/bench_rel_{i}.mp4',
+                        likes_count=aleatorio.randint(0, 500), views=aleatorio.randint(0, 50000))
+                for i in range(args.momentos)
+            ],
+            batch_size=1000,
+        )
+        ids = list(Momento.objects.filter(usuario=autor).order_by('pk').values_list('pk', flat=True))
+        TagMomento = relacionados.TagMomento
+        TagMomento.objects.bulk_create(
+            [
+                TagMomento(momento_id=momento_id, tag_id=tag_id)
+                for momento_id in ids
+                for tag_id in set(aleatorio.choices(tags, weights=zipf, k=args.tags_por_momento))
+            ],
+            batch_size=5000,
+        )
+        print(f'\n== {args.momentos} momentos, {args.tags} tags (Zipf); preparado em {time.perf_counter() - inicio:.1f}s ==')
+
+        inicio = time.perf_counter()
+        call_command('reconstruir_relacionados', stdout=StringIO())
+        print(f'  reconstrução completa: {time.perf_counter() - inicio:.1f}s, '
+              f'{MomentoRelacionado.objects.count()} relações')
+
+        # Momento cuja primeira tag é a mais popular do vocabulário
+        alvo = TagMomento.objects.filter(tag_id=tags[0]).order_by('momento_id').values_list('momento_id', flat=True)[0]
+        primeira = Tag.objects.filter(momentos=alvo).order_by('pk').values_list('slug', flat=True)[0]
+        print(f"  momento {alvo}: tag '{primeira}' em {TagMomento.objects.filter(tag__slug=primeira).count()} momentos")
+
+        consultas = {
+            'por tag': lambda: list(
+                valores_feed(Momento.objects.visible_to(None).filter(tags__slug=primeira).exclude(pk=alvo)
+                             .order_by('-likes_count', '-views', '-created_at'))[:PAGINA]
+            ),
+            'índice': lambda: list(relacionados.sugestoes(None, alvo, PAGINA)),
+        }
+        for rotulo, consulta in consultas.items():
+            consulta()  # aquece
+            with CaptureQueriesContext(connection) as capturadas:
+                consulta()
+            duracoes = cronometrar(consulta, args.repeticoes)
+            p = percentis(duracoes)
+            print(f'  {rotulo:8} mediana {statistics.median(duracoes):7.2f} ms   p95 {p["p95"]:7.2f} ms   '
+                  f'{len(capturadas)} consulta(s)')
+
+        duracoes = cronometrar(lambda: relacionados.atualizar(alvo), max(3, args.repeticoes // 5))
+        print(f'\n== atualização incremental (tarefa, ao mudar as tags) ==')
+        print(f'  mediana {statistics.median(duracoes):7.1f} ms por momento')
+
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
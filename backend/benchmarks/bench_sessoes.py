@@ -0,0 +1,64 @@
+"""
+Benchmark: custo de autenticação por requisição para cada engine de sessão
+Localização: backend/benchmarks/bench_sessoes.py
+
+Uso (a partir de backend/):
+    python benchmarks/bench_sessoes.py [--requisicoes 500]
+
+Faz login de um usuário temporário e mede GET /api/auth/csrf/ (a view é
+trivial: o custo é o da sessão + autenticação do DRF) com cada engine:
+db (padrão do Django), cached_db e cache. Usa o cache configurado em CACHES
+(REDIS_URL ou memória local). Tudo é desfeito ao final.
+"""
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._django import cronometrar, setup  # noqa: E402
+
+ENGINES = {
+    'db': 'config.sessoes.db',
+    'cached_db': 'config.sessoes.cached_db',
+    'cache': 'config.sessoes.cache',
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requisicoes', type=int, default=500)
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import connection, transaction
+    from django.test import Client, override_settings
+    from django.test.utils import CaptureQueriesContext
+
+    print(f"Cache: {settings.CACHES['default']['BACKEND']}")
+    with transaction.atomic():
+        usuario = get_user_model().objects.create_user(
+            username='bench_sessao', email='bench_sessao@example.com', password=None
+        )
+        for nome, engine in ENGINES.items():
+            with override_settings(SESSION_ENGINE=engine):
+                client = Client()
+                client.force_login(usuario)
+                client.get('/api/auth/csrf/')  # aquece (cache da sessão)
+
+                with CaptureQueriesContext(connection) as consultas:
+                    resposta = client.get('/api/auth/csrf/')
+                assert resposta.status_code == 200, resposta.status_code
+                # Lido já: com DEBUG=True o log de consultas é zerado a cada requisição
+                total_consultas = len(consultas)
+
+                duracoes = cronometrar(lambda: client.get('/api/auth/csrf/'), args.requisicoes)
+                print(f'  {nome:<10} mediana {statistics.median(duracoes):7.3f} ms   {total_consultas} consultas/requisição')
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmark: timeline "seguindo" pré-computada x JOIN com os seguidos na leitura
+Localização: backend/benchmarks/bench_timeline.py
+
+Uso (a partir de backend/):
+    python benchmarks/bench_timeline.py [--seguidos 5000] [--momentos-por-autor 3] [--grandes 10]
+                                        [--seguidores 5000] [--publicacoes 5] [--repeticoes 30]
+
+Monta, em uma transação desfeita ao final, um leitor que segue --seguidos
+autores (--grandes deles acima de TIMELINE_LIMIAR_PULL) e compara a
+primeira página e uma página profunda (cursor) de:
+- ingênuo: visible_to + usuario__in=<seguidos>, ordenado por data;
+- timeline: momentos.timeline.timeline() (entradas pré-computadas e podadas
+  + pull dos autores grandes).
+Depois mede o fan-out de uma publicação para um autor com --seguidores
+seguidores e confere o limite de entradas por timeline.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks._django import cronometrar, percentis, setup  # noqa: E402
+
+PAGINA = 9
+
+
+def criar_usuarios(Usuario, prefixo, total):
+    Usuario.objects.bulk_create(
+        [Usuario(username=f'{prefixo}{i}', email=f'{prefixo}{i}@example.com', password='!') for i in range(total)],
+        batch_size=1000,
+    )
+    return list(Usuario.objects.filter(username__startswith=prefixo).order_by('pk').values_list('pk', flat=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seguidos', type=int, default=5000, help='Autores seguidos pelo leitor')
+    parser.add_argument('--momentos-por-autor', type=int, default=3)
+    parser.add_argument('--grandes', type=int, default=10, help='Autores seguidos acima do limiar de pull')
+    parser.add_argument('--seguidores', type=int, default=5000, help='Seguidores do autor no teste de fan-out')
+    parser.add_argument('--publicacoes', type=int, default=5, help='Publicações medidas no fan-out')
+    parser.add_argument('--repeticoes', type=int, default=30)
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import connection, transaction
+    from django.db.models import Count, Max, Q
+    from django.test.utils import CaptureQueriesContext
+    from django.utils import timezone
+    from momentos import timeline
+    from momentos.feed import valores_feed
+    from momentos.models import EntradaTimeline, Momento
+    from usuarios.models import Seguidor
+
+    Usuario = get_user_model()
+    ordem = ('-created_at', '-id')
+
+    with transaction.atomic():
+        inicio = time.perf_counter()
+        leitor = Usuario.objects.create_user(username='bench_tl_leitor', email='bench_tl_leitor@example.com')
+        autores = criar_usuarios(Usuario, 'bench_tl_autor_', args.seguidos)
+        Seguidor.objects.bulk_create([Seguidor(seguidor=leitor, seguido_id=a) for a in autores], batch_size=1000)
+        Usuario.objects.filter(pk__in=autores).update(seguidores_count=1)
+        grandes = set(autores[:args.grandes])
+        Usuario.objects.filter(pk__in=grandes).update(seguidores_count=settings.TIMELINE_LIMIAR_PULL)
+
+        agora = timezone.now()
+        total = args.seguidos * args.momentos_por_autor
+        Momento.objects.bulk_create(
+            [
+                Momento(usuario_id=autores[i % len(autores)], titulo=f'Lance {i}', video=f'videos/bench_tl_{i}.mp4',
+                        created_at=agora - timedelta(minutes=total - i))
+                for i in range(total)
+            ],
+            batch_size=1000,
+        )
+        # Estado estável do push: entradas dos autores comuns, podadas pelo código da timeline
+        distribuidos = Momento.objects.filter(usuario_id__in=autores).exclude(usuario_id__in=grandes)
+        EntradaTimeline.objects.bulk_create(
+            [EntradaTimeline(usuario=leitor, momento_id=pk, autor_id=autor, created_at=criado)
+             for pk, autor, criado in distribuidos.values_list('pk', 'usuario_id', 'created_at')],
+            batch_size=1000,
+        )
+        timeline._podar([leitor.pk])
+        print(f'\n== leitor seguindo {args.seguidos} autores ({args.grandes} grandes), {total} momentos, '
+              f'{EntradaTimeline.objects.filter(usuario=leitor).count()} entradas '
+              f'(limite {settings.TIMELINE_LIMITE}); preparado em {time.perf_counter() - inicio:.1f}s ==')
+
+        consultas = {
+            'ingênuo': Momento.objects.visible_to(leitor).filter(
+                Q(usuario__in=Seguidor.objects.filter(seguidor=leitor).values('seguido_id')) | Q(usuario=leitor)
+            ),
+            'timeline': timeline.timeline(leitor),
+        }
+        paginas = {}
+        for rotulo, queryset in consultas.items():
+            ordenado = valores_feed(queryset).order_by(*ordem)
+            # Página profunda: a mesma condição de cursor que o CursorPagination aplica
+            corte = list(ordenado[PAGINA * 9:PAGINA * 9 + 1])[0]
+            profunda = ordenado.filter(Q(created_at__lt=corte['created_at']) |
+                                       Q(created_at=corte['created_at'], id__lt=corte['id']))
+            paginas[rotulo] = [m['id'] for m in ordenado[:PAGINA]]
+            for nome, fatia in (('página 1', ordenado), ('página 10', profunda)):
+                list(fatia[:PAGINA])  # aquece
+                with CaptureQueriesContext(connection) as capturadas:
+                    list(fatia[:PAGINA])
+                duracoes = cronometrar(lambda: list(fatia[:PAGINA]), args.repeticoes)
+                p = percentis(duracoes)
+                print(f'  {rotulo:9} {nome:10} mediana {statistics.median(duracoes):7.2f} ms   '
+                      f'p95 {p["p95"]:7.2f} ms   {len(capturadas)} consulta(s)')
+        print(f"  mesma primeira página: {'sim' if paginas['ingênuo'] == paginas['timeline'] else 'NÃO'}")
+
+        # Fan-out de uma publicação
+        autor = Usuario.objects.create_user(username='bench_tl_popular', email='bench_tl_popular@example.com')
+        seguidores = criar_usuarios(Usuario, 'bench_tl_fa_', args.seguidores)
+        Seguidor.objects.bulk_create([Seguidor(seguidor_id=s, seguido=autor) for s in seguidores], batch_size=1000)
+        Usuario.objects.filter(pk=autor.pk).update(seguidores_count=len(seguidores))
+        if len(seguidores) >= settings.TIMELINE_LIMIAR_PULL:
+            print(f'\n  (--seguidores >= TIMELINE_LIMIAR_PULL={settings.TIMELINE_LIMIAR_PULL}: autor lido por pull, sem fan-out)')
+        duracoes = []
+        for i in range(args.publicacoes):
+            momento = Momento.objects.create(usuario=autor, titulo=f'Post {i}', video=f'videos/bench_tl_p{i}.mp4')
+            inicio = time.perf_counter()
+            timeline.distribuir(momento.pk)
+            duracoes.append((time.perf_counter() - inicio) * 1000)
+        mediana = statistics.median(duracoes)
+        print(f'\n== fan-out para {len(seguidores)} seguidores (lotes de {settings.TIMELINE_LOTE}) ==')
+        print(f'  mediana {mediana:8.1f} ms por publicação   {len(seguidores) / mediana * 1000:9.0f} entradas/s')
+        maior = (EntradaTimeline.objects.filter(usuario_id__in=seguidores).values('usuario_id')
+                 .annotate(total=Count('pk')).aggregate(maior=Max('total'))['maior'])
+        print(f'  maior timeline após {len(duracoes)} publicações: {maior} entradas')
+
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
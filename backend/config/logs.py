@@ -0,0 +1,115 @@
+"""
+Logging estruturado, amostrado e fora do caminho da requisição
+Localização: backend/config/logs.py
+
+- registrar_evento(): evento "nome chave=valor ..." com formatação preguiçosa;
+  não monta nada se o nível estiver desligado ou o evento não for amostrado.
+- AmostragemFilter: taxa de amostragem por logger (settings.LOG_AMOSTRAGEM);
+  WARNING ou acima nunca é descartado.
+- FilaHandler: QueueHandler que não bloqueia; a formatação e a escrita no
+  console acontecem na thread do QueueListener.
+"""
+import atexit
+import json
+import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+
+from django.conf import settings
+
+
+def taxa_amostragem(nome):
+    """Taxa do prefixo mais específico em LOG_AMOSTRAGEM ('momentos.views' -> 'momentos' -> 1.0)"""
+    taxas = getattr(settings, 'LOG_AMOSTRAGEM', {})
+    while nome:
+        if nome in taxas:
+            return taxas[nome]
+        nome = nome.rpartition('.')[0]
+    return 1.0
+
+
+def amostrado(nome):
+    taxa = taxa_amostragem(nome)
+    return taxa >= 1 or random.random() < taxa
+
+
+class Campos:
+    """key=value (logfmt), formatado apenas se o registro for de fato emitido"""
+    __slots__ = ('campos',)
+
+    def __init__(self, campos):
+        self.campos = campos
+
+    def __str__(self):
+        partes = []
+        for chave, valor in self.campos.items():
+            texto = str(valor)
+            if not texto or any(c in texto for c in ' ="\n'):
+                texto = json.dumps(texto, ensure_ascii=False)
+            partes.append(f'{chave}={texto}')
+        return ' '.join(partes)
+
+
+def registrar_evento(logger, evento, nivel=logging.INFO, **campos):
+    """
+    Emite um evento estruturado. Os campos ficam também em record.campos
+    (para formatters JSON). Nunca passe valores que exijam consulta ao banco.
+    """
+    if not logger.isEnabledFor(nivel) or not amostrado(logger.name):
+        return
+    emitir_evento(logger, evento, nivel, campos, stacklevel=3)
+
+
+def emitir_evento(logger, evento, nivel, campos, stacklevel=2):
+    """Emite sem nova amostragem (quem chama já decidiu registrar)"""
+    # stacklevel: module/lineno do registro apontam para quem chamou, não para este arquivo
+    logger.log(nivel, '%s %s', evento, Campos(campos), stacklevel=stacklevel,
+               extra={'evento': evento, 'campos': campos, 'amostrado': True})
+
+
+class AmostragemFilter(logging.Filter):
+    """Descarta parte dos registros abaixo de WARNING conforme LOG_AMOSTRAGEM"""
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or getattr(record, 'amostrado', False):
+            return True
+        return amostrado(record.name)
+
+
+class FilaHandler(QueueHandler):
+    """
+    Enfileira o registro sem formatar e retorna imediatamente; um QueueListener
+    escreve no console. Com a fila cheia o registro é descartado (e contado).
+    """
+
+    def __init__(self, capacidade=10000):
+        super().__init__(queue.Queue(capacidade))
+        self.destino = logging.StreamHandler()
+        self.descartados = 0
+        self.listener = QueueListener(self.queue, self.destino)
+        self.listener.start()
+        atexit.register(self._parar)
+
+    def setFormatter(self, fmt):
+        # O formatter configurado vale para o destino (thread do listener)
+        self.destino.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Fila em processo: não precisa serializar; a formatação fica para o listener
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+    def _parar(self):
+        # Esvazia a fila antes de sair (chamado no close() e no atexit)
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def close(self):
+        self._parar()
+        super().close()
@@ -0,0 +1,229 @@
+"""
+Middlewares do projeto
+Localização: backend/config/middleware.py
+"""
+import logging
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.functional import SimpleLazyObject, empty
+
+from . import perfil, replicas
+from .logs import amostrado, emitir_evento
+
+logger = logging.getLogger('config.acesso')
+logger_perfil = logging.getLogger('config.perfil')
+
+
+def _usuario_id(request):
+    """ID do usuário já carregado pela requisição (nunca consulta o banco só para o log)"""
+    user = request.__dict__.get('user')
+    if isinstance(user, SimpleLazyObject):
+        if user._wrapped is empty:
+            return None
+        user = user._wrapped
+    return getattr(user, 'pk', None)
+
+
+class LogAcessoMiddleware:
+    """
+    Log de acesso estruturado e amostrado (logger 'config.acesso').
+    A decisão de amostragem é tomada antes da requisição: as não amostradas
+    não pagam nem a medição de tempo.
+    """
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _deve_registrar(self):
+        return logger.isEnabledFor(logging.INFO) and amostrado(logger.name)
+
+    def _registrar(self, request, response, inicio):
+        emitir_evento(logger, 'http.requisicao', logging.INFO, {
+            'metodo': request.method,
+            'caminho': request.path,
+            'status': response.status_code,
+            'ms': round((time.perf_counter() - inicio) * 1000, 1),
+            'usuario': _usuario_id(request),
+        })
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._deve_registrar():
+            return self.get_response(request)
+        inicio = time.perf_counter()
+        response = self.get_response(request)
+        self._registrar(request, response, inicio)
+        return response
+
+    async def __acall__(self, request):
+        if not self._deve_registrar():
+            return await self.get_response(request)
+        inicio = time.perf_counter()
+        response = await self.get_response(request)
+        self._registrar(request, response, inicio)
+        return response
+
+
+class ReplicasMiddleware:
+    """
+    Banco de leitura por requisição (config.replicas): réplica para as
+    seguras, primário para as escritas e, por alguns segundos depois de
+    uma escrita, para as leituras do mesmo navegador. Sem DB_REPLICAS o
+    middleware nem é carregado.
+    """
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DB_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = replicas.iniciar(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            replicas.encerrar(token)
+        replicas.fixar(request, response)
+        return response
+
+    async def __acall__(self, request):
+        token = replicas.iniciar(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            replicas.encerrar(token)
+        replicas.fixar(request, response)
+        return response
+
+
+def _endpoint(request):
+    """Método + rota com os parâmetros ('GET /api/momentos/<int:pk>/'), não a URL concreta"""
+    match = request.resolver_match
+    return f'{request.method} /{match.route}' if match else f'{request.method} (sem rota)'
+
+
+class PerfilMiddleware:
+    """
+    Perfil por requisição (config.perfil), opt-in: com PERFIL_AMOSTRAGEM=0 o
+    middleware nem é carregado. Nas requisições amostradas mede consultas,
+    tempo de banco, view, serialização e render; envia Server-Timing (PERFIL_SERVER_TIMING),
+    alimenta os histogramas por endpoint e avisa (WARNING 'perfil.orcamento')
+    acima de PERFIL_ORCAMENTO_CONSULTAS.
+    """
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.taxa = settings.PERFIL_AMOSTRAGEM
+        if self.taxa <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.orcamento = settings.PERFIL_ORCAMENTO_CONSULTAS
+        self.server_timing = settings.PERFIL_SERVER_TIMING
+        self.intervalo = settings.PERFIL_INTERVALO_SEGUNDOS
+        perfil.instalar_serializacao()
+        # Os hooks precisam ter o mesmo modo do handler; senão o Django os
+        # embrulha em sync_to_async (um salto de thread por requisição)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            self.process_view = self._process_view_async
+            self.process_template_response = self._process_template_response_async
+        else:
+            self.process_view = self._inicio_view
+            self.process_template_response = self._inicio_render
+
+    def _inicio_view(self, request, view_func, view_args, view_kwargs):
+        medicao = perfil._medicao.get()
+        if medicao is not None:
+            medicao.view_inicio = time.perf_counter()
+
+    def _inicio_render(self, request, response):
+        medicao = perfil._medicao.get()
+        if medicao is not None:
+            medicao.render_inicio = time.perf_counter()
+            response.add_post_render_callback(medicao.fim_render)
+        return response
+
+    async def _process_view_async(self, *args):
+        return self._inicio_view(*args)
+
+    async def _process_template_response_async(self, request, response):
+        return self._inicio_render(request, response)
+
+    def _concluir(self, request, response, medicao):
+        tempos = medicao.tempos(time.perf_counter())
+        acima_orcamento = medicao.consultas > self.orcamento
+        endpoint = _endpoint(request)
+
+        if self.server_timing:
+            metricas = [
+                f'db;dur={tempos["db"]:.1f};desc="{medicao.consultas} consultas"',
+                f'view;dur={tempos["view"]:.1f}',
+                f'serializacao;dur={tempos["serializacao"]:.1f}',
+                f'render;dur={tempos["render"]:.1f}',
+                f'total;dur={tempos["total"]:.1f}',
+            ]
+            if acima_orcamento:
+                metricas.append(f'orcamento;desc="acima de {self.orcamento} consultas"')
+            response['Server-Timing'] = ', '.join(metricas)
+
+        if acima_orcamento:
+            emitir_evento(logger_perfil, 'perfil.orcamento', logging.WARNING, {
+                'endpoint': endpoint,
+                'caminho': request.path,
+                'consultas': medicao.consultas,
+                'db_ms': round(tempos['db'], 1),
+                'ms': round(tempos['total'], 1),
+            })
+
+        perfil.agregador.registrar(endpoint, {
+            'total_ms': tempos['total'],
+            'db_ms': tempos['db'],
+            'view_ms': tempos['view'],
+            'serializacao_ms': tempos['serializacao'],
+            'consultas': medicao.consultas,
+        }, acima_orcamento)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= self.taxa:
+            return self.get_response(request)
+        perfil.instalar_nas_conexoes_abertas()
+        medicao, token = perfil.iniciar()
+        try:
+            response = self.get_response(request)
+        finally:
+            perfil.encerrar(token)
+        self._concluir(request, response, medicao)
+        if perfil.agregador.vencido(self.intervalo):
+            perfil.agregador.descarregar()
+        return response
+
+    async def __acall__(self, request):
+        if random.random() >= self.taxa:
+            return await self.get_response(request)
+        medicao, token = perfil.iniciar()
+        try:
+            response = await self.get_response(request)
+        finally:
+            perfil.encerrar(token)
+        self._concluir(request, response, medicao)
+        if perfil.agregador.vencido(self.intervalo):
+            await sync_to_async(perfil.agregador.descarregar)()
+        return response
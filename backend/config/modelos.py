@@ -0,0 +1,31 @@
+"""
+Contadores desnormalizados fora dos save() completos
+Localização: backend/config/modelos.py
+
+Contadores como Momento.likes_count e Usuario.seguidores_count só mudam
+por UPDATE atômico (F() / RETURNING). Um save() completo de uma instância
+carregada antes regravaria o valor lido, desfazendo o que mudou nesse meio
+tempo. ContadoresMixin transforma o save() completo de uma linha existente
+em save(update_fields=...) com todos os campos menos os CONTADORES.
+INSERTs e save(update_fields=[...]) explícitos continuam como antes.
+"""
+
+
+class ContadoresMixin:
+    """Models: CONTADORES = ('campo', ...) nunca entram no UPDATE de um save() completo"""
+
+    CONTADORES = ()
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if (
+            update_fields is None and not args
+            and not self._state.adding and not kwargs.get('force_insert')
+            and kwargs.get('using') in (None, self._state.db)
+        ):
+            deferidos = self.get_deferred_fields()
+            update_fields = [
+                campo.name for campo in self._meta.concrete_fields
+                if not campo.primary_key and campo.name not in self.CONTADORES
+                and campo.attname not in deferidos
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
@@ -0,0 +1,252 @@
+"""
+Perfil de requisições: consultas, tempo de banco, view, serialização e render
+Localização: backend/config/perfil.py
+
+- Medicao: acumulada por requisição amostrada (PerfilMiddleware). As consultas
+  são contadas por um execute_wrapper instalado em toda conexão; o wrapper
+  lê um ContextVar, então também mede views async (o contexto acompanha o
+  sync_to_async) e não custa nada nas requisições não amostradas.
+- Serialização: serializer.data (BaseSerializer.data, instalado pelo
+  middleware) e caminhos próprios como momentos.feed.serializar_feed rodam
+  dentro de medir_serializacao(); somado ao render da Response, vira
+  serializacao_ms. Só a chamada mais externa conta (serializers aninhados
+  que chamam .data não somam duas vezes).
+- Histogramas por endpoint ("GET /api/momentos/<int:pk>/"): agregados em
+  memória e descarregados no cache 'perfil' a cada PERFIL_INTERVALO_SEGUNDOS,
+  para que o comando relatorio_perfil some todos os processos.
+"""
+import atexit
+import contextvars
+import hashlib
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.core.cache import caches
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+# Limites superiores (inclusivos) de cada faixa; a última faixa é "acima disso"
+FAIXAS = {
+    'total_ms': (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000),
+    'db_ms': (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000),
+    'view_ms': (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000),
+    'serializacao_ms': (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000),
+    'consultas': (0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30, 50, 100),
+}
+CHAVE_ENDPOINTS = 'perfil:endpoints'
+TTL_CACHE = 7 * 24 * 3600
+
+_medicao = contextvars.ContextVar('perfil_medicao', default=None)
+_serializando = contextvars.ContextVar('perfil_serializando', default=False)
+
+
+class Medicao:
+    """Acumuladores de uma requisição (mutável: compartilhado com as threads do sync_to_async)"""
+    __slots__ = ('inicio', 'consultas', 'db', 'serializacao', 'view_inicio', 'render_inicio', 'render_fim')
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.consultas = 0
+        self.db = 0.0
+        self.serializacao = 0.0
+        self.view_inicio = self.render_inicio = self.render_fim = None
+
+    def fim_render(self, response):
+        # post-render callback do TemplateResponse (DRF Response)
+        self.render_fim = time.perf_counter()
+
+    def tempos(self, fim):
+        """
+        Tempos em ms: total, db, view (inclui o banco e o serializer.data da
+        view), render e serializacao (serializer.data + render)
+        """
+        view_fim = self.render_inicio or fim
+        render = ((self.render_fim or fim) - self.render_inicio) * 1000 if self.render_inicio else 0.0
+        return {
+            'total': (fim - self.inicio) * 1000,
+            'db': self.db * 1000,
+            'view': (view_fim - self.view_inicio) * 1000 if self.view_inicio else 0.0,
+            'render': render,
+            'serializacao': self.serializacao * 1000 + render,
+        }
+
+
+def _medir_consulta(execute, sql, params, many, context):
+    medicao = _medicao.get()
+    if medicao is None:
+        return execute(sql, params, many, context)
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicao.db += time.perf_counter() - inicio
+        medicao.consultas += 1
+
+
+@contextmanager
+def medir_serializacao():
+    """Soma o bloco em Medicao.serializacao (nada fora de requisições amostradas)"""
+    medicao = _medicao.get()
+    if medicao is None or _serializando.get():
+        yield
+        return
+    token = _serializando.set(True)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        medicao.serializacao += time.perf_counter() - inicio
+        _serializando.reset(token)
+
+
+def instalar_serializacao():
+    """Mede serializer.data (Serializer e ListSerializer passam por BaseSerializer.data)"""
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data.fget
+    if getattr(original, 'perfil', False):
+        return
+
+    def data(self):
+        with medir_serializacao():
+            return original(self)
+
+    data.perfil = True
+    BaseSerializer.data = property(data)
+
+
+def instalar(connection, **kwargs):
+    if _medir_consulta not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_medir_consulta)
+
+
+def instalar_nas_conexoes_abertas():
+    # Conexões criadas antes do middleware (ex.: testes) não passaram pelo sinal
+    for connection in connections.all(initialized_only=True):
+        instalar(connection)
+
+
+connection_created.connect(instalar, dispatch_uid='config.perfil.instalar')
+
+
+def iniciar():
+    medicao = Medicao()
+    return medicao, _medicao.set(medicao)
+
+
+def encerrar(token):
+    _medicao.reset(token)
+
+
+def faixa(metrica, valor):
+    for indice, limite in enumerate(FAIXAS[metrica]):
+        if valor <= limite:
+            return indice
+    return len(FAIXAS[metrica])
+
+
+def _chave(endpoint, metrica, sufixo):
+    # Rotas têm '<', ':' etc.: o nome vai no índice, a chave usa um hash curto
+    return f'perfil:{hashlib.md5(endpoint.encode()).hexdigest()[:12]}:{metrica}:{sufixo}'
+
+
+class Agregador:
+    """Histogramas em memória do processo, descarregados periodicamente no cache"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.contagens = defaultdict(int)  # chave do cache -> incremento pendente
+        self.endpoints = set()
+        self.ultimo_descarregamento = time.monotonic()
+
+    def registrar(self, endpoint, valores, acima_orcamento):
+        with self.lock:
+            self.endpoints.add(endpoint)
+            self.contagens[_chave(endpoint, 'n', 'total')] += 1
+            if acima_orcamento:
+                self.contagens[_chave(endpoint, 'n', 'acima_orcamento')] += 1
+            for metrica, valor in valores.items():
+                self.contagens[_chave(endpoint, metrica, faixa(metrica, valor))] += 1
+                # Somas em unidades inteiras (µs ou consultas): incr só aceita inteiros
+                soma = round(valor * 1000) if metrica.endswith('_ms') else valor
+                self.contagens[_chave(endpoint, metrica, 'soma')] += soma
+
+    def vencido(self, intervalo):
+        return time.monotonic() - self.ultimo_descarregamento >= intervalo
+
+    def descarregar(self):
+        with self.lock:
+            contagens, self.contagens = self.contagens, defaultdict(int)
+            endpoints, self.endpoints = self.endpoints, set()
+            self.ultimo_descarregamento = time.monotonic()
+        if not contagens:
+            return
+        cache = caches['perfil']
+        conhecidos = cache.get(CHAVE_ENDPOINTS, set())
+        if not endpoints <= conhecidos:
+            cache.set(CHAVE_ENDPOINTS, conhecidos | endpoints, TTL_CACHE)
+        for chave, incremento in contagens.items():
+            try:
+                cache.incr(chave, incremento)
+            except ValueError:
+                if not cache.add(chave, incremento, TTL_CACHE):
+                    cache.incr(chave, incremento)
+
+
+agregador = Agregador()
+atexit.register(agregador.descarregar)
+
+
+def ler_histogramas():
+    """{endpoint: {'n', 'acima_orcamento', metrica: {'faixas': [...], 'soma'}}} do cache 'perfil'"""
+    cache = caches['perfil']
+    resultado = {}
+    for endpoint in sorted(cache.get(CHAVE_ENDPOINTS, set())):
+        chaves = [_chave(endpoint, 'n', 'total'), _chave(endpoint, 'n', 'acima_orcamento')]
+        for metrica, limites in FAIXAS.items():
+            chaves += [_chave(endpoint, metrica, i) for i in range(len(limites) + 1)]
+            chaves.append(_chave(endpoint, metrica, 'soma'))
+        valores = cache.get_many(chaves)
+
+        dados = {
+            'n': valores.get(chaves[0], 0),
+            'acima_orcamento': valores.get(chaves[1], 0),
+        }
+        if not dados['n']:
+            continue
+        for metrica, limites in FAIXAS.items():
+            soma = valores.get(_chave(endpoint, metrica, 'soma'), 0)
+            dados[metrica] = {
+                'faixas': [valores.get(_chave(endpoint, metrica, i), 0) for i in range(len(limites) + 1)],
+                'soma': soma / 1000 if metrica.endswith('_ms') else soma,
+            }
+        resultado[endpoint] = dados
+    return resultado
+
+
+def limpar_histogramas():
+    cache = caches['perfil']
+    chaves = [CHAVE_ENDPOINTS]
+    for endpoint in cache.get(CHAVE_ENDPOINTS, set()):
+        chaves += [_chave(endpoint, 'n', 'total'), _chave(endpoint, 'n', 'acima_orcamento')]
+        for metrica, limites in FAIXAS.items():
+            chaves += [_chave(endpoint, metrica, i) for i in range(len(limites) + 1)]
+            chaves.append(_chave(endpoint, metrica, 'soma'))
+    cache.delete_many(chaves)
+
+
+def percentil(metrica, faixas, p):
+    """Limite superior da faixa que contém o percentil p (estimativa do histograma)"""
+    total = sum(faixas)
+    if not total:
+        return None
+    alvo = total * p / 100
+    acumulado = 0
+    limites = FAIXAS[metrica]
+    for indice, contagem in enumerate(faixas):
+        acumulado += contagem
+        if acumulado >= alvo:
+            return limites[indice] if indice < len(limites) else float('inf')
+    return float('inf')
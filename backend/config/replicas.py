@@ -0,0 +1,92 @@
+"""
+Leituras em réplicas do Postgres
+Localização: backend/config/replicas.py
+
+Com DB_REPLICAS configurado (aliases replica_1, replica_2... em DATABASES):
+- requisições seguras (GET/HEAD/OPTIONS) leem de uma réplica, sorteada
+  uma vez por requisição: as consultas da mesma resposta veem o mesmo
+  estado;
+- escritas, leituras dentro de transação e tudo o que roda fora de
+  requisições (comandos, thread de tarefas) usam o primário ('default');
+- depois de uma escrita, o cookie COOKIE mantém as leituras daquele
+  navegador no primário por DB_REPLICA_FIXAR_SEGUNDOS: quem acabou de
+  curtir, comentar ou editar vê o resultado mesmo com atraso de replicação;
+- consultas que toleram atraso (contadores, notificações) pedem uma réplica
+  explicitamente com .using(replica()); nas requisições fixadas (e dentro
+  de primario()) replica() também é o primário: quem acabou de curtir vê o
+  próprio like no total.
+Sem réplicas, o roteador e o middleware nem são carregados e replica()
+retorna 'default'.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+COOKIE = 'db_primario'
+METODOS_SEGUROS = ('GET', 'HEAD', 'OPTIONS')
+
+# Banco de leitura da requisição atual: uma réplica, 'default' (requisição
+# fixada ou primario()) ou None (fora de requisições)
+_replica = ContextVar('replica_leitura', default=None)
+
+
+def sortear():
+    return random.choice(settings.DB_REPLICAS) if settings.DB_REPLICAS else DEFAULT_DB_ALIAS
+
+
+def replica():
+    """Alias para uma leitura que tolera atraso: o banco de leitura da requisição ou uma réplica sorteada"""
+    return _replica.get() or sortear()
+
+
+def iniciar(request):
+    """Escolhe o banco de leitura da requisição. Retorna o token para encerrar()."""
+    fixada = request.method not in METODOS_SEGUROS or COOKIE in request.COOKIES
+    return _replica.set(DEFAULT_DB_ALIAS if fixada else sortear())
+
+
+def encerrar(token):
+    _replica.reset(token)
+
+
+def fixar(request, response):
+    """Depois de uma escrita, as próximas leituras do navegador vão para o primário"""
+    if request.method not in METODOS_SEGUROS:
+        response.set_cookie(COOKIE, '1', max_age=settings.DB_REPLICA_FIXAR_SEGUNDOS, httponly=True, samesite='Lax')
+
+
+@contextmanager
+def primario():
+    """Leituras no primário dentro do bloco (ex.: tarefa executada no contexto de uma requisição)"""
+    token = _replica.set(DEFAULT_DB_ALIAS)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+class RoteadorReplicas:
+    """DATABASE_ROUTERS: leituras na réplica da requisição, escritas no primário"""
+
+    def db_for_read(self, model, **hints):
+        alias = _replica.get()
+        # Leitura dentro de transação faz parte de uma escrita (ex.: select_for_update)
+        if alias in (None, DEFAULT_DB_ALIAS) or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        instancia = hints.get('instance')
+        if instancia is not None and instancia._state.db:
+            return instancia._state.db
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Réplicas têm os mesmos dados do primário
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,26 @@
+"""
+Engines de sessão do projeto (SESSION_ENGINE = 'config.sessoes.<backend>')
+Localização: backend/config/sessoes/
+
+Mesmos backends do Django (db, cached_db, cache), com uma diferença: a
+sessão não é regravada se os dados não mudaram desde que foram carregados
+(ex.: código que marca modified=True ou reatribui o mesmo valor).
+"""
+import copy
+
+
+class EscritaSobDemandaMixin:
+    """Pula o save() quando o conteúdo é igual ao que foi carregado"""
+
+    def load(self):
+        dados = super().load()
+        # Cópia profunda: alterações em listas/dicts aninhados também contam como mudança
+        self._dados_carregados = copy.deepcopy(dados)
+        return dados
+
+    def save(self, must_create=False):
+        carregados = getattr(self, '_dados_carregados', None)
+        if not must_create and self.session_key and carregados is not None and carregados == self._session:
+            return
+        super().save(must_create=must_create)
+        self._dados_carregados = copy.deepcopy(self._session)
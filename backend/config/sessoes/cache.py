@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends import cache
+
+from . import EscritaSobDemandaMixin
+
+
+class SessionStore(EscritaSobDemandaMixin, cache.SessionStore):
+    pass
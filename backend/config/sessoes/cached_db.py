@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends import cached_db
+
+from . import EscritaSobDemandaMixin
+
+
+class SessionStore(EscritaSobDemandaMixin, cached_db.SessionStore):
+    pass
@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends import db
+
+from . import EscritaSobDemandaMixin
+
+
+class SessionStore(EscritaSobDemandaMixin, db.SessionStore):
+    pass
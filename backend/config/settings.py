@@ -1,5 +1,6 @@
+import tempfile
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -21,6 +22,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'config.middleware.PerfilMiddleware',
+    'config.middleware.LogAcessoMiddleware',
+    'config.middleware.ReplicasMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -48,8 +52,45 @@ SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SECURE = False
 SESSION_COOKIE_AGE = 86400
 
+# Cache: com REDIS_URL, compartilhado entre processos/workers (requer o pacote redis);
+# sem REDIS_URL, memória local do processo (dev e testes)
+REDIS_URL = config('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+        # Histogramas do PerfilMiddleware (config.perfil), somados entre os workers
+        'perfil': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'lance-certo',
+        },
+        # Sem Redis, em arquivo: o comando relatorio_perfil roda em outro processo
+        'perfil': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(Path(tempfile.gettempdir()) / 'lance-certo-perfil'),
+        },
+    }
+
+# Engine de sessão (config.sessoes): 'db', 'cached_db' (cache + banco) ou 'cache' (só cache).
+# Com cache local por processo o padrão continua 'db': um logout em um worker
+# não invalidaria a cópia em cache dos outros. Não regrava sessões inalteradas.
+SESSION_BACKEND = config('SESSION_BACKEND', default='cached_db' if REDIS_URL else 'db')
+SESSION_ENGINE = f'config.sessoes.{SESSION_BACKEND}'
+
 ROOT_URLCONF = 'config.urls'
 
+# Views assíncronas para as leituras mais acessadas (usar com servidor ASGI, ex.: uvicorn)
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
 # Database
 DATABASES = {
     'default': {
@@ -59,9 +100,45 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD'),
         'HOST': config('DB_HOST'),
         'PORT': config('DB_PORT'),
+        # Conexões persistentes: reaproveita a conexão entre requisições (segundos; 0 = fecha ao fim de cada requisição).
+        # Com ASYNC_VIEWS o padrão é 0: as consultas rodam nas threads do executor de sync_to_async e cada
+        # thread manteria a própria conexão aberta; sem pool, cada consulta paralela abre uma conexão
+        # nova: em produção, ASYNC_VIEWS requer DB_POOL
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=0 if ASYNC_VIEWS else 60, cast=int),
+        # Verifica a conexão reaproveitada no início da requisição (evita erro após queda do Postgres)
+        'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
     }
 }
 
+# Pool nativo do Django 5.x (requer `pip install "psycopg[binary,pool]"`).
+# Com o pool ativo, CONN_MAX_AGE precisa ser 0: o pool é quem mantém as conexões abertas.
+if config('DB_POOL', default=False, cast=bool):
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': config('DB_POOL_MIN_SIZE', default=2, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        }
+    }
+
+# Réplicas de leitura (config/replicas.py): DB_REPLICAS=host[:porta],... com o mesmo banco e usuário do
+# primário. Viram os aliases replica_1, replica_2...; nos testes espelham o 'default'.
+DB_REPLICAS = []
+for _numero, _endereco in enumerate(config('DB_REPLICAS', default='', cast=Csv()), start=1):
+    _host, _, _porta = _endereco.partition(':')
+    DATABASES[f'replica_{_numero}'] = {
+        **DATABASES['default'],
+        'HOST': _host,
+        'PORT': _porta or DATABASES['default']['PORT'],
+        'OPTIONS': dict(DATABASES['default'].get('OPTIONS', {})),
+        'TEST': {'MIRROR': 'default'},
+    }
+    DB_REPLICAS.append(f'replica_{_numero}')
+DATABASE_ROUTERS = ['config.replicas.RoteadorReplicas'] if DB_REPLICAS else []
+# Depois de uma escrita, as leituras do mesmo navegador ficam no primário por este tempo
+DB_REPLICA_FIXAR_SEGUNDOS = config('DB_REPLICA_FIXAR_SEGUNDOS', default=5, cast=int)
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
@@ -86,8 +163,33 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Limites por endpoint (views com throttle_scope), por usuário logado ou IP.
+    # Contadores no cache 'default': com REDIS_URL o limite vale para todos os workers.
+    'DEFAULT_THROTTLE_CLASSES': [
+        'config.throttling.JanelaDeslizanteThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'views': config('THROTTLE_VIEWS', default='120/min'),
+        'likes': config('THROTTLE_LIKES', default='60/min'),
+        'busca_usuarios': config('THROTTLE_BUSCA_USUARIOS', default='60/min'),
+        'senha_codigo': config('THROTTLE_SENHA_CODIGO', default='5/hour'),
+        'senha_verificacao': config('THROTTLE_SENHA_VERIFICACAO', default='20/hour'),
+    },
 }
 
+# JSON rápido (orjson) para respostas e corpos de requisição.
+# Sem o orjson instalado, os renderers recaem no json padrão do DRF.
+if config('FAST_JSON', default=True, cast=bool):
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+        'config.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ]
+    REST_FRAMEWORK['DEFAULT_PARSER_CLASSES'] = [
+        'config.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ]
+
 AUTH_USER_MODEL = 'usuarios.Usuario'
 
 # Internacionalização
@@ -112,15 +214,52 @@ DATA_UPLOAD_MAX_NUMBER_FIELDS = 1000
 FILE_UPLOAD_PERMISSIONS = 0o644
 FILE_UPLOAD_DIRECTORY_PERMISSIONS = 0o755
 
-# Handlers de upload
+# Handlers de upload (os mesmos do Django, calculando o SHA-256 durante o recebimento)
 FILE_UPLOAD_HANDLERS = [
-    'django.core.files.uploadhandler.MemoryFileUploadHandler',
-    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+    'momentos.conteudo.HashMemoryFileUploadHandler',
+    'momentos.conteudo.HashTemporaryFileUploadHandler',
 ]
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# GET condicional (momentos.condicional): s-maxage para caches compartilhados (CDN/proxy)
+# em conteúdo público visto por anônimos; navegadores sempre revalidam (ETag)
+HTTP_CACHE_SHARED_MAX_AGE = config('HTTP_CACHE_SHARED_MAX_AGE', default=60, cast=int)
+
+# Tarefas em segundo plano (momentos.tasks)
+# True executa as tarefas de forma síncrona no commit (útil em testes)
+TASKS_ALWAYS_EAGER = config('TASKS_ALWAYS_EAGER', default=False, cast=bool)
+
+# Views: cada usuário conta no máximo uma view por momento nesta janela (deduplicação no cache)
+VIEWS_JANELA_DEDUP_MINUTOS = config('VIEWS_JANELA_DEDUP_MINUTOS', default=30, cast=int)
+
+# Notificações
+# Likes no mesmo momento dentro desta janela são agrupados em uma única linha
+NOTIFICACOES_JANELA_AGRUPAMENTO_MINUTOS = config('NOTIFICACOES_JANELA_AGRUPAMENTO_MINUTOS', default=360, cast=int)
+# Notificações lidas sem atividade (updated_at) há mais que isso são removidas por `limpar_notificacoes`
+NOTIFICACOES_RETENCAO_DIAS = config('NOTIFICACOES_RETENCAO_DIAS', default=90, cast=int)
+
+# Perfil de requisições (config.middleware.PerfilMiddleware): opt-in, desligado com 0.
+# Fração das requisições medidas (consultas, tempo de banco/view/render); em
+# produção uma amostra pequena (ex.: 0.01) basta para os histogramas por endpoint.
+PERFIL_AMOSTRAGEM = config('PERFIL_AMOSTRAGEM', default=0.0, cast=float)
+# Requisições com mais consultas que isso geram um WARNING 'perfil.orcamento'
+PERFIL_ORCAMENTO_CONSULTAS = config('PERFIL_ORCAMENTO_CONSULTAS', default=15, cast=int)
+# Header Server-Timing (aparece no DevTools); expõe tempos internos, então só em dev por padrão
+PERFIL_SERVER_TIMING = config('PERFIL_SERVER_TIMING', default=DEBUG, cast=bool)
+# A cada quantos segundos cada processo descarrega seus histogramas no cache 'perfil'
+PERFIL_INTERVALO_SEGUNDOS = config('PERFIL_INTERVALO_SEGUNDOS', default=10, cast=float)
+
 # Configuração de Logging
+# Os handlers escrevem por uma fila (config.logs.FilaHandler): o console não
+# fica no caminho da requisição. Eventos de baixo nível são amostrados por
+# logger (prefixo mais específico vale; WARNING ou acima nunca é descartado).
+LOG_LEVEL = config('LOG_LEVEL', default='INFO')
+LOG_AMOSTRAGEM = {
+    'config.acesso': config('LOG_AMOSTRAGEM_ACESSO', default=0.1, cast=float),
+    'momentos': config('LOG_AMOSTRAGEM_MOMENTOS', default=1.0, cast=float),
+}
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -134,10 +273,16 @@ LOGGING = {
             'style': '{',
         },
     },
+    'filters': {
+        'amostragem': {
+            '()': 'config.logs.AmostragemFilter',
+        },
+    },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
+            '()': 'config.logs.FilaHandler',
             'formatter': 'verbose',
+            'filters': ['amostragem'],
         },
     },
     'root': {
@@ -147,7 +292,17 @@ LOGGING = {
     'loggers': {
         'momentos': {
             'handlers': ['console'],
-            'level': 'INFO',
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+        'config.acesso': {
+            'handlers': ['console'],
+            'level': config('LOG_LEVEL_ACESSO', default='INFO'),
+            'propagate': False,
+        },
+        'config.perfil': {
+            'handlers': ['console'],
+            'level': LOG_LEVEL,
             'propagate': False,
         },
     },
@@ -160,4 +315,47 @@ EMAIL_PORT = config('MY_EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('MY_EMAIL', default='')
 EMAIL_HOST_PASSWORD = config('MY_EMAIL_PASS', default='')
-DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=EMAIL_HOST_USER or 'no-reply@lancecerto.com')
\ No newline at end of file
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=EMAIL_HOST_USER or 'no-reply@lancecerto.com')
+# Evita que um servidor SMTP travado prenda o worker indefinidamente
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
+
+# Fila de e-mails (usuarios.fila_email): lote por conexão SMTP, retentativas com backoff
+EMAIL_FILA_LOTE = config('EMAIL_FILA_LOTE', default=50, cast=int)
+EMAIL_FILA_MAX_TENTATIVAS = config('EMAIL_FILA_MAX_TENTATIVAS', default=6, cast=int)
+EMAIL_FILA_BACKOFF_SEGUNDOS = config('EMAIL_FILA_BACKOFF_SEGUNDOS', default=30, cast=int)
+# Tempo máximo de um lote "enviando" antes de outro worker poder reassumi-lo
+EMAIL_FILA_LEASE_SEGUNDOS = config('EMAIL_FILA_LEASE_SEGUNDOS', default=300, cast=int)
+
+# Exclusão de conta em segundo plano (usuarios.exclusao): linhas por DELETE e pausa entre lotes
+EXCLUSAO_CONTA_LOTE = config('EXCLUSAO_CONTA_LOTE', default=1000, cast=int)
+EXCLUSAO_CONTA_PAUSA_SEGUNDOS = config('EXCLUSAO_CONTA_PAUSA_SEGUNDOS', default=0.05, cast=float)
+# Lotes por vez na thread de tarefas (o resto volta para o fim da fila)
+EXCLUSAO_CONTA_LOTES_POR_TAREFA = config('EXCLUSAO_CONTA_LOTES_POR_TAREFA', default=20, cast=int)
+EXCLUSAO_CONTA_LEASE_SEGUNDOS = config('EXCLUSAO_CONTA_LEASE_SEGUNDOS', default=300, cast=int)
+EXCLUSAO_CONTA_MAX_TENTATIVAS = config('EXCLUSAO_CONTA_MAX_TENTATIVAS', default=5, cast=int)
+EXCLUSAO_CONTA_BACKOFF_SEGUNDOS = config('EXCLUSAO_CONTA_BACKOFF_SEGUNDOS', default=60, cast=int)
+
+# Streaming HLS (momentos.hls): empacotamento com ffmpeg após o upload
+HLS_ATIVO = config('HLS_ATIVO', default=False, cast=bool)
+HLS_FFMPEG = config('HLS_FFMPEG', default='ffmpeg')
+# Degraus altura:kbps de vídeo (degraus acima da resolução original são pulados)
+HLS_ESCADA = config('HLS_ESCADA', default='240:400,480:1000,720:2500')
+HLS_AUDIO_KBPS = config('HLS_AUDIO_KBPS', default=96, cast=int)
+HLS_SEGUNDOS = config('HLS_SEGUNDOS', default=4, cast=int)
+HLS_TIMEOUT_SEGUNDOS = config('HLS_TIMEOUT_SEGUNDOS', default=600, cast=int)
+# 'processando' há mais que isto (maior que o timeout + cópias) é retomado pelo empacotar_hls
+HLS_LEASE_SEGUNDOS = config('HLS_LEASE_SEGUNDOS', default=900, cast=int)
+
+# Deduplicação de mídia (momentos/conteudo.py): uploads com o mesmo conteúdo compartilham um arquivo
+MIDIA_DEDUP = config('MIDIA_DEDUP', default=True, cast=bool)
+
+# Timeline "seguindo" (momentos.timeline): fan-out na publicação, pull para autores grandes
+TIMELINE_LIMITE = config('TIMELINE_LIMITE', default=800, cast=int)
+TIMELINE_LIMIAR_PULL = config('TIMELINE_LIMIAR_PULL', default=10000, cast=int)
+TIMELINE_LOTE = config('TIMELINE_LOTE', default=1000, cast=int)
+TIMELINE_PODA_PERIODO = config('TIMELINE_PODA_PERIODO', default=50, cast=int)
+TIMELINE_PREENCHER = config('TIMELINE_PREENCHER', default=20, cast=int)
+
+# Momentos relacionados (momentos.relacionados): vizinhos por coocorrência de tags, pré-computados
+RELACIONADOS_K = config('RELACIONADOS_K', default=24, cast=int)
+RELACIONADOS_CANDIDATOS_POR_TAG = config('RELACIONADOS_CANDIDATOS_POR_TAG', default=200, cast=int)
\ No newline at end of file
@@ -0,0 +1,57 @@
+"""
+Throttling (limite de requisições) por endpoint
+Localização: backend/config/throttling.py
+
+JanelaDeslizanteThrottle: mesmo contrato do ScopedRateThrottle do DRF
+(view.throttle_scope + DEFAULT_THROTTLE_RATES, chave por usuário ou IP),
+mas com contador de janela deslizante em vez da lista de timestamps:
+duas janelas fixas ponderadas, cada uma um inteiro no cache (get_many + incr).
+Custo O(1) por requisição e funciona com cache local (locmem, um contador
+por processo) ou compartilhado (Redis, limite global entre workers).
+"""
+from rest_framework.throttling import ScopedRateThrottle
+
+
+class JanelaDeslizanteThrottle(ScopedRateThrottle):
+    """
+    estimativa = anterior * (fração da janela anterior ainda coberta) + atual
+    Views sem throttle_scope não são limitadas (nem acessam o cache).
+    """
+
+    def allow_request(self, request, view):
+        self.scope = getattr(view, self.scope_attr, None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        agora = self.timer()
+        janela = int(agora // self.duration)
+        self.decorrido = (agora % self.duration) / self.duration
+        chave_atual, chave_anterior = f'{self.key}:{janela}', f'{self.key}:{janela - 1}'
+
+        valores = self.cache.get_many([chave_atual, chave_anterior])
+        self.atual = valores.get(chave_atual, 0)
+        self.anterior = valores.get(chave_anterior, 0)
+        if self.anterior * (1 - self.decorrido) + self.atual >= self.num_requests:
+            return False
+
+        try:
+            self.cache.incr(chave_atual)
+        except ValueError:
+            # Primeira requisição da janela (ou chave expirada); add é atômico
+            if not self.cache.add(chave_atual, 1, self.duration * 2):
+                self.cache.incr(chave_atual)
+        return True
+
+    def wait(self):
+        """Segundos até a estimativa voltar a ficar abaixo do limite (Retry-After)"""
+        restante_janela = (1 - self.decorrido) * self.duration
+        if self.atual >= self.num_requests or not self.anterior:
+            return restante_janela
+        # Espera o peso da janela anterior cair o suficiente
+        fracao_necessaria = 1 - (self.num_requests - self.atual) / self.anterior
+        return max(0.0, min(restante_janela, (fracao_necessaria - self.decorrido) * self.duration))
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Momento, Tag, Like, Comentario, Notificacao
+from .contadores import descontar
+from .models import Momento, Tag, Like, Comentario, Notificacao, ConteudoMidia
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
@@ -51,6 +52,14 @@ class LikeAdmin(admin.ModelAdmin):
         # Prevenir criação manual via admin (likes devem vir da API)
         return False
 
+    def delete_model(self, request, obj):
+        descontar(Like.objects.filter(pk=obj.pk))
+        super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        descontar(queryset)
+        super().delete_queryset(request, queryset)
+
 @admin.register(Comentario)
 class ComentarioAdmin(admin.ModelAdmin):
     list_display = ['usuario', 'momento', 'texto_resumido', 'created_at']
@@ -65,12 +74,21 @@ class ComentarioAdmin(admin.ModelAdmin):
 
 @admin.register(Notificacao)
 class NotificacaoAdmin(admin.ModelAdmin):
-    list_display = ['usuario_destino', 'tipo', 'mensagem_resumida', 'lida', 'created_at']
+    list_display = ['usuario_destino', 'tipo', 'mensagem_resumida', 'total_atores', 'lida', 'updated_at']
     list_filter = ['tipo', 'lida', 'created_at']
+    list_select_related = ['usuario_destino', 'usuario_origem', 'momento']
     search_fields = ['usuario_destino__username', 'mensagem']
-    readonly_fields = ['created_at']
+    readonly_fields = ['created_at', 'updated_at']
 
     def mensagem_resumida(self, obj):
-        return obj.mensagem[:75] + '...' if len(obj.mensagem) > 75 else obj.mensagem
+        mensagem = obj.renderizar_mensagem()
+        return mensagem[:75] + '...' if len(mensagem) > 75 else mensagem
 
-    mensagem_resumida.short_description = 'Mensagem'
\ No newline at end of file
+    mensagem_resumida.short_description = 'Mensagem'
+
+@admin.register(ConteudoMidia)
+class ConteudoMidiaAdmin(admin.ModelAdmin):
+    list_display = ['arquivo', 'referencias', 'tamanho', 'created_at']
+    search_fields = ['sha256', 'arquivo']
+    readonly_fields = ['sha256', 'arquivo', 'tamanho', 'referencias', 'created_at']
+    ordering = ['-created_at']
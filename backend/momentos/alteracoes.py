@@ -0,0 +1,66 @@
+"""
+O que muda quando uma linha existente é salva
+Localização: backend/momentos/alteracoes.py
+
+Um único pre_save para Momento e Usuario lê a linha anterior uma vez, só
+com as colunas que interessam a alguém e que o save vai gravar, e guarda
+na instância o que mudou:
+- arquivos (momentos/arquivos.py): vídeo, thumbnail ou avatar trocado ou limpo;
+- privacidade: is_private mudou.
+Quem reage só é chamado no post_save, depois que o UPDATE deu certo: fora
+de transação, enfileirar() roda no ato, e um arquivo agendado no pre_save
+seria apagado mesmo se o save falhasse. A remoção dos arquivos é agendada
+ali, e o sinal privacidade_alterada(sender, instance) é enviado para
+timeline e relacionados agendarem o trabalho.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import Signal
+
+from . import arquivos
+from .models import Momento
+
+Usuario = get_user_model()
+
+# sender=Momento ou Usuario; instance já gravada com o novo is_private
+privacidade_alterada = Signal()
+
+
+def _ao_salvar(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._alteracoes = None
+    if raw:
+        return
+    campos = [
+        campo for campo in arquivos.campos_de_arquivo(sender)
+        if update_fields is None or campo.name in update_fields
+    ]
+    deduplicados = arquivos.deduplicar(instance, campos)
+    privacidade = update_fields is None or 'is_private' in update_fields
+    if instance._state.adding or not (campos or privacidade):
+        return
+
+    colunas = [campo.attname for campo in campos] + (['is_private'] if privacidade else [])
+    anterior = sender._base_manager.filter(pk=instance.pk).values(*colunas).first()
+    if anterior is None:
+        return
+    instance._alteracoes = (
+        arquivos.substituidos(instance, campos, anterior, deduplicados),
+        privacidade and anterior['is_private'] != instance.is_private,
+    )
+
+
+def _depois_de_salvar(sender, instance, raw=False, **kwargs):
+    alteracoes = instance.__dict__.pop('_alteracoes', None)
+    if alteracoes is None:
+        return
+    substituidos, privacidade = alteracoes
+    arquivos.agendar_remocao(substituidos)
+    if privacidade:
+        privacidade_alterada.send(sender=sender, instance=instance)
+
+
+def conectar():
+    for model in (Momento, Usuario):
+        rotulo = model._meta.label
+        pre_save.connect(_ao_salvar, sender=model, dispatch_uid=f'alteracoes_antes_{rotulo}')
+        post_save.connect(_depois_de_salvar, sender=model, dispatch_uid=f'alteracoes_depois_{rotulo}')
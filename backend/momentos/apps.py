@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class MomentosConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'momentos'
+
+    def ready(self):
+        from . import alteracoes, arquivos, contadores, hls, relacionados, timeline
+        alteracoes.conectar()
+        arquivos.conectar()
+        contadores.conectar()
+        hls.conectar()
+        relacionados.conectar()
+        timeline.conectar()
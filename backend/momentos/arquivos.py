@@ -0,0 +1,102 @@
+"""
+Remoção de arquivos de mídia que deixaram de ser referenciados
+Localização: backend/momentos/arquivos.py
+
+Os sinais abaixo valem para todo model com FileField (vídeo e thumbnail de
+Momento, avatar de Usuario), inclusive em deletes em cascata e no admin:
+- post_delete: os arquivos da linha removida;
+- save: o arquivo anterior quando o campo é trocado ou limpo (detectado
+  por momentos/alteracoes.py e agendado no post_save, depois do UPDATE).
+A remoção é agendada com momentos.tasks.enfileirar: só acontece depois do
+commit (rollback mantém os arquivos) e roda na thread de tarefas, fora da
+requisição. O que escapar daqui (falhas, processos encerrados, uploads de
+transações desfeitas) é recolhido pelo comando limpar_midia.
+Com MIDIA_DEDUP, o pre_save também troca uploads novos pelo conteúdo
+compartilhado (momentos/conteudo.py); arquivos compartilhados não são
+apagados aqui: a remoção só desconta a referência.
+"""
+import logging
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import FileField
+from django.db.models.signals import post_delete
+
+from config.logs import registrar_evento
+
+from . import conteudo
+from .tasks import enfileirar
+
+logger = logging.getLogger(__name__)
+
+
+def campos_de_arquivo(model):
+    return [campo for campo in model._meta.concrete_fields if isinstance(campo, FileField)]
+
+
+def arquivos_de(instance):
+    """FieldFiles de uma instância (vazios incluídos)"""
+    return [getattr(instance, campo.attname) for campo in campos_de_arquivo(type(instance))]
+
+
+def apagar_arquivos(storage, nomes):
+    """Tarefa: remove os arquivos do storage (ausentes são ignorados)"""
+    removidos = 0
+    for nome in nomes:
+        try:
+            storage.delete(nome)
+            removidos += 1
+        except Exception:
+            logger.exception('Erro ao remover arquivo de mídia %s', nome)
+    registrar_evento(logger, 'midia.removida', total=removidos)
+
+
+def agendar_remocao(arquivos):
+    """Agenda a remoção, após o commit, de uma lista de FieldFile"""
+    por_storage = defaultdict(list)
+    compartilhados = []
+    for arquivo in arquivos:
+        if not arquivo:
+            continue
+        if conteudo.gerenciado(arquivo.name):
+            compartilhados.append(arquivo.name)
+        else:
+            por_storage[arquivo.storage].append(arquivo.name)
+    if compartilhados:
+        conteudo.liberar(compartilhados)
+    for storage, nomes in por_storage.items():
+        enfileirar(apagar_arquivos, storage, nomes)
+
+
+def _ao_remover(sender, instance, **kwargs):
+    agendar_remocao(arquivos_de(instance))
+
+
+def deduplicar(instance, campos):
+    """Com MIDIA_DEDUP, troca uploads novos pelo conteúdo compartilhado; retorna os attnames trocados"""
+    return conteudo.deduplicar(instance, campos) if settings.MIDIA_DEDUP and campos else []
+
+
+def substituidos(instance, campos, anteriores, deduplicados):
+    """FieldFiles que a linha deixa de referenciar (anteriores: valores gravados das colunas)"""
+    resultado = []
+    for campo in campos:
+        novo = getattr(instance, campo.attname)
+        anterior = anteriores[campo.attname]
+        if anterior and anterior != novo.name:
+            resultado.append(campo.attr_class(instance, campo, anterior))
+        elif anterior and campo.attname in deduplicados:
+            # Reenvio do mesmo conteúdo: a linha continua com uma única referência
+            resultado.append(novo)
+    return resultado
+
+
+def conectar():
+    """
+    Liga o post_delete para todos os models com arquivos (chamado em MomentosConfig.ready).
+    Trocas de arquivo no save são detectadas por momentos/alteracoes.py.
+    """
+    for model in apps.get_models():
+        if campos_de_arquivo(model):
+            post_delete.connect(_ao_remover, sender=model, dispatch_uid=f'arquivos_remover_{model._meta.label}')
@@ -0,0 +1,233 @@
+"""
+Views assíncronas (ASGI) para os caminhos de leitura mais acessados
+Localização: backend/momentos/async_views.py
+
+Ativadas com ASYNC_VIEWS=True (servidor ASGI, ex.: uvicorn). O GET é atendido
+aqui, com a negociação de conteúdo e os throttles da view DRF original; os
+demais métodos (e a API navegável) são delegados a ela.
+
+O trabalho com o banco reaproveita o ORM síncrono das views e serializers:
+cada chamada de em_paralelo roda em uma thread do executor, com a sua própria
+conexão, devolvida ao fim (close_old_connections). Consultas independentes
+(ex.: COUNT e página) rodam em paralelo; trabalho sequencial fica em uma única
+chamada. Só leituras simples, sem fan-out nem serializer com consultas, usam
+o ORM assíncrono (notificações).
+
+Com o padrão de ASYNC_VIEWS (DB_CONN_MAX_AGE=0), cada chamada de em_paralelo
+abre e fecha uma conexão: em produção, ASYNC_VIEWS requer DB_POOL=True.
+"""
+import asyncio
+import functools
+
+from asgiref.sync import sync_to_async
+from django.core.paginator import InvalidPage, Paginator
+from django.db import close_old_connections
+from django.http import Http404, HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException, AuthenticationFailed, NotAuthenticated, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from config.replicas import replica
+
+from .condicional import versao_momento
+from .feed import serializar_feed, valores_feed
+from .models import Notificacao
+from .serializers import MomentoDetailSerializer, NotificacaoSerializer
+from .views import MomentoListCreateView, MomentoDetailView, MomentoPagination, NotificacaoListView
+
+
+def em_paralelo(func):
+    """
+    Envolve uma função síncrona (ORM) para rodar em uma thread própria
+    (thread_sensitive=False), permitindo várias consultas simultâneas.
+    """
+    @functools.wraps(func)
+    def executar(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            # Fim da "requisição" desta thread: respeita CONN_MAX_AGE / pool
+            close_old_connections()
+    return sync_to_async(executar, thread_sensitive=False)
+
+
+def resposta_json(data, request=None, status=200):
+    """
+    JSON renderizado pelo renderer negociado em AsyncReadView.dispatch (mesmos
+    bytes das views síncronas, inclusive com "Accept: application/json; indent=2").
+    Sem negociação (ex.: 406), usa o renderer padrão, como o DRF.
+    """
+    renderer = getattr(request, 'accepted_renderer', None) or api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    media_type = getattr(request, 'accepted_media_type', None)
+    corpo = renderer.render(data, media_type, {'request': request})
+    return HttpResponse(corpo, status=status, content_type=renderer.media_type)
+
+
+async def paginar(queryset, request, pagination_class, *tarefas):
+    """
+    Paginação no formato do PageNumberPagination, com o COUNT e a busca da
+    página em paralelo. `tarefas` são awaitables independentes executados
+    no mesmo gather. Retorna (pagination, itens_da_pagina, resultados_das_tarefas).
+    """
+    pagination = pagination_class()
+    pagination.request = request
+    page_size = pagination.get_page_size(request)
+    try:
+        numero = int(request.query_params.get(pagination.page_query_param) or 1)
+    except ValueError:
+        # Ex.: ?page=last precisa do total antes; caminho raro, sem paralelismo
+        numero = None
+
+    if numero is None or numero < 1:
+        page, *extras = await asyncio.gather(
+            em_paralelo(pagination.paginate_queryset)(queryset, request), *tarefas
+        )
+        return pagination, page, extras
+
+    inicio = (numero - 1) * page_size
+    total, itens, *extras = await asyncio.gather(
+        em_paralelo(queryset.count)(),
+        em_paralelo(list)(queryset[inicio:inicio + page_size]),
+        *tarefas
+    )
+
+    paginator = Paginator(queryset, page_size)
+    paginator.count = total
+    try:
+        pagination.page = paginator.page(numero)
+    except InvalidPage as exc:
+        raise NotFound(pagination.invalid_page_message.format(page_number=numero, message=str(exc)))
+    pagination.page.object_list = itens
+    return pagination, itens, extras
+
+
+def resposta_paginada(pagination, data):
+    return {
+        'count': pagination.page.paginator.count,
+        'next': pagination.get_next_link(),
+        'previous': pagination.get_previous_link(),
+        'results': data,
+    }
+
+
+class AsyncReadView(View):
+    """
+    Base: GET assíncrono; demais métodos delegados à view DRF síncrona
+    (que continua responsável por autenticação/CSRF/permissões da escrita).
+    """
+    sync_view_class = None
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        cls.sync_view = staticmethod(cls.sync_view_class.as_view())
+        # A view DRF aplica a própria verificação de CSRF (SessionAuthentication)
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET':
+            return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+
+        request.user = await request.auser()
+        drf_request = Request(request)
+        drf_request.user = request.user
+        drf_request.auth = None
+        view = self.sync_view_instance(drf_request, **kwargs)
+        try:
+            # Como em APIView.initial(): negociação de conteúdo e throttles da view DRF
+            drf_request.accepted_renderer, drf_request.accepted_media_type = (
+                view.perform_content_negotiation(drf_request)
+            )
+            if not isinstance(drf_request.accepted_renderer, JSONRenderer):
+                # API navegável (HTML): caminho raro, atendido pela view síncrona
+                return await sync_to_async(self.sync_view)(request, *args, **kwargs)
+            await sync_to_async(view.check_throttles)(drf_request)
+            response = await self.get(drf_request, *args, **kwargs)
+        except Http404 as http404:
+            # Mesma mensagem do exception_handler do DRF
+            exc = NotFound(*http404.args)
+            response = resposta_json({'detail': exc.detail}, drf_request, status=exc.status_code)
+        except (NotAuthenticated, AuthenticationFailed) as exc:
+            # Como no DRF com SessionAuthentication (sem WWW-Authenticate): 403
+            response = resposta_json({'detail': exc.detail}, drf_request, status=403)
+        except APIException as exc:
+            response = resposta_json({'detail': exc.detail}, drf_request, status=exc.status_code)
+            if getattr(exc, 'wait', None):
+                response['Retry-After'] = '%d' % exc.wait
+        # Cabeçalhos de APIView.finalize_response (Allow, Vary: Accept)
+        for chave, valor in view.default_response_headers.items():
+            if chave == 'Vary':
+                patch_vary_headers(response, [valor])
+            else:
+                response[chave] = valor
+        return response
+
+    def sync_view_instance(self, request, **kwargs):
+        """Instância da view DRF original, para reaproveitar get_queryset/get_object"""
+        view = self.sync_view_class()
+        view.setup(request, **kwargs)
+        view.format_kwarg = None
+        return view
+
+
+class MomentoListCreateAsyncView(AsyncReadView):
+    """
+    GET /api/momentos/ - Feed (assíncrono; COUNT e página em paralelo)
+    POST /api/momentos/ - Delegado a MomentoListCreateView
+    """
+    sync_view_class = MomentoListCreateView
+
+    async def get(self, request):
+        view = self.sync_view_instance(request)
+        queryset = valores_feed(view.filter_queryset(view.get_queryset()))
+
+        pagination, itens, _ = await paginar(queryset, request, MomentoPagination)
+        data = await em_paralelo(serializar_feed)(itens, request)
+        return resposta_json(resposta_paginada(pagination, data), request)
+
+
+class MomentoDetailAsyncView(AsyncReadView):
+    """
+    GET /api/momentos/{id}/ - Detalhes (assíncrono)
+    PATCH/DELETE - Delegados a MomentoDetailView
+    """
+    sync_view_class = MomentoDetailView
+
+    async def get(self, request, pk):
+        view = self.sync_view_instance(request, pk=pk)
+
+        def responder():
+            # Versão e detalhe são sequenciais: uma thread, uma conexão
+            versao = versao_momento(request, pk)
+            if versao is not None:
+                nao_modificado = versao.resposta_304(request)
+                if nao_modificado is not None:
+                    return nao_modificado
+
+            momento = view.get_object(pk)
+            response = resposta_json(MomentoDetailSerializer(momento, context={'request': request}).data, request)
+            return versao.aplicar(response) if versao is not None else response
+
+        return await em_paralelo(responder)()
+
+
+class NotificacaoListAsyncView(AsyncReadView):
+    """
+    GET /api/momentos/notificacoes/ - Notificações do usuário (assíncrono)
+    """
+    sync_view_class = NotificacaoListView
+
+    async def get(self, request):
+        if not request.user.is_authenticated:
+            raise NotAuthenticated()
+
+        notificacoes = [
+            n async for n in Notificacao.objects.using(replica()).filter(usuario_destino=request.user)
+            .select_related('usuario_origem', 'momento').order_by('-updated_at')[:30]
+        ]
+        # Sem acesso ao banco: tudo foi carregado pelo select_related
+        data = NotificacaoSerializer(notificacoes, many=True, context={'request': request}).data
+        return resposta_json(data, request)
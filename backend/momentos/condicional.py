@@ -0,0 +1,130 @@
+"""
+GET condicional (ETag / Last-Modified) e Cache-Control
+Localização: backend/momentos/condicional.py
+
+A versão de cada recurso é calculada com uma única consulta leve (datas de
+atualização + contadores), antes de qualquer serialização. Se o cliente já tem
+a versão atual, a view responde 304 sem montar o corpo.
+
+Views, likes e comentários não mexem em Momento.updated_at (o campo continua
+sendo a data da última edição): os próprios contadores entram na chave da
+ETag. Como eles não têm data, o detalhe e o perfil validam só por ETag; um
+Last-Modified ali faria If-Modified-Since responder 304 com contadores velhos.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework.settings import api_settings
+
+from .models import Comentario, Momento, Tag
+
+Usuario = get_user_model()
+
+
+class Versao:
+    """Validadores de uma representação (ETag fraca + Last-Modified)"""
+
+    def __init__(self, request, partes, ultima_modificacao, publico):
+        # A representação depende de quem vê (is_liked, totais do dono), da URL e do formato
+        viewer = request.user.pk if request.user.is_authenticated else 0
+        # Views assíncronas renderizam com o renderer padrão (async_views.resposta_json)
+        renderer = getattr(request, 'accepted_renderer', None) or api_settings.DEFAULT_RENDERER_CLASSES[0]
+        formato = renderer.format
+        chave = repr((viewer, request.get_full_path(), formato, *partes))
+        self.etag = 'W/"%s"' % hashlib.md5(chave.encode()).hexdigest()
+        self.last_modified = int(ultima_modificacao.timestamp()) if ultima_modificacao else None
+        # Cache compartilhado apenas para conteúdo público visto por anônimos
+        self.publico = publico and not request.user.is_authenticated
+
+    def resposta_304(self, request):
+        """HttpResponseNotModified se o cliente já tem esta versão; senão None"""
+        resposta = get_conditional_response(request, etag=self.etag, last_modified=self.last_modified)
+        return self.aplicar(resposta) if resposta is not None else None
+
+    def aplicar(self, response):
+        response.headers['ETag'] = self.etag
+        if self.last_modified is not None:
+            response.headers['Last-Modified'] = http_date(self.last_modified)
+        if self.publico:
+            patch_cache_control(response, public=True, max_age=0, s_maxage=settings.HTTP_CACHE_SHARED_MAX_AGE)
+        else:
+            patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ['Cookie'])
+        return response
+
+
+def _agregados_do_autor(usuario_ref, views=False):
+    """
+    Subqueries com total, likes recebidos e última edição dos momentos de um autor
+    (e a soma das views, para quem lista os momentos com o contador: o perfil)
+    """
+    momentos = Momento.objects.filter(usuario=usuario_ref).order_by().values('usuario')
+    agregados = {
+        'autor_total': Subquery(momentos.annotate(v=Count('pk')).values('v')[:1]),
+        'autor_likes': Subquery(momentos.annotate(v=Sum('likes_count')).values('v')[:1]),
+        'autor_ultimo': Subquery(momentos.annotate(v=Max('updated_at')).values('v')[:1]),
+    }
+    if views:
+        agregados['autor_views'] = Subquery(momentos.annotate(v=Sum('views')).values('v')[:1])
+    return agregados
+
+
+def _comentarios(momento_ref):
+    """Total e maior id dos comentários: muda em qualquer inclusão ou exclusão"""
+    comentarios = Comentario.objects.filter(momento=momento_ref).order_by().values('momento')
+    return {
+        'comentarios_total': Subquery(comentarios.annotate(v=Count('pk')).values('v')[:1]),
+        'comentarios_ultimo': Subquery(comentarios.annotate(v=Max('pk')).values('v')[:1]),
+    }
+
+
+def versao_momento(request, pk):
+    """Versão do detalhe de um momento visível (None se não visível: segue o caminho normal)"""
+    linha = (
+        Momento.objects.visible_to(request.user).filter(pk=pk)
+        .annotate(**_agregados_do_autor(OuterRef('usuario')), **_comentarios(OuterRef('pk')))
+        .values(
+            'updated_at', 'is_private', 'views', 'likes_count', 'usuario__updated_at', 'usuario__is_private',
+            'comentarios_total', 'comentarios_ultimo', 'autor_total', 'autor_likes', 'autor_ultimo',
+        )
+        .first()
+    )
+    if linha is None:
+        return None
+    return Versao(
+        request,
+        partes=tuple(linha.values()),
+        ultima_modificacao=None,
+        publico=not linha['is_private'] and not linha['usuario__is_private'],
+    )
+
+
+def versao_perfil(request, username):
+    """Versão do perfil público (None se não existe ou é privado: segue o caminho normal)"""
+    linha = (
+        Usuario.objects.filter(username=username, is_active=True)
+        .annotate(**_agregados_do_autor(OuterRef('pk'), views=True))
+        .values('pk', 'updated_at', 'is_private', 'autor_total', 'autor_likes', 'autor_views', 'autor_ultimo')
+        .first()
+    )
+    if linha is None:
+        return None
+    is_owner = request.user.is_authenticated and request.user.pk == linha['pk']
+    if linha['is_private'] and not is_owner:
+        return None
+    return Versao(request, partes=tuple(linha.values()), ultima_modificacao=None, publico=True)
+
+
+def versao_tags(request):
+    """Versão da lista de tags"""
+    linha = Tag.objects.aggregate(total=Count('pk'), ultimo=Max('updated_at'))
+    return Versao(
+        request,
+        partes=(linha['total'], linha['ultimo']),
+        ultima_modificacao=linha['ultimo'],
+        publico=True,
+    )
@@ -0,0 +1,40 @@
+"""
+Momento.likes_count fora da view de like
+Localização: backend/momentos/contadores.py
+
+O contador é mantido pelos UPDATEs atômicos da MomentoLikeView. Likes
+apagados por outros caminhos também precisam descontá-lo:
+- Usuario.delete() (admin, shell): o Collector apaga em cascata os likes
+  dados pelo usuário; o pre_delete do usuário desconta antes;
+- admin de likes: LikeAdmin chama descontar() antes de apagar;
+- exclusão de conta (usuarios/exclusao.py): apaga em lotes e desconta no
+  próprio lote.
+Não há receiver em Like: com ele o Collector deixaria de apagar os likes de
+um momento com um único DELETE (carregaria todos para enviar os sinais).
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.signals import pre_delete
+
+from .models import Like, Momento
+
+Usuario = get_user_model()
+
+
+def descontar(likes):
+    """Desconta de likes_count os likes do queryset (chamar antes de apagá-los)"""
+    por_momento = (
+        likes.filter(momento_id=OuterRef('pk')).order_by()
+        .values('momento_id').annotate(total=Count('pk')).values('total')
+    )
+    return Momento.objects.filter(pk__in=likes.values('momento_id')).update(
+        likes_count=F('likes_count') - Subquery(por_momento)
+    )
+
+
+def _ao_apagar_usuario(sender, instance, **kwargs):
+    descontar(Like.objects.filter(usuario_id=instance.pk))
+
+
+def conectar():
+    pre_delete.connect(_ao_apagar_usuario, sender=Usuario, dispatch_uid='contadores_likes_usuario')
@@ -0,0 +1,173 @@
+"""
+Armazenamento de mídia endereçado por conteúdo (deduplicação)
+Localização: backend/momentos/conteudo.py
+
+Com MIDIA_DEDUP, vídeos, thumbnails e avatares novos são gravados uma vez
+por conteúdo, em conteudo/{aa}/{sha256}.{ext}, e cada ConteudoMidia conta
+quantas linhas apontam para o arquivo:
+- o SHA-256 é calculado enquanto o upload chega (handlers abaixo, em
+  FILE_UPLOAD_HANDLERS), sem reler o arquivo;
+- no pre_save (momentos.alteracoes), um upload cujo conteúdo já existe só
+  incrementa a referência: nada é gravado no storage e o momento
+  reaproveita o que já foi gerado para o mesmo vídeo (pacote HLS). O save
+  precisa estar em uma transação (as views de upload usam atomic);
+- remover ou trocar o arquivo desconta a referência, e o arquivo só é
+  apagado quando ninguém mais o usa (recolher, depois do commit).
+Arquivos antigos são migrados pelo comando deduplicar_midia.
+"""
+import hashlib
+import logging
+import os
+from collections import Counter, defaultdict
+from functools import partial
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.transaction import TransactionManagementError
+from django.db.models import F
+
+from config.logs import registrar_evento
+
+from .models import ConteudoMidia
+from .tasks import enfileirar
+
+logger = logging.getLogger(__name__)
+
+PASTA = 'conteudo'
+TAMANHO_BLOCO = 1024 * 1024
+
+
+class _HashUploadMixin:
+    """Guarda em `arquivo.sha256` o hash dos blocos recebidos por este handler"""
+
+    def new_file(self, *args, **kwargs):
+        self._sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def file_complete(self, file_size):
+        arquivo = super().file_complete(file_size)
+        if arquivo is not None:
+            arquivo.sha256 = self._sha256.hexdigest()
+        return arquivo
+
+
+class HashMemoryFileUploadHandler(_HashUploadMixin, MemoryFileUploadHandler):
+    def receive_data_chunk(self, raw_data, start):
+        if self.activated:
+            self._sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+
+class HashTemporaryFileUploadHandler(_HashUploadMixin, TemporaryFileUploadHandler):
+    def receive_data_chunk(self, raw_data, start):
+        self._sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+
+def gerenciado(nome):
+    """True se o arquivo é um conteúdo compartilhado (com contagem de referências)"""
+    return nome.startswith(f'{PASTA}/')
+
+
+def nome_do_conteudo(sha256, nome_original):
+    extensao = os.path.splitext(nome_original)[1].lower()[:10]
+    return f'{PASTA}/{sha256[:2]}/{sha256}{extensao}'
+
+
+def calcular_sha256(arquivo):
+    """SHA-256 de um arquivo: o calculado no upload ou, na falta dele, lido em blocos"""
+    sha256 = getattr(arquivo, 'sha256', None)
+    if sha256:
+        return sha256
+    resumo = hashlib.sha256()
+    for bloco in arquivo.chunks(TAMANHO_BLOCO):
+        resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+def armazenar(arquivo, nome_original, storage=None, sha256=None):
+    """
+    Registra uma referência ao conteúdo de `arquivo` e retorna o nome dele no
+    storage. O arquivo só é gravado se o conteúdo ainda não existir.
+    Exige transação: a referência é desfeita junto com a linha que a usaria
+    se o save falhar (em autocommit ela ficaria contada para sempre).
+    """
+    if not transaction.get_connection().in_atomic_block:
+        raise TransactionManagementError(
+            'Uploads com MIDIA_DEDUP precisam ser salvos dentro de transaction.atomic()'
+        )
+    storage = storage or default_storage
+    sha256 = sha256 or calcular_sha256(arquivo)
+    # A linha fica travada até o commit: a coleta não a remove no meio do caminho
+    if ConteudoMidia.objects.filter(sha256=sha256).update(referencias=F('referencias') + 1):
+        registrar_evento(logger, 'midia.duplicada', logging.DEBUG, sha256=sha256[:16])
+        return ConteudoMidia.objects.filter(sha256=sha256).values_list('arquivo', flat=True).get()
+
+    nome = nome_do_conteudo(sha256, nome_original)
+    if not storage.exists(nome):
+        salvo = storage.save(nome, arquivo)
+        if salvo != nome:
+            # Mesmo conteúdo gravado em paralelo por outro upload
+            storage.delete(salvo)
+    try:
+        with transaction.atomic():
+            ConteudoMidia.objects.create(sha256=sha256, arquivo=nome, tamanho=arquivo.size, referencias=1)
+    except IntegrityError:
+        ConteudoMidia.objects.filter(sha256=sha256).update(referencias=F('referencias') + 1)
+    return nome
+
+
+def deduplicar(instance, campos):
+    """
+    Troca os uploads ainda não gravados dos `campos` pelo conteúdo
+    compartilhado (chamado no pre_save, antes de o FileField gravar o
+    arquivo). Retorna os attnames trocados.
+    """
+    trocados = []
+    for campo in campos:
+        arquivo = getattr(instance, campo.attname)
+        if not arquivo or arquivo._committed:
+            continue
+        arquivo.name = armazenar(arquivo.file, arquivo.name, arquivo.storage)
+        arquivo._committed = True
+        trocados.append(campo.attname)
+    return trocados
+
+
+def liberar(nomes):
+    """
+    Desconta uma referência por nome (na transação atual) e agenda, para
+    depois do commit, a coleta dos conteúdos que ficarem sem referências.
+    """
+    por_quantidade = defaultdict(list)
+    for nome, quantidade in Counter(nomes).items():
+        por_quantidade[quantidade].append(nome)
+    for quantidade, grupo in por_quantidade.items():
+        ConteudoMidia.objects.filter(arquivo__in=grupo).update(referencias=F('referencias') - quantidade)
+    enfileirar(recolher, sorted(set(nomes)))
+
+
+def recolher(nomes=None, storage=None):
+    """
+    Tarefa: apaga linha e arquivo dos conteúdos sem referências (todos, sem
+    `nomes`). Cada um é conferido sob lock: um upload do mesmo conteúdo
+    espera e, em seguida, grava o arquivo de novo.
+    """
+    storage = storage or default_storage
+    candidatos = ConteudoMidia.objects.filter(referencias__lte=0)
+    if nomes is not None:
+        candidatos = candidatos.filter(arquivo__in=nomes)
+    removidos = 0
+    for pk in list(candidatos.values_list('pk', flat=True)):
+        with transaction.atomic():
+            conteudo = ConteudoMidia.objects.select_for_update().filter(pk=pk, referencias__lte=0).first()
+            if conteudo is None:
+                continue
+            conteudo.delete()
+            # O arquivo só sai depois do commit: um rollback mantém linha e arquivo
+            transaction.on_commit(partial(storage.delete, conteudo.arquivo))
+        removidos += 1
+    if removidos:
+        registrar_evento(logger, 'midia.conteudo_removido', total=removidos)
+    return removidos
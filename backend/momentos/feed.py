@@ -0,0 +1,137 @@
+"""
+Caminho rápido de leitura do feed
+Localização: backend/momentos/feed.py
+
+Gera exatamente a mesma saída de MomentoListSerializer(many=True).data, mas a
+partir de linhas .values() (sem instanciar modelos nem serializers por item)
+e com um número fixo de consultas por página:
+    página (valores_feed) + tags + totais dos autores + likes do usuário.
+A paridade é garantida por teste em momentos/tests.py.
+"""
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q, Sum
+from rest_framework import serializers
+
+from config.perfil import medir_serializacao
+from config.replicas import replica
+
+from .models import Like, Momento
+from .serializers import url_hls
+
+Usuario = get_user_model()
+
+CAMPOS_FEED = (
+    'id', 'titulo', 'descricao', 'video', 'hls', 'thumbnail', 'duracao', 'views',
+    'likes_count', 'created_at', 'is_private',
+    'usuario_id', 'usuario__username', 'usuario__email', 'usuario__first_name',
+    'usuario__last_name', 'usuario__avatar', 'usuario__bio', 'usuario__data_nascimento',
+    'usuario__created_at', 'usuario__is_private',
+)
+
+# Mesmos campos DRF usados pelos serializers: a formatação é idêntica
+_datetime = serializers.DateTimeField()
+_date = serializers.DateField()
+
+_video_storage = Momento._meta.get_field('video').storage
+_thumbnail_storage = Momento._meta.get_field('thumbnail').storage
+_avatar_storage = Usuario._meta.get_field('avatar').storage
+
+
+def valores_feed(queryset):
+    """Queryset de dicts com as colunas do feed (para paginar sem instanciar modelos)"""
+    return queryset.prefetch_related(None).values(*CAMPOS_FEED)
+
+
+def _url(storage, nome, request):
+    if not nome:
+        return None
+    url = storage.url(nome)
+    return request.build_absolute_uri(url) if request else url
+
+
+def _tags_por_momento(ids):
+    tags = {}
+    linhas = (
+        Momento.tags.through.objects.filter(momento_id__in=ids)
+        .order_by('tag__nome')
+        .values_list('momento_id', 'tag_id', 'tag__nome', 'tag__slug')
+    )
+    for momento_id, tag_id, nome, slug in linhas:
+        tags.setdefault(momento_id, []).append({'id': tag_id, 'nome': nome, 'slug': slug})
+    return tags
+
+
+def _totais_por_autor(autores, user):
+    """total_momentos e total_likes_recebidos de todos os autores em uma consulta"""
+    # Mesma regra do UsuarioSerializer: o dono conta tudo, os demais só vídeos públicos
+    visiveis = Q(is_private=False)
+    if user is not None and user.is_authenticated:
+        visiveis |= Q(usuario_id=user.pk)
+    # Contadores toleram atraso de replicação
+    linhas = (
+        Momento.objects.using(replica()).filter(usuario_id__in=autores)
+        .order_by()
+        .values('usuario_id')
+        .annotate(
+            total_momentos=Count('id', filter=visiveis),
+            total_likes=Sum('likes_count', filter=visiveis),
+        )
+    )
+    return {
+        linha['usuario_id']: (linha['total_momentos'], linha['total_likes'] or 0)
+        for linha in linhas
+    }
+
+
+@medir_serializacao()
+def serializar_feed(linhas, request):
+    """Equivalente a MomentoListSerializer(many=True, context={'request': request}).data"""
+    linhas = list(linhas)
+    if not linhas:
+        return []
+
+    user = getattr(request, 'user', None)
+    ids = [linha['id'] for linha in linhas]
+    tags = _tags_por_momento(ids)
+    totais = _totais_por_autor({linha['usuario_id'] for linha in linhas}, user)
+    curtidos = set()
+    if user is not None and user.is_authenticated:
+        curtidos = set(
+            Like.objects.filter(usuario=user, momento_id__in=ids).values_list('momento_id', flat=True)
+        )
+
+    resultado = []
+    for linha in linhas:
+        autor_id = linha['usuario_id']
+        total_momentos, total_likes_recebidos = totais.get(autor_id, (0, 0))
+        data_nascimento = linha['usuario__data_nascimento']
+        resultado.append({
+            'id': linha['id'],
+            'titulo': linha['titulo'],
+            'descricao': linha['descricao'],
+            'video': _url(_video_storage, linha['video'], request),
+            'hls': url_hls(linha['id'], linha['hls'], request),
+            'thumbnail': _url(_thumbnail_storage, linha['thumbnail'], request),
+            'duracao': linha['duracao'],
+            'views': linha['views'],
+            'total_likes': linha['likes_count'],
+            'is_liked': linha['id'] in curtidos,
+            'tags': tags.get(linha['id'], []),
+            'usuario': {
+                'id': autor_id,
+                'username': linha['usuario__username'],
+                'email': linha['usuario__email'],
+                'first_name': linha['usuario__first_name'],
+                'last_name': linha['usuario__last_name'],
+                'avatar': _url(_avatar_storage, linha['usuario__avatar'], request),
+                'bio': linha['usuario__bio'],
+                'data_nascimento': _date.to_representation(data_nascimento) if data_nascimento else None,
+                'total_momentos': total_momentos,
+                'total_likes_recebidos': total_likes_recebidos,
+                'created_at': _datetime.to_representation(linha['usuario__created_at']),
+                'is_private': linha['usuario__is_private'],
+            },
+            'created_at': _datetime.to_representation(linha['created_at']),
+            'is_private': linha['is_private'],
+        })
+    return resultado
@@ -0,0 +1,228 @@
+"""
+Empacotamento HLS (streaming adaptativo) dos momentos
+Localização: backend/momentos/hls.py
+
+empacotar() gera com ffmpeg uma escada pequena de qualidades (HLS_ESCADA,
+sem ampliar acima da resolução original), segmentos de HLS_SEGUNDOS e uma
+master playlist, gravados no storage em hls/{id}/{versao}/. O player baixa só os
+segmentos que assiste, na qualidade que a conexão aguenta, em vez do
+arquivo original inteiro.
+
+Fluxo: com HLS_ATIVO, o upload marca o momento como 'pendente' e o worker
+`empacotar_hls --continuo` (processo próprio) roda o ffmpeg: um encode leva
+minutos e não pode ocupar a thread de tarefas (notificações, remoção de
+arquivos, timeline, exclusão de contas). O mesmo comando, sem --continuo,
+processa pendências, falhas e vídeos antigos. Os arquivos são servidos por
+MomentoHLSView, com a mesma regra de visibilidade do detalhe, em URLs com a
+versão do pacote: reempacotar grava em outra pasta e troca a URL, então
+um cache nunca mistura segmentos de pacotes diferentes.
+Um vídeo deduplicado (momentos/conteudo.py) reaproveita o pacote do momento
+que já tem o mesmo arquivo: a pasta só é removida quando nenhum momento
+aponta mais para a master playlist dela.
+"""
+import logging
+import re
+import shutil
+import subprocess
+import tempfile
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Q
+from django.db.models.signals import post_delete
+from django.utils import timezone
+
+from config.logs import registrar_evento
+
+from .models import Momento
+from .tasks import enfileirar
+
+logger = logging.getLogger(__name__)
+
+PASTA = 'hls'
+MASTER = 'master.m3u8'
+# Nomes planos (sem subpastas): as URIs relativas das playlists resolvem na mesma rota
+ARQUIVO_VALIDO = re.compile(r'^[\w-]+\.(m3u8|ts)$')
+CONTENT_TYPES = {'m3u8': 'application/vnd.apple.mpegurl', 'ts': 'video/mp2t'}
+
+_storage = Momento._meta.get_field('video').storage
+
+
+class ErroEmpacotamento(Exception):
+    pass
+
+
+def pasta_do_momento(momento_id, versao):
+    return f'{PASTA}/{momento_id}/{versao}'
+
+
+def versao_do_pacote(master):
+    """Versão (nome da pasta) de um pacote, a partir do caminho da master playlist"""
+    return master.rpartition('/')[0].rpartition('/')[2]
+
+
+def escada():
+    """[(altura, kbps de vídeo)] de HLS_ESCADA ('240:400,480:1000,720:2500')"""
+    degraus = []
+    for degrau in settings.HLS_ESCADA.split(','):
+        altura, _, kbps = degrau.partition(':')
+        degraus.append((int(altura), int(kbps)))
+    return sorted(degraus)
+
+
+def _sondar(caminho):
+    """(altura, tem_audio) do vídeo, lidos do cabeçalho que o ffmpeg imprime"""
+    saida = subprocess.run(
+        [settings.HLS_FFMPEG, '-hide_banner', '-i', str(caminho)],
+        capture_output=True, text=True, timeout=60,
+    ).stderr
+    video = re.search(r'Stream #.*?: Video: .*?, (\d{2,5})x(\d{2,5})', saida)
+    if video is None:
+        raise ErroEmpacotamento(f'Sem faixa de vídeo: {saida[-500:]}')
+    return int(video.group(2)), re.search(r'Stream #.*?: Audio: ', saida) is not None
+
+
+def comando_ffmpeg(entrada, saida, altura_original, tem_audio):
+    """Linha de comando do ffmpeg: um encode por degrau, segmentos alinhados em keyframes"""
+    degraus = [degrau for degrau in escada() if degrau[0] <= altura_original] or [(altura_original, escada()[0][1])]
+    segundos = settings.HLS_SEGUNDOS
+
+    filtros = [f'[0:v]split={len(degraus)}' + ''.join(f'[v{i}]' for i in range(len(degraus)))]
+    filtros += [f'[v{i}]scale=-2:{altura}[s{i}]' for i, (altura, _) in enumerate(degraus)]
+    cmd = [settings.HLS_FFMPEG, '-hide_banner', '-loglevel', 'error', '-y', '-i', str(entrada),
+           '-filter_complex', ';'.join(filtros)]
+    mapa = []
+    for i, (_, kbps) in enumerate(degraus):
+        cmd += ['-map', f'[s{i}]', f'-b:v:{i}', f'{kbps}k', f'-maxrate:v:{i}', f'{kbps * 107 // 100}k',
+                f'-bufsize:v:{i}', f'{kbps * 3 // 2}k']
+        if tem_audio:
+            cmd += ['-map', '0:a:0']
+        mapa.append(f'v:{i},a:{i}' if tem_audio else f'v:{i}')
+    cmd += ['-c:v', 'libx264', '-preset', 'veryfast', '-profile:v', 'main',
+            '-force_key_frames', f'expr:gte(t,n_forced*{segundos})', '-sc_threshold', '0']
+    if tem_audio:
+        cmd += ['-c:a', 'aac', '-b:a', f'{settings.HLS_AUDIO_KBPS}k', '-ac', '2']
+    cmd += ['-f', 'hls', '-hls_time', str(segundos), '-hls_playlist_type', 'vod',
+            '-hls_flags', 'independent_segments', '-hls_segment_filename', str(saida / 'v%v_%03d.ts'),
+            '-master_pl_name', MASTER, '-var_stream_map', ' '.join(mapa), str(saida / 'v%v.m3u8')]
+    return cmd
+
+
+def _remover_pasta(pasta):
+    """Remove os arquivos de uma pasta de pacote HLS no storage"""
+    try:
+        _, arquivos = _storage.listdir(pasta)
+    except FileNotFoundError:
+        return
+    for nome in arquivos:
+        _storage.delete(f'{pasta}/{nome}')
+
+
+def a_empacotar():
+    """Pendentes e 'processando' com o lease vencido (o processo caiu no meio do encode)"""
+    return Q(hls_status='pendente') | Q(hls_status='processando', hls_lease_ate__lt=timezone.now()) | Q(
+        hls_status='processando', hls_lease_ate__isnull=True
+    )
+
+
+def empacotar(momento_id):
+    """
+    Empacota o vídeo do momento (chamado pelo empacotar_hls). Só um processo empacota por vez:
+    a reserva ('processando' com lease de HLS_LEASE_SEGUNDOS) é um UPDATE condicional.
+    """
+    reservado = Momento.objects.filter(a_empacotar(), pk=momento_id).update(
+        hls_status='processando', hls_lease_ate=timezone.now() + timedelta(seconds=settings.HLS_LEASE_SEGUNDOS)
+    )
+    if not reservado:
+        return
+    video = Momento.objects.filter(pk=momento_id).values_list('video', flat=True).first()
+    pasta = pasta_do_momento(momento_id, uuid.uuid4().hex[:12])
+    try:
+        with tempfile.TemporaryDirectory(prefix='hls-') as temporario:
+            temporario = Path(temporario)
+            entrada = temporario / 'entrada'
+            with _storage.open(video) as origem, open(entrada, 'wb') as destino:
+                shutil.copyfileobj(origem, destino, 1024 * 1024)
+            saida = temporario / 'saida'
+            saida.mkdir()
+
+            altura, tem_audio = _sondar(entrada)
+            resultado = subprocess.run(
+                comando_ffmpeg(entrada, saida, altura, tem_audio),
+                capture_output=True, text=True, timeout=settings.HLS_TIMEOUT_SEGUNDOS,
+            )
+            if resultado.returncode != 0:
+                raise ErroEmpacotamento(resultado.stderr[-1000:])
+
+            # Os nomes precisam ser exatamente os das playlists
+            total = 0
+            for arquivo in sorted(saida.iterdir()):
+                with open(arquivo, 'rb') as conteudo:
+                    nome = _storage.save(f'{pasta}/{arquivo.name}', File(conteudo))
+                if nome != f'{pasta}/{arquivo.name}':
+                    raise ErroEmpacotamento(f'Storage renomeou {arquivo.name} para {nome}')
+                total += arquivo.stat().st_size
+    except Exception as exc:
+        _remover_pasta(pasta)  # segmentos já gravados desta versão
+        Momento.objects.filter(pk=momento_id).update(hls_status='falhou', hls_lease_ate=None)
+        logger.warning('Falha ao empacotar HLS do momento %s: %r', momento_id, exc)
+        return
+
+    # Nova versão do detalhe (ETag) com a URL da playlist
+    anterior = Momento.objects.filter(pk=momento_id).values_list('hls', flat=True).first()
+    if not Momento.objects.filter(pk=momento_id).update(
+        hls=f'{pasta}/{MASTER}', hls_status='pronto', hls_lease_ate=None, updated_at=timezone.now()
+    ):
+        _remover_pasta(pasta)  # o momento foi apagado durante o empacotamento
+        return
+    if anterior:
+        _remover_pacote(anterior)  # versão anterior (ou pacote reaproveitado), se ninguém mais a usa
+    registrar_evento(logger, 'momento.hls', momento=momento_id, bytes=total)
+
+
+def reaproveitar(momento_id):
+    """Usa o pacote pronto de outro momento com o mesmo arquivo de vídeo, se houver"""
+    video = Momento.objects.filter(pk=momento_id).values_list('video', flat=True).first()
+    pronto = (
+        Momento.objects.filter(video=video, hls_status='pronto').exclude(pk=momento_id)
+        .values_list('hls', flat=True).first()
+    )
+    if not pronto:
+        return False
+    Momento.objects.filter(pk=momento_id).update(hls=pronto, hls_status='pronto', updated_at=timezone.now())
+    registrar_evento(logger, 'momento.hls_reaproveitado', momento=momento_id)
+    return True
+
+
+def agendar(momento_id):
+    """
+    Reaproveita o pacote de um vídeo idêntico ou, se não houver, marca o
+    momento como pendente para o worker empacotar_hls.
+    """
+    if reaproveitar(momento_id):
+        return
+    Momento.objects.filter(pk=momento_id).update(hls_status='pendente')
+
+
+def _remover_pacote(master):
+    """Tarefa: remove a pasta do pacote se nenhum momento usa mais a playlist"""
+    if not Momento.objects.filter(hls=master).exists():
+        _remover_pasta(master.rpartition('/')[0])
+
+
+def agendar_remocao_pacotes(masters):
+    """Remove, após o commit, os pacotes HLS que ficarem sem momento (chamado ao apagar momentos)"""
+    for master in set(masters):
+        enfileirar(_remover_pacote, master)
+
+
+def _ao_remover(sender, instance, **kwargs):
+    if instance.hls:
+        agendar_remocao_pacotes([instance.hls])
+
+
+def conectar():
+    post_delete.connect(_ao_remover, sender=Momento, dispatch_uid='hls_remover_pacote')
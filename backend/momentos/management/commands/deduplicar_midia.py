@@ -0,0 +1,159 @@
+"""
+Migração da mídia existente para o armazenamento por conteúdo
+Uso: python manage.py deduplicar_midia [--lote 200] [--dry-run] [--recontar]
+
+Percorre os FileFields (vídeo, thumbnail, avatar) que ainda apontam para
+arquivos próprios, calcula o SHA-256 de cada arquivo em uma única leitura
+(os mesmos blocos alimentam o hash e a cópia temporária) e troca a
+referência pelo conteúdo compartilhado (momentos/conteudo.py). Duplicatas
+não são gravadas de novo; o arquivo antigo é removido após o commit.
+Momentos que passam a ter o mesmo vídeo ficam com um único pacote HLS.
+Pode ser interrompido e executado de novo: cada arquivo é uma transação.
+
+--recontar recalcula `referencias` a partir das linhas (ex.: após restaurar
+um backup; rodar sem uploads em andamento) e recolhe os conteúdos sem uso.
+"""
+import hashlib
+import tempfile
+from collections import Counter
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from momentos import conteudo, hls
+from momentos.arquivos import apagar_arquivos, campos_de_arquivo
+from momentos.models import ConteudoMidia, Momento
+from momentos.tasks import enfileirar
+
+
+def legados(model, campo, lote):
+    """Nomes distintos ainda fora do armazenamento por conteúdo (paginação por chave)"""
+    ultimo = ''
+    while True:
+        nomes = list(
+            model._base_manager.filter(**{f'{campo.attname}__gt': ultimo})
+            .exclude(**{f'{campo.attname}__startswith': f'{conteudo.PASTA}/'})
+            .order_by(campo.attname).values_list(campo.attname, flat=True).distinct()[:lote]
+        )
+        if not nomes:
+            return
+        yield from nomes
+        ultimo = nomes[-1]
+
+
+def unificar_pacotes(video):
+    """Todos os momentos com o mesmo vídeo passam a usar o primeiro pacote HLS pronto"""
+    masters = set(Momento.objects.filter(video=video, hls_status='pronto').values_list('hls', flat=True))
+    if not masters:
+        return
+    escolhido = min(masters)
+    Momento.objects.filter(video=video).exclude(hls=escolhido).exclude(hls_status='processando').update(
+        hls=escolhido, hls_status='pronto', updated_at=timezone.now()
+    )
+    hls.agendar_remocao_pacotes(masters - {escolhido})
+
+
+class Command(BaseCommand):
+    help = 'Move a mídia existente para o armazenamento deduplicado por conteúdo (SHA-256)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=200, help='Nomes lidos do banco por consulta')
+        parser.add_argument('--dry-run', action='store_true', help='Calcula os hashes e conta, não altera nada')
+        parser.add_argument('--recontar', action='store_true',
+                            help='Apenas recalcula as referências e recolhe conteúdos sem uso')
+
+    def handle(self, *args, **options):
+        if options['recontar']:
+            self.recontar()
+            return
+
+        storage = default_storage
+        vistos = set(ConteudoMidia.objects.values_list('sha256', flat=True)) if options['dry_run'] else None
+        examinados = duplicados = ausentes = economizados = 0
+        for model in apps.get_models():
+            for campo in campos_de_arquivo(model):
+                for nome in legados(model, campo, options['lote']):
+                    examinados += 1
+                    try:
+                        novo, tamanho, duplicado = self.migrar(storage, model, campo, nome, vistos)
+                    except FileNotFoundError:
+                        ausentes += 1
+                        if options['verbosity'] >= 2:
+                            self.stdout.write(f'  ausente: {nome}')
+                        continue
+                    if duplicado:
+                        duplicados += 1
+                        economizados += tamanho
+                    if options['verbosity'] >= 2:
+                        self.stdout.write(f"  {nome} -> {novo}{' (duplicado)' if duplicado else ''}")
+                    if examinados % 100 == 0:
+                        self.stdout.write(f'  {examinados} arquivos examinados, {duplicados} duplicados...')
+
+        acao = 'seriam liberados' if options['dry_run'] else 'liberados'
+        self.stdout.write(self.style.SUCCESS(
+            f'{examinados} arquivos examinados, {duplicados} duplicados ({economizados / 1024 / 1024:.1f} MB {acao}); '
+            f'{ausentes} ausentes no storage.'
+        ))
+
+    def migrar(self, storage, model, campo, nome, vistos):
+        """Migra um arquivo. Retorna (nome novo, tamanho, era duplicado)."""
+        resumo = hashlib.sha256()
+        tamanho = 0
+        with storage.open(nome) as origem, tempfile.TemporaryFile() as copia:
+            for bloco in origem.chunks(conteudo.TAMANHO_BLOCO):
+                resumo.update(bloco)
+                copia.write(bloco)
+                tamanho += len(bloco)
+            sha256 = resumo.hexdigest()
+
+            if vistos is not None:
+                # --dry-run: nada é gravado
+                duplicado = sha256 in vistos
+                vistos.add(sha256)
+                return conteudo.nome_do_conteudo(sha256, nome), tamanho, duplicado
+
+            arquivo = File(copia, name=nome)
+            arquivo.size = tamanho
+            with transaction.atomic():
+                duplicado = ConteudoMidia.objects.filter(sha256=sha256).exists()
+                novo = conteudo.armazenar(arquivo, nome, storage, sha256=sha256)
+                alteracoes = {campo.attname: novo}
+                if any(f.name == 'updated_at' for f in model._meta.concrete_fields):
+                    alteracoes['updated_at'] = timezone.now()  # nova URL: nova versão (ETag)
+                atualizadas = model._base_manager.filter(**{campo.attname: nome}).update(**alteracoes)
+                # armazenar() contou uma referência; o arquivo antigo podia ser de várias linhas
+                if atualizadas != 1:
+                    ConteudoMidia.objects.filter(sha256=sha256).update(referencias=F('referencias') + atualizadas - 1)
+                if atualizadas:
+                    enfileirar(apagar_arquivos, storage, [nome])
+                else:
+                    enfileirar(conteudo.recolher, [novo])  # linha alterada no meio do caminho
+                if model is Momento and campo.name == 'video':
+                    unificar_pacotes(novo)
+        return novo, tamanho, duplicado
+
+    def recontar(self):
+        contagem = Counter()
+        for model in apps.get_models():
+            for campo in campos_de_arquivo(model):
+                linhas = (
+                    model._base_manager.filter(**{f'{campo.attname}__startswith': f'{conteudo.PASTA}/'})
+                    .values(campo.attname).annotate(total=Count('pk')).order_by()
+                )
+                for linha in linhas:
+                    contagem[linha[campo.attname]] += linha['total']
+
+        corrigidos = 0
+        for pk, arquivo, referencias in ConteudoMidia.objects.values_list('pk', 'arquivo', 'referencias').iterator():
+            if referencias != contagem.get(arquivo, 0):
+                ConteudoMidia.objects.filter(pk=pk).update(referencias=contagem.get(arquivo, 0))
+                corrigidos += 1
+        recolhidos = conteudo.recolher()
+        self.stdout.write(self.style.SUCCESS(
+            f'{corrigidos} contagens corrigidas; {recolhidos} conteúdos sem referências removidos.'
+        ))
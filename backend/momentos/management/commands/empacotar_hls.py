@@ -0,0 +1,73 @@
+"""
+Empacotamento HLS dos momentos
+Uso: python manage.py empacotar_hls [--todos] [--falhas] [--momento ID] [--limite N]
+                                  [--continuo] [--intervalo 5]
+
+Processa os momentos marcados como pendentes pelos uploads com HLS_ATIVO e
+os que ficaram 'processando' com o lease vencido (worker que caiu no meio
+do encode).
+Em produção roda como worker (--continuo), em um processo separado dos
+servidores web: o encode não disputa a thread de tarefas. --todos inclui os vídeos ainda não
+empacotados (ex.: ao ligar HLS_ATIVO com acervo existente), --falhas tenta
+de novo os que falharam e --momento reempacota um momento específico.
+Momentos com o mesmo arquivo de vídeo de um já empacotado (deduplicação)
+reaproveitam o pacote dele em vez de rodar o ffmpeg.
+O ffmpeg roda aqui, neste processo, um vídeo por vez (ver momentos/hls.py).
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from momentos.hls import a_empacotar, empacotar, reaproveitar
+from momentos.models import Momento
+
+
+class Command(BaseCommand):
+    help = 'Gera os pacotes HLS (escada de qualidades + playlists) dos momentos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todos', action='store_true', help='Inclui momentos nunca empacotados')
+        parser.add_argument('--falhas', action='store_true', help='Inclui momentos cujo empacotamento falhou')
+        parser.add_argument('--momento', type=int, help='Reempacota apenas este momento')
+        parser.add_argument('--limite', type=int, help='Máximo de momentos nesta execução')
+        parser.add_argument('--continuo', action='store_true', help='Não termina: verifica pendências a cada --intervalo')
+        parser.add_argument('--intervalo', type=float, default=5, help='Segundos entre verificações (--continuo)')
+
+    def handle(self, *args, **options):
+        while True:
+            processados = self.processar(options)
+            if not options['continuo'] or options['momento']:
+                break
+            # --todos e --falhas valem para a primeira passada; depois, só os novos uploads
+            options['todos'] = options['falhas'] = False
+            if not processados:
+                time.sleep(options['intervalo'])
+
+    def processar(self, options):
+        if options['momento']:
+            alvos = Momento.objects.filter(pk=options['momento'])
+        else:
+            filtro = a_empacotar()
+            if options['todos']:
+                filtro |= Q(hls_status='')
+            if options['falhas']:
+                filtro |= Q(hls_status='falhou')
+            alvos = Momento.objects.filter(filtro).exclude(video='')
+        ids = list(alvos.order_by('-created_at').values_list('pk', flat=True)[:options['limite']])
+        if not ids and options['continuo']:
+            return 0
+
+        prontos = 0
+        for posicao, momento_id in enumerate(ids, 1):
+            inicio = time.monotonic()
+            # Vídeo idêntico (deduplicado) já empacotado: só aponta para o pacote dele
+            if options['momento'] or not reaproveitar(momento_id):
+                Momento.objects.filter(pk=momento_id).update(hls_status='pendente')
+                empacotar(momento_id)
+            status = Momento.objects.filter(pk=momento_id).values_list('hls_status', flat=True).first()
+            prontos += status == 'pronto'
+            self.stdout.write(f'  [{posicao}/{len(ids)}] momento {momento_id}: {status} ({time.monotonic() - inicio:.1f}s)')
+
+        self.stdout.write(self.style.SUCCESS(f'{prontos} de {len(ids)} momentos empacotados.'))
+        return len(ids)
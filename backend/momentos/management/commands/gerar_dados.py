@@ -0,0 +1,66 @@
+"""
+Dados sintéticos em escala para desenvolvimento e benchmarks
+Uso: python manage.py gerar_dados [--usuarios 1000] [--momentos 10000] [--media-likes 20] ...
+
+Gera usuários (parte privados), momentos com tags, likes e comentários em
+lei de potência e notificações (ver momentos/sintetico.py). No Postgres grava
+com COPY: ~10M linhas em poucos minutos, por exemplo
+    python manage.py gerar_dados --usuarios 100000 --momentos 400000 --media-likes 20
+NUNCA rode em produção. Para recomeçar, use outro --prefixo ou `manage.py flush`.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from momentos.sintetico import gerar
+
+
+class Command(BaseCommand):
+    help = 'Gera um conjunto de dados sintético (usuários, momentos, likes, comentários, notificações)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=1000)
+        parser.add_argument('--privados', type=float, default=0.1, help='Fração de perfis privados')
+        parser.add_argument('--momentos', type=int, default=10000)
+        parser.add_argument('--momentos-privados', type=float, default=0.1, help='Fração de momentos privados')
+        parser.add_argument('--tags', type=int, default=50)
+        parser.add_argument('--max-tags', type=int, default=3, help='Máximo de tags por momento')
+        parser.add_argument('--media-likes', type=float, default=20, help='Média de likes por momento')
+        parser.add_argument('--media-comentarios', type=float, default=3, help='Média de comentários por momento')
+        parser.add_argument('--media-views', type=float, default=300, help='Média de views por momento')
+        parser.add_argument('--dias', type=int, default=365, help='Período coberto pelos momentos')
+        parser.add_argument('--prefixo', default='sint', help='Prefixo dos usernames e tags')
+        parser.add_argument('--senha', default='sintetico123', help='Senha de todos os usuários gerados')
+        parser.add_argument('--lote', type=int, default=50000, help='Linhas por COPY/bulk_create')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG:
+            self.stdout.write(self.style.WARNING('DEBUG=False: confira se este não é o banco de produção.'))
+        if options['usuarios'] < 2:
+            raise CommandError('São necessários pelo menos 2 usuários.')
+        prefixo = options['prefixo']
+        if get_user_model().objects.filter(username__startswith=f'{prefixo}_').exists():
+            raise CommandError(f'Já existem usuários "{prefixo}_*": use outro --prefixo ou limpe o banco.')
+
+        inicio = time.monotonic()
+        totais = gerar(
+            usuarios=options['usuarios'], fracao_privados=options['privados'],
+            momentos=options['momentos'], fracao_momentos_privados=options['momentos_privados'],
+            tags=options['tags'], max_tags_por_momento=options['max_tags'],
+            media_likes=options['media_likes'], media_comentarios=options['media_comentarios'],
+            media_views=options['media_views'], dias=options['dias'], prefixo=prefixo,
+            senha=options['senha'], lote=options['lote'], seed=options['seed'],
+            progresso=lambda texto: self.stdout.write(f'  {texto}...'),
+        )
+        duracao = time.monotonic() - inicio
+
+        for modelo, total in totais.items():
+            self.stdout.write(f'  {modelo:<28} {total:>12,}')
+        linhas = sum(totais.values())
+        self.stdout.write(self.style.SUCCESS(
+            f'{linhas:,} linhas em {duracao:.1f}s ({linhas / duracao:,.0f} linhas/s). '
+            f'Login: {prefixo}_0 / senha {options["senha"]}'
+        ))
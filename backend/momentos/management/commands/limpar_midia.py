@@ -0,0 +1,127 @@
+"""
+Coleta de mídia órfã
+Uso: python manage.py limpar_midia [--pasta videos] [--idade-minima 24] [--lote 1000]
+                                   [--max-por-segundo 50] [--dry-run]
+
+Percorre o storage de mídia em fluxo (diretório a diretório, sem montar a
+árvore inteira na memória) e remove arquivos que nenhuma linha referencia.
+Cada lote de caminhos é conferido com uma consulta `campo IN (...)` por
+FileField (vídeo, thumbnail, avatar), uma para os conteúdos deduplicados e
+uma para as pastas HLS, e não com uma consulta por arquivo.
+Antes, conteúdos deduplicados sem referências (coleta perdida) são apagados.
+Arquivos mais novos que --idade-minima horas ficam: o upload é gravado no
+storage antes do commit da linha que o referencia.
+Complementa a remoção no commit (momentos/arquivos.py); pensado para rodar
+periodicamente (ex.: cron semanal), sempre primeiro com --dry-run.
+"""
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from momentos import conteudo, hls
+from momentos.arquivos import campos_de_arquivo
+from momentos.models import ConteudoMidia, Momento
+
+
+def percorrer(storage, pasta=''):
+    """Gera os caminhos de todos os arquivos abaixo de `pasta` (ignora ocultos)"""
+    try:
+        diretorios, arquivos = storage.listdir(pasta)
+    except FileNotFoundError:
+        return
+    for nome in sorted(arquivos):
+        if not nome.startswith('.'):
+            yield f'{pasta}/{nome}' if pasta else nome
+    for nome in sorted(diretorios):
+        if not nome.startswith('.'):
+            yield from percorrer(storage, f'{pasta}/{nome}' if pasta else nome)
+
+
+def referenciados(caminhos):
+    """Subconjunto de `caminhos` usado por algum FileField, conteúdo deduplicado ou pacote HLS"""
+    usados = set()
+    for model in apps.get_models():
+        for campo in campos_de_arquivo(model):
+            usados.update(
+                model._base_manager.filter(**{f'{campo.attname}__in': caminhos})
+                .values_list(campo.attname, flat=True)
+            )
+    # Conteúdo compartilhado ainda registrado (a coleta dele apaga o arquivo sob lock)
+    usados.update(ConteudoMidia.objects.filter(arquivo__in=caminhos).values_list('arquivo', flat=True))
+
+    # Pacotes HLS: a pasta inteira pertence ao momento cuja master playlist está nela
+    pastas = {caminho.rpartition('/')[0] for caminho in caminhos if caminho.startswith(f'{hls.PASTA}/')}
+    if pastas:
+        masters = Momento.objects.filter(hls__in=[f'{pasta}/{hls.MASTER}' for pasta in pastas]).values_list('hls', flat=True)
+        com_dono = {master.rpartition('/')[0] for master in masters}
+        usados.update(caminho for caminho in caminhos if caminho.rpartition('/')[0] in com_dono)
+    return usados
+
+
+def lotes(iteravel, tamanho):
+    lote = []
+    for item in iteravel:
+        lote.append(item)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+class Command(BaseCommand):
+    help = 'Remove arquivos de mídia que nenhuma linha do banco referencia'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pasta', default='', help='Subpasta do storage (padrão: tudo)')
+        parser.add_argument('--idade-minima', type=float, default=24,
+                            help='Mantém arquivos modificados há menos de N horas')
+        parser.add_argument('--lote', type=int, default=1000, help='Caminhos conferidos por consulta')
+        parser.add_argument('--max-por-segundo', type=float, default=50,
+                            help='Limite de remoções por segundo (0 = sem limite)')
+        parser.add_argument('--dry-run', action='store_true', help='Apenas lista e conta, não remove')
+
+    def handle(self, *args, **options):
+        storage = default_storage
+        limite = timezone.now() - timedelta(hours=options['idade_minima'])
+        taxa = options['max_por_segundo']
+        examinados = orfaos = recentes = tamanho = 0
+        inicio = time.monotonic()
+
+        if not options['dry_run']:
+            recolhidos = conteudo.recolher(storage=storage)
+            if recolhidos:
+                self.stdout.write(f'  {recolhidos} conteúdos deduplicados sem referências removidos')
+
+        for lote in lotes(percorrer(storage, options['pasta'].strip('/')), options['lote']):
+            examinados += len(lote)
+            usados = referenciados(lote)
+            for caminho in lote:
+                if caminho in usados:
+                    continue
+                if storage.get_modified_time(caminho) > limite:
+                    recentes += 1
+                    continue
+                orfaos += 1
+                tamanho += storage.size(caminho)
+                if options['verbosity'] >= 2:
+                    self.stdout.write(f'  {caminho}')
+                if options['dry_run']:
+                    continue
+                storage.delete(caminho)
+                # Limite de taxa: não passa de `taxa` remoções por segundo desde o início
+                if taxa:
+                    espera = orfaos / taxa - (time.monotonic() - inicio)
+                    if espera > 0:
+                        time.sleep(espera)
+            self.stdout.write(f'  {examinados} arquivos examinados, {orfaos} órfãos...')
+
+        acao = 'seriam removidos' if options['dry_run'] else 'removidos'
+        self.stdout.write(self.style.SUCCESS(
+            f'{orfaos} arquivos órfãos {acao} ({tamanho / 1024 / 1024:.1f} MB) de {examinados} examinados; '
+            f'{recentes} órfãos recentes mantidos.'
+        ))
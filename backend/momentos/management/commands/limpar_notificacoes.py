@@ -0,0 +1,49 @@
+"""
+Retenção de notificações
+Uso: python manage.py limpar_notificacoes [--dias 90] [--lote 1000] [--pausa 0.1] [--dry-run]
+
+Remove notificações LIDAS sem atividade há mais tempo que a retenção (updated_at:
+uma linha agrupada criada há meses pode ter recebido likes ontem), em lotes pequenos
+(cada lote é um DELETE curto por chave primária), sem travar a tabela.
+Pensado para rodar periodicamente (ex.: cron diário).
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from momentos.models import Notificacao
+
+
+class Command(BaseCommand):
+    help = 'Remove notificações lidas antigas em lotes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dias', type=int, default=settings.NOTIFICACOES_RETENCAO_DIAS,
+                            help='Remove notificações lidas sem atividade há mais de N dias')
+        parser.add_argument('--lote', type=int, default=1000, help='Linhas por DELETE')
+        parser.add_argument('--pausa', type=float, default=0.1, help='Segundos entre lotes')
+        parser.add_argument('--dry-run', action='store_true', help='Apenas conta, não remove')
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=options['dias'])
+        antigas = Notificacao.objects.filter(lida=True, updated_at__lt=limite).order_by()
+
+        if options['dry_run']:
+            self.stdout.write(f'{antigas.count()} notificações seriam removidas (lidas, sem atividade desde {limite:%Y-%m-%d}).')
+            return
+
+        total = 0
+        while True:
+            ids = list(antigas.values_list('pk', flat=True)[:options['lote']])
+            if not ids:
+                break
+            removidas, _ = Notificacao.objects.filter(pk__in=ids).delete()
+            total += removidas
+            self.stdout.write(f'  {total} removidas...')
+            if options['pausa']:
+                time.sleep(options['pausa'])
+
+        self.stdout.write(self.style.SUCCESS(f'{total} notificações removidas.'))
@@ -0,0 +1,85 @@
+"""
+Reconstrução do índice de momentos relacionados
+Uso: python manage.py reconstruir_relacionados [--lote 500]
+
+Recalcula os RELACIONADOS_K vizinhos de todos os momentos com tags, com a
+mesma pontuação da atualização incremental (momentos/relacionados.py).
+Tags, frequências e engajamento são lidos uma vez (índice invertido em
+memória), em vez de consultas por momento; cada lote de --lote momentos
+é gravado em uma transação, então as sugestões continuam disponíveis
+durante a reconstrução. Útil na implantação do recurso, após importações
+em massa ou ao mudar RELACIONADOS_K / RELACIONADOS_CANDIDATOS_POR_TAG.
+"""
+import heapq
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from momentos import relacionados
+from momentos.models import MomentoRelacionado
+from momentos.relacionados import TagMomento
+
+
+class Command(BaseCommand):
+    help = 'Recalcula o índice de momentos relacionados por coocorrência de tags'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help='Momentos gravados por transação')
+
+    def handle(self, *args, **options):
+        inicio = time.monotonic()
+        tags_de = defaultdict(set)
+        for momento_id, tag_id in TagMomento.objects.values_list('momento_id', 'tag_id').iterator(chunk_size=5000):
+            tags_de[momento_id].add(tag_id)
+        pesos = {
+            tag_id: relacionados.peso(total)
+            for tag_id, total in Counter(tag for tags in tags_de.values() for tag in tags).items()
+        }
+
+        # Candidatos de cada tag: os mais engajados entre os sugeríveis (como em _candidatos)
+        engajamento = {}
+        por_tag = defaultdict(list)
+        for pk, likes, views in relacionados.sugeriveis().values_list('pk', 'likes_count', 'views').iterator(chunk_size=5000):
+            if pk in tags_de:
+                engajamento[pk] = (likes, views)
+                for tag_id in tags_de[pk]:
+                    por_tag[tag_id].append((likes, views, pk))
+        limite = settings.RELACIONADOS_CANDIDATOS_POR_TAG
+        por_tag = {tag_id: [pk for *_, pk in heapq.nlargest(limite, lista)] for tag_id, lista in por_tag.items()}
+
+        ids = sorted(tags_de)
+        gravadas = 0
+        for i in range(0, len(ids), options['lote']):
+            lote = ids[i:i + options['lote']]
+            linhas = []
+            for momento_id in lote:
+                tags = tags_de[momento_id]
+                candidatos = {
+                    candidato: (tags_de[candidato] & tags, *engajamento[candidato])
+                    for tag_id in tags for candidato in por_tag.get(tag_id, ())
+                }
+                linhas.extend(
+                    MomentoRelacionado(momento_id=momento_id, relacionado_id=candidato, pontuacao=pontuacao)
+                    for pontuacao, _, _, candidato in relacionados.melhores(
+                        relacionados.pontuar(momento_id, candidatos, pesos)
+                    )
+                )
+            with transaction.atomic():
+                MomentoRelacionado.objects.filter(momento_id__in=lote).delete()
+                MomentoRelacionado.objects.bulk_create(linhas, batch_size=1000)
+            gravadas += len(linhas)
+            if options['verbosity'] >= 2:
+                self.stdout.write(f'  {i + len(lote)}/{len(ids)} momentos...')
+
+        # Listas de momentos que perderam todas as tags
+        sem_tags = MomentoRelacionado.objects.filter(
+            ~Exists(TagMomento.objects.filter(momento_id=OuterRef('momento_id')))
+        ).delete()[0]
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(ids)} momentos com tags, {gravadas} relações gravadas, {sem_tags} obsoletas removidas '
+            f'em {time.monotonic() - inicio:.1f}s.'
+        ))
@@ -0,0 +1,101 @@
+"""
+Relatório dos histogramas por endpoint do PerfilMiddleware
+Uso: python manage.py relatorio_perfil [--ordenar p95|n|consultas|db|view|serializacao] [--json] [--limpar]
+
+Lê o cache 'perfil' (somado entre todos os processos; a última fração de
+até PERFIL_INTERVALO_SEGUNDOS de cada processo ainda pode estar em memória).
+Percentis são estimados pelo limite superior da faixa do histograma.
+"view" inclui o banco e o serializer.data feitos na view; "serial." é o
+serializer.data somado ao render da resposta.
+Requer PERFIL_AMOSTRAGEM > 0 nos servidores.
+"""
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from config.perfil import FAIXAS, ler_histogramas, limpar_histogramas, percentil
+
+
+def _resumo(endpoint, dados):
+    n = dados['n']
+    return {
+        'endpoint': endpoint,
+        'n': n,
+        'p50_ms': percentil('total_ms', dados['total_ms']['faixas'], 50),
+        'p95_ms': percentil('total_ms', dados['total_ms']['faixas'], 95),
+        'p99_ms': percentil('total_ms', dados['total_ms']['faixas'], 99),
+        'media_ms': round(dados['total_ms']['soma'] / n, 2),
+        'media_db_ms': round(dados['db_ms']['soma'] / n, 2),
+        'media_view_ms': round(dados['view_ms']['soma'] / n, 2),
+        'p95_view_ms': percentil('view_ms', dados['view_ms']['faixas'], 95),
+        'media_serializacao_ms': round(dados['serializacao_ms']['soma'] / n, 2),
+        'p95_serializacao_ms': percentil('serializacao_ms', dados['serializacao_ms']['faixas'], 95),
+        'media_consultas': round(dados['consultas']['soma'] / n, 2),
+        'p95_consultas': percentil('consultas', dados['consultas']['faixas'], 95),
+        'acima_orcamento': dados['acima_orcamento'],
+    }
+
+
+def _formatar(metrica, valor):
+    # Percentil na faixa aberta: só se sabe que passou do último limite
+    return f'>{FAIXAS[metrica][-1]}' if valor == float('inf') else str(valor)
+
+
+ORDENACOES = {
+    'p95': lambda r: (r['p95_ms'], r['media_ms']),
+    'n': lambda r: r['n'],
+    'consultas': lambda r: r['media_consultas'],
+    'db': lambda r: r['media_db_ms'],
+    'view': lambda r: r['media_view_ms'],
+    'serializacao': lambda r: r['media_serializacao_ms'],
+}
+
+
+class Command(BaseCommand):
+    help = 'Mostra os histogramas de latência e consultas por endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ordenar', choices=sorted(ORDENACOES), default='p95')
+        parser.add_argument('--json', action='store_true', help='Saída em JSON (resumo e faixas)')
+        parser.add_argument('--limpar', action='store_true', help='Zera os histogramas depois de ler')
+
+    def handle(self, *args, **options):
+        histogramas = ler_histogramas()
+        linhas = sorted(
+            (_resumo(endpoint, dados) for endpoint, dados in histogramas.items()),
+            key=ORDENACOES[options['ordenar']], reverse=True,
+        )
+
+        if options['json']:
+            for linha in linhas:
+                linha['histogramas'] = {
+                    metrica: histogramas[linha['endpoint']][metrica]
+                    for metrica in FAIXAS
+                }
+            # Faixa aberta (inf) vira null: Infinity não é JSON válido
+            for linha in linhas:
+                for chave, valor in linha.items():
+                    if valor == float('inf'):
+                        linha[chave] = None
+            self.stdout.write(json.dumps(linhas, indent=2, ensure_ascii=False))
+        elif not linhas:
+            self.stdout.write('Nenhuma requisição medida (PERFIL_AMOSTRAGEM > 0 nos servidores?).')
+        else:
+            self.stdout.write(
+                f'{"endpoint":<48} {"n":>7} {"p50":>6} {"p95":>6} {"p99":>6} {"média":>8} '
+                f'{"db":>8} {"view":>8} {"serial.":>8} {"p95 s.":>6} {"consultas":>9} {"p95 c.":>6} {"acima":>6}'
+            )
+            for linha in linhas:
+                self.stdout.write(
+                    f'{linha["endpoint"]:<48} {linha["n"]:>7} {_formatar("total_ms", linha["p50_ms"]):>6} '
+                    f'{_formatar("total_ms", linha["p95_ms"]):>6} {_formatar("total_ms", linha["p99_ms"]):>6} {linha["media_ms"]:>8} '
+                    f'{linha["media_db_ms"]:>8} {linha["media_view_ms"]:>8} {linha["media_serializacao_ms"]:>8} '
+                    f'{_formatar("serializacao_ms", linha["p95_serializacao_ms"]):>6} {linha["media_consultas"]:>9} '
+                    f'{_formatar("consultas", linha["p95_consultas"]):>6} {linha["acima_orcamento"]:>6}'
+                )
+            self.stdout.write(f'(tempos em ms; orçamento: {settings.PERFIL_ORCAMENTO_CONSULTAS} consultas)')
+
+        if options['limpar']:
+            limpar_histogramas()
+            self.stdout.write(self.style.SUCCESS('Histogramas zerados.'))
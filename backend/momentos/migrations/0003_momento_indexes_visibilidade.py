@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('momentos', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='momento',
+            index=models.Index(condition=models.Q(('is_private', False)), fields=['-created_at'], name='momento_publico_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='momento',
+            index=models.Index(condition=models.Q(('is_private', False)), fields=['-views', '-created_at'], name='momento_publico_trend_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='momento',
+            index=models.Index(fields=['usuario', '-created_at'], name='momento_usuario_recent_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:25
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def preencher_likes_count(apps, schema_editor):
+    """Inicializa o contador a partir dos likes existentes (um único UPDATE)"""
+    Momento = apps.get_model('momentos', 'Momento')
+    Like = apps.get_model('momentos', 'Like')
+    contagem = (
+        Like.objects.filter(momento=OuterRef('pk'))
+        .order_by()
+        .values('momento')
+        .annotate(total=Count('pk'))
+        .values('total')
+    )
+    Momento.objects.update(likes_count=Coalesce(Subquery(contagem), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('momentos', '0003_momento_indexes_visibilidade'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='momento',
+            name='likes_count',
+            field=models.IntegerField(default=0, verbose_name='Curtidas'),
+        ),
+        migrations.RunPython(preencher_likes_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='momento',
+            index=models.Index(condition=models.Q(('is_private', False)), fields=['-likes_count', '-views', '-created_at'], name='momento_publico_popular_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:26
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copiar_created_at(apps, schema_editor):
+    """Notificações existentes: updated_at = created_at (preserva a ordem da listagem)"""
+    Notificacao = apps.get_model('momentos', 'Notificacao')
+    Notificacao.objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('momentos', '0004_momento_likes_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='notificacao',
+            options={'ordering': ['-updated_at'], 'verbose_name': 'Notificação', 'verbose_name_plural': 'Notificações'},
+        ),
+        migrations.AddField(
+            model_name='notificacao',
+            name='marco',
+            field=models.IntegerField(blank=True, null=True, verbose_name='Marco de visualizações'),
+        ),
+        migrations.AddField(
+            model_name='notificacao',
+            name='total_atores',
+            field=models.IntegerField(default=1, verbose_name='Total de usuários (agrupados)'),
+        ),
+        migrations.AddField(
+            model_name='notificacao',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Atualizado em'),
+        ),
+        migrations.RunPython(copiar_created_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='notificacao',
+            name='mensagem',
+            field=models.TextField(blank=True, default='', max_length=500, verbose_name='Mensagem'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacao',
+            index=models.Index(fields=['usuario_destino', '-updated_at'], name='notificacao_destino_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacao',
+            index=models.Index(condition=models.Q(('lida', False)), fields=['usuario_destino', 'momento', 'tipo'], name='notificacao_agrupar_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacao',
+            index=models.Index(condition=models.Q(('lida', True)), fields=['created_at'], name='notificacao_retencao_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:36
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copiar_created_at(apps, schema_editor):
+    """Tags existentes: updated_at = created_at"""
+    Tag = apps.get_model('momentos', 'Tag')
+    Tag.objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('momentos', '0005_notificacao_agrupamento'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(copiar_created_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('momentos', '0006_tag_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='momento',
+            name='hls',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Playlist HLS'),
+        ),
+        migrations.AddField(
+            model_name='momento',
+            name='hls_status',
+            field=models.CharField(blank=True, choices=[('pendente', 'Pendente'), ('processando', 'Processando'), ('pronto', 'Pronto'), ('falhou', 'Falhou')], max_length=12, verbose_name='Status HLS'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('momentos', '0007_momento_hls'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConteudoMidia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('arquivo', models.CharField(max_length=255, unique=True, verbose_name='Arquivo')),
+                ('tamanho', models.BigIntegerField(default=0, verbose_name='Tamanho (bytes)')),
+                ('referencias', models.IntegerField(default=0, verbose_name='Referências')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+            ],
+            options={
+                'verbose_name': 'Conteúdo de mídia',
+                'verbose_name_plural': 'Conteúdos de mídia',
+                'indexes': [models.Index(condition=models.Q(('referencias__lte', 0)), fields=['created_at'], name='conteudo_sem_referencia_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('momentos', '0008_conteudo_midia'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EntradaTimeline',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(verbose_name='Publicado em')),
+                ('autor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Autor')),
+                ('momento', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entradas_timeline', to='momentos.momento', verbose_name='Momento')),
+                ('usuario', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='timeline', to=settings.AUTH_USER_MODEL, verbose_name='Dono da timeline')),
+            ],
+            options={
+                'verbose_name': 'Entrada de timeline',
+                'verbose_name_plural': 'Entradas de timeline',
+                'indexes': [models.Index(fields=['usuario', '-created_at', '-id'], name='timeline_usuario_recent_idx')],
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'momento'), name='entrada_timeline_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('momentos', '0009_entrada_timeline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MomentoRelacionado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pontuacao', models.FloatField(verbose_name='Pontuação')),
+                ('momento', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='relacionados', to='momentos.momento', verbose_name='Momento')),
+                ('relacionado', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='relacionado_em', to='momentos.momento', verbose_name='Relacionado')),
+            ],
+            options={
+                'verbose_name': 'Momento relacionado',
+                'verbose_name_plural': 'Momentos relacionados',
+                'indexes': [models.Index(fields=['momento', '-pontuacao'], name='relacionado_momento_pont_idx')],
+                'constraints': [models.UniqueConstraint(fields=('momento', 'relacionado'), name='momento_relacionado_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('momentos', '0010_momento_relacionado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='momento',
+            name='hls_lease_ate',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Lease HLS até'),
+        ),
+    ]
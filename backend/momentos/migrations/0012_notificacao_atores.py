@@ -0,0 +1,85 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def fechar_duplicadas(apps, schema_editor):
+    """Likes não lidos duplicados (INSERTs concorrentes): mantém a linha mais recente de cada momento"""
+    Notificacao = apps.get_model('momentos', 'Notificacao')
+    abertas = Notificacao.objects.filter(tipo='like', lida=False)
+    grupos = (
+        abertas.order_by().values('usuario_destino', 'momento')
+        .annotate(ultima=Max('pk'), total=models.Count('pk')).filter(total__gt=1)
+    )
+    for grupo in grupos.iterator():
+        abertas.filter(
+            usuario_destino=grupo['usuario_destino'], momento=grupo['momento'], pk__lt=grupo['ultima']
+        ).update(lida=True)
+
+
+def registrar_atores(apps, schema_editor):
+    """Linhas abertas: o único ator conhecido é o último (usuario_origem)"""
+    Notificacao = apps.get_model('momentos', 'Notificacao')
+    NotificacaoAtor = apps.get_model('momentos', 'NotificacaoAtor')
+    abertas = Notificacao.objects.filter(tipo='like', lida=False, usuario_origem__isnull=False)
+    NotificacaoAtor.objects.bulk_create(
+        (NotificacaoAtor(notificacao_id=pk, usuario_id=usuario_id)
+         for pk, usuario_id in abertas.values_list('pk', 'usuario_origem').iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('momentos', '0011_momento_hls_lease'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificacaoAtor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'verbose_name': 'Ator da notificação',
+                'verbose_name_plural': 'Atores da notificação',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='notificacao',
+            name='notificacao_agrupar_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='notificacao',
+            name='notificacao_retencao_idx',
+        ),
+        migrations.AddIndex(
+            model_name='notificacao',
+            index=models.Index(condition=models.Q(('lida', True)), fields=['updated_at'], name='notificacao_retencao_idx'),
+        ),
+        migrations.RunPython(fechar_duplicadas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notificacao',
+            constraint=models.UniqueConstraint(condition=models.Q(('lida', False), ('tipo', 'like')), fields=('usuario_destino', 'momento'), name='notificacao_like_aberta_unica'),
+        ),
+        migrations.AddField(
+            model_name='notificacaoator',
+            name='notificacao',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='atores', to='momentos.notificacao'),
+        ),
+        migrations.AddField(
+            model_name='notificacaoator',
+            name='usuario',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='notificacaoator',
+            constraint=models.UniqueConstraint(fields=('notificacao', 'usuario'), name='notificacao_ator_unico'),
+        ),
+        migrations.RunPython(registrar_atores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('momentos', '0012_notificacao_atores'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='notificacao',
+            name='notificacao_like_aberta_unica',
+        ),
+        migrations.AddField(
+            model_name='notificacao',
+            name='grupo_aberto',
+            field=models.BooleanField(default=True, verbose_name='Grupo aberto'),
+        ),
+        migrations.AddConstraint(
+            model_name='notificacao',
+            constraint=models.UniqueConstraint(condition=models.Q(('grupo_aberto', True), ('lida', False), ('tipo', 'like')), fields=('usuario_destino', 'momento'), name='notificacao_like_aberta_unica'),
+        ),
+    ]
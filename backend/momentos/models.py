@@ -1,10 +1,14 @@
-from django.db import models
+from django.db import models, connections, router
+from django.db.models import Q
 from django.conf import settings
 
+from config.modelos import ContadoresMixin
+
 class Tag(models.Model):
     nome = models.CharField(max_length=50, unique=True, verbose_name='Nome')
     slug = models.SlugField(max_length=50, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = 'Tag'
@@ -14,7 +18,87 @@ class Tag(models.Model):
     def __str__(self):
         return self.nome
 
-class Momento(models.Model):
+class MomentoQuerySet(models.QuerySet):
+    """Camada única de visibilidade (privacidade do vídeo + privacidade do perfil)"""
+
+    def visible_to(self, user):
+        """
+        Momentos que o usuário pode ver: vídeos públicos de perfis públicos
+        (e ativos: contas em exclusão somem na hora) OU qualquer momento do próprio usuário.
+        """
+        publicos = Q(is_private=False, usuario__is_private=False, usuario__is_active=True)
+        if user is not None and user.is_authenticated:
+            return self.filter(publicos | Q(usuario=user))
+        return self.filter(publicos)
+
+    def _banco_escrita(self):
+        """Conexão das escritas em SQL próprio (self.db seria a de leitura: a réplica, em GETs)"""
+        return connections[self._db or router.db_for_write(self.model)]
+
+    def _pk_subquery(self):
+        """SQL (e parâmetros) que seleciona apenas os IDs deste queryset"""
+        return self.order_by().values('pk').query.sql_with_params()
+
+    def update_returning(self, assignments, returning, params=()):
+        """
+        UPDATE condicional restrito a este queryset, com RETURNING.
+        Autoriza e grava em uma única ida ao banco. Retorna as linhas afetadas.
+        """
+        connection = self._banco_escrita()
+        qn = connection.ops.quote_name
+        subquery, sub_params = self._pk_subquery()
+        sql = 'UPDATE {table} SET {assignments} WHERE {pk} IN ({subquery}) RETURNING {returning}'.format(
+            table=qn(self.model._meta.db_table),
+            assignments=assignments,
+            pk=qn(self.model._meta.pk.column),
+            subquery=subquery,
+            returning=', '.join(qn(col) for col in returning),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, (*params, *sub_params))
+            return cursor.fetchall()
+
+    def insert_related(self, model, values, returning=('id',), ignore_conflicts=False):
+        """
+        INSERT ... SELECT de uma linha de `model` para cada momento deste queryset.
+        Se o momento não estiver no queryset (ex.: não visível), nada é inserido.
+        """
+        connection = self._banco_escrita()
+        qn = connection.ops.quote_name
+        columns, params = [], []
+        for name, value in values.items():
+            field = model._meta.get_field(name)
+            columns.append(qn(field.column))
+            params.append(field.get_db_prep_save(value, connection))
+        fk_column = model._meta.get_field('momento').column
+        subquery, sub_params = self._pk_subquery()
+        sql = (
+            'INSERT INTO {table} ({columns}, {fk}) '
+            'SELECT {placeholders}, {pk} FROM {source} WHERE {pk} IN ({subquery}) '
+            '{conflict}RETURNING {returning}'
+        ).format(
+            table=qn(model._meta.db_table),
+            columns=', '.join(columns),
+            fk=qn(fk_column),
+            placeholders=', '.join(['%s'] * len(params)),
+            pk=qn(self.model._meta.pk.column),
+            source=qn(self.model._meta.db_table),
+            subquery=subquery,
+            conflict='ON CONFLICT DO NOTHING ' if ignore_conflicts else '',
+            returning=', '.join(qn(col) for col in returning),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, (*params, *sub_params))
+            return cursor.fetchall()
+
+class Momento(ContadoresMixin, models.Model):
+    HLS_STATUS_CHOICES = (
+        ('pendente', 'Pendente'),
+        ('processando', 'Processando'),
+        ('pronto', 'Pronto'),
+        ('falhou', 'Falhou'),
+    )
+
     usuario = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -25,29 +109,131 @@ class Momento(models.Model):
     descricao = models.TextField(max_length=1000, blank=True, verbose_name='Descrição')
     video = models.FileField(upload_to='videos/%Y/%m/', verbose_name='Vídeo')
     thumbnail = models.ImageField(upload_to='thumbnails/%Y/%m/', blank=True, verbose_name='Thumbnail')
+    # Master playlist HLS no storage (momentos/hls.py); vazio enquanto não empacotado
+    hls = models.CharField(max_length=255, blank=True, verbose_name='Playlist HLS')
+    hls_status = models.CharField(max_length=12, choices=HLS_STATUS_CHOICES, blank=True, verbose_name='Status HLS')
+    # Fim do "lease" de quem está empacotando: 'processando' vencido volta para a fila
+    hls_lease_ate = models.DateTimeField(null=True, blank=True, verbose_name='Lease HLS até')
     duracao = models.IntegerField(default=0, verbose_name='Duração (segundos)')
     views = models.IntegerField(default=0, verbose_name='Visualizações')
+    # Contador desnormalizado, mantido na mesma transação do INSERT/DELETE de Like
+    # (views e likes_count ficam fora do UPDATE de save() completos: config.modelos.ContadoresMixin)
+    likes_count = models.IntegerField(default=0, verbose_name='Curtidas')
     tags = models.ManyToManyField(Tag, related_name='momentos', blank=True, verbose_name='Tags')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
     is_private = models.BooleanField(default=False, verbose_name='Vídeo Privado')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
 
+    objects = MomentoQuerySet.as_manager()
+
+    CONTADORES = ('views', 'likes_count')
+
     class Meta:
         verbose_name = 'Momento'
         verbose_name_plural = 'Momentos'
         ordering = ['-created_at']
+        indexes = [
+            # Feed público (predicados de visible_to + ordenações do feed)
+            models.Index(fields=['-created_at'], condition=Q(is_private=False), name='momento_publico_recent_idx'),
+            models.Index(fields=['-views', '-created_at'], condition=Q(is_private=False), name='momento_publico_trend_idx'),
+            models.Index(fields=['-likes_count', '-views', '-created_at'], condition=Q(is_private=False), name='momento_publico_popular_idx'),
+            # Momentos do próprio usuário / perfil
+            models.Index(fields=['usuario', '-created_at'], name='momento_usuario_recent_idx'),
+        ]
 
     def __str__(self):
         return self.titulo
 
     @property
     def total_likes(self):
-        return self.likes.count()
+        return self.likes_count
 
     def incrementar_views(self):
         self.views += 1
         self.save(update_fields=['views'])
 
+class ConteudoMidia(models.Model):
+    """
+    Arquivo de mídia endereçado por conteúdo (momentos/conteudo.py): uploads
+    iguais (mesmo SHA-256) compartilham um único arquivo no storage.
+    `referencias` conta as linhas cujos FileFields apontam para `arquivo`.
+    """
+    sha256 = models.CharField(max_length=64, unique=True, verbose_name='SHA-256')
+    arquivo = models.CharField(max_length=255, unique=True, verbose_name='Arquivo')
+    tamanho = models.BigIntegerField(default=0, verbose_name='Tamanho (bytes)')
+    referencias = models.IntegerField(default=0, verbose_name='Referências')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
+
+    class Meta:
+        verbose_name = 'Conteúdo de mídia'
+        verbose_name_plural = 'Conteúdos de mídia'
+        indexes = [
+            # Coleta dos conteúdos sem referências
+            models.Index(fields=['created_at'], condition=Q(referencias__lte=0), name='conteudo_sem_referencia_idx'),
+        ]
+
+    def __str__(self):
+        return self.arquivo
+
+class EntradaTimeline(models.Model):
+    """
+    Timeline pré-computada (momentos/timeline.py): um momento entregue na
+    timeline de um seguidor (fan-out na publicação). `autor` e `created_at`
+    são cópias do momento, para revogar e podar sem JOIN.
+    """
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='timeline',
+        db_index=False,  # coberto pelo índice (usuario, -created_at, -id)
+        verbose_name='Dono da timeline'
+    )
+    momento = models.ForeignKey(Momento, on_delete=models.CASCADE, related_name='entradas_timeline', verbose_name='Momento')
+    autor = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+', verbose_name='Autor'
+    )
+    created_at = models.DateTimeField(verbose_name='Publicado em')
+
+    class Meta:
+        verbose_name = 'Entrada de timeline'
+        verbose_name_plural = 'Entradas de timeline'
+        constraints = [
+            models.UniqueConstraint(fields=['usuario', 'momento'], name='entrada_timeline_unica'),
+        ]
+        indexes = [
+            # Leitura e poda: mais recentes de cada timeline
+            models.Index(fields=['usuario', '-created_at', '-id'], name='timeline_usuario_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.momento_id} na timeline de {self.usuario_id}'
+
+class MomentoRelacionado(models.Model):
+    """
+    Índice de momentos relacionados (momentos/relacionados.py): os
+    RELACIONADOS_K vizinhos de cada momento por coocorrência de tags,
+    pré-computados para as sugestões do player.
+    """
+    momento = models.ForeignKey(
+        Momento, on_delete=models.CASCADE, related_name='relacionados',
+        db_index=False,  # coberto pelo índice (momento, -pontuacao)
+        verbose_name='Momento'
+    )
+    relacionado = models.ForeignKey(Momento, on_delete=models.CASCADE, related_name='relacionado_em', verbose_name='Relacionado')
+    pontuacao = models.FloatField(verbose_name='Pontuação')
+
+    class Meta:
+        verbose_name = 'Momento relacionado'
+        verbose_name_plural = 'Momentos relacionados'
+        constraints = [
+            models.UniqueConstraint(fields=['momento', 'relacionado'], name='momento_relacionado_unico'),
+        ]
+        indexes = [
+            # Leitura das sugestões: os vizinhos de maior pontuação
+            models.Index(fields=['momento', '-pontuacao'], name='relacionado_momento_pont_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.relacionado_id} relacionado a {self.momento_id}'
+
 class Like(models.Model):
     usuario = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -125,14 +311,69 @@ class Notificacao(models.Model):
         verbose_name='Momento relacionado'
     )
     tipo = models.CharField(max_length=20, choices=TIPO_CHOICES, verbose_name='Tipo')
-    mensagem = models.TextField(max_length=500, verbose_name='Mensagem')
+    # Legado: notificações novas são renderizadas na leitura (ver renderizar_mensagem)
+    mensagem = models.TextField(max_length=500, blank=True, default='', verbose_name='Mensagem')
+    # Agrupamento: "X e mais N pessoas curtiram..." é uma única linha atualizada no lugar
+    total_atores = models.IntegerField(default=1, verbose_name='Total de usuários (agrupados)')
+    marco = models.IntegerField(null=True, blank=True, verbose_name='Marco de visualizações')
     lida = models.BooleanField(default=False, verbose_name='Lida')
+    # Likes: o grupo recebe novos atores até sair da janela de agrupamento; fechado, continua não lido
+    grupo_aberto = models.BooleanField(default=True, verbose_name='Grupo aberto')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
 
     class Meta:
         verbose_name = 'Notificação'
         verbose_name_plural = 'Notificações'
-        ordering = ['-created_at']
+        ordering = ['-updated_at']
+        indexes = [
+            # Listagem do usuário (mais recentes primeiro)
+            models.Index(fields=['usuario_destino', '-updated_at'], name='notificacao_destino_idx'),
+            # Retenção: lidas sem atividade há mais tempo
+            models.Index(fields=['updated_at'], condition=Q(lida=True), name='notificacao_retencao_idx'),
+        ]
+        constraints = [
+            # Um grupo de likes aberto (não lido) por momento: INSERTs concorrentes
+            # do agrupamento (vários processos) não duplicam a notificação
+            models.UniqueConstraint(
+                fields=['usuario_destino', 'momento'], condition=Q(tipo='like', lida=False, grupo_aberto=True),
+                name='notificacao_like_aberta_unica',
+            ),
+        ]
 
     def __str__(self):
-        return f'Notificação para {self.usuario_destino.username}: {self.tipo}'
\ No newline at end of file
+        return f'Notificação para {self.usuario_destino.username}: {self.tipo}'
+
+    def renderizar_mensagem(self):
+        """Monta o texto a partir dos campos estruturados (usuario_origem, momento, total_atores, marco)"""
+        titulo = self.momento.titulo if self.momento_id and self.momento else ''
+        username = self.usuario_origem.username if self.usuario_origem_id and self.usuario_origem else ''
+
+        if self.tipo == 'like' and username:
+            outros = self.total_atores - 1
+            if outros <= 0:
+                return f'{username} curtiu seu momento: "{titulo}"'
+            if outros == 1:
+                return f'{username} e mais 1 pessoa curtiram seu momento: "{titulo}"'
+            return f'{username} e mais {outros} pessoas curtiram seu momento: "{titulo}"'
+
+        if self.tipo == 'view_milestone' and self.marco:
+            return f'Seu momento "{titulo}" atingiu {self.marco} visualizações! 🚀'
+
+        if self.tipo == 'comentario' and username:
+            return f'{username} comentou em seu momento: "{titulo}"'
+
+        return self.mensagem
+
+
+class NotificacaoAtor(models.Model):
+    """Usuários distintos de uma notificação agrupada (total_atores conta estas linhas)"""
+    notificacao = models.ForeignKey(Notificacao, on_delete=models.CASCADE, related_name='atores')
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        verbose_name = 'Ator da notificação'
+        verbose_name_plural = 'Atores da notificação'
+        constraints = [
+            models.UniqueConstraint(fields=['notificacao', 'usuario'], name='notificacao_ator_unico'),
+        ]
@@ -0,0 +1,104 @@
+"""
+Criação de notificações (executada em segundo plano via momentos.tasks)
+Localização: backend/momentos/notificacoes.py
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from config.logs import registrar_evento
+
+from .models import Notificacao, NotificacaoAtor
+from .tasks import enfileirar
+
+logger = logging.getLogger(__name__)
+
+
+def _travar(aberta):
+    """(pk, created_at) da linha aberta, travada até o fim da transação; None se não há"""
+    return aberta.select_for_update().values_list('pk', 'created_at').first()
+
+
+def criar_notificacao_like(momento_id, usuario_destino_id, usuario_origem_id):
+    """
+    Cria OU agrupa a notificação de like para o dono do momento.
+    Há no máximo um grupo de likes aberto (não lido) por momento
+    (notificacao_like_aberta_unica):
+    - dentro da janela de agrupamento, ele é atualizado no lugar ("X e mais N
+      pessoas curtiram..."); total_atores conta usuários distintos
+      (NotificacaoAtor), então curtir de novo depois de descurtir não soma;
+    - fora da janela, o grupo é fechado (continua não lido, com o total que
+      tinha) e uma linha nova começa o próximo grupo.
+    Processos que agrupam o mesmo momento ao mesmo tempo não duplicam a linha:
+    o INSERT perdedor viola a restrição e segue pelo agrupamento, com a linha
+    travada (FOR UPDATE).
+    """
+    agora = timezone.now()
+    janela = timedelta(minutes=settings.NOTIFICACOES_JANELA_AGRUPAMENTO_MINUTOS)
+    aberta = Notificacao.objects.filter(
+        usuario_destino_id=usuario_destino_id, momento_id=momento_id, tipo='like', lida=False, grupo_aberto=True
+    )
+
+    with transaction.atomic():
+        linha = _travar(aberta)
+        if linha is not None and linha[1] < agora - janela:
+            # Fora da janela: fecha o grupo; os atores só servem para deduplicar o grupo aberto
+            pk = linha[0]
+            aberta.filter(pk=pk).update(grupo_aberto=False)
+            NotificacaoAtor.objects.filter(notificacao_id=pk).delete()
+            linha = None
+        if linha is None:
+            try:
+                with transaction.atomic():
+                    notificacao = Notificacao.objects.create(
+                        usuario_destino_id=usuario_destino_id,
+                        usuario_origem_id=usuario_origem_id,
+                        momento_id=momento_id,
+                        tipo='like',
+                    )
+            except IntegrityError:
+                # Outro processo abriu o grupo entre a busca e o INSERT
+                linha = _travar(aberta)
+            else:
+                NotificacaoAtor.objects.create(notificacao=notificacao, usuario_id=usuario_origem_id)
+                registrar_evento(logger, 'notificacao.like', momento=momento_id, agrupada=False)
+                return
+        if linha is None:
+            return  # lida nesse meio tempo: o próximo like abre outro grupo
+
+        pk = linha[0]
+        _, novo = NotificacaoAtor.objects.get_or_create(notificacao_id=pk, usuario_id=usuario_origem_id)
+        if novo:
+            aberta.filter(pk=pk).update(
+                total_atores=F('total_atores') + 1,
+                usuario_origem_id=usuario_origem_id,
+                updated_at=agora,
+            )
+    registrar_evento(logger, 'notificacao.like', momento=momento_id, agrupada=True, novo_ator=novo)
+
+
+def criar_notificacao_views(momento_id, usuario_destino_id, marco):
+    """Cria a notificação de marco de visualizações."""
+    Notificacao.objects.create(
+        usuario_destino_id=usuario_destino_id,
+        momento_id=momento_id,
+        tipo='view_milestone',
+        marco=marco,
+    )
+    registrar_evento(logger, 'notificacao.views', momento=momento_id, marco=marco)
+
+
+def notificar_like(momento_id, usuario_destino_id, usuario_origem_id):
+    """Enfileira a notificação de like (ignora likes do próprio dono)."""
+    if usuario_destino_id == usuario_origem_id:
+        return
+    enfileirar(criar_notificacao_like, momento_id, usuario_destino_id, usuario_origem_id)
+
+
+def notificar_views(momento_id, usuario_destino_id, marco):
+    """Enfileira a notificação de marco de visualizações."""
+    enfileirar(criar_notificacao_views, momento_id, usuario_destino_id, marco)
@@ -0,0 +1,204 @@
+"""
+Momentos relacionados (sugestões do player) por coocorrência de tags
+Localização: backend/momentos/relacionados.py
+
+Filtrar o feed por uma tag do vídeo e ordenar por popularidade varre todos
+os momentos da tag a cada abertura do player. Aqui os vizinhos de cada
+momento ficam pré-computados em MomentoRelacionado:
+- pontuação: soma dos pesos das tags em comum; tags raras pesam mais
+  (peso = 1 / log(2 + momentos com a tag)), então "vasco" aproxima mais
+  dois vídeos do que "futebol". Engajamento (likes, views) desempata;
+- candidatos: os RELACIONADOS_CANDIDATOS_POR_TAG momentos mais engajados
+  de cada tag do momento, entre os visíveis para qualquer visitante;
+- cada momento guarda os RELACIONADOS_K melhores; a leitura é um JOIN com
+  essas K linhas, filtrado por visible_to (um vizinho que ficou privado
+  some das sugestões sem recálculo);
+- incremental: ao mudar as tags de um momento (m2m_changed), a lista dele
+  é recalculada e ele entra nas listas dos vizinhos que supera (a
+  pontuação é simétrica), depois do commit, na thread de tarefas;
+- privacidade (privacidade_alterada, momentos/alteracoes.py): o momento
+  ou os momentos do perfil que ficam privados saem das listas dos
+  vizinhos; os que voltam a ser públicos entram de novo. As vagas abertas
+  nas listas dos vizinhos só são preenchidas pela reconstrução.
+O comando reconstruir_relacionados recalcula o índice inteiro (rodar
+periodicamente: renova os pesos e preenche as vagas).
+"""
+import heapq
+import logging
+import math
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Min, Q, Window
+from django.db.models.functions import RowNumber
+from django.db.models.signals import m2m_changed
+
+from config.logs import registrar_evento
+
+from .alteracoes import privacidade_alterada
+from .feed import valores_feed
+from .models import Momento, MomentoRelacionado
+from .tasks import enfileirar
+
+logger = logging.getLogger(__name__)
+
+Usuario = get_user_model()
+TagMomento = Momento.tags.through
+
+
+def sugestoes(usuario, momento_id, limite):
+    """Vizinhos do momento visíveis para o usuário, em formato de feed (valores_feed)"""
+    return valores_feed(
+        Momento.objects.visible_to(usuario)
+        .filter(relacionado_em__momento_id=momento_id)
+        .order_by('-relacionado_em__pontuacao', '-likes_count', '-views', '-id')
+    )[:limite]
+
+
+def sugeriveis():
+    """Momentos que podem ser sugeridos: os visíveis para qualquer visitante"""
+    return Momento.objects.visible_to(None)
+
+
+def peso(frequencia):
+    """Peso de uma tag presente em `frequencia` momentos"""
+    return 1 / math.log(2 + frequencia)
+
+
+def pontuar(momento_id, candidatos, pesos):
+    """
+    candidatos: {id: (tags em comum, likes_count, views)}.
+    Retorna [(pontuacao, likes_count, views, id)] de cada candidato com tag em comum.
+    """
+    return [
+        (sum(pesos[tag] for tag in comuns), likes, views, candidato)
+        for candidato, (comuns, likes, views) in candidatos.items()
+        if comuns and candidato != momento_id
+    ]
+
+
+def melhores(pontuados):
+    return heapq.nlargest(settings.RELACIONADOS_K, pontuados)
+
+
+def _candidatos(tags):
+    """Os momentos mais engajados de cada tag, com as tags que têm em comum com `tags`"""
+    limite = settings.RELACIONADOS_CANDIDATOS_POR_TAG
+    engajamento = {}
+    for tag_id in tags:
+        engajamento.update(
+            (pk, (likes, views)) for pk, likes, views in
+            sugeriveis().filter(tags=tag_id).order_by('-likes_count', '-views', '-id')
+            .values_list('pk', 'likes_count', 'views')[:limite]
+        )
+    comuns = defaultdict(set)
+    for momento_id, tag_id in TagMomento.objects.filter(
+        momento_id__in=engajamento, tag_id__in=tags
+    ).values_list('momento_id', 'tag_id'):
+        comuns[momento_id].add(tag_id)
+    return {pk: (comuns[pk], likes, views) for pk, (likes, views) in engajamento.items()}
+
+
+def _pesos(tags):
+    frequencias = (
+        TagMomento.objects.filter(tag_id__in=tags).order_by()
+        .values('tag_id').annotate(total=Count('id')).values_list('tag_id', 'total')
+    )
+    return {tag_id: peso(total) for tag_id, total in frequencias}
+
+
+def _podar(momento_ids):
+    """Mantém só os RELACIONADOS_K melhores vizinhos de cada momento"""
+    if not momento_ids:
+        return 0
+    excedentes = list(
+        MomentoRelacionado.objects.filter(momento_id__in=momento_ids)
+        .annotate(posicao=Window(
+            RowNumber(), partition_by=F('momento_id'),
+            order_by=[F('pontuacao').desc(), F('relacionado__likes_count').desc(),
+                      F('relacionado__views').desc(), F('relacionado_id').desc()],
+        ))
+        .filter(posicao__gt=settings.RELACIONADOS_K)
+        .values_list('pk', flat=True)
+    )
+    if not excedentes:
+        return 0
+    return MomentoRelacionado.objects.filter(pk__in=excedentes).delete()[0]
+
+
+def _entrar_nas_listas(momento_id, pontuados):
+    """Insere o momento nas listas dos vizinhos que ainda têm vaga ou cujo pior item ele supera"""
+    pontuacoes = {candidato: pontuacao for pontuacao, _, _, candidato in pontuados}
+    listas = {
+        linha['momento_id']: (linha['total'], linha['pior'])
+        for linha in MomentoRelacionado.objects.filter(momento_id__in=pontuacoes).order_by()
+        .values('momento_id').annotate(total=Count('pk'), pior=Min('pontuacao'))
+    }
+    k = settings.RELACIONADOS_K
+    entra = [
+        candidato for candidato, pontuacao in pontuacoes.items()
+        if listas.get(candidato, (0, None))[0] < k or pontuacao >= listas[candidato][1]
+    ]
+    MomentoRelacionado.objects.bulk_create(
+        [MomentoRelacionado(momento_id=c, relacionado_id=momento_id, pontuacao=pontuacoes[c]) for c in entra],
+        ignore_conflicts=True,
+    )
+    _podar([c for c in entra if listas.get(c, (0, None))[0] >= k])
+    return len(entra)
+
+
+def atualizar(momento_id):
+    """Tarefa: recalcula os vizinhos do momento e o coloca nas listas dos vizinhos"""
+    if not Momento.objects.filter(pk=momento_id).exists():
+        return
+    tags = set(TagMomento.objects.filter(momento_id=momento_id).values_list('tag_id', flat=True))
+    pontuados = pontuar(momento_id, _candidatos(tags), _pesos(tags)) if tags else []
+    with transaction.atomic():
+        MomentoRelacionado.objects.filter(Q(momento_id=momento_id) | Q(relacionado_id=momento_id)).delete()
+        MomentoRelacionado.objects.bulk_create([
+            MomentoRelacionado(momento_id=momento_id, relacionado_id=candidato, pontuacao=pontuacao)
+            for pontuacao, _, _, candidato in melhores(pontuados)
+        ])
+        vizinhos = _entrar_nas_listas(momento_id, pontuados) if sugeriveis().filter(pk=momento_id).exists() else 0
+    registrar_evento(logger, 'relacionados.atualizados', logging.DEBUG,
+                     momento=momento_id, candidatos=len(pontuados), listas_vizinhas=vizinhos)
+
+
+def atualizar_autor(autor_id):
+    """Tarefa: perfil que mudou de privacidade: tira ou recoloca os momentos dele nas listas dos vizinhos"""
+    if not Usuario.objects.filter(pk=autor_id, is_private=False, is_active=True).exists():
+        removidas = MomentoRelacionado.objects.filter(relacionado__usuario_id=autor_id).delete()[0]
+        registrar_evento(logger, 'relacionados.autor_retirado', logging.DEBUG, autor=autor_id, relacoes=removidas)
+        return
+    com_tags = sugeriveis().filter(usuario_id=autor_id, tags__isnull=False).distinct()
+    for momento_id in com_tags.values_list('pk', flat=True):
+        atualizar(momento_id)
+
+
+def _ao_mudar_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # tag.momentos.add(...): um recálculo por momento
+        for momento_id in pk_set or ():
+            enfileirar(atualizar, momento_id)
+        return
+    # tags.clear() seguido de um add() por tag (serializers): um recálculo só, depois do commit
+    if getattr(instance, '_relacionados_agendado', False):
+        return
+    instance._relacionados_agendado = True
+    transaction.on_commit(lambda: instance.__dict__.pop('_relacionados_agendado', None))
+    enfileirar(atualizar, instance.pk)
+
+
+def _ao_mudar_privacidade(sender, instance, **kwargs):
+    """Momento ou perfil que muda de privacidade: sai das listas dos vizinhos ou volta a elas"""
+    # atualizar() tira das listas o momento que deixou de ser sugerível e recoloca o que voltou a ser
+    enfileirar(atualizar if sender is Momento else atualizar_autor, instance.pk)
+
+
+def conectar():
+    m2m_changed.connect(_ao_mudar_tags, sender=TagMomento, dispatch_uid='relacionados_tags')
+    privacidade_alterada.connect(_ao_mudar_privacidade, dispatch_uid='relacionados_privacidade')
@@ -1,7 +1,22 @@
 import json
+from django.urls import reverse
 from rest_framework import serializers
+from .hls import versao_do_pacote
 from .models import Momento, Tag, Like, Comentario, Notificacao
-from usuarios.serializers import UsuarioSerializer
+from usuarios.serializers import UsuarioSerializer, UsuarioResumoSerializer
+
+def url_hls(momento_id, hls, request):
+    """URL da master playlist servida por MomentoHLSView (mesma regra de visibilidade do vídeo)"""
+    if not hls:
+        return None
+    url = reverse('momentos:momento-hls', kwargs={
+        'pk': momento_id, 'versao': versao_do_pacote(hls), 'arquivo': 'master.m3u8',
+    })
+    return request.build_absolute_uri(url) if request else url
+
+# Quantidade de comentários embutidos no detalhe do momento.
+# O restante é paginado em /api/momentos/{id}/comentarios/
+COMENTARIOS_PREVIEW_LIMIT = 10
 
 class TagSerializer(serializers.ModelSerializer):
     """Serializer para Tags"""
@@ -12,7 +27,7 @@ class TagSerializer(serializers.ModelSerializer):
 
 class ComentarioSerializer(serializers.ModelSerializer):
     """Serializer para Comentários"""
-    usuario = UsuarioSerializer(read_only=True)
+    usuario = UsuarioResumoSerializer(read_only=True)
 
     class Meta:
         model = Comentario
@@ -25,6 +40,7 @@ class MomentoListSerializer(serializers.ModelSerializer):
     total_likes = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
     video = serializers.SerializerMethodField()
+    hls = serializers.SerializerMethodField()
     thumbnail = serializers.SerializerMethodField()
     is_private = serializers.BooleanField(read_only=True)  # NOVO
 
@@ -35,6 +51,7 @@ class MomentoListSerializer(serializers.ModelSerializer):
             'titulo',
             'descricao',
             'video',
+            'hls',
             'thumbnail',
             'duracao',
             'views',
@@ -48,11 +65,8 @@ class MomentoListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'views', 'created_at']
 
     def get_total_likes(self, obj):
-        # Se a view anotou 'likes_count', usa esse valor
-        if hasattr(obj, 'likes_count'):
-            return obj.likes_count
-        # Caso contrário, conta diretamente
-        return obj.likes.count()
+        # Contador desnormalizado (sem COUNT por item)
+        return obj.likes_count
 
     def get_is_liked(self, obj):
         """Verifica se o usuário atual curtiu este momento"""
@@ -68,6 +82,10 @@ class MomentoListSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.video.url) if request else obj.video.url
         return None
 
+    def get_hls(self, obj):
+        """URL da master playlist HLS (None enquanto o vídeo não foi empacotado)"""
+        return url_hls(obj.pk, obj.hls, self.context.get('request'))
+
     def get_thumbnail(self, obj):
         """Retorna URL completa do thumbnail"""
         request = self.context.get('request')
@@ -81,8 +99,10 @@ class MomentoDetailSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
     total_likes = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
-    comentarios = ComentarioSerializer(many=True, read_only=True)
+    comentarios = serializers.SerializerMethodField()
+    total_comentarios = serializers.SerializerMethodField()
     video = serializers.SerializerMethodField()
+    hls = serializers.SerializerMethodField()
     thumbnail = serializers.SerializerMethodField()
     is_private = serializers.BooleanField(read_only=True)
 
@@ -93,6 +113,7 @@ class MomentoDetailSerializer(serializers.ModelSerializer):
             'titulo',
             'descricao',
             'video',
+            'hls',
             'thumbnail',
             'duracao',
             'views',
@@ -101,6 +122,7 @@ class MomentoDetailSerializer(serializers.ModelSerializer):
             'tags',
             'usuario',
             'comentarios',
+            'total_comentarios',
             'created_at',
             'updated_at',
             'is_private'
@@ -108,10 +130,8 @@ class MomentoDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'usuario', 'views', 'created_at', 'updated_at']
 
     def get_total_likes(self, obj):
-        """Pega do campo anotado OU da property"""
-        if hasattr(obj, 'likes_count'):
-            return obj.likes_count
-        return obj.likes.count()
+        """Contador desnormalizado (sem COUNT)"""
+        return obj.likes_count
 
     def get_is_liked(self, obj):
         request = self.context.get('request')
@@ -119,6 +139,22 @@ class MomentoDetailSerializer(serializers.ModelSerializer):
             return Like.objects.filter(usuario=request.user, momento=obj).exists()
         return False
 
+    def get_comentarios(self, obj):
+        """Retorna apenas os primeiros comentários (prefetch da view OU consulta limitada)"""
+        if hasattr(obj, 'comentarios_preview'):
+            comentarios = obj.comentarios_preview
+        else:
+            comentarios = obj.comentarios.select_related('usuario').order_by(
+                'created_at', 'id'
+            )[:COMENTARIOS_PREVIEW_LIMIT]
+        return ComentarioSerializer(comentarios, many=True, context=self.context).data
+
+    def get_total_comentarios(self, obj):
+        """Pega do campo anotado OU conta diretamente"""
+        if hasattr(obj, 'comentarios_count'):
+            return obj.comentarios_count
+        return obj.comentarios.count()
+
     def get_video(self, obj):
         """Retorna URL completa do vídeo"""
         request = self.context.get('request')
@@ -126,6 +162,10 @@ class MomentoDetailSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.video.url) if request else obj.video.url
         return None
 
+    def get_hls(self, obj):
+        """URL da master playlist HLS (None enquanto o vídeo não foi empacotado)"""
+        return url_hls(obj.pk, obj.hls, self.context.get('request'))
+
     def get_thumbnail(self, obj):
         """Retorna URL completa do thumbnail"""
         request = self.context.get('request')
@@ -190,7 +230,9 @@ class MomentoUpdateSerializer(serializers.ModelSerializer):
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        # Só os campos editados: contadores e o estado do HLS mudam por UPDATEs próprios
+        # enquanto a requisição roda, e um UPDATE completo regravaria os valores lidos
+        instance.save(update_fields=[*validated_data, 'updated_at'])
 
         if tags_data is not None:
             instance.tags.clear()
@@ -207,9 +249,11 @@ class MomentoUpdateSerializer(serializers.ModelSerializer):
 
 class NotificacaoSerializer(serializers.ModelSerializer):
     """Serializer para Notificações"""
-    usuario_origem = UsuarioSerializer(read_only=True)
+    usuario_origem = UsuarioResumoSerializer(read_only=True)
     # Envia apenas o ID do momento para facilitar navegação no frontend
-    momento_id = serializers.ReadOnlyField(source='momento.id')
+    momento_id = serializers.ReadOnlyField()
+    # Renderizada a partir dos campos estruturados
+    mensagem = serializers.CharField(source='renderizar_mensagem', read_only=True)
 
     class Meta:
         model = Notificacao
@@ -219,7 +263,9 @@ class NotificacaoSerializer(serializers.ModelSerializer):
             'momento_id',
             'tipo',
             'mensagem',
+            'total_atores',
             'lida',
-            'created_at'
+            'created_at',
+            'updated_at'
         ]
         read_only_fields = fields
\ No newline at end of file
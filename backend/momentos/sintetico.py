@@ -0,0 +1,244 @@
+"""
+Gerador de dados sintéticos em escala
+Localização: backend/momentos/sintetico.py
+
+Usado pelo comando gerar_dados (banco local em escala de produção) e por
+testes/benchmarks que precisam de volumes controlados. Distribuições:
+- autores e tags com cauda longa (poucos usuários postam muito, poucas tags dominam);
+- likes, comentários e views por momento em lei de potência (Pareto);
+- notificações como o app as deixaria: uma linha de like agrupada por momento
+  (total_atores), com um NotificacaoAtor por curtidor enquanto não lida, e o
+  marco de 15 views.
+likes_count é gravado já coerente com as linhas de Like.
+
+A gravação é em lotes: COPY (CSV) no Postgres (psycopg2 ou psycopg 3),
+bulk_create nos demais bancos.
+Os IDs são atribuídos aqui (continuando do maior existente) e as sequências
+são ajustadas no final.
+"""
+import csv
+import io
+import itertools
+import random
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import Comentario, Like, Momento, Notificacao, NotificacaoAtor, Tag
+
+TAGS_BASE = ['futebol', 'basquete', 'vôlei', 'golaço', 'defesa', 'drible', 'assistência', 'falta',
+             'pênalti', 'enterrada', 'bloqueio', 'ace', 'contra-ataque', 'bicicleta', 'cesta de três']
+FRASES = ['Que lance!', 'Golaço demais', 'Assisti umas dez vezes', 'Isso foi sorte 😅',
+          'Melhor jogada do campeonato', 'Defesa incrível', 'Quem filmou? Ficou ótimo', '🔥🔥🔥']
+NULO = r'\N'
+
+
+def lei_de_potencia(rnd, media, maximo, alfa=1.5):
+    """Inteiro >= 0 com cauda longa (Pareto) e média aproximada `media`"""
+    # (X - 1) com X ~ Pareto(alfa, xm=1) tem média 1 / (alfa - 1)
+    return min(maximo, int((rnd.paretovariate(alfa) - 1) * media * (alfa - 1)))
+
+
+class Gravador:
+    """
+    Acumula instâncias (não salvas, com pk) por modelo e grava em lotes.
+    Os modelos são gravados na ordem em que apareceram: adicione o pai antes
+    dos filhos para as FKs serem satisfeitas a cada lote.
+    """
+
+    def __init__(self, lote):
+        self.lote = lote
+        self.usar_copy = connection.vendor == 'postgresql'
+        self.pendentes = {}
+        self.totais = defaultdict(int)
+
+    def adicionar(self, objeto):
+        objetos = self.pendentes.setdefault(type(objeto), [])
+        objetos.append(objeto)
+        if len(objetos) >= self.lote:
+            self.descarregar()
+
+    def descarregar(self):
+        for model, objetos in self.pendentes.items():
+            if not objetos:
+                continue
+            if self.usar_copy:
+                self._copiar(model, objetos)
+            else:
+                model.objects.bulk_create(objetos)
+            self.totais[model] += len(objetos)
+            objetos.clear()
+
+    def _copiar(self, model, objetos):
+        campos = model._meta.concrete_fields
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        for objeto in objetos:
+            linha = []
+            for campo in campos:
+                valor = campo.get_db_prep_save(getattr(objeto, campo.attname), connection)
+                linha.append(NULO if valor is None else valor)
+            escritor.writerow(linha)
+        buffer.seek(0)
+
+        qn = connection.ops.quote_name
+        colunas = ', '.join(qn(campo.column) for campo in campos)
+        sql = f"COPY {qn(model._meta.db_table)} ({colunas}) FROM STDIN WITH (FORMAT csv, NULL '{NULO}')"
+        with connection.cursor() as cursor:
+            if connection.Database.__name__ == 'psycopg':
+                # psycopg 3: copy() no lugar do copy_expert() do psycopg2
+                with cursor.copy(sql) as copia:
+                    copia.write(buffer.getvalue())
+            else:
+                cursor.copy_expert(sql, buffer)
+
+    def finalizar(self):
+        self.descarregar()
+        modelos = list(self.pendentes)
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), modelos):
+                cursor.execute(sql)
+            if self.usar_copy:
+                # Estatísticas atualizadas: o planner escolhe os índices como em produção
+                for model in modelos:
+                    cursor.execute(f'ANALYZE {connection.ops.quote_name(model._meta.db_table)}')
+
+
+def _proximo_id(model):
+    return (model.objects.aggregate(maior=Max('pk'))['maior'] or 0) + 1
+
+
+def gerar(usuarios=1000, fracao_privados=0.1, momentos=10000, fracao_momentos_privados=0.1,
+          tags=50, max_tags_por_momento=3, media_likes=20, media_comentarios=3, media_views=300,
+          dias=365, prefixo='sint', senha='sintetico123', lote=50000, seed=42, progresso=None):
+    """
+    Gera o conjunto e retorna {nome do modelo: linhas inseridas}.
+    Os usuários são '{prefixo}_{i}' (todos com a mesma `senha`); o prefixo
+    não pode estar em uso. `progresso(texto)` é chamado a cada etapa.
+    Não é atômico: uma interrupção deixa os lotes já gravados.
+    """
+    Usuario = get_user_model()
+    TagMomento = Momento.tags.through
+    rnd = random.Random(seed)
+    gravador = Gravador(lote)
+    agora = timezone.now()
+    inicio_periodo = agora - timedelta(days=dias)
+    progresso = progresso or (lambda texto: None)
+
+    def momento_apos(instante):
+        return instante + (agora - instante) * rnd.random()
+
+    # Usuários (entraram antes do período dos momentos)
+    hash_senha = make_password(senha)
+    id_usuario = _proximo_id(Usuario)
+    ids_usuarios = list(range(id_usuario, id_usuario + usuarios))
+    for i, pk in enumerate(ids_usuarios):
+        entrada = inicio_periodo - timedelta(days=rnd.random() * 30)
+        gravador.adicionar(Usuario(
+            pk=pk, username=f'{prefixo}_{i}', email=f'{prefixo}_{i}@example.com', password=hash_senha,
+            first_name=f'Atleta {i}', bio='Jogador amador' if rnd.random() < 0.5 else '',
+            is_private=rnd.random() < fracao_privados,
+            date_joined=entrada, created_at=entrada, updated_at=entrada,
+        ))
+    progresso(f'{usuarios} usuários')
+
+    # Tags
+    id_tag = _proximo_id(Tag)
+    ids_tags = list(range(id_tag, id_tag + tags))
+    for i, pk in enumerate(ids_tags):
+        nome = f'{TAGS_BASE[i % len(TAGS_BASE)]} {prefixo}{i // len(TAGS_BASE)}'
+        gravador.adicionar(Tag(pk=pk, nome=nome, slug=slugify(nome), created_at=inicio_periodo,
+                               updated_at=inicio_periodo))
+    gravador.descarregar()
+    progresso(f'{tags} tags')
+
+    # Cauda longa: pesos acumulados para rnd.choices (Pareto por autor, Zipf por tag)
+    pesos_autores = list(itertools.accumulate(rnd.paretovariate(1.2) for _ in ids_usuarios))
+    pesos_tags = list(itertools.accumulate(1 / (i + 1) for i in range(tags)))
+    autores = rnd.choices(range(usuarios), cum_weights=pesos_autores, k=momentos)
+
+    ids = {
+        model: _proximo_id(model)
+        for model in (Momento, TagMomento, Like, Comentario, Notificacao, NotificacaoAtor)
+    }
+
+    def novo_id(model):
+        pk = ids[model]
+        ids[model] += 1
+        return pk
+
+    inicio = time.monotonic()
+    for i, indice_autor in enumerate(autores):
+        autor = ids_usuarios[indice_autor]
+        criado = momento_apos(inicio_periodo)
+
+        # Curtidores distintos, nunca o próprio autor
+        total_likes = lei_de_potencia(rnd, media_likes, usuarios - 1)
+        curtidores = [j + (j >= indice_autor) for j in rnd.sample(range(usuarios - 1), total_likes)]
+        views = total_likes + lei_de_potencia(rnd, media_views, 10 ** 7)
+
+        momento_id = novo_id(Momento)
+        gravador.adicionar(Momento(
+            pk=momento_id, usuario_id=autor,
+            titulo=f'Lance #{i} — {TAGS_BASE[i % len(TAGS_BASE)]}',
+            descricao='Descrição com acentuação e emoji ⚽' if rnd.random() < 0.6 else '',
+            video=f'videos/sintetico/{i}.mp4',
+            thumbnail=f'thumbnails/sintetico/{i}.jpg' if rnd.random() < 0.8 else '',
+            duracao=rnd.randint(5, 60), views=views, likes_count=total_likes,
+            is_private=rnd.random() < fracao_momentos_privados,
+            created_at=criado, updated_at=criado,
+        ))
+
+        escolhidas = set()
+        for _ in range(rnd.randint(0, max_tags_por_momento)):
+            escolhidas.add(ids_tags[rnd.choices(range(tags), cum_weights=pesos_tags)[0]])
+        for tag_id in escolhidas:
+            gravador.adicionar(TagMomento(pk=novo_id(TagMomento), momento_id=momento_id, tag_id=tag_id))
+
+        instantes = sorted(momento_apos(criado) for _ in curtidores)
+        for indice, instante in zip(curtidores, instantes):
+            gravador.adicionar(Like(pk=novo_id(Like), usuario_id=ids_usuarios[indice],
+                                    momento_id=momento_id, created_at=instante))
+
+        for _ in range(lei_de_potencia(rnd, media_comentarios, 10 ** 4)):
+            instante = momento_apos(criado)
+            gravador.adicionar(Comentario(
+                pk=novo_id(Comentario), usuario_id=rnd.choice(ids_usuarios), momento_id=momento_id,
+                texto=rnd.choice(FRASES), created_at=instante, updated_at=instante,
+            ))
+
+        if curtidores:
+            notificacao_id = novo_id(Notificacao)
+            lida = rnd.random() < 0.7
+            gravador.adicionar(Notificacao(
+                pk=notificacao_id, usuario_destino_id=autor,
+                usuario_origem_id=ids_usuarios[curtidores[-1]], momento_id=momento_id, tipo='like',
+                total_atores=total_likes, lida=lida,
+                created_at=instantes[0], updated_at=instantes[-1],
+            ))
+            if not lida:
+                # Grupo aberto: os atores deduplicam o próximo like (momentos.notificacoes)
+                for indice in curtidores:
+                    gravador.adicionar(NotificacaoAtor(pk=novo_id(NotificacaoAtor), notificacao_id=notificacao_id,
+                                                       usuario_id=ids_usuarios[indice]))
+        if views >= 15:
+            instante = momento_apos(criado)
+            gravador.adicionar(Notificacao(
+                pk=novo_id(Notificacao), usuario_destino_id=autor, momento_id=momento_id,
+                tipo='view_milestone', marco=15, lida=rnd.random() < 0.7,
+                created_at=instante, updated_at=instante,
+            ))
+
+        if (i + 1) % 10000 == 0:
+            progresso(f'{i + 1} momentos ({(i + 1) / (time.monotonic() - inicio):.0f}/s)')
+
+    gravador.finalizar()
+    return {model._meta.label: total for model, total in gravador.totais.items()}
@@ -0,0 +1,70 @@
+"""
+Fila simples de tarefas em segundo plano (em processo)
+Localização: backend/momentos/tasks.py
+
+As tarefas são enfileiradas somente após o commit da transação atual e
+executadas por uma thread de trabalho, fora do caminho da requisição.
+Com TASKS_ALWAYS_EAGER=True (testes) executam de forma síncrona no commit.
+"""
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from config.replicas import primario
+
+logger = logging.getLogger(__name__)
+
+_fila = queue.Queue()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _executar(func, args, kwargs):
+    try:
+        # Com TASKS_ALWAYS_EAGER a tarefa roda no contexto da requisição: lê do primário
+        with primario():
+            func(*args, **kwargs)
+    except Exception:
+        logger.exception('Erro ao executar tarefa %s', getattr(func, '__name__', func))
+
+
+def _loop():
+    while True:
+        func, args, kwargs = _fila.get()
+        try:
+            _executar(func, args, kwargs)
+        finally:
+            # A thread reaproveita conexões; descarta as expiradas/quebradas
+            close_old_connections()
+            _fila.task_done()
+
+
+def _garantir_worker():
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        return
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_loop, name='momentos-tasks', daemon=True)
+            _worker.start()
+
+
+def enfileirar(func, *args, **kwargs):
+    """Agenda func(*args, **kwargs) para depois do commit da transação atual."""
+    if getattr(settings, 'TASKS_ALWAYS_EAGER', False):
+        transaction.on_commit(lambda: _executar(func, args, kwargs))
+        return
+
+    def _submeter():
+        _garantir_worker()
+        _fila.put((func, args, kwargs))
+
+    transaction.on_commit(_submeter)
+
+
+def aguardar_fila():
+    """Bloqueia até a fila esvaziar (útil em comandos de gerenciamento e testes)."""
+    _fila.join()
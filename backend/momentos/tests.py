@@ -1,3 +1,1361 @@
-from django.test import TestCase
+import datetime
+import json
+import time
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, IntegrityError, connection, connections, transaction
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from config import perfil, replicas
+from config.middleware import ReplicasMiddleware
+from config.throttling import JanelaDeslizanteThrottle
+
+from . import conteudo, hls, notificacoes
+from .condicional import versao_momento
+from .feed import serializar_feed, valores_feed
+from .models import (
+    Comentario, ConteudoMidia, EntradaTimeline, Like, Momento, MomentoRelacionado, Notificacao, NotificacaoAtor, Tag,
+)
+from .serializers import (
+    COMENTARIOS_PREVIEW_LIMIT, MomentoDetailSerializer, MomentoListSerializer, MomentoUpdateSerializer,
+)
+from .sintetico import Gravador, gerar
+
+Usuario = get_user_model()
+
+
+class FeedParidadeTests(TestCase):
+    """O caminho rápido (momentos/feed.py) deve gerar os mesmos bytes do MomentoListSerializer"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana = Usuario.objects.create_user(
+            username='ana', email='ana@example.com', password='x', first_name='Ána',
+            avatar='avatars/ana.png', bio='Linha 1\nLinha 2   "aspas"',
+            data_nascimento=datetime.date(1990, 5, 17),
+        )
+        cls.beto = Usuario.objects.create_user(username='beto', email='beto@example.com', password='x')
+        cls.caio = Usuario.objects.create_user(
+            username='caio', email='caio@example.com', password='x', is_private=True
+        )
+
+        futebol = Tag.objects.create(nome='futebol', slug='futebol')
+        gol = Tag.objects.create(nome='Gol', slug='gol')
+        ao_vivo = Tag.objects.create(nome='ao vivo', slug='ao-vivo')
+
+        def momento(usuario, titulo, **kwargs):
+            return Momento.objects.create(
+                usuario=usuario, titulo=titulo, video=f'videos/2025/01/{titulo}.mp4', **kwargs
+            )
+
+        m1 = momento(cls.ana, 'golaço', descricao='Descrição com acentuação', duracao=30,
+                     views=120, likes_count=2, thumbnail='thumbnails/2025/01/golaco.jpg',
+                     hls='hls/1/master.m3u8', hls_status='pronto')
+        m1.tags.set([futebol, gol, ao_vivo])
+        m2 = momento(cls.ana, 'privado', is_private=True, likes_count=5)
+        m2.tags.set([gol])
+        m3 = momento(cls.beto, 'defesa', views=7, likes_count=1)
+        momento(cls.caio, 'perfil-privado', likes_count=3)
+        momento(cls.beto, 'sem tags')
+
+        Like.objects.create(usuario=cls.beto, momento=m1)
+        Like.objects.create(usuario=cls.ana, momento=m3)
+
+    def comparar(self, user):
+        request = RequestFactory().get('/api/momentos/')
+        request.user = user
+        queryset = Momento.objects.visible_to(user).select_related('usuario').prefetch_related('tags')
+
+        for ordenacao in (('-created_at',), ('-views', '-created_at'), ('-likes_count', '-views', '-created_at')):
+            with self.subTest(user=str(user), ordenacao=ordenacao):
+                momentos = queryset.order_by(*ordenacao)
+                esperado = MomentoListSerializer(momentos, many=True, context={'request': request}).data
+                obtido = serializar_feed(valores_feed(momentos), request)
+                self.assertEqual(JSONRenderer().render(obtido), JSONRenderer().render(esperado))
+
+    def test_paridade_anonimo(self):
+        self.comparar(AnonymousUser())
+
+    def test_paridade_autenticado(self):
+        self.comparar(self.ana)
+        self.comparar(self.beto)
+        self.comparar(self.caio)
+
+    def test_pagina_vazia(self):
+        request = RequestFactory().get('/api/momentos/')
+        request.user = AnonymousUser()
+        self.assertEqual(serializar_feed(valores_feed(Momento.objects.none()), request), [])
+
+    def test_consultas_fixas_por_pagina(self):
+        request = RequestFactory().get('/api/momentos/')
+        request.user = self.ana
+        linhas = list(valores_feed(Momento.objects.visible_to(self.ana).order_by('-created_at')))
+        # tags + totais dos autores + likes do usuário, independente do tamanho da página
+        with self.assertNumQueries(3):
+            serializar_feed(linhas, request)
+
+
+class AsyncParidadeTests(TestCase):
+    """As views assíncronas (ASYNC_VIEWS) devem responder os mesmos bytes e cabeçalhos das views DRF"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana = Usuario.objects.create_user(username='ana', email='ana@example.com', password='x', bio='Olá "mundo"')
+        cls.beto = Usuario.objects.create_user(username='beto', email='beto@example.com', password='x')
+        gol = Tag.objects.create(nome='Gol', slug='gol')
+        cls.momento = Momento.objects.create(usuario=cls.ana, titulo='golaço', video='videos/golaco.mp4',
+                                             views=10, likes_count=1)
+        cls.momento.tags.set([gol])
+        Momento.objects.create(usuario=cls.ana, titulo='privado', video='videos/privado.mp4', is_private=True)
+        Momento.objects.create(usuario=cls.beto, titulo='defesa', video='videos/defesa.mp4')
+        Like.objects.create(usuario=cls.beto, momento=cls.momento)
+        Comentario.objects.create(usuario=cls.beto, momento=cls.momento, texto='Que lance!')
+        notificacoes.criar_notificacao_like(cls.momento.pk, cls.ana.pk, cls.beto.pk)
+
+    def setUp(self):
+        cache.clear()
+        # Consultas na thread do teste (a transação do TestCase não é visível para outras conexões)
+        for modulo in ('momentos.async_views', 'usuarios.async_views'):
+            patcher = mock.patch(f'{modulo}.em_paralelo', sync_to_async)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def responder(self, url, usuario, extra=None):
+        """(síncrona, assíncrona) para o mesmo GET"""
+        from usuarios.async_views import PublicProfileAsyncView
+        from usuarios.views import PublicProfileView
+
+        from .async_views import MomentoDetailAsyncView, MomentoListCreateAsyncView, NotificacaoListAsyncView
+        from .views import MomentoDetailView, MomentoListCreateView, NotificacaoListView
+
+        kwargs, extra = {}, extra or {}
+        caminho = url.split('?')[0]
+        if caminho.startswith('/api/auth/profile/'):
+            sincrona, assincrona = PublicProfileView, PublicProfileAsyncView
+            kwargs = {'username': caminho.rstrip('/').rsplit('/', 1)[1]}
+        elif caminho.endswith('/notificacoes/'):
+            sincrona, assincrona = NotificacaoListView, NotificacaoListAsyncView
+        elif caminho == '/api/momentos/':
+            sincrona, assincrona = MomentoListCreateView, MomentoListCreateAsyncView
+        else:
+            sincrona, assincrona = MomentoDetailView, MomentoDetailAsyncView
+            kwargs = {'pk': int(caminho.rstrip('/').rsplit('/', 1)[1])}
+
+        request = RequestFactory().get(url, **extra)
+        request.user = usuario
+        resposta_sincrona = sincrona.as_view()(request, **kwargs).render()
+
+        async def auser():
+            return usuario
+
+        request = RequestFactory().get(url, **extra)
+        request.auser = auser
+        return resposta_sincrona, async_to_sync(assincrona.as_view())(request, **kwargs)
+
+    def assertMesmaResposta(self, url, usuario, **extra):
+        sincrona, assincrona = self.responder(url, usuario, extra=extra)
+        with self.subTest(url=url, usuario=str(usuario)):
+            self.assertEqual(assincrona.status_code, sincrona.status_code)
+            self.assertEqual(assincrona.content, sincrona.content)
+            for cabecalho in ('Content-Type', 'ETag', 'Cache-Control', 'Allow', 'Retry-After'):
+                self.assertEqual(assincrona.get(cabecalho), sincrona.get(cabecalho), cabecalho)
+            self.assertEqual(
+                sorted(assincrona.get('Vary', '').split(', ')), sorted(sincrona.get('Vary', '').split(', '))
+            )
+        return sincrona
+
+    def test_paridade_byte_a_byte(self):
+        urls = [
+            '/api/momentos/', '/api/momentos/?ordering=-views&page_size=1&page=2', '/api/momentos/?tags=gol',
+            f'/api/momentos/{self.momento.pk}/', f'/api/momentos/{self.momento.pk + 1}/', '/api/momentos/999/',
+            '/api/auth/profile/ana/', '/api/auth/profile/ana/?page_size=1', '/api/auth/profile/ninguem/',
+            '/api/momentos/notificacoes/',
+        ]
+        for usuario in (AnonymousUser(), self.ana, self.beto):
+            for url in urls:
+                self.assertMesmaResposta(url, usuario)
+
+    def test_negociacao_de_conteudo(self):
+        url = f'/api/momentos/{self.momento.pk}/'
+        indentada = self.assertMesmaResposta(url, self.beto, HTTP_ACCEPT='application/json; indent=2')
+        self.assertIn(b'\n  "id"', indentada.content)
+        self.assertMesmaResposta(f'{url}?format=json', self.beto)
+        self.assertEqual(self.assertMesmaResposta(url, self.beto, HTTP_ACCEPT='application/xml').status_code, 406)
+        # API navegável: delegada à view síncrona
+        _, assincrona = self.responder(url, self.beto, extra={'HTTP_ACCEPT': 'text/html'})
+        self.assertTrue(assincrona['Content-Type'].startswith('text/html'))
+
+    def test_detalhe_em_uma_unica_thread(self):
+        from .async_views import MomentoDetailAsyncView
+
+        # Sem pool, cada chamada de em_paralelo abre uma conexão
+        with mock.patch('momentos.async_views.em_paralelo', side_effect=sync_to_async) as em_paralelo:
+            async def auser():
+                return self.beto
+
+            request = RequestFactory().get(f'/api/momentos/{self.momento.pk}/')
+            request.auser = auser
+            resposta = async_to_sync(MomentoDetailAsyncView.as_view())(request, pk=self.momento.pk)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(em_paralelo.call_count, 1)
+
+    def test_throttles_da_view_drf(self):
+        from .async_views import MomentoDetailAsyncView
+        from .views import MomentoDetailView
+
+        url = f'/api/momentos/{self.momento.pk}/'
+        with mock.patch.object(MomentoDetailView, 'throttle_scope', 'views', create=True), \
+                mock.patch.object(JanelaDeslizanteThrottle, 'THROTTLE_RATES', {'views': '1/min'}):
+            async def auser():
+                return self.beto
+
+            respostas = []
+            for _ in range(2):
+                request = RequestFactory().get(url)
+                request.auser = auser
+                respostas.append(async_to_sync(MomentoDetailAsyncView.as_view())(request, pk=self.momento.pk))
+        self.assertEqual([r.status_code for r in respostas], [200, 429])
+        self.assertIn('Retry-After', respostas[1])
+
+
+class ComentariosTests(TestCase):
+    """Comentários: lista por cursor e prévia limitada no detalhe do momento"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana = Usuario.objects.create_user(username='ana', email='ana@example.com', password='x')
+        cls.momento = Momento.objects.create(usuario=cls.ana, titulo='golaço', video='videos/golaco.mp4')
+        Comentario.objects.bulk_create([
+            Comentario(usuario=cls.ana, momento=cls.momento, texto=f'comentário {i}') for i in range(23)
+        ])
+        # Empates em created_at: o cursor desempata pelo id
+        Comentario.objects.filter(pk__in=Comentario.objects.order_by('pk').values('pk')[5:15]).update(
+            created_at=timezone.now() - datetime.timedelta(minutes=1)
+        )
+        cls.ordem = list(Comentario.objects.order_by('created_at', 'id').values_list('pk', flat=True))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cursor_percorre_todas_as_paginas(self):
+        url = f'/api/momentos/{self.momento.pk}/comentarios/?page_size=7'
+        vistos, paginas = [], 0
+        while url:
+            resposta = self.client.get(url)
+            self.assertEqual(resposta.status_code, 200)
+            dados = resposta.json()
+            self.assertLessEqual(len(dados['results']), 7)
+            vistos += [comentario['id'] for comentario in dados['results']]
+            url, paginas = dados['next'], paginas + 1
+        self.assertEqual(paginas, 4)
+        self.assertEqual(vistos, self.ordem)
+
+        # Comentário novo depois da leitura: entra no fim, sem repetir nem pular os anteriores
+        primeira = self.client.get(f'/api/momentos/{self.momento.pk}/comentarios/?page_size=20').json()
+        Comentario.objects.create(usuario=self.ana, momento=self.momento, texto='atrasado')
+        segunda = self.client.get(primeira['next']).json()
+        self.assertEqual(
+            [c['id'] for c in primeira['results'] + segunda['results']],
+            list(Comentario.objects.order_by('created_at', 'id').values_list('pk', flat=True)),
+        )
+
+    def test_detalhe_traz_previa_limitada_e_total(self):
+        dados = self.client.get(f'/api/momentos/{self.momento.pk}/').json()
+        self.assertEqual(len(dados['comentarios']), COMENTARIOS_PREVIEW_LIMIT)
+        self.assertEqual([c['id'] for c in dados['comentarios']], self.ordem[:COMENTARIOS_PREVIEW_LIMIT])
+        self.assertEqual(dados['total_comentarios'], 23)
+        # Autor resumido: sem os agregados do UsuarioSerializer
+        self.assertNotIn('total_momentos', dados['comentarios'][0]['usuario'])
+
+        # Fora da view (sem a prévia pré-carregada), o serializer aplica o mesmo limite
+        data = MomentoDetailSerializer(Momento.objects.get(pk=self.momento.pk)).data
+        self.assertEqual(len(data['comentarios']), COMENTARIOS_PREVIEW_LIMIT)
+        self.assertEqual(data['total_comentarios'], 23)
+
+
+class ViewsThrottleTests(TestCase):
+    """Deduplicação de views no cache e limite por endpoint (config.throttling)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana = Usuario.objects.create_user(username='ana', email='ana@example.com', password='x')
+        cls.beto = Usuario.objects.create_user(username='beto', email='beto@example.com', password='x')
+        cls.momento = Momento.objects.create(usuario=cls.ana, titulo='golaço', video='videos/golaco.mp4')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.beto)
+
+    def test_view_repetida_nao_acessa_banco(self):
+        url = f'/api/momentos/{self.momento.pk}/view/'
+        self.assertEqual(self.client.post(url).data['views'], 1)
+        with self.assertNumQueries(0):
+            resposta = self.client.post(url)
+        self.assertEqual(resposta.status_code, 200)
+        self.momento.refresh_from_db()
+        self.assertEqual(self.momento.views, 1)
+
+    def test_view_negada_nao_fica_deduplicada(self):
+        privado = Momento.objects.create(usuario=self.ana, titulo='privado', video='videos/p.mp4', is_private=True)
+        url = f'/api/momentos/{privado.pk}/view/'
+        self.assertEqual(self.client.post(url).status_code, 403)
+        self.assertEqual(self.client.post(url).status_code, 403)
+
+    def test_limite_por_escopo(self):
+        url = f'/api/momentos/{self.momento.pk}/like/'
+        with mock.patch.object(JanelaDeslizanteThrottle, 'THROTTLE_RATES', {'likes': '2/min'}):
+            self.assertEqual(self.client.post(url).status_code, 201)
+            self.assertEqual(self.client.delete(url).status_code, 200)
+            resposta = self.client.post(url)
+            self.assertEqual(resposta.status_code, 429)
+            self.assertIn('Retry-After', resposta)
+            # O limite é por usuário
+            outro = APIClient()
+            outro.force_authenticate(self.ana)
+            self.assertNotEqual(outro.post(url).status_code, 429)
+
+
+class VisibilidadeMatrizTests(TestCase):
+    """visible_to em todos os caminhos de um momento: anônimo/outro/dono x momento privado/perfil privado"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana = Usuario.objects.create_user(username='ana', email='ana@example.com', password='x')
+        cls.caio = Usuario.objects.create_user(username='caio', email='caio@example.com', password='x', is_private=True)
+        cls.beto = Usuario.objects.create_user(username='beto', email='beto@example.com', password='x')
+        cls.momentos = {
+            'público': Momento.objects.create(usuario=cls.ana, titulo='segredo-publico', video='videos/a.mp4'),
+            'momento privado': Momento.objects.create(usuario=cls.ana, titulo='segredo-momento', video='videos/b.mp4',
+                                                      is_private=True),
+            'perfil privado': Momento.objects.create(usuario=cls.caio, titulo='segredo-perfil', video='videos/c.mp4'),
+        }
+
+    def setUp(self):
+        cache.clear()
+
+    def cliente(self, quem, momento):
+        cliente = APIClient()
+        usuario = {'anônimo': None, 'outro': self.beto, 'dono': momento.usuario}[quem]
+        if usuario is not None:
+            cliente.force_authenticate(usuario)
+        return cliente
+
+    def test_matriz(self):
+        acoes = {
+            'detalhe': lambda c, pk: c.get(f'/api/momentos/{pk}/'),
+            'like': lambda c, pk: c.post(f'/api/momentos/{pk}/like/'),
+            'view': lambda c, pk: c.post(f'/api/momentos/{pk}/view/'),
+            'comentários': lambda c, pk: c.get(f'/api/momentos/{pk}/comentarios/'),
+            'comentar': lambda c, pk: c.post(f'/api/momentos/{pk}/comentarios/', {'texto': 'oi'}),
+        }
+        sucesso = {'detalhe': 200, 'like': 201, 'view': 200, 'comentários': 200, 'comentar': 201}
+        so_logado = {'like', 'view', 'comentar'}
+
+        for caso, momento in self.momentos.items():
+            for quem in ('anônimo', 'outro', 'dono'):
+                visivel = caso == 'público' or quem == 'dono'
+                for acao, requisitar in acoes.items():
+                    with self.subTest(caso=caso, quem=quem, acao=acao):
+                        resposta = requisitar(self.cliente(quem, momento), momento.pk)
+                        if quem == 'anônimo' and acao in so_logado:
+                            self.assertEqual(resposta.status_code, 403)
+                        elif visivel:
+                            self.assertEqual(resposta.status_code, sucesso[acao])
+                        else:
+                            self.assertEqual(resposta.status_code, 403)
+                            self.assertNotIn(momento.titulo.encode(), resposta.content)
+
+        # Nada foi contado nem gravado nos momentos invisíveis, exceto pelos donos
+        for caso in ('momento privado', 'perfil privado'):
+            momento = Momento.objects.get(pk=self.momentos[caso].pk)
+            self.assertEqual((momento.views, momento.likes_count), (0, 1))
+            self.assertEqual(list(momento.likes.values_list('usuario', flat=True)), [momento.usuario_id])
+            self.assertEqual(list(momento.comentarios.values_list('usuario', flat=True)), [momento.usuario_id])
+        self.assertEqual(Momento.objects.get(pk=self.momentos['público'].pk).views, 1)
+
+
+class GetCondicionalTests(TestCase):
+    """ETag do detalhe e do perfil (momentos/condicional.py): contadores na chave, 304/412, mesma versão em ASGI"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana = Usuario.objects.create_user(username='ana', email='ana@example.com', password='x')
+        cls.beto = Usuario.objects.create_user(username='beto', email='beto@example.com', password='x')
+        cls.momento = Momento.objects.create(usuario=cls.ana, titulo='golaço', video='videos/golaco.mp4')
+        cls.url = f'/api/momentos/{cls.momento.pk}/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.beto)
+
+    def etag(self):
+        return self.client.get(self.url)['ETag']
+
+    def test_304_com_a_versao_atual(self):
+        etag = self.etag()
+        resposta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 304)
+        self.assertEqual(resposta['ETag'], etag)
+        # Só ETag: contadores não têm data, If-Modified-Since não pode validar o detalhe
+        self.assertNotIn('Last-Modified', resposta)
+
+    def test_412_com_if_match_desatualizado(self):
+        etag = self.etag()
+        self.client.post(f'{self.url}like/')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MATCH=etag).status_code, 412)
+
+    def test_contadores_mudam_a_etag_sem_tocar_updated_at(self):
+        editado_em = Momento.objects.get(pk=self.momento.pk).updated_at
+        escritas = [
+            lambda: self.client.post(f'{self.url}view/'),
+            lambda: self.client.post(f'{self.url}like/'),
+            lambda: self.client.delete(f'{self.url}like/'),
+            lambda: self.client.post(f'{self.url}comentarios/', {'texto': 'que golaço'}),
+            lambda: self.client.delete(f'/api/momentos/comentarios/{Comentario.objects.get().pk}/'),
+        ]
+        anterior = self.etag()
+        for passo, escrever in enumerate(escritas):
+            self.assertLess(escrever().status_code, 300)
+            atual = self.etag()
+            self.assertNotEqual(atual, anterior, passo)
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=anterior).status_code, 200)
+            anterior = atual
+        self.assertEqual(Momento.objects.get(pk=self.momento.pk).updated_at, editado_em)
+
+    def test_perfil_muda_com_views_e_likes(self):
+        # O perfil lista os momentos com views e total_likes; anônimos recebem s-maxage
+        perfil = '/api/auth/profile/ana/'
+        anonimo = APIClient()
+        anterior = anonimo.get(perfil)['ETag']
+        for escrever in (lambda: self.client.post(f'{self.url}view/'), lambda: self.client.post(f'{self.url}like/')):
+            self.assertLess(escrever().status_code, 300)
+            resposta = anonimo.get(perfil, HTTP_IF_NONE_MATCH=anterior)
+            self.assertEqual(resposta.status_code, 200)
+            anterior = resposta['ETag']
+        self.assertEqual(resposta.json()['momentos']['results'][0]['views'], 1)
+
+    def test_mesma_etag_na_view_assincrona(self):
+        # AsyncReadView entrega à versão um Request do DRF sem negociação de conteúdo
+        request = Request(RequestFactory().get(self.url))
+        request.user = self.beto
+        self.assertEqual(versao_momento(request, self.momento.pk).etag, self.etag())
+
+
+class NotificacoesLikeTests(TestCase):
+    """Agrupamento de likes (momentos/notificacoes.py) e retenção (limpar_notificacoes)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana = Usuario.objects.create_user(username='ana', email='ana@example.com', password='x')
+        cls.beto = Usuario.objects.create_user(username='beto', email='beto@example.com', password='x')
+        cls.caio = Usuario.objects.create_user(username='caio', email='caio@example.com', password='x')
+        cls.momento = Momento.objects.create(usuario=cls.ana, titulo='golaço', video='videos/golaco.mp4')
+
+    def curtir(self, usuario):
+        notificacoes.criar_notificacao_like(self.momento.pk, self.ana.pk, usuario.pk)
+
+    def test_total_conta_usuarios_distintos(self):
+        for usuario in (self.beto, self.caio, self.beto, self.beto):
+            self.curtir(usuario)
+        notificacao = Notificacao.objects.get()
+        self.assertEqual(notificacao.total_atores, 2)
+        self.assertEqual(notificacao.renderizar_mensagem(), 'caio e mais 1 pessoa curtiram seu momento: "golaço"')
+
+    def test_insert_concorrente_agrupa_na_linha_existente(self):
+        # Outro processo abre o grupo entre a busca e o INSERT deste
+        self.curtir(self.beto)
+        real = notificacoes._travar
+        with mock.patch.object(notificacoes, '_travar', side_effect=[None, real(Notificacao.objects.all())]):
+            self.curtir(self.caio)
+        self.assertEqual(list(Notificacao.objects.values_list('total_atores', flat=True)), [2])
+
+    def test_uma_linha_aberta_por_momento(self):
+        self.curtir(self.beto)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Notificacao.objects.create(usuario_destino=self.ana, momento=self.momento, tipo='like')
+        Notificacao.objects.update(lida=True)
+        self.curtir(self.beto)
+        self.assertEqual(Notificacao.objects.count(), 2)
+
+    def test_fora_da_janela_abre_grupo_novo_sem_perder_o_anterior(self):
+        self.curtir(self.beto)
+        self.curtir(self.caio)
+        Notificacao.objects.update(created_at=timezone.now() - datetime.timedelta(days=1))
+        self.curtir(self.beto)
+        self.curtir(self.caio)
+        self.curtir(self.beto)
+        # O grupo antigo continua não lido, com os dois atores que o dono ainda não viu
+        self.assertEqual(
+            list(Notificacao.objects.order_by('pk').values_list('lida', 'grupo_aberto', 'total_atores')),
+            [(False, False, 2), (False, True, 2)],
+        )
+        self.assertEqual(
+            Notificacao.objects.order_by('pk').first().renderizar_mensagem(),
+            'caio e mais 1 pessoa curtiram seu momento: "golaço"',
+        )
+
+    def test_retencao_pela_ultima_atividade(self):
+        antigo = timezone.now() - datetime.timedelta(days=200)
+        _, ativa = Notificacao.objects.bulk_create([
+            Notificacao(usuario_destino=self.ana, momento=self.momento, tipo='view_milestone', marco=100, lida=True),
+            Notificacao(usuario_destino=self.ana, momento=self.momento, tipo='like', lida=True),
+        ])
+        Notificacao.objects.update(created_at=antigo, updated_at=antigo)
+        Notificacao.objects.filter(pk=ativa.pk).update(updated_at=timezone.now())
+        call_command('limpar_notificacoes', '--pausa', '0', stdout=StringIO())
+        self.assertEqual(list(Notificacao.objects.values_list('pk', flat=True)), [ativa.pk])
+
+
+class LikesCountTests(TestCase):
+    """likes_count igual ao número de likes: repetições na API e exclusões fora dela (momentos/contadores.py)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana = Usuario.objects.create_user(username='ana', email='ana@example.com', password='x')
+        cls.beto = Usuario.objects.create_user(username='beto', email='beto@example.com', password='x')
+        cls.caio = Usuario.objects.create_user(username='caio', email='caio@example.com', password='x')
+        cls.momentos = [
+            Momento.objects.create(usuario=cls.ana, titulo=f'lance {i}', video=f'videos/lance_{i}.mp4')
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def curtir(self, usuario, momento, metodo='post'):
+        client = APIClient()
+        client.force_authenticate(usuario)
+        return getattr(client, metodo)(f'/api/momentos/{momento.pk}/like/')
+
+    def assertContadoresCorretos(self):
+        for momento in Momento.objects.all():
+            self.assertEqual(momento.likes_count, Like.objects.filter(momento=momento).count(), momento.titulo)
+
+    def test_like_e_unlike_repetidos_sao_idempotentes(self):
+        momento = self.momentos[0]
+        self.assertEqual(self.curtir(self.beto, momento).status_code, 201)
+        repetido = self.curtir(self.beto, momento)
+        self.assertEqual((repetido.status_code, repetido.data['total_likes']), (200, 1))
+        self.assertContadoresCorretos()
+        self.assertEqual(self.curtir(self.beto, momento, 'delete').status_code, 200)
+        repetido = self.curtir(self.beto, momento, 'delete')
+        self.assertEqual((repetido.status_code, repetido.data['total_likes']), (200, 0))
+        self.assertContadoresCorretos()
+
+    def test_excluir_usuario_desconta_likes_dados(self):
+        for momento in self.momentos:
+            self.curtir(self.beto, momento)
+        self.curtir(self.caio, self.momentos[0])
+        self.beto.delete()
+        self.assertEqual([m.likes_count for m in Momento.objects.order_by('pk')], [1, 0])
+        self.assertContadoresCorretos()
+
+    def test_edicao_nao_regrava_contadores_lidos(self):
+        # PATCH carrega o momento; um like e uma view chegam antes do UPDATE da edição
+        carregado = Momento.objects.get(pk=self.momentos[0].pk)
+        self.assertEqual(self.curtir(self.beto, self.momentos[0]).status_code, 201)
+        Momento.objects.filter(pk=carregado.pk).update(views=7)
+        serializer = MomentoUpdateSerializer(carregado, data={'titulo': 'editado'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        momento = Momento.objects.get(pk=carregado.pk)
+        self.assertEqual((momento.titulo, momento.likes_count, momento.views), ('editado', 1, 7))
+        # save() completo (admin, shell) também preserva os contadores
+        carregado.descricao = 'nova'
+        carregado.save()
+        self.assertEqual(Momento.objects.values_list('likes_count', 'views').get(pk=carregado.pk), (1, 7))
+        self.assertContadoresCorretos()
+
+    def test_admin_desconta_likes_apagados(self):
+        for usuario in (self.beto, self.caio):
+            for momento in self.momentos:
+                self.curtir(usuario, momento)
+        like_admin = admin.site._registry[Like]
+        like_admin.delete_model(None, Like.objects.get(usuario=self.caio, momento=self.momentos[1]))
+        like_admin.delete_queryset(None, Like.objects.filter(usuario=self.beto))
+        self.assertEqual([m.likes_count for m in Momento.objects.order_by('pk')], [1, 0])
+        self.assertContadoresCorretos()
+
+
+@override_settings(PERFIL_AMOSTRAGEM=1.0, PERFIL_SERVER_TIMING=True,
+                   PERFIL_ORCAMENTO_CONSULTAS=1, PERFIL_INTERVALO_SEGUNDOS=3600)
+class PerfilMiddlewareTests(TestCase):
+    """config.middleware.PerfilMiddleware: Server-Timing, orçamento e histogramas"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.ana = Usuario.objects.create_user(username='ana', email='ana@example.com', password='x')
+        cls.momento = Momento.objects.create(usuario=cls.ana, titulo='golaço', video='videos/golaco.mp4')
+
+    def test_mede_consultas_e_registra_endpoint(self):
+        client = Client()
+        with self.assertLogs('config.perfil', 'WARNING') as logs:
+            with CaptureQueriesContext(connection) as consultas:
+                resposta = client.get(f'/api/momentos/{self.momento.pk}/')
+            total = len(consultas)
+
+        self.assertIn(f'desc="{total} consultas"', resposta['Server-Timing'])
+        self.assertIn('total;dur=', resposta['Server-Timing'])
+        self.assertIn('perfil.orcamento endpoint="GET /api/momentos/<int:pk>/"', logs.output[0])
+        chave = perfil._chave('GET /api/momentos/<int:pk>/', 'consultas', 'soma')
+        self.assertGreaterEqual(perfil.agregador.contagens[chave], total)
+
+    @override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'perfil': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'perfil-testes'},
+    })
+    def test_separa_view_e_serializacao(self):
+        endpoint = 'GET /api/momentos/<int:pk>/'
+        somas = {metrica: perfil._chave(endpoint, metrica, 'soma') for metrica in ('view_ms', 'serializacao_ms')}
+        antes = {metrica: perfil.agregador.contagens[chave] for metrica, chave in somas.items()}
+        original = MomentoDetailSerializer.to_representation
+
+        def lento(serializer, instance):
+            time.sleep(0.03)
+            return original(serializer, instance)
+
+        with mock.patch.object(MomentoDetailSerializer, 'to_representation', lento), \
+                self.assertLogs('config.perfil', 'WARNING'):
+            resposta = Client().get(f'/api/momentos/{self.momento.pk}/')
+
+        timing = dict(
+            metrica.split(';')[0:2] for metrica in resposta['Server-Timing'].split(', ')
+            if ';dur=' in metrica
+        )
+        self.assertGreaterEqual(float(timing['serializacao'].removeprefix('dur=')), 30)
+        # Em µs; o serializer.data da view também conta no tempo da view
+        for metrica in somas:
+            self.assertGreaterEqual(perfil.agregador.contagens[somas[metrica]] - antes[metrica], 30000)
+
+        saida = StringIO()
+        perfil.agregador.descarregar()
+        call_command('relatorio_perfil', '--ordenar', 'serializacao', '--json', stdout=saida)
+        linha = next(linha for linha in json.loads(saida.getvalue()) if linha['endpoint'] == endpoint)
+        self.assertGreaterEqual(linha['media_serializacao_ms'], 30 / linha['n'])
+        self.assertIn('view_ms', linha['histogramas'])
+
+
+@override_settings(DB_REPLICAS=['replica_1', 'replica_2'], DB_REPLICA_FIXAR_SEGUNDOS=5)
+class ReplicasTests(SimpleTestCase):
+    """config.replicas: leituras seguras na réplica, escritas e leituras pós-escrita no primário"""
+
+    def rotear(self, request):
+        roteador = replicas.RoteadorReplicas()
+        vistos = {}
+
+        def view(request):
+            vistos['leitura'] = roteador.db_for_read(Momento)
+            vistos['escrita'] = roteador.db_for_write(Momento)
+            vistos['contador'] = replicas.replica()
+            with replicas.primario():
+                vistos['tarefa'] = roteador.db_for_read(Momento)
+            return HttpResponse()
+
+        return vistos, ReplicasMiddleware(view)(request)
+
+    def test_roteamento_por_requisicao(self):
+        fabrica = RequestFactory()
+        vistos, resposta = self.rotear(fabrica.get('/api/momentos/'))
+        self.assertIn(vistos['leitura'], ['replica_1', 'replica_2'])
+        self.assertEqual(vistos['contador'], vistos['leitura'])
+        self.assertEqual((vistos['escrita'], vistos['tarefa']), ('default', 'default'))
+        self.assertNotIn(replicas.COOKIE, resposta.cookies)
+
+        # Escrita: primário, e o navegador fica fixado nele por alguns segundos
+        vistos, resposta = self.rotear(fabrica.post('/api/momentos/1/like/'))
+        self.assertEqual((vistos['leitura'], vistos['contador']), ('default', 'default'))
+        self.assertEqual(resposta.cookies[replicas.COOKIE]['max-age'], 5)
+
+        # Fixada: até os contadores vêm do primário
+        fabrica.cookies[replicas.COOKIE] = '1'
+        vistos, _ = self.rotear(fabrica.get('/api/momentos/'))
+        self.assertEqual((vistos['leitura'], vistos['contador']), ('default', 'default'))
+
+        # Fora de requisições (comandos, tarefas) e dentro de transações: primário
+        roteador = replicas.RoteadorReplicas()
+        self.assertEqual(roteador.db_for_read(Momento), 'default')
+        token = replicas.iniciar(RequestFactory().get('/'))
+        try:
+            with mock.patch.object(connection, 'in_atomic_block', True):
+                self.assertEqual(roteador.db_for_read(Momento), 'default')
+        finally:
+            replicas.encerrar(token)
+
+    def test_sem_replicas_nao_carrega(self):
+        with override_settings(DB_REPLICAS=[]):
+            self.assertEqual(replicas.replica(), 'default')
+            with self.assertRaises(MiddlewareNotUsed):
+                ReplicasMiddleware(lambda request: HttpResponse())
+
+
+class ReplicaEspelhoTests(TransactionTestCase):
+    """Roteamento ponta a ponta por um segundo alias, espelho do 'default' como os de DB_REPLICAS nos testes"""
+    # O alias é criado em setUpClass; '__all__' é resolvido depois dele
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        padrao = connections['default'].settings_dict
+        connections.settings['replica_1'] = {**padrao, 'TEST': {**padrao['TEST'], 'MIRROR': 'default'}}
+        cls.addClassCleanup(cls.remover_alias)
+        super().setUpClass()
+
+    @classmethod
+    def remover_alias(cls):
+        connections['replica_1'].close()
+        del connections['replica_1']
+        del connections.settings['replica_1']
+
+    def setUp(self):
+        cache.clear()
+        self.ana = Usuario.objects.create_user(username='ana', email='ana@example.com', password='x')
+        self.beto = Usuario.objects.create_user(username='beto', email='beto@example.com', password='x')
+        self.momento = Momento.objects.create(usuario=self.ana, titulo='golaço', video='videos/golaco.mp4')
+        patcher = override_settings(DB_REPLICAS=['replica_1'], DATABASE_ROUTERS=['config.replicas.RoteadorReplicas'])
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+        self.client = Client()
+        self.client.force_login(self.beto)
+
+    def consultas(self, metodo, url):
+        """(consultas no primário, consultas na réplica, resposta)"""
+        with CaptureQueriesContext(connections['default']) as primario, \
+                CaptureQueriesContext(connections['replica_1']) as replica:
+            resposta = getattr(self.client, metodo)(url)
+        return len(primario), len(replica), resposta
+
+    def test_leituras_na_replica_e_fixacao_apos_escrita(self):
+        perfil = f'/api/auth/profile/{self.ana.username}/'
+        _, na_replica, resposta = self.consultas('get', perfil)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertGreater(na_replica, 0)
+
+        _, na_replica, resposta = self.consultas('post', f'/api/momentos/{self.momento.pk}/like/')
+        self.assertEqual((resposta.status_code, na_replica), (201, 0))
+        self.assertIn(replicas.COOKIE, resposta.cookies)
+
+        # Fixada: nada na réplica, nem os contadores que usam replica()
+        _, na_replica, resposta = self.consultas('get', perfil)
+        self.assertEqual(na_replica, 0)
+        self.assertEqual(resposta.json()['user']['total_likes_recebidos'], 1)
+
+
+class GeradorSinteticoTests(TestCase):
+    """momentos.sintetico: dados coerentes com o que o app produziria"""
+
+    def test_gera_conjunto_coerente(self):
+        from django.db.models import Count, F
+
+        totais = gerar(usuarios=30, momentos=60, tags=8, media_likes=6, media_comentarios=2, lote=100)
+
+        self.assertEqual(totais['usuarios.Usuario'], 30)
+        self.assertEqual(totais['momentos.Momento'], 60)
+        self.assertEqual(totais['momentos.Like'], Like.objects.count())
+        # likes_count denormalizado bate com as linhas, e ninguém curte o próprio momento
+        divergentes = Momento.objects.annotate(total=Count('likes')).exclude(total=F('likes_count'))
+        self.assertFalse(divergentes.exists())
+        self.assertFalse(Like.objects.filter(usuario_id=F('momento__usuario_id')).exists())
+        self.assertEqual(
+            Notificacao.objects.filter(tipo='like').count(),
+            Momento.objects.filter(likes_count__gt=0).count(),
+        )
+        # Grupos não lidos: um ator por curtidor, como os likes pela API deixariam
+        nao_lidas = Notificacao.objects.filter(tipo='like', lida=False)
+        self.assertTrue(nao_lidas.exists())
+        self.assertEqual(totais['momentos.NotificacaoAtor'], NotificacaoAtor.objects.count())
+        for notificacao in nao_lidas:
+            self.assertCountEqual(
+                notificacao.atores.values_list('usuario_id', flat=True),
+                Like.objects.filter(momento_id=notificacao.momento_id).values_list('usuario_id', flat=True),
+            )
+            self.assertEqual(notificacao.atores.count(), notificacao.total_atores)
+        self.assertFalse(NotificacaoAtor.objects.filter(notificacao__lida=True).exists())
+        # Um like novo num grupo gerado (dentro da janela) não conta de novo quem já curtiu
+        notificacao = nao_lidas.first()
+        Notificacao.objects.filter(pk=notificacao.pk).update(updated_at=timezone.now())
+        total = notificacao.total_atores
+        notificacoes.criar_notificacao_like(notificacao.momento_id, notificacao.usuario_destino_id,
+                                            notificacao.atores.first().usuario_id)
+        notificacao.refresh_from_db()
+        self.assertEqual((notificacao.total_atores, notificacao.atores.count()), (total, total))
+        # IDs atribuídos pelo gerador: as sequências continuam depois deles
+        Momento.objects.create(usuario=Usuario.objects.first(), titulo='novo', video='videos/novo.mp4')
+        self.assertTrue(Usuario.objects.filter(username='sint_0').get().check_password('sintetico123'))
+
+    def test_copy_com_psycopg2_e_psycopg3(self):
+        tags = [Tag(pk=1, nome='golaço', slug='golaco'), Tag(pk=2, nome='drible', slug='drible')]
+        for driver, metodo in (('psycopg2', 'copy_expert'), ('psycopg', 'copy')):
+            with self.subTest(driver=driver), \
+                    mock.patch.object(connection, 'Database', mock.Mock(__name__=driver)), \
+                    mock.patch.object(connection, 'cursor') as cursor:
+                Gravador(10)._copiar(Tag, tags)
+            cursor = cursor.return_value.__enter__.return_value
+            chamada = getattr(cursor, metodo)
+            chamada.assert_called_once()
+            self.assertTrue(chamada.call_args.args[0].startswith('COPY "momentos_tag"'))
+            if driver == 'psycopg':
+                conteudo = chamada.return_value.__enter__.return_value.write.call_args.args[0]
+            else:
+                conteudo = chamada.call_args.args[1].getvalue()
+            self.assertEqual(conteudo.splitlines()[1].split(',')[:3], ['2', 'drible', 'drible'])
+
+
+@override_settings(TASKS_ALWAYS_EAGER=True,
+                   STORAGES={'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'}})
+class ArquivosMidiaTests(TestCase):
+    """momentos.arquivos (remoção no commit) e o comando limpar_midia"""
+
+    def setUp(self):
+        self.ana = Usuario.objects.create_user(username='ana', email='ana@example.com', password='x')
+        self.momento = Momento.objects.create(
+            usuario=self.ana, titulo='golaço',
+            video=SimpleUploadedFile('golaco.mp4', b'video'), thumbnail=SimpleUploadedFile('golaco.jpg', b'jpg'),
+        )
+        self.arquivos = [self.momento.video.name, self.momento.thumbnail.name]
+
+    def test_remove_arquivos_apenas_apos_commit(self):
+        pk = self.momento.pk
+        try:
+            with transaction.atomic():
+                self.momento.delete()
+                raise DatabaseError
+        except DatabaseError:
+            pass
+        self.assertTrue(all(default_storage.exists(nome) for nome in self.arquivos))
+
+        client = APIClient()
+        client.force_authenticate(self.ana)
+        with self.captureOnCommitCallbacks(execute=True):
+            resposta = client.delete(f'/api/momentos/{pk}/')
+        self.assertEqual(resposta.status_code, 204)
+        self.assertFalse(any(default_storage.exists(nome) for nome in self.arquivos))
+
+    def test_troca_de_arquivo_remove_o_anterior(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.momento.thumbnail = SimpleUploadedFile('nova.jpg', b'png')
+            self.momento.save()
+        self.assertTrue(default_storage.exists(self.momento.video.name))
+        self.assertFalse(default_storage.exists(self.arquivos[1]))
+        self.assertTrue(default_storage.exists(self.momento.thumbnail.name))
+
+    def test_limpar_midia_remove_somente_orfaos_antigos(self):
+        orfao = default_storage.save('videos/2020/01/orfao.mp4', ContentFile(b'x'))
+        saida = StringIO()
+        call_command('limpar_midia', '--dry-run', stdout=saida)
+        self.assertIn('0 arquivos órfãos seriam removidos', saida.getvalue())
+        self.assertIn('1 órfãos recentes mantidos', saida.getvalue())
+
+        call_command('limpar_midia', '--idade-minima', '0', '--max-por-segundo', '0', stdout=StringIO())
+        self.assertFalse(default_storage.exists(orfao))
+        self.assertTrue(all(default_storage.exists(nome) for nome in self.arquivos))
+
+
+@override_settings(TASKS_ALWAYS_EAGER=True, MIDIA_DEDUP=False,
+                   STORAGES={'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'}})
+class ArquivosForaDeTransacaoTests(TransactionTestCase):
+    """Em autocommit (ex.: troca de avatar no PATCH do perfil), on_commit roda no ato"""
+
+    def test_save_que_falha_mantem_o_arquivo_anterior(self):
+        Usuario.objects.create_user(username='beto', email='beto@example.com', password='x')
+        ana = Usuario.objects.create_user(username='ana', email='ana@example.com', password='x',
+                                          avatar=SimpleUploadedFile('ana.jpg', b'jpg'))
+        anterior = ana.avatar.name
+
+        ana.avatar = SimpleUploadedFile('nova.jpg', b'png')
+        ana.email = 'beto@example.com'
+        with self.assertRaises(IntegrityError):
+            ana.save()
+        self.assertTrue(default_storage.exists(anterior))
+
+        ana.email = 'ana@example.com'
+        ana.save()
+        self.assertFalse(default_storage.exists(anterior))
+        self.assertTrue(default_storage.exists(ana.avatar.name))
+
+    @override_settings(MIDIA_DEDUP=True)
+    def test_deduplicacao_exige_transacao(self):
+        from PIL import Image
+
+        ana = Usuario.objects.create_user(username='ana', email='ana@example.com', password='x')
+        ana.avatar = SimpleUploadedFile('ana.jpg', b'jpg')
+        with self.assertRaises(transaction.TransactionManagementError):
+            ana.save()
+        self.assertFalse(ConteudoMidia.objects.exists())
+
+        # As views de upload salvam em transação
+        imagem = BytesIO()
+        Image.new('RGB', (2, 2)).save(imagem, 'PNG')
+        client = APIClient()
+        client.force_authenticate(ana)
+        resposta = client.patch('/api/auth/user/', {'avatar': SimpleUploadedFile('ana.png', imagem.getvalue())},
+                                format='multipart')
+        self.assertEqual(resposta.status_code, 200)
+        ana.refresh_from_db()
+        self.assertEqual(ConteudoMidia.objects.get().arquivo, ana.avatar.name)
+        self.assertTrue(default_storage.exists(ana.avatar.name))
+
+
+@override_settings(TASKS_ALWAYS_EAGER=True,
+                   STORAGES={'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'}})
+class ConteudoMidiaTests(TestCase):
+    """momentos.conteudo: uploads iguais compartilham um arquivo, com contagem de referências"""
+
+    def setUp(self):
+        self.ana = Usuario.objects.create_user(username='ana', email='ana@example.com', password='x')
+        self.client = APIClient()
+        self.client.force_authenticate(self.ana)
+
+    def enviar(self, titulo):
+        with self.captureOnCommitCallbacks(execute=True):
+            resposta = self.client.post('/api/momentos/', {
+                'titulo': titulo, 'video': SimpleUploadedFile('lance.mp4', b'mesmo video'),
+            }, format='multipart')
+        self.assertEqual(resposta.status_code, 201)
+        return Momento.objects.get(titulo=titulo)
+
+    def test_duplicata_nao_grava_de_novo_e_reaproveita_hls(self):
+        with mock.patch.object(hls, 'empacotar') as empacotar, override_settings(HLS_ATIVO=True):
+            primeiro = self.enviar('primeiro')
+            self.assertEqual(primeiro.hls_status, 'pendente')  # o worker empacotar_hls é quem empacota
+            Momento.objects.filter(pk=primeiro.pk).update(hls='hls/1/master.m3u8', hls_status='pronto')
+            with mock.patch.object(default_storage, 'save') as save:
+                segundo = self.enviar('segundo')
+        save.assert_not_called()
+        empacotar.assert_not_called()
+        self.assertEqual(segundo.video.name, primeiro.video.name)
+        self.assertTrue(segundo.video.name.startswith('conteudo/'))
+        self.assertEqual((segundo.hls, segundo.hls_status), ('hls/1/master.m3u8', 'pronto'))
+        self.assertEqual(ConteudoMidia.objects.get().referencias, 2)
+
+        # O arquivo só sai do storage com a última referência
+        with self.captureOnCommitCallbacks(execute=True):
+            primeiro.delete()
+        self.assertTrue(default_storage.exists(segundo.video.name))
+        with self.captureOnCommitCallbacks(execute=True):
+            segundo.delete()
+        self.assertFalse(default_storage.exists(segundo.video.name))
+        self.assertFalse(ConteudoMidia.objects.exists())
+
+    def test_save_que_falha_nao_conta_referencia(self):
+        Usuario.objects.create_user(username='beto', email='beto@example.com', password='x')
+        self.ana.avatar = SimpleUploadedFile('ana.jpg', b'avatar')
+        self.ana.email = 'beto@example.com'
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.ana.save()
+        self.assertFalse(ConteudoMidia.objects.exists())
+
+    def test_upload_em_campo_vazio_mantem_a_referencia(self):
+        momento = self.enviar('sem thumbnail')
+        with self.captureOnCommitCallbacks(execute=True):
+            momento.thumbnail = SimpleUploadedFile('capa.jpg', b'capa')
+            momento.save()
+        self.assertEqual(ConteudoMidia.objects.get(arquivo=momento.thumbnail.name).referencias, 1)
+        self.assertTrue(default_storage.exists(momento.thumbnail.name))
+
+    def test_recolher_so_apaga_o_arquivo_depois_do_commit(self):
+        momento = self.enviar('lance')
+        nome = momento.video.name
+        ConteudoMidia.objects.update(referencias=0)
+        with self.assertRaises(DatabaseError), self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                conteudo.recolher([nome])
+                raise DatabaseError
+        self.assertTrue(ConteudoMidia.objects.exists())
+        self.assertTrue(default_storage.exists(nome))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(conteudo.recolher([nome]), 1)
+        self.assertFalse(default_storage.exists(nome))
+
+    def test_limpeza_da_carga_libera_a_referencia(self):
+        from benchmarks.bench_carga import apagar_uploads
+
+        for n in range(2):
+            self.enviar(f'Carga x #{n}')
+        conteudo = ConteudoMidia.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(apagar_uploads('x'), 2)
+        self.assertFalse(ConteudoMidia.objects.exists())
+        self.assertFalse(default_storage.exists(conteudo.arquivo))
+
+        # A próxima carga com os mesmos bytes grava o arquivo de novo
+        momento = self.enviar('Carga y #0')
+        self.assertEqual(default_storage.open(momento.video.name).read(), b'mesmo video')
+
+    def test_deduplicar_midia_migra_arquivos_existentes(self):
+        nomes = [default_storage.save(f'videos/2020/01/{n}.mp4', ContentFile(b'igual')) for n in 'ab']
+        for nome in nomes:
+            Momento.objects.create(usuario=self.ana, titulo=nome, video=nome)
+        saida = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('deduplicar_midia', stdout=saida)
+        self.assertIn('2 arquivos examinados, 1 duplicados', saida.getvalue())
+
+        conteudo = ConteudoMidia.objects.get()
+        self.assertEqual(conteudo.referencias, 2)
+        self.assertEqual(set(Momento.objects.values_list('video', flat=True)), {conteudo.arquivo})
+        self.assertFalse(any(default_storage.exists(nome) for nome in nomes))
+        self.assertEqual(default_storage.open(conteudo.arquivo).read(), b'igual')
+
+
+@override_settings(TASKS_ALWAYS_EAGER=True, TIMELINE_LIMITE=3, TIMELINE_LIMIAR_PULL=3, TIMELINE_PODA_PERIODO=1)
+class TimelineTests(TestCase):
+    """momentos.timeline: push para autores comuns, pull para grandes, poda e revogação"""
+
+    def setUp(self):
+        self.ana = Usuario.objects.create_user(username='ana', email='ana@example.com', password='x')
+        self.bia = Usuario.objects.create_user(username='bia', email='bia@example.com', password='x')
+        self.caio = Usuario.objects.create_user(username='caio', email='caio@example.com', password='x')
+        self.clientes = {}
+        for usuario in (self.ana, self.bia):
+            self.clientes[usuario.username] = APIClient()
+            self.clientes[usuario.username].force_authenticate(usuario)
+        for seguido in ('bia', 'caio'):
+            with self.captureOnCommitCallbacks(execute=True):
+                resposta = self.clientes['ana'].post(f'/api/auth/profile/{seguido}/seguir/')
+            self.assertEqual(resposta.json(), {'seguindo': True, 'seguidores': 1})
+        # caio passa a ser um autor grande: lido por pull, sem fan-out
+        Usuario.objects.filter(pk=self.caio.pk).update(seguidores_count=3)
+
+    def publicar(self, autor, titulo):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Momento.objects.create(usuario=autor, titulo=titulo, video=f'videos/{titulo}.mp4')
+
+    def titulos(self):
+        resposta = self.clientes['ana'].get('/api/momentos/timeline/')
+        self.assertEqual(resposta.status_code, 200)
+        return [momento['titulo'] for momento in resposta.json()['results']]
+
+    def test_push_pull_e_poda(self):
+        for i in range(5):
+            self.publicar(self.bia, f'bia{i}')
+        self.publicar(self.caio, 'caio0')
+        self.publicar(self.ana, 'ana0')
+        self.publicar(Usuario.objects.create_user(username='dani', email='dani@example.com'), 'dani0')
+
+        entregues = EntradaTimeline.objects.filter(usuario=self.ana)
+        self.assertEqual(sorted(entregues.values_list('momento__titulo', flat=True)), ['bia2', 'bia3', 'bia4'])
+        self.assertFalse(EntradaTimeline.objects.filter(autor=self.caio).exists())
+        self.assertEqual(self.titulos(), ['ana0', 'caio0', 'bia4', 'bia3', 'bia2'])
+
+    def test_paginas_fundem_autores_puxados_e_entregues(self):
+        publicados = [self.publicar(autor, f'{autor.username}{i}') for i in range(7) for autor in (self.caio, self.bia)]
+        privado = self.publicar(self.caio, 'caio-privado')
+        Momento.objects.filter(pk=privado.pk).update(is_private=True)
+        esperado = [m.titulo for m in sorted(publicados, key=lambda m: (m.created_at, m.pk), reverse=True)]
+        # bia: só as TIMELINE_LIMITE entregas mais recentes; caio: lido por pull em qualquer profundidade
+        esperado = [t for t in esperado if t.startswith('caio') or t in ('bia6', 'bia5', 'bia4')]
+
+        obtidos, url = [], '/api/momentos/timeline/?page_size=2'
+        while url:
+            resposta = self.clientes['ana'].get(url).json()
+            obtidos += [momento['titulo'] for momento in resposta['results']]
+            url = resposta['next']
+        self.assertEqual(obtidos, esperado)
+
+    def test_privacidade_e_deixar_de_seguir_revogam(self):
+        momentos = [self.publicar(self.bia, f'bia{i}') for i in range(2)]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.clientes['bia'].patch(f'/api/momentos/{momentos[0].pk}/', {'is_private': True}, format='json')
+        self.assertEqual(list(EntradaTimeline.objects.values_list('momento_id', flat=True)), [momentos[1].pk])
+        self.assertEqual(self.titulos(), ['bia1'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.clientes['bia'].patch('/api/auth/user/', {'is_private': True}, format='json')
+        self.assertFalse(EntradaTimeline.objects.exists())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.clientes['bia'].patch('/api/auth/user/', {'is_private': False}, format='json')
+        self.assertEqual(self.titulos(), ['bia1'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resposta = self.clientes['ana'].delete('/api/auth/profile/bia/seguir/')
+        self.assertEqual(resposta.json(), {'seguindo': False, 'seguidores': 0})
+        self.assertEqual(self.titulos(), [])
+
+
+@override_settings(TASKS_ALWAYS_EAGER=True, RELACIONADOS_K=2)
+class RelacionadosTests(TestCase):
+    """momentos.relacionados: índice por coocorrência de tags, incremental e reconstruído"""
+
+    def setUp(self):
+        self.bia = Usuario.objects.create_user(username='bia', email='bia@example.com', password='x')
+        self.cliente = APIClient()
+
+    def criar(self, titulo, tags, **campos):
+        with self.captureOnCommitCallbacks(execute=True):
+            momento = Momento.objects.create(usuario=self.bia, titulo=titulo, video=f'videos/{titulo}.mp4', **campos)
+            for nome in tags:
+                momento.tags.add(Tag.objects.get_or_create(nome=nome, slug=nome)[0])
+        return momento
+
+    def sugestoes(self, momento):
+        resposta = self.cliente.get(f'/api/momentos/{momento.pk}/suggestions/')
+        self.assertEqual(resposta.status_code, 200)
+        return [sugestao['titulo'] for sugestao in resposta.json()]
+
+    def indice(self):
+        return set(MomentoRelacionado.objects.values_list('momento_id', 'relacionado_id'))
+
+    def test_tags_raras_pesam_mais_e_engajamento_desempata(self):
+        base = self.criar('base', ['futebol', 'vasco'])
+        self.criar('popular', ['futebol'], likes_count=5)
+        self.criar('raro', ['futebol', 'vasco'])
+        self.criar('morno', ['futebol'], likes_count=1)
+        self.criar('oculto', ['futebol', 'vasco'], is_private=True)
+
+        self.assertEqual(self.sugestoes(base), ['raro', 'popular'])
+        with self.assertNumQueries(4):
+            self.cliente.get(f'/api/momentos/{base.pk}/suggestions/')
+        # Pesos das listas antigas ficam defasados até a reconstrução; a ordem do momento se mantém
+        call_command('reconstruir_relacionados', stdout=StringIO())
+        self.assertEqual(self.sugestoes(base), ['raro', 'popular'])
+        self.assertEqual(len(self.indice()), 10)  # RELACIONADOS_K por momento, inclusive o privado
+
+        # Vizinho que fica privado some na leitura; a reconstrução repõe a vaga
+        Momento.objects.filter(titulo='raro').update(is_private=True)
+        self.assertEqual(self.sugestoes(base), ['popular'])
+        call_command('reconstruir_relacionados', stdout=StringIO())
+        self.assertEqual(self.sugestoes(base), ['popular', 'morno'])
+
+    def test_troca_de_tags_e_momento_privado(self):
+        base = self.criar('base', ['vasco'])
+        outro = self.criar('outro', ['futebol'])
+        self.assertEqual(self.sugestoes(base), [])
+
+        dona = APIClient()
+        dona.force_authenticate(self.bia)
+        with self.captureOnCommitCallbacks(execute=True):
+            dona.patch(f'/api/momentos/{outro.pk}/', {'tags': ['vasco', 'futebol']}, format='json')
+        self.assertEqual(self.sugestoes(base), ['outro'])
+        self.assertEqual(self.sugestoes(outro), ['base'])
+
+        Momento.objects.filter(pk=base.pk).update(is_private=True)
+        self.assertEqual(self.cliente.get(f'/api/momentos/{base.pk}/suggestions/').status_code, 403)
+        self.assertEqual(dona.get(f'/api/momentos/{base.pk}/suggestions/').json()[0]['titulo'], 'outro')
+
+    def test_privacidade_tira_e_recoloca_nas_listas(self):
+        base = self.criar('base', ['vasco'])
+        outro = self.criar('outro', ['vasco'])
+        cris = Usuario.objects.create_user(username='cris', email='cris@example.com', password='x')
+        with self.captureOnCommitCallbacks(execute=True):
+            do_cris = Momento.objects.create(usuario=cris, titulo='do_cris', video='videos/do_cris.mp4')
+            do_cris.tags.add(Tag.objects.get(slug='vasco'))
+        self.assertCountEqual(self.sugestoes(base), ['outro', 'do_cris'])
+
+        def salvar(instancia, is_private):
+            instancia.is_private = is_private
+            with self.captureOnCommitCallbacks(execute=True):
+                instancia.save()
+
+        # Uma leitura da linha anterior por save, compartilhada por arquivos, timeline e relacionados
+        outro.descricao = 'editado'
+        with self.assertNumQueries(2):
+            outro.save()
+
+        salvar(outro, True)
+        self.assertNotIn((base.pk, outro.pk), self.indice())
+        self.assertIn((outro.pk, base.pk), self.indice())  # a dona continua vendo as sugestões dele
+        salvar(cris, True)
+        self.assertFalse(MomentoRelacionado.objects.filter(relacionado=do_cris).exists())
+        self.assertEqual(self.sugestoes(base), [])
+
+        salvar(outro, False)
+        salvar(cris, False)
+        self.assertCountEqual(self.sugestoes(base), ['outro', 'do_cris'])
+        self.assertCountEqual(self.sugestoes(do_cris), ['outro', 'base'])
+
+
+@override_settings(STORAGES={'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'}})
+class HLSTests(TestCase):
+    """momentos.hls: comando do ffmpeg e arquivos servidos com a regra de visibilidade"""
+
+    def setUp(self):
+        self.ana = Usuario.objects.create_user(username='ana', email='ana@example.com', password='x')
+        self.momento = Momento.objects.create(usuario=self.ana, titulo='golaço', video='videos/golaco.mp4')
+        pasta = hls.pasta_do_momento(self.momento.pk, 'v1')
+        default_storage.save(f'{pasta}/master.m3u8', ContentFile(b'#EXTM3U\nv0.m3u8\n'))
+        default_storage.save(f'{pasta}/v0_000.ts', ContentFile(b'\x47' * 188))
+        Momento.objects.filter(pk=self.momento.pk).update(hls=f'{pasta}/master.m3u8', hls_status='pronto')
+
+    def test_escada_nao_amplia_e_audio_opcional(self):
+        cmd = ' '.join(hls.comando_ffmpeg('entrada', Path('saida'), 480, tem_audio=False))
+        self.assertIn('scale=-2:240', cmd)
+        self.assertIn('scale=-2:480', cmd)
+        self.assertNotIn('scale=-2:720', cmd)
+        self.assertNotIn('0:a:0', cmd)
+        self.assertIn('-var_stream_map v:0 v:1', cmd)
+
+    def test_processando_com_lease_vencido_volta_para_a_fila(self):
+        agora = timezone.now()
+        Momento.objects.filter(pk=self.momento.pk).update(
+            hls_status='processando', hls_lease_ate=agora + datetime.timedelta(minutes=5)
+        )
+        call_command('empacotar_hls', stdout=StringIO())
+        self.momento.refresh_from_db()
+        self.assertEqual(self.momento.hls_status, 'processando')  # outro worker está empacotando
+
+        # Worker caiu no meio do encode: retomado (aqui falha, o vídeo não existe no storage)
+        Momento.objects.filter(pk=self.momento.pk).update(hls_lease_ate=agora - datetime.timedelta(seconds=1))
+        with self.assertLogs('momentos.hls', 'WARNING'):
+            call_command('empacotar_hls', stdout=StringIO())
+        self.momento.refresh_from_db()
+        self.assertEqual((self.momento.hls_status, self.momento.hls_lease_ate), ('falhou', None))
+
+    def test_edicao_durante_empacotamento_preserva_hls(self):
+        # PATCH carrega o momento enquanto o worker empacota; o empacotamento termina antes do UPDATE
+        Momento.objects.filter(pk=self.momento.pk).update(
+            hls='', hls_status='processando', hls_lease_ate=timezone.now() + datetime.timedelta(minutes=5)
+        )
+        carregado = Momento.objects.get(pk=self.momento.pk)
+        pasta = hls.pasta_do_momento(self.momento.pk, 'v2')
+        Momento.objects.filter(pk=self.momento.pk).update(
+            hls=f'{pasta}/master.m3u8', hls_status='pronto', hls_lease_ate=None
+        )
+        serializer = MomentoUpdateSerializer(carregado, data={'titulo': 'editado'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.assertEqual(
+            Momento.objects.values_list('titulo', 'hls', 'hls_status', 'hls_lease_ate').get(pk=self.momento.pk),
+            ('editado', f'{pasta}/master.m3u8', 'pronto', None),
+        )
+
+    @override_settings(HTTP_CACHE_SHARED_MAX_AGE=60)
+    def test_serve_somente_momentos_visiveis(self):
+        client = Client()
+        url = f'/api/momentos/{self.momento.pk}/hls/v1/'
+        self.assertEqual(client.get(f'/api/momentos/{self.momento.pk}/').json()['hls'], f'http://testserver{url}master.m3u8')
+
+        resposta = client.get(f'{url}master.m3u8', HTTP_ACCEPT='application/vnd.apple.mpegurl')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta['Content-Type'], 'application/vnd.apple.mpegurl')
+        # Caches compartilhados só guardam por pouco tempo: a revogação abaixo chega a eles logo
+        self.assertEqual(set(resposta['Cache-Control'].split(', ')), {'public', 'max-age=3600', 's-maxage=60'})
+        self.assertEqual(len(b''.join(client.get(f'{url}v0_000.ts').streaming_content)), 188)
+        self.assertEqual(client.get(f'{url}v9_000.ts').status_code, 404)
+        self.assertEqual(client.get(f'{url}master.txt').status_code, 404)
+
+        # Reempacotado: a versão antiga deixa de ser servida, o detalhe aponta para a nova
+        pasta = hls.pasta_do_momento(self.momento.pk, 'v2')
+        default_storage.save(f'{pasta}/v0_000.ts', ContentFile(b'\x47' * 376))
+        Momento.objects.filter(pk=self.momento.pk).update(hls=f'{pasta}/master.m3u8')
+        self.assertEqual(client.get(f'{url}v0_000.ts').status_code, 404)
+        url = f'/api/momentos/{self.momento.pk}/hls/v2/'
+        self.assertEqual(client.get(f'/api/momentos/{self.momento.pk}/').json()['hls'], f'http://testserver{url}master.m3u8')
+        self.assertEqual(len(b''.join(client.get(f'{url}v0_000.ts').streaming_content)), 376)
+
+        # Revogação: privado deixa de ser servido a terceiros; o dono só recebe cópia privada
+        Momento.objects.filter(pk=self.momento.pk).update(is_private=True)
+        self.assertEqual(client.get(f'{url}v0_000.ts', HTTP_ACCEPT='video/mp2t').status_code, 403)
+        client.force_login(self.ana)
+        self.assertEqual(client.get(f'{url}v0_000.ts')['Cache-Control'], 'private, max-age=3600')
+
+
+class OrcamentoConsultasMixin:
+    """
+    Orçamento de consultas por endpoint. Cada caso de CASOS é
+    (nome, cliente, url, orçamento): é medido com os dados base e de novo
+    depois de crescer() multiplicar o volume ligado aos alvos (momentos do
+    autor e da tag, likes, comentários, notificações, usuários da busca).
+    Precisa caber no orçamento e não pode variar com o volume.
+    Clientes: 'anonimo', 'leitor' (logado) e 'autor' (dono dos alvos).
+    Ao reduzir consultas, baixe o orçamento junto.
+    """
+    CASOS = ()
+
+    @classmethod
+    def setUpTestData(cls):
+        # Ruído realista em volta dos alvos
+        gerar(usuarios=12, momentos=20, tags=6, media_likes=4, media_comentarios=2, prefixo='base', seed=1)
+        cls.autor = Usuario.objects.create_user(username='autor', email='autor@example.com', password='x')
+        cls.leitor = Usuario.objects.create_user(username='leitor', email='leitor@example.com', password='x')
+        cls.tag = Tag.objects.create(nome='orçamento', slug='orcamento')
+        cls.criar_volume(momentos=2, atores=2, prefixo='p')
+        cls.momento = Momento.objects.filter(usuario=cls.autor).earliest('created_at')
+
+    @classmethod
+    def criar_volume(cls, momentos, atores, prefixo):
+        """Momentos do autor (com a tag e o termo da busca) e atores que curtem, comentam e notificam"""
+        novos = [
+            Momento.objects.create(usuario=cls.autor, titulo=f'Golaço {prefixo}{i}', video=f'videos/{prefixo}{i}.mp4',
+                                   thumbnail=f'thumbnails/{prefixo}{i}.jpg')
+            for i in range(momentos)
+        ]
+        for momento in novos:
+            momento.tags.add(cls.tag)
+        alvo = Momento.objects.filter(usuario=cls.autor).earliest('created_at')
+        # 'autorXX' também entra na busca de usuários por 'autor'
+        usuarios = Usuario.objects.bulk_create([
+            Usuario(username=f'autor{prefixo}{i}', email=f'autor{prefixo}{i}@example.com') for i in range(atores)
+        ])
+        Like.objects.bulk_create([Like(usuario=u, momento=m) for u in usuarios for m in novos + [alvo]],
+                                 ignore_conflicts=True)
+        for momento in novos + [alvo]:
+            momento.likes_count = momento.likes.count()
+            momento.save(update_fields=['likes_count'])
+        Comentario.objects.bulk_create([Comentario(usuario=u, momento=alvo, texto='Que lance!') for u in usuarios])
+        # Uma linha de like não lida por momento (notificacao_like_aberta_unica)
+        Notificacao.objects.bulk_create([
+            Notificacao(usuario_destino=cls.autor, usuario_origem=u, momento=m, tipo='like', lida=u != usuarios[-1])
+            for u in usuarios for m in novos
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.clientes = {'anonimo': Client(), 'leitor': Client(), 'autor': Client()}
+        self.clientes['leitor'].force_login(self.leitor)
+        self.clientes['autor'].force_login(self.autor)
+
+    def medir(self, cliente, url):
+        url = url.format(momento=self.momento.pk, autor=self.autor.username, tag=self.tag.slug)
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self.clientes[cliente].get(url)
+        self.assertEqual(resposta.status_code, 200, url)
+        return len(consultas)
+
+    def test_orcamento_de_consultas(self):
+        pequeno = {nome: self.medir(cliente, url) for nome, cliente, url, _ in self.CASOS}
+        self.criar_volume(momentos=30, atores=25, prefixo='g')
+        for nome, cliente, url, orcamento in self.CASOS:
+            with self.subTest(nome):
+                self.assertLessEqual(pequeno[nome], orcamento, f'{nome}: acima do orçamento')
+                self.assertEqual(self.medir(cliente, url), pequeno[nome], f'{nome}: consultas crescem com o volume')
+
+
+class OrcamentoConsultasMomentosTests(OrcamentoConsultasMixin, TestCase):
+    CASOS = (
+        ('feed recentes (anônimo)', 'anonimo', '/api/momentos/', 4),
+        ('feed recentes', 'leitor', '/api/momentos/', 7),
+        ('feed trending', 'leitor', '/api/momentos/?sort=trending', 7),
+        ('feed popular', 'leitor', '/api/momentos/?sort=popular', 7),
+        ('feed página mínima', 'leitor', '/api/momentos/?page_size=1', 7),
+        ('feed página máxima', 'leitor', '/api/momentos/?page_size=24', 7),
+        ('feed por tag', 'leitor', '/api/momentos/?tag={tag}', 7),
+        ('feed por tag (anônimo)', 'anonimo', '/api/momentos/?tag={tag}', 4),
+        ('feed busca', 'leitor', '/api/momentos/?search=golaço', 7),
+        ('feed por usuário', 'anonimo', '/api/momentos/?usuario={autor}', 4),
+        ('detalhe (anônimo)', 'anonimo', '/api/momentos/{momento}/', 6),
+        ('detalhe', 'leitor', '/api/momentos/{momento}/', 9),
+        ('comentários', 'anonimo', '/api/momentos/{momento}/comentarios/', 2),
+        ('notificações', 'autor', '/api/momentos/notificacoes/', 3),
+        ('tags', 'anonimo', '/api/momentos/tags/', 2),
+    )
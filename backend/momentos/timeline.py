@@ -0,0 +1,208 @@
+"""
+Timeline "seguindo" com fan-out híbrido
+Localização: backend/momentos/timeline.py
+
+Montar a timeline na leitura com usuario__in=<seguidos> é um JOIN com todos
+os autores seguidos (milhares) a cada página. Aqui ela é pré-computada:
+- push: ao ser publicado, o momento público de um autor comum é copiado
+  para EntradaTimeline de cada seguidor, em lotes de TIMELINE_LOTE
+  (thread de tarefas, depois do commit);
+- pull: autores com TIMELINE_LIMIAR_PULL seguidores ou mais não são
+  distribuídos (seriam milhões de linhas por post); na leitura, cada um
+  deles (e o próprio usuário) contribui só com os momentos mais recentes
+  que a página pode precisar, buscados pelo índice (usuario, -created_at),
+  e a página é a fusão dessas listas curtas com as entradas entregues;
+- cada timeline guarda ~TIMELINE_LIMITE entradas: a poda é amortizada e
+  roda, em média, a cada TIMELINE_PODA_PERIODO entregas para o seguidor;
+- privacidade: momento ou perfil que fica privado tem as entradas revogadas
+  (e redistribuídas se voltar a ser público); deixar de seguir remove as
+  do autor. A leitura ainda passa por visible_to: uma entrada ainda não
+  revogada nunca expõe um momento privado.
+Seguir alguém preenche a timeline com os TIMELINE_PREENCHER momentos mais
+recentes do autor.
+"""
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+from django.db.models.signals import post_save
+
+from config.logs import registrar_evento
+from usuarios.models import Seguidor
+
+from .alteracoes import privacidade_alterada
+from .models import EntradaTimeline, Momento
+from .tasks import enfileirar
+
+logger = logging.getLogger(__name__)
+
+Usuario = get_user_model()
+
+
+def timeline(usuario, antes=None, profundidade=None):
+    """
+    Momentos da timeline: entradas pré-computadas + autores grandes seguidos + os próprios.
+    De cada autor lido por pull entram só os `profundidade` momentos visíveis mais
+    recentes publicados antes de `antes` (padrão: TIMELINE_LIMITE, a mesma profundidade das
+    entradas entregues), em vez de um OR com todos os momentos desses autores.
+    """
+    profundidade = profundidade or settings.TIMELINE_LIMITE
+    visiveis = Momento.objects.visible_to(usuario)
+    if antes is not None:
+        visiveis = visiveis.filter(created_at__lt=antes)
+    autores = [usuario.pk, *Seguidor.objects.filter(
+        seguidor=usuario, seguido__seguidores_count__gte=settings.TIMELINE_LIMIAR_PULL
+    ).values_list('seguido_id', flat=True)]
+    # Top-N de cada autor pelo índice (usuario, -created_at); UNION ALL em uma consulta onde o banco permite
+    recentes = [
+        visiveis.filter(usuario_id=autor_id).order_by('-created_at', '-id').values_list('pk', flat=True)[:profundidade]
+        for autor_id in autores
+    ]
+    if len(recentes) > 1 and connection.features.supports_slicing_ordering_in_compound:
+        recentes = [recentes[0].union(*recentes[1:], all=True)]
+    puxados = [pk for consulta in recentes for pk in consulta]
+    entregues = EntradaTimeline.objects.filter(usuario=usuario).values('momento_id')
+    return Momento.objects.visible_to(usuario).filter(Q(pk__in=entregues) | Q(pk__in=puxados))
+
+
+def _distribuiveis():
+    """Momentos que entram por push: públicos, de perfis públicos e ativos, de autores comuns"""
+    return Momento.objects.filter(
+        is_private=False, usuario__is_private=False, usuario__is_active=True,
+        usuario__seguidores_count__lt=settings.TIMELINE_LIMIAR_PULL,
+    )
+
+
+def _podar(usuario_ids):
+    """Mantém só as TIMELINE_LIMITE entradas mais recentes de cada timeline"""
+    if not usuario_ids:
+        return 0
+    excedentes = list(
+        EntradaTimeline.objects.filter(usuario_id__in=usuario_ids)
+        .annotate(posicao=Window(
+            RowNumber(), partition_by=F('usuario_id'), order_by=[F('created_at').desc(), F('id').desc()]
+        ))
+        .filter(posicao__gt=settings.TIMELINE_LIMITE)
+        .values_list('pk', flat=True)
+    )
+    if not excedentes:
+        return 0
+    return EntradaTimeline.objects.filter(pk__in=excedentes).delete()[0]
+
+
+def _entregar(usuario_ids, momentos, podar):
+    """Insere (momento_id, autor_id, created_at) nas timelines e poda as indicadas"""
+    with transaction.atomic():
+        EntradaTimeline.objects.bulk_create(
+            [
+                EntradaTimeline(usuario_id=usuario_id, momento_id=momento_id, autor_id=autor_id, created_at=criado)
+                for usuario_id in usuario_ids
+                for momento_id, autor_id, criado in momentos
+            ],
+            ignore_conflicts=True,
+        )
+        _podar(podar)
+
+
+def distribuir(momento_id):
+    """Tarefa: push do momento para as timelines dos seguidores do autor"""
+    momento = _distribuiveis().filter(pk=momento_id).values_list('pk', 'usuario_id', 'created_at').first()
+    if momento is None:
+        return
+    periodo = settings.TIMELINE_PODA_PERIODO
+    entregues = ultimo = 0
+    while True:
+        lote = list(
+            Seguidor.objects.filter(seguido_id=momento[1], pk__gt=ultimo)
+            .order_by('pk').values_list('pk', 'seguidor_id')[:settings.TIMELINE_LOTE]
+        )
+        if not lote:
+            break
+        ultimo = lote[-1][0]
+        seguidores = [seguidor_id for _, seguidor_id in lote]
+        # Poda amortizada: cada timeline é podada em ~1 de cada `periodo` entregas
+        _entregar(seguidores, [momento], [s for s in seguidores if (s + momento_id) % periodo == 0])
+        entregues += len(seguidores)
+    registrar_evento(logger, 'timeline.fanout', momento=momento_id, seguidores=entregues)
+
+
+def preencher(seguidor_id, autor_id):
+    """Tarefa: ao seguir, entrega os momentos recentes do autor (se ele for distribuído por push)"""
+    recentes = list(
+        _distribuiveis().filter(usuario_id=autor_id).order_by('-created_at')
+        .values_list('pk', 'usuario_id', 'created_at')[:settings.TIMELINE_PREENCHER]
+    )
+    if recentes:
+        _entregar([seguidor_id], recentes, [seguidor_id])
+
+
+def _apagar_em_lotes(entradas):
+    removidas = 0
+    while True:
+        pks = list(entradas.order_by().values_list('pk', flat=True)[:settings.TIMELINE_LOTE])
+        if not pks:
+            return removidas
+        removidas += EntradaTimeline.objects.filter(pk__in=pks).delete()[0]
+
+
+def revogar_momento(momento_id):
+    """Tarefa: tira o momento de todas as timelines"""
+    removidas = _apagar_em_lotes(EntradaTimeline.objects.filter(momento_id=momento_id))
+    registrar_evento(logger, 'timeline.revogada', momento=momento_id, entradas=removidas)
+
+
+def revogar_autor(autor_id, usuario_id=None):
+    """Tarefa: tira os momentos do autor de todas as timelines (ou só da de `usuario_id`)"""
+    entradas = EntradaTimeline.objects.filter(autor_id=autor_id)
+    if usuario_id is not None:
+        entradas = entradas.filter(usuario_id=usuario_id)
+    removidas = _apagar_em_lotes(entradas)
+    registrar_evento(logger, 'timeline.revogada', autor=autor_id, usuario=usuario_id, entradas=removidas)
+
+
+def redistribuir_autor(autor_id):
+    """Tarefa: perfil que voltou a ser público entrega de novo os momentos recentes"""
+    recentes = _distribuiveis().filter(usuario_id=autor_id).order_by('-created_at')
+    for momento_id in recentes.values_list('pk', flat=True)[:settings.TIMELINE_PREENCHER]:
+        distribuir(momento_id)
+
+
+def seguir(seguidor, seguido):
+    """Passa a seguir (idempotente). Retorna True se a relação foi criada agora."""
+    with transaction.atomic():
+        _, criado = Seguidor.objects.get_or_create(seguidor=seguidor, seguido=seguido)
+        if criado:
+            Usuario.objects.filter(pk=seguido.pk).update(seguidores_count=F('seguidores_count') + 1)
+            enfileirar(preencher, seguidor.pk, seguido.pk)
+    return criado
+
+
+def deixar_de_seguir(seguidor, seguido):
+    """Deixa de seguir (idempotente). Retorna True se havia a relação."""
+    with transaction.atomic():
+        removidos, _ = Seguidor.objects.filter(seguidor=seguidor, seguido=seguido).delete()
+        if removidos:
+            Usuario.objects.filter(pk=seguido.pk).update(seguidores_count=F('seguidores_count') - 1)
+            enfileirar(revogar_autor, seguido.pk, seguidor.pk)
+    return bool(removidos)
+
+
+def _ao_criar_momento(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not instance.is_private:
+        enfileirar(distribuir, instance.pk)
+
+
+def _ao_mudar_privacidade(sender, instance, **kwargs):
+    """Momento ou perfil que muda de privacidade: revoga ou redistribui as entradas"""
+    if sender is Momento:
+        enfileirar(revogar_momento if instance.is_private else distribuir, instance.pk)
+    else:
+        enfileirar(revogar_autor if instance.is_private else redistribuir_autor, instance.pk)
+
+
+def conectar():
+    post_save.connect(_ao_criar_momento, sender=Momento, dispatch_uid='timeline_distribuir')
+    privacidade_alterada.connect(_ao_mudar_privacidade, dispatch_uid='timeline_privacidade')
@@ -1,9 +1,13 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     MomentoListCreateView,
+    TimelineView,
     MomentoDetailView,
     MomentoIncrementViewView,
     MomentoLikeView,
+    MomentoHLSView,
+    MomentoSugestoesView,
     ComentarioListCreateView,
     ComentarioDeleteView,
     TagListView,
@@ -13,12 +17,26 @@ from .views import (
 
 app_name = 'momentos'
 
+# Sob ASGI (ASYNC_VIEWS=True), os GETs mais acessados usam as views assíncronas
+if settings.ASYNC_VIEWS:
+    from .async_views import MomentoListCreateAsyncView, MomentoDetailAsyncView, NotificacaoListAsyncView
+    momento_list_create = MomentoListCreateAsyncView.as_view()
+    momento_detail = MomentoDetailAsyncView.as_view()
+    notificacao_list = NotificacaoListAsyncView.as_view()
+else:
+    momento_list_create = MomentoListCreateView.as_view()
+    momento_detail = MomentoDetailView.as_view()
+    notificacao_list = NotificacaoListView.as_view()
+
 urlpatterns = [
     # Momentos
-    path('', MomentoListCreateView.as_view(), name='momento-list-create'),
-    path('<int:pk>/', MomentoDetailView.as_view(), name='momento-detail'),
+    path('', momento_list_create, name='momento-list-create'),
+    path('timeline/', TimelineView.as_view(), name='timeline'),
+    path('<int:pk>/', momento_detail, name='momento-detail'),
     path('<int:pk>/view/', MomentoIncrementViewView.as_view(), name='momento-increment-view'),
     path('<int:pk>/like/', MomentoLikeView.as_view(), name='momento-like'),
+    path('<int:pk>/hls/<str:versao>/<str:arquivo>', MomentoHLSView.as_view(), name='momento-hls'),
+    path('<int:pk>/suggestions/', MomentoSugestoesView.as_view(), name='momento-suggestions'),
 
     # Comentários
     path('<int:pk>/comentarios/', ComentarioListCreateView.as_view(), name='comentario-list-create'),
@@ -28,6 +46,6 @@ urlpatterns = [
     path('tags/', TagListView.as_view(), name='tag-list'),
 
     # Notificação
-    path('notificacoes/', NotificacaoListView.as_view(), name='notificacao-list'),
+    path('notificacoes/', notificacao_list, name='notificacao-list'),
     path('notificacoes/marcar-lidas/', NotificacaoMarcarLidasView.as_view(), name='notificacao-marcar-lidas'),
 ]
\ No newline at end of file
@@ -2,11 +2,23 @@ from rest_framework import status, generics, filters
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.negotiation import BaseContentNegotiation
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Count
+from django.http import FileResponse, Http404
+from django.utils.cache import patch_cache_control
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from django.db import transaction
+from django.db.models import Q, Count, Prefetch
 from .models import Momento, Tag, Like, Comentario, Notificacao
+from . import hls, relacionados
+from .condicional import versao_momento, versao_tags
+from .feed import serializar_feed, valores_feed
+from .notificacoes import notificar_like, notificar_views
+from .timeline import timeline
 from .serializers import (
     MomentoListSerializer,
     MomentoDetailSerializer,
@@ -14,10 +26,14 @@ from .serializers import (
     MomentoUpdateSerializer,
     TagSerializer,
     ComentarioSerializer,
-    NotificacaoSerializer
+    NotificacaoSerializer,
+    COMENTARIOS_PREVIEW_LIMIT
 )
 import logging
 
+from config.logs import registrar_evento
+from config.replicas import replica
+
 # Logger para debug
 logger = logging.getLogger(__name__)
 
@@ -27,6 +43,32 @@ class MomentoPagination(PageNumberPagination):
     page_size_query_param = 'page_size'  # Permite customizar: ?page_size=12
     max_page_size = 24  # Máximo de 24 por página
 
+def momento_inacessivel(request, pk):
+    """
+    Caminho raro, após uma escrita condicional não afetar nenhuma linha:
+    diferencia momento inexistente (404) de momento privado (403).
+    """
+    if Momento.objects.filter(pk=pk).exists():
+        return Response(
+            {'error': 'Este vídeo é privado'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    raise Http404
+
+# Timeline: cursor (estável com entregas novas chegando no topo)
+class TimelinePagination(CursorPagination):
+    page_size = 9
+    page_size_query_param = 'page_size'
+    max_page_size = 24
+    ordering = ('-created_at', '-id')
+
+# Paginação por cursor para comentários (estável mesmo com inserções concorrentes)
+class ComentarioPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+    ordering = ('created_at', 'id')
+
 class MomentoListCreateView(generics.ListCreateAPIView):
     """
     GET /api/momentos/ - Lista todos os momentos (com paginação)
@@ -39,41 +81,22 @@ class MomentoListCreateView(generics.ListCreateAPIView):
     pagination_class = MomentoPagination
 
     def get_queryset(self):
-        queryset = Momento.objects.select_related('usuario').prefetch_related('tags')
-
-        # LÓGICA DE PRIVACIDADE DE USUÁRIOS (já existente)
-        if self.request.user.is_authenticated:
-            queryset = queryset.filter(
-                Q(usuario__is_private=False) | Q(usuario=self.request.user)
-            ).distinct()
-        else:
-            queryset = queryset.filter(usuario__is_private=False)
-
-        # LÓGICA DE PRIVACIDADE DE VÍDEOS (com verificação de campo)
-        # Mostrar apenas vídeos públicos OU vídeos privados do próprio usuário
-        try:
-            if self.request.user.is_authenticated:
-                queryset = queryset.filter(
-                    Q(is_private=False) | Q(usuario=self.request.user)
-                ).distinct()
-            else:
-                # Usuários deslogados veem apenas vídeos públicos
-                queryset = queryset.filter(is_private=False)
-        except Exception as e:
-            # Se o campo is_private não existir ainda, ignora o filtro
-            logger.warning(f"Campo is_private não encontrado: {e}")
+        # LÓGICA DE PRIVACIDADE (perfil + vídeo) centralizada em Momento.objects.visible_to
+        queryset = (
+            Momento.objects.visible_to(self.request.user)
+            .select_related('usuario')
+            .prefetch_related('tags')
+        )
 
         # Filtrar por tag
         tag = self.request.query_params.get('tag', None)
         if tag:
             queryset = queryset.filter(tags__slug=tag)
-            logger.info(f"🏷️ Filtrando por tag: {tag}")
 
         # Filtrar por usuário
         usuario = self.request.query_params.get('usuario', None)
         if usuario:
             queryset = queryset.filter(usuario__username=usuario)
-            logger.info(f"👤 Filtrando por usuário: {usuario}")
 
         # Busca por texto
         search = self.request.query_params.get('search', None)
@@ -83,25 +106,19 @@ class MomentoListCreateView(generics.ListCreateAPIView):
                 Q(descricao__icontains=search) |
                 Q(tags__nome__icontains=search)
             ).distinct()
-            logger.info(f"🔍 Busca por texto: {search}")
 
         sort_by = self.request.query_params.get('sort', 'recent')
-        logger.info(f"📊 Ordenação solicitada: {sort_by}")
 
         if sort_by == 'trending':
             queryset = queryset.order_by('-views', '-created_at')
-            logger.info(f"🔥 Ordenando por views (trending/em alta)")
 
         elif sort_by == 'popular':
-            queryset = queryset.annotate(
-                likes_count=Count('likes', distinct=True)
-            ).order_by('-likes_count', '-views', '-created_at')
-            logger.info(f"❤️ Ordenando por curtidas (popular)")
+            queryset = queryset.order_by('-likes_count', '-views', '-created_at')
 
         else:  # recent (padrão)
             queryset = queryset.order_by('-created_at')
-            logger.info(f"📅 Ordenando por data (recent)")
 
+        registrar_evento(logger, 'feed.consulta', logging.DEBUG, sort=sort_by, tag=tag, usuario=usuario, search=search)
         return queryset
 
     def get_serializer_class(self):
@@ -109,8 +126,43 @@ class MomentoListCreateView(generics.ListCreateAPIView):
             return MomentoCreateSerializer
         return MomentoListSerializer
 
+    def list(self, request, *args, **kwargs):
+        # Caminho rápido de leitura: mesma saída do MomentoListSerializer (ver momentos/feed.py)
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(valores_feed(queryset))
+        return self.get_paginated_response(serializar_feed(page, request))
+
     def perform_create(self, serializer):
-        serializer.save(usuario=self.request.user)
+        # Atômico: a referência ao conteúdo deduplicado (momentos/conteudo.py) segue o INSERT
+        with transaction.atomic():
+            momento = serializer.save(usuario=self.request.user)
+        if settings.HLS_ATIVO:
+            hls.agendar(momento.pk)
+
+class TimelineView(generics.ListAPIView):
+    """
+    GET /api/momentos/timeline/ - Momentos de quem o usuário segue (e os próprios)
+    Pré-computada por fan-out na publicação; ver momentos/timeline.py
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = TimelinePagination
+
+    def get_queryset(self):
+        # Páginas para frente só precisam, de cada autor puxado, dos momentos que o
+        # CursorPagination lê: created_at < posição, [offset:offset + página + 1]
+        cursor = self.paginator.decode_cursor(self.request)
+        if cursor is None:
+            return timeline(self.request.user, profundidade=self.paginator.get_page_size(self.request) + 1)
+        if cursor.reverse or cursor.position is None:
+            return timeline(self.request.user)
+        return timeline(
+            self.request.user, antes=cursor.position,
+            profundidade=cursor.offset + self.paginator.get_page_size(self.request) + 1,
+        )
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(valores_feed(self.get_queryset()))
+        return self.get_paginated_response(serializar_feed(page, request))
 
 class MomentoDetailView(APIView):
     """
@@ -121,24 +173,38 @@ class MomentoDetailView(APIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get_object(self, pk):
-        momento = get_object_or_404(
-            Momento.objects.select_related('usuario').prefetch_related('tags', 'comentarios'),
-            pk=pk
+        comentarios_preview = Comentario.objects.filter(usuario__is_active=True).select_related('usuario').order_by(
+            'created_at', 'id'
+        )[:COMENTARIOS_PREVIEW_LIMIT]
+        queryset = (
+            Momento.objects.visible_to(self.request.user)
+            .select_related('usuario')
+            .annotate(comentarios_count=Count('comentarios', distinct=True))
+            .prefetch_related(
+                'tags',
+                Prefetch('comentarios', queryset=comentarios_preview, to_attr='comentarios_preview')
+            )
         )
-        
-        # Isso evita erro se a migration ainda não foi executada
-        if hasattr(momento, 'is_private') and momento.is_private:
-            # Se o vídeo é privado, apenas o dono pode ver
-            if not self.request.user.is_authenticated or self.request.user != momento.usuario:
-                from rest_framework.exceptions import PermissionDenied
+        try:
+            return queryset.get(pk=pk)
+        except Momento.DoesNotExist:
+            # Existe mas não é visível para este usuário
+            if Momento.objects.filter(pk=pk).exists():
                 raise PermissionDenied("Este vídeo é privado")
-        
-        return momento
+            raise Http404
 
     def get(self, request, pk):
+        # GET condicional: 304 antes de carregar comentários/tags e serializar
+        versao = versao_momento(request, pk)
+        if versao is not None:
+            nao_modificado = versao.resposta_304(request)
+            if nao_modificado is not None:
+                return nao_modificado
+
         momento = self.get_object(pk)
         serializer = MomentoDetailSerializer(momento, context={'request': request})
-        return Response(serializer.data)
+        response = Response(serializer.data)
+        return versao.aplicar(response) if versao is not None else response
 
     def patch(self, request, pk):
         momento = self.get_object(pk)
@@ -152,7 +218,8 @@ class MomentoDetailView(APIView):
 
         serializer = MomentoUpdateSerializer(momento, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                serializer.save()
             return Response(MomentoDetailSerializer(momento, context={'request': request}).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -178,152 +245,227 @@ class MomentoIncrementViewView(APIView):
     POST /api/momentos/{id}/view/ - Incrementa view do momento
     """
     permission_classes = [IsAuthenticatedOrReadOnly]
+    throttle_scope = 'views'
 
     def post(self, request, pk):
-        momento = get_object_or_404(Momento, pk=pk)
-
-        # VERIFICAR PRIVACIDADE: Não permitir incrementar view de vídeo privado
-        if momento.is_private:
-            is_owner = request.user.is_authenticated and request.user == momento.usuario
-            if not is_owner:
-                return Response(
-                    {'error': 'Este vídeo é privado'},
-                    status=status.HTTP_403_FORBIDDEN
-                )
+        # Uma view por usuário por momento na janela: repetições não chegam ao banco.
+        # cache.add é atômico, então requisições concorrentes também só contam uma vez.
+        chave_dedup = f'view:{pk}:{request.user.pk}'
+        if not cache.add(chave_dedup, 1, timeout=settings.VIEWS_JANELA_DEDUP_MINUTOS * 60):
+            return Response({'message': 'View já contabilizada'}, status=status.HTTP_200_OK)
+
+        # UPDATE condicional: só incrementa se o momento for visível e o usuário não for o dono
+        queryset = Momento.objects.visible_to(request.user).filter(pk=pk)
+        if request.user.is_authenticated:
+            queryset = queryset.exclude(usuario=request.user)
+        rows = queryset.update_returning(
+            'views = views + 1', ['views', 'usuario_id']
+        )
 
-        # Não incrementar se for o dono
-        if request.user.is_authenticated and request.user == momento.usuario:
-            return Response(
-                {'message': 'Donos não incrementam views próprias', 'views': momento.views},
-                status=status.HTTP_200_OK
-            )
+        if not rows:
+            # Nada foi contado: libera a chave para não mascarar o 403/404 nas próximas
+            cache.delete(chave_dedup)
+            # Não incrementar se for o dono
+            if request.user.is_authenticated:
+                views = Momento.objects.filter(pk=pk, usuario=request.user).values_list('views', flat=True).first()
+                if views is not None:
+                    return Response(
+                        {'message': 'Donos não incrementam views próprias', 'views': views},
+                        status=status.HTTP_200_OK
+                    )
+            return momento_inacessivel(request, pk)
 
-        # Lógica de notificação de views
-        views_antes = momento.views
-        momento.incrementar_views()
-        views_depois = momento.views
-
-        # Criar notificação ao atingir 15 views
-        if views_depois == 15 and views_antes < 15:
-            try:
-                Notificacao.objects.create(
-                    usuario_destino=momento.usuario,
-                    momento=momento,
-                    tipo='view_milestone',
-                    mensagem=f'Seu momento "{momento.titulo}" atingiu 15 visualizações! 🚀'
-                )
-                logger.info(f"🎉 Notificação de 15 views criada para '{momento.titulo}'")
-            except Exception as e:
-                logger.error(f"Erro ao criar notificação de views: {e}")
+        views, usuario_id = rows[0]
+
+        # Notificar ao atingir 15 views (o UPDATE é atômico: apenas uma requisição vê 15)
+        if views == 15:
+            notificar_views(pk, usuario_id, 15)
 
-        logger.info(f"👁️ View incrementada para '{momento.titulo}': {momento.views} views")
+        registrar_evento(logger, 'momento.view', momento=pk, views=views)
 
         return Response(
-            {'message': 'View incrementada', 'views': momento.views},
+            {'message': 'View incrementada', 'views': views},
             status=status.HTTP_200_OK
         )
 
 class MomentoLikeView(APIView):
     """
-    POST /api/momentos/{id}/like/ - Curtir momento
-    DELETE /api/momentos/{id}/like/ - Descurtir momento
+    POST /api/momentos/{id}/like/ - Curtir momento (idempotente)
+    DELETE /api/momentos/{id}/like/ - Descurtir momento (idempotente)
     """
     permission_classes = [IsAuthenticated]
+    throttle_scope = 'likes'
 
     def post(self, request, pk):
-        momento = get_object_or_404(Momento, pk=pk)
-
-        if momento.is_private:
-            is_owner = request.user.is_authenticated and request.user == momento.usuario
-            if not is_owner:
-                return Response(
-                    {'error': 'Este vídeo é privado'},
-                    status=status.HTTP_403_FORBIDDEN
+        visiveis = Momento.objects.visible_to(request.user).filter(pk=pk)
+
+        with transaction.atomic():
+            # INSERT ... SELECT ... ON CONFLICT DO NOTHING: só insere se visível e ainda não curtido
+            inseridos = visiveis.insert_related(
+                Like,
+                {'usuario': request.user.pk, 'created_at': timezone.now()},
+                ignore_conflicts=True
+            )
+            if inseridos:
+                rows = Momento.objects.filter(pk=pk).update_returning(
+                    'likes_count = likes_count + 1', ['likes_count', 'usuario_id']
                 )
 
-        like, created = Like.objects.get_or_create(
-            usuario=request.user,
-            momento=momento
-        )
-
-        if created:
-            # Criar notificação de like (se não for o próprio dono)
-            if momento.usuario != request.user:
-                try:
-                    Notificacao.objects.create(
-                        usuario_destino=momento.usuario,
-                        usuario_origem=request.user,
-                        momento=momento,
-                        tipo='like',
-                        mensagem=f'{request.user.username} curtiu seu momento: "{momento.titulo}"'
-                    )
-                    logger.info(f"🎉 Notificação de like criada para '{momento.titulo}'")
-                except Exception as e:
-                    logger.error(f"Erro ao criar notificação de like: {e}")
-
-            logger.info(f"❤️ {request.user.username} curtiu '{momento.titulo}': {momento.total_likes} likes")
+        if not inseridos:
+            total_likes = visiveis.values_list('likes_count', flat=True).first()
+            if total_likes is None:
+                return momento_inacessivel(request, pk)
             return Response(
-                {
-                    'message': 'Momento curtido',
-                    'total_likes': momento.total_likes
-                },
-                status=status.HTTP_201_CREATED
-            )
-        else:
-            return Response(
-                {'message': 'Você já curtiu este momento'},
-                status=status.HTTP_400_BAD_REQUEST
+                {'message': 'Você já curtiu este momento', 'total_likes': total_likes},
+                status=status.HTTP_200_OK
             )
 
+        total_likes, usuario_id = rows[0]
+        notificar_like(pk, usuario_id, request.user.pk)
+
+        registrar_evento(logger, 'momento.like', momento=pk, usuario=request.user.pk, total_likes=total_likes)
+        return Response(
+            {
+                'message': 'Momento curtido',
+                'total_likes': total_likes
+            },
+            status=status.HTTP_201_CREATED
+        )
+
     def delete(self, request, pk):
-        momento = get_object_or_404(Momento, pk=pk)
-
-        if momento.is_private:
-            is_owner = request.user.is_authenticated and request.user == momento.usuario
-            if not is_owner:
-                return Response(
-                    {'error': 'Este vídeo é privado'},
-                    status=status.HTTP_403_FORBIDDEN
+        visiveis = Momento.objects.visible_to(request.user).filter(pk=pk)
+
+        with transaction.atomic():
+            # DELETE condicional: só remove o like se o momento ainda for visível
+            deleted, _ = Like.objects.filter(usuario=request.user, momento__in=visiveis).delete()
+            if deleted:
+                rows = Momento.objects.filter(pk=pk).update_returning(
+                    'likes_count = likes_count - 1', ['likes_count']
                 )
 
-        try:
-            like = Like.objects.get(usuario=request.user, momento=momento)
-            like.delete()
-            logger.info(f"💔 {request.user.username} descurtiu '{momento.titulo}': {momento.total_likes} likes")
+        if not deleted:
+            total_likes = visiveis.values_list('likes_count', flat=True).first()
+            if total_likes is None:
+                return momento_inacessivel(request, pk)
             return Response(
-                {
-                    'message': 'Like removido',
-                    'total_likes': momento.total_likes
-                },
+                {'message': 'Você não curtiu este momento', 'total_likes': total_likes},
                 status=status.HTTP_200_OK
             )
-        except Like.DoesNotExist:
-            return Response(
-                {'error': 'Você não curtiu este momento'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+
+        total_likes = rows[0][0]
+        registrar_evento(logger, 'momento.unlike', momento=pk, usuario=request.user.pk, total_likes=total_likes)
+        return Response(
+            {
+                'message': 'Like removido',
+                'total_likes': total_likes
+            },
+            status=status.HTTP_200_OK
+        )
+
+class IgnorarAccept(BaseContentNegotiation):
+    """Players HLS pedem m3u8/ts: os erros saem sempre no primeiro renderer (JSON)"""
+
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+class MomentoHLSView(APIView):
+    """
+    GET /api/momentos/{id}/hls/{versao}/{arquivo} - Playlists e segmentos HLS
+    Cada arquivo passa pela mesma regra de visibilidade do detalhe; só a
+    versão atual do pacote é servida.
+    """
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    content_negotiation_class = IgnorarAccept
+
+    def get(self, request, pk, versao, arquivo):
+        formato = hls.ARQUIVO_VALIDO.match(arquivo)
+        if formato is None:
+            raise Http404
+        linha = Momento.objects.visible_to(request.user).filter(pk=pk).values(
+            'hls', 'is_private', 'usuario__is_private'
+        ).first()
+        if linha is None:
+            return momento_inacessivel(request, pk)
+        if not linha['hls'] or versao != hls.versao_do_pacote(linha['hls']):
+            raise Http404
+
+        # A pasta vem da playlist do momento (pode ser o pacote reaproveitado de um vídeo idêntico)
+        try:
+            conteudo = hls._storage.open(f"{linha['hls'].rpartition('/')[0]}/{arquivo}")
+        except FileNotFoundError:
+            raise Http404
+        response = FileResponse(conteudo, content_type=hls.CONTENT_TYPES[formato.group(1)])
+        # Arquivos imutáveis (reempacotar grava outra versão, em outra URL). Caches
+        # compartilhados guardam só por HTTP_CACHE_SHARED_MAX_AGE: um vídeo que fica
+        # privado deixa de ser servido por eles logo; vídeos privados só no navegador
+        publico = not linha['is_private'] and not linha['usuario__is_private']
+        if publico:
+            patch_cache_control(response, public=True, max_age=3600, s_maxage=settings.HTTP_CACHE_SHARED_MAX_AGE)
+        else:
+            patch_cache_control(response, private=True, max_age=3600)
+        return response
+
+class MomentoSugestoesView(APIView):
+    """
+    GET /api/momentos/{id}/suggestions/ - Momentos relacionados (por tags)
+    Lidos do índice pré-computado; ver momentos/relacionados.py
+    """
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def get(self, request, pk):
+        if not Momento.objects.visible_to(request.user).filter(pk=pk).exists():
+            return momento_inacessivel(request, pk)
+        try:
+            limite = int(request.query_params.get('page_size', 9))
+        except ValueError:
+            limite = 9
+        limite = max(1, min(limite, settings.RELACIONADOS_K))
+        linhas = relacionados.sugestoes(request.user, pk, limite)
+        return Response(serializar_feed(linhas, request))
 
 class ComentarioListCreateView(APIView):
     """
-    GET /api/momentos/{id}/comentarios/ - Lista comentários
+    GET /api/momentos/{id}/comentarios/ - Lista comentários (paginação por cursor)
     POST /api/momentos/{id}/comentarios/ - Cria comentário
     """
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get(self, request, pk):
-        momento = get_object_or_404(Momento, pk=pk)
-        comentarios = momento.comentarios.select_related('usuario').order_by('created_at')
-        serializer = ComentarioSerializer(comentarios, many=True)
-        return Response(serializer.data)
+        if not Momento.objects.visible_to(request.user).filter(pk=pk).exists():
+            return momento_inacessivel(request, pk)
+        comentarios = Comentario.objects.filter(momento_id=pk, usuario__is_active=True).select_related('usuario')
+
+        pagination = ComentarioPagination()
+        page = pagination.paginate_queryset(comentarios, request, view=self)
+        serializer = ComentarioSerializer(page, many=True, context={'request': request})
+        return pagination.get_paginated_response(serializer.data)
 
     def post(self, request, pk):
-        momento = get_object_or_404(Momento, pk=pk)
-        serializer = ComentarioSerializer(data=request.data)
+        serializer = ComentarioSerializer(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # INSERT ... SELECT condicional: só comenta se o momento for visível
+        agora = timezone.now()
+        texto = serializer.validated_data['texto']
+        rows = Momento.objects.visible_to(request.user).filter(pk=pk).insert_related(
+            Comentario,
+            {'usuario': request.user.pk, 'texto': texto, 'created_at': agora, 'updated_at': agora}
+        )
+        if not rows:
+            return momento_inacessivel(request, pk)
 
-        if serializer.is_valid():
-            serializer.save(usuario=request.user, momento=momento)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        comentario = Comentario(
+            id=rows[0][0], usuario=request.user, momento_id=pk,
+            texto=texto, created_at=agora, updated_at=agora
+        )
+        return Response(
+            ComentarioSerializer(comentario, context={'request': request}).data,
+            status=status.HTTP_201_CREATED
+        )
 
 class ComentarioDeleteView(APIView):
     """
@@ -355,6 +497,13 @@ class TagListView(generics.ListAPIView):
     serializer_class = TagSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def list(self, request, *args, **kwargs):
+        versao = versao_tags(request)
+        nao_modificado = versao.resposta_304(request)
+        if nao_modificado is not None:
+            return nao_modificado
+        return versao.aplicar(super().list(request, *args, **kwargs))
+
 class NotificacaoListView(generics.ListAPIView):
     """
     GET /api/momentos/notificacoes/ - Lista notificações do usuário logado
@@ -363,10 +512,11 @@ class NotificacaoListView(generics.ListAPIView):
     serializer_class = NotificacaoSerializer
 
     def get_queryset(self):
-        # Retorna apenas as 30 mais recentes
-        return Notificacao.objects.filter(
+        # Retorna apenas as 30 mais recentes (mensagem é renderizada na leitura);
+        # notificações toleram atraso de replicação
+        return Notificacao.objects.using(replica()).filter(
             usuario_destino=self.request.user
-        ).order_by('-created_at')[:30]
+        ).select_related('usuario_origem', 'momento').order_by('-updated_at')[:30]
 
 
 class NotificacaoMarcarLidasView(APIView):
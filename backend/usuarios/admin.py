@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import Usuario
+from .models import EmailSaida, ExclusaoConta, Usuario
 
 @admin.register(Usuario)
 class UsuarioAdmin(UserAdmin):
@@ -22,4 +22,22 @@ class UsuarioAdmin(UserAdmin):
     
     def total_momentos(self, obj):
         return obj.momentos.count()
-    total_momentos.short_description = 'Total de Momentos'
\ No newline at end of file
+    total_momentos.short_description = 'Total de Momentos'
+
+
+@admin.register(EmailSaida)
+class EmailSaidaAdmin(admin.ModelAdmin):
+    list_display = ['assunto', 'destinatario', 'status', 'tentativas', 'proxima_tentativa', 'created_at', 'enviado_em']
+    list_filter = ['status', 'created_at']
+    search_fields = ['destinatario', 'assunto']
+    ordering = ['-created_at']
+    readonly_fields = ['tentativas', 'ultimo_erro', 'created_at', 'enviado_em']
+
+
+@admin.register(ExclusaoConta)
+class ExclusaoContaAdmin(admin.ModelAdmin):
+    list_display = ['username', 'status', 'etapa', 'tentativas', 'created_at', 'concluida_em']
+    list_filter = ['status', 'created_at']
+    search_fields = ['username']
+    ordering = ['-created_at']
+    readonly_fields = ['usuario', 'username', 'etapa', 'removidos', 'tentativas', 'ultimo_erro', 'created_at', 'concluida_em']
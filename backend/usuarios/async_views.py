@@ -0,0 +1,69 @@
+"""
+Views assíncronas (ASGI) de usuários
+Localização: backend/usuarios/async_views.py
+
+Ativadas com ASYNC_VIEWS=True. Ver momentos/async_views.py.
+"""
+import asyncio
+
+from django.contrib.auth import get_user_model
+from django.http import Http404
+
+from momentos.async_views import AsyncReadView, em_paralelo, paginar, resposta_json, resposta_paginada
+from momentos.condicional import versao_perfil
+from momentos.feed import serializar_feed, valores_feed
+from momentos.models import Momento
+from momentos.views import MomentoPagination
+from .serializers import UsuarioSerializer, anotar_totais
+from .views import PublicProfileView
+
+Usuario = get_user_model()
+
+
+class PublicProfileAsyncView(AsyncReadView):
+    """
+    GET /api/auth/profile/{username}/ - Perfil público (assíncrono)
+    Busca do usuário, COUNT e página de momentos rodam em paralelo
+    (os momentos são filtrados por username, sem depender da primeira consulta).
+    """
+    sync_view_class = PublicProfileView
+
+    async def get(self, request, username):
+        versao = await em_paralelo(versao_perfil)(request, username)
+        if versao is not None:
+            nao_modificado = versao.resposta_304(request)
+            if nao_modificado is not None:
+                return nao_modificado
+
+        momentos_queryset = valores_feed(
+            Momento.objects.visible_to(request.user)
+            .filter(usuario__username=username)
+            .select_related('usuario')
+            .prefetch_related('tags')
+            .order_by('-created_at')
+        )
+        buscar_usuario = em_paralelo(anotar_totais(Usuario.objects.filter(username=username, is_active=True), request.user).first)()
+
+        pagination, momentos, (user,) = await paginar(
+            momentos_queryset, request, MomentoPagination, buscar_usuario
+        )
+        if user is None:
+            # Mesma mensagem do get_object_or_404 da view síncrona
+            raise Http404('No %s matches the given query.' % Usuario._meta.object_name)
+
+        # LÓGICA DE PRIVACIDADE: Bloquear acesso se privado e não for o dono
+        is_owner = request.user.is_authenticated and request.user == user
+        if user.is_private and not is_owner:
+            return resposta_json({'error': 'Este perfil é privado'}, request, status=403)
+
+        user_serializer = UsuarioSerializer(user, context={'request': request})
+        user_data, momentos_data = await asyncio.gather(
+            em_paralelo(lambda: user_serializer.data)(),
+            em_paralelo(serializar_feed)(momentos, request),
+        )
+
+        response = resposta_json({
+            'user': user_data,
+            'momentos': resposta_paginada(pagination, momentos_data),
+        }, request)
+        return versao.aplicar(response) if versao is not None else response
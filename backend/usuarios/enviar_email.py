@@ -1,13 +1,12 @@
-from django.core.mail import EmailMultiAlternatives
-from django.conf import settings
+from .fila_email import enfileirar_email
 
 
 def send_password_reset_email(email, code, username=None):
     """
-    Envia um email de recuperação de senha com o código fornecido.
+    Enfileira um email de recuperação de senha com o código fornecido.
+    O envio (SMTP) acontece fora da requisição, via usuarios.fila_email.
     """
     subject = 'Recuperação de senha - Lance Certo'
-    from_email = getattr(settings, 'MY_EMAIL', None) or getattr(settings, 'DEFAULT_FROM_EMAIL', 'no-reply@lancecerto.com')
     text_content = f"Olá{(' ' + username) if username else ''},\n\nSeu código de recuperação é: { code }\n\nSe você não solicitou essa ação, ignore este email.\n\nAtenciosamente,\nEquipe Lance Certo"
 
     html_content = f"""
@@ -26,8 +25,5 @@ def send_password_reset_email(email, code, username=None):
     </html>
     """
 
-    msg = EmailMultiAlternatives(subject, text_content, from_email, [email])
-    msg.attach_alternative(html_content, "text/html")
-    # Dispara o envio, se houver qualquer erro, será lançado e o chamador pode tratá-lo
-    msg.send(fail_silently=False)
-    return True
\ No newline at end of file
+    # Remetente: DEFAULT_FROM_EMAIL, definido no envio
+    return enfileirar_email(email, subject, text_content, html_content)
\ No newline at end of file
@@ -0,0 +1,242 @@
+"""
+Exclusão de conta em segundo plano
+Localização: backend/usuarios/exclusao.py
+
+Usuario.delete() passaria pelo Collector do Django: carrega todos os
+dependentes na memória e apaga tudo em uma transação longa, travando likes,
+comentários e notificações de um criador com milhares de momentos.
+
+Aqui, solicitar_exclusao() só oculta o usuário (is_active=False: sai do feed,
+da busca e do perfil, e as sessões param de valer) e registra uma
+ExclusaoConta. processar_exclusoes() apaga os dependentes por ETAPAS, em
+lotes de EXCLUSAO_CONTA_LOTE linhas: cada lote é um SELECT de PKs + um DELETE
+por PK em uma transação curta, e o progresso (etapa e contagens) é salvo a
+cada lote. As etapas são idempotentes: um processo que cair é retomado pelo
+comando excluir_contas quando o lease expirar, a partir da etapa salva.
+
+Os likes do usuário descontam likes_count dos momentos curtidos no mesmo
+lote (o contador desnormalizado não deriva), assim como quem ele segue
+desconta seguidores_count. Os arquivos dos momentos são
+removidos após o commit (momentos.arquivos).
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from config.logs import registrar_evento
+from momentos.arquivos import agendar_remocao, arquivos_de
+from momentos.hls import agendar_remocao_pacotes
+from momentos.models import (
+    Comentario, EntradaTimeline, Like, Momento, MomentoRelacionado, Notificacao, NotificacaoAtor,
+)
+from momentos.tasks import enfileirar
+
+from .models import ExclusaoConta, Seguidor, Usuario
+
+logger = logging.getLogger(__name__)
+
+TagMomento = Momento.tags.through
+
+
+def _apagar_pks(model, pks):
+    """DELETE ... WHERE pk IN (...) direto, sem Collector nem sinais"""
+    if not pks:
+        return 0
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'DELETE FROM {table} WHERE {pk} IN ({placeholders})'.format(
+                table=qn(model._meta.db_table),
+                pk=qn(model._meta.pk.column),
+                placeholders=', '.join(['%s'] * len(pks)),
+            ),
+            pks,
+        )
+        return cursor.rowcount
+
+
+def _lote_simples(model, filtro):
+    def apagar(usuario_id, lote):
+        pks = list(model.objects.filter(filtro(usuario_id)).order_by().values_list('pk', flat=True)[:lote])
+        return _apagar_pks(model, pks)
+    return apagar
+
+
+def _lote_likes(usuario_id, lote):
+    """Likes dados pelo usuário: remove e desconta likes_count dos momentos curtidos"""
+    linhas = list(Like.objects.filter(usuario_id=usuario_id).order_by().values_list('pk', 'momento_id')[:lote])
+    removidos = _apagar_pks(Like, [pk for pk, _ in linhas])
+    # (usuario, momento) é único: cada momento aparece uma vez no lote
+    Momento.objects.filter(pk__in=[momento_id for _, momento_id in linhas]).update(
+        likes_count=F('likes_count') - 1
+    )
+    return removidos
+
+
+def _lote_seguindo(usuario_id, lote):
+    """Quem o usuário segue: remove e desconta seguidores_count dos seguidos"""
+    linhas = list(Seguidor.objects.filter(seguidor_id=usuario_id).order_by().values_list('pk', 'seguido_id')[:lote])
+    removidos = _apagar_pks(Seguidor, [pk for pk, _ in linhas])
+    Usuario.objects.filter(pk__in=[seguido_id for _, seguido_id in linhas]).update(
+        seguidores_count=F('seguidores_count') - 1
+    )
+    return removidos
+
+
+def _lote_momentos(usuario_id, lote):
+    """Momentos do usuário (já sem dependentes): remove e agenda a remoção dos arquivos"""
+    momentos = list(Momento.objects.filter(usuario_id=usuario_id).order_by().only('pk', 'video', 'thumbnail', 'hls')[:lote])
+    removidos = _apagar_pks(Momento, [momento.pk for momento in momentos])
+    agendar_remocao([arquivo for momento in momentos for arquivo in arquivos_de(momento)])
+    agendar_remocao_pacotes([momento.hls for momento in momentos if momento.hls])
+    return removidos
+
+
+def _lote_usuario(usuario_id, lote):
+    """Por último, a própria linha (o que resta é pequeno: grupos, permissões, avatar)"""
+    usuario = Usuario.objects.filter(pk=usuario_id).first()
+    if usuario is None:
+        return 0
+    usuario.delete()
+    return 1
+
+
+# Filhos antes dos pais: cada etapa só começa quando a anterior não tem mais linhas
+ETAPAS = [
+    ('likes', _lote_likes),
+    ('comentarios', _lote_simples(Comentario, lambda u: Q(usuario_id=u))),
+    ('likes_recebidos', _lote_simples(Like, lambda u: Q(momento__usuario_id=u))),
+    ('comentarios_recebidos', _lote_simples(Comentario, lambda u: Q(momento__usuario_id=u))),
+    ('atores_notificacoes', _lote_simples(NotificacaoAtor, lambda u: (
+        Q(usuario_id=u) | Q(notificacao__usuario_destino_id=u) | Q(notificacao__usuario_origem_id=u)
+        | Q(notificacao__momento__usuario_id=u)
+    ))),
+    ('notificacoes', _lote_simples(Notificacao, lambda u: (
+        Q(usuario_destino_id=u) | Q(usuario_origem_id=u) | Q(momento__usuario_id=u)
+    ))),
+    ('tags', _lote_simples(TagMomento, lambda u: Q(momento__usuario_id=u))),
+    ('relacionados', _lote_simples(MomentoRelacionado, lambda u: Q(momento__usuario_id=u) | Q(relacionado__usuario_id=u))),
+    ('timeline', _lote_simples(EntradaTimeline, lambda u: Q(usuario_id=u) | Q(autor_id=u))),
+    ('seguindo', _lote_seguindo),
+    ('seguidores', _lote_simples(Seguidor, lambda u: Q(seguido_id=u))),
+    ('momentos', _lote_momentos),
+    ('usuario', _lote_usuario),
+]
+
+
+def solicitar_exclusao(usuario):
+    """Oculta o usuário agora e agenda a remoção dos dados. Retorna a ExclusaoConta."""
+    agora = timezone.now()
+    with transaction.atomic():
+        Usuario.objects.filter(pk=usuario.pk).update(is_active=False, updated_at=agora)
+        exclusao = ExclusaoConta.objects.filter(usuario=usuario).exclude(status='concluida').first()
+        if exclusao is None:
+            exclusao = ExclusaoConta.objects.create(
+                usuario=usuario, username=usuario.username, proxima_tentativa=agora
+            )
+        enfileirar(_tarefa)
+    registrar_evento(logger, 'conta.exclusao_solicitada', usuario=usuario.pk, exclusao=exclusao.pk)
+    return exclusao
+
+
+def _reservar():
+    """Marca uma exclusão pronta como 'executando' (com lease) e a retorna."""
+    agora = timezone.now()
+    with transaction.atomic():
+        exclusao = (
+            ExclusaoConta.objects.select_for_update(skip_locked=True)
+            .filter(status__in=['pendente', 'executando'], proxima_tentativa__lte=agora)
+            .order_by('proxima_tentativa')
+            .first()
+        )
+        if exclusao is None:
+            return None
+        exclusao.status = 'executando'
+        exclusao.proxima_tentativa = agora + timedelta(seconds=settings.EXCLUSAO_CONTA_LEASE_SEGUNDOS)
+        exclusao.save(update_fields=['status', 'proxima_tentativa'])
+    return exclusao
+
+
+def _executar(exclusao, max_lotes):
+    """Avança a exclusão lote a lote. Retorna (concluiu, lotes executados)."""
+    if exclusao.usuario_id is None:
+        # A linha do usuário já foi removida (o processo caiu antes de marcar 'concluida')
+        return True, 0
+    nomes = [nome for nome, _ in ETAPAS]
+    inicio = nomes.index(exclusao.etapa) if exclusao.etapa in nomes else 0
+    lotes = 0
+    for nome, apagar in ETAPAS[inicio:]:
+        while True:
+            if max_lotes is not None and lotes >= max_lotes:
+                return False, lotes
+            with transaction.atomic():
+                removidos = apagar(exclusao.usuario_id, settings.EXCLUSAO_CONTA_LOTE)
+                exclusao.etapa = nome
+                exclusao.removidos[nome] = exclusao.removidos.get(nome, 0) + removidos
+                # Cada lote salvo renova o lease
+                exclusao.proxima_tentativa = timezone.now() + timedelta(seconds=settings.EXCLUSAO_CONTA_LEASE_SEGUNDOS)
+                exclusao.save(update_fields=['etapa', 'removidos', 'proxima_tentativa'])
+            lotes += 1
+            if removidos < settings.EXCLUSAO_CONTA_LOTE or nome == 'usuario':
+                break
+            if settings.EXCLUSAO_CONTA_PAUSA_SEGUNDOS:
+                time.sleep(settings.EXCLUSAO_CONTA_PAUSA_SEGUNDOS)
+    return True, lotes
+
+
+def _registrar_falha(exclusao, exc):
+    exclusao.tentativas += 1
+    if exclusao.tentativas >= settings.EXCLUSAO_CONTA_MAX_TENTATIVAS:
+        status, proxima = 'falhou', timezone.now()
+    else:
+        atraso = settings.EXCLUSAO_CONTA_BACKOFF_SEGUNDOS * 2 ** (exclusao.tentativas - 1)
+        status, proxima = 'pendente', timezone.now() + timedelta(seconds=min(atraso, 3600))
+    ExclusaoConta.objects.filter(pk=exclusao.pk).update(
+        status=status, proxima_tentativa=proxima, tentativas=exclusao.tentativas, ultimo_erro=repr(exc)[:1000]
+    )
+    logger.warning('Falha na exclusão da conta %s (etapa %s, tentativa %s, %s): %r',
+                   exclusao.username, exclusao.etapa, exclusao.tentativas, status, exc)
+
+
+def processar_exclusoes(max_lotes=None):
+    """
+    Executa as exclusões prontas. Com max_lotes, para depois desse número de
+    lotes e devolve a exclusão em andamento à fila. Retorna (concluídas, restam).
+    """
+    concluidas = lotes = 0
+    while max_lotes is None or lotes < max_lotes:
+        exclusao = _reservar()
+        if exclusao is None:
+            return concluidas, False
+        try:
+            terminou, executados = _executar(exclusao, None if max_lotes is None else max_lotes - lotes)
+        except Exception as exc:
+            _registrar_falha(exclusao, exc)
+            continue
+        lotes += executados
+        if not terminou:
+            # Libera o lease: retomada na próxima tarefa ou pelo comando
+            ExclusaoConta.objects.filter(pk=exclusao.pk).update(status='pendente', proxima_tentativa=timezone.now())
+            return concluidas, True
+        ExclusaoConta.objects.filter(pk=exclusao.pk).update(
+            status='concluida', concluida_em=timezone.now(), ultimo_erro=''
+        )
+        concluidas += 1
+        registrar_evento(logger, 'conta.excluida', usuario=exclusao.username,
+                         linhas=sum(exclusao.removidos.values()))
+    return concluidas, True
+
+
+def _tarefa():
+    """
+    Na thread de tarefas, uma fatia de EXCLUSAO_CONTA_LOTES_POR_TAREFA lotes por
+    vez: o restante volta para o fim da fila, sem bloquear as outras tarefas.
+    """
+    _, restam = processar_exclusoes(settings.EXCLUSAO_CONTA_LOTES_POR_TAREFA)
+    if restam:
+        enfileirar(_tarefa)
@@ -0,0 +1,148 @@
+"""
+Fila durável de e-mails (caixa de saída em banco)
+Localização: backend/usuarios/fila_email.py
+
+enfileirar_email() só insere em EmailSaida e agenda o processamento para
+depois do commit (thread de momentos.tasks). processar_fila() reserva lotes
+(SELECT ... FOR UPDATE SKIP LOCKED + lease), envia cada lote por UMA conexão
+SMTP e reagenda falhas com backoff exponencial. O comando processar_emails
+faz o mesmo periodicamente (retentativas e e-mails de processos que caíram).
+
+Entrega "pelo menos uma vez": se o processo cair entre o envio e a marcação,
+o e-mail é reenviado quando o lease expirar.
+"""
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from config.logs import registrar_evento
+from momentos.tasks import enfileirar
+
+from .models import EmailSaida
+
+logger = logging.getLogger(__name__)
+
+# Erros que não melhoram com nova tentativa
+ERROS_PERMANENTES = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)
+
+
+def enfileirar_email(destinatario, assunto, texto, html=''):
+    """Insere o e-mail na caixa de saída; o envio acontece fora da requisição."""
+    email = EmailSaida.objects.create(
+        destinatario=destinatario,
+        assunto=assunto,
+        texto=texto,
+        html=html,
+        proxima_tentativa=timezone.now(),
+    )
+    enfileirar(processar_fila)
+    return email
+
+
+def _reservar_lote(tamanho):
+    """Marca até `tamanho` e-mails prontos como 'enviando' (com lease) e os retorna."""
+    agora = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            EmailSaida.objects.select_for_update(skip_locked=True)
+            .filter(status__in=['pendente', 'enviando'], proxima_tentativa__lte=agora)
+            .order_by('proxima_tentativa')
+            .values_list('pk', flat=True)[:tamanho]
+        )
+        if not ids:
+            return []
+        EmailSaida.objects.filter(pk__in=ids).update(
+            status='enviando',
+            tentativas=F('tentativas') + 1,
+            proxima_tentativa=agora + timedelta(seconds=settings.EMAIL_FILA_LEASE_SEGUNDOS),
+        )
+    return list(EmailSaida.objects.filter(pk__in=ids).order_by('pk'))
+
+
+def _registrar_falha(email, exc):
+    permanente = isinstance(exc, ERROS_PERMANENTES)
+    campos = {'ultimo_erro': repr(exc)[:1000]}
+    if permanente or email.tentativas >= settings.EMAIL_FILA_MAX_TENTATIVAS:
+        status, proxima = 'falhou', timezone.now()
+        # Não será reenviado: o conteúdo sai junto, como nos enviados
+        campos.update(texto='', html='')
+    else:
+        atraso = settings.EMAIL_FILA_BACKOFF_SEGUNDOS * 2 ** (email.tentativas - 1)
+        status, proxima = 'pendente', timezone.now() + timedelta(seconds=min(atraso, 3600))
+    EmailSaida.objects.filter(pk=email.pk).update(status=status, proxima_tentativa=proxima, **campos)
+    logger.warning('Falha ao enviar e-mail %s (tentativa %s, %s): %r', email.pk, email.tentativas, status, exc)
+
+
+def _fechar(conexao):
+    try:
+        conexao.close()
+    except Exception:
+        pass
+
+
+def _enviar_lote(emails):
+    """Envia o lote por uma única conexão SMTP (reaberta apenas se cair). Retorna quantos foram enviados."""
+    conexao = get_connection(fail_silently=False)
+    try:
+        conexao.open()
+    except Exception as exc:
+        # Servidor inacessível: nenhuma mensagem sai, todas voltam para a fila
+        for email in emails:
+            _registrar_falha(email, exc)
+        return 0
+
+    enviados = []
+    try:
+        for email in emails:
+            msg = EmailMultiAlternatives(
+                email.assunto, email.texto, settings.DEFAULT_FROM_EMAIL, [email.destinatario],
+                connection=conexao,
+            )
+            if email.html:
+                msg.attach_alternative(email.html, 'text/html')
+            try:
+                msg.send(fail_silently=False)
+            except Exception as exc:
+                _registrar_falha(email, exc)
+                if not isinstance(exc, ERROS_PERMANENTES):
+                    # A conexão pode ter ficado inutilizável: reabre para o resto do lote
+                    _fechar(conexao)
+                    try:
+                        conexao.open()
+                    except Exception:
+                        pass
+                continue
+            enviados.append(email.pk)
+    finally:
+        _fechar(conexao)
+
+    if enviados:
+        # O conteúdo não é mais necessário (ex.: códigos de recuperação)
+        EmailSaida.objects.filter(pk__in=enviados).update(
+            status='enviado', enviado_em=timezone.now(), texto='', html='', ultimo_erro=''
+        )
+    return len(enviados)
+
+
+def processar_fila(tamanho_lote=None):
+    """Envia todos os e-mails prontos, lote a lote. Retorna (enviados, falhas)."""
+    tamanho_lote = tamanho_lote or settings.EMAIL_FILA_LOTE
+    total_enviados = total_falhas = 0
+    while True:
+        lote = _reservar_lote(tamanho_lote)
+        if not lote:
+            break
+        enviados = _enviar_lote(lote)
+        total_enviados += enviados
+        total_falhas += len(lote) - enviados
+        registrar_evento(logger, 'email.lote', enviados=enviados, falhas=len(lote) - enviados)
+        if enviados == 0:
+            # Nada saiu (ex.: servidor fora): espera o backoff em vez de insistir agora
+            break
+    return total_enviados, total_falhas
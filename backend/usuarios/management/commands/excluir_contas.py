@@ -0,0 +1,43 @@
+"""
+Exclusões de conta pendentes
+Uso: python manage.py excluir_contas [--continuo] [--intervalo 10] [--status]
+
+Executa (ou retoma, a partir da etapa salva) as exclusões de conta da fila
+(ExclusaoConta), em lotes curtos (ver usuarios/exclusao.py). O servidor já
+processa as novas aos poucos na thread de tarefas; este comando termina as
+grandes de uma vez e recupera as de processos que caíram (lease expirado).
+Rodar periodicamente (ex.: cron a cada 10 minutos) ou com --continuo.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from usuarios.exclusao import processar_exclusoes
+from usuarios.models import ExclusaoConta
+
+
+class Command(BaseCommand):
+    help = 'Executa e retoma as exclusões de conta em segundo plano'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--continuo', action='store_true', help='Não termina: verifica a fila a cada --intervalo')
+        parser.add_argument('--intervalo', type=float, default=10, help='Segundos entre verificações (--continuo)')
+        parser.add_argument('--status', action='store_true', help='Apenas mostra o progresso das exclusões abertas')
+
+    def handle(self, *args, **options):
+        if options['status']:
+            for exclusao in ExclusaoConta.objects.exclude(status='concluida').order_by('created_at'):
+                linhas = ', '.join(f'{etapa} {total}' for etapa, total in exclusao.removidos.items()) or '-'
+                self.stdout.write(
+                    f'  {exclusao.username:<20} {exclusao.status:<10} etapa={exclusao.etapa or "-"} '
+                    f'tentativas={exclusao.tentativas} removidos: {linhas}'
+                )
+            return
+
+        while True:
+            concluidas, _ = processar_exclusoes()
+            if concluidas or not options['continuo']:
+                self.stdout.write(f'{concluidas} exclusões de conta concluídas.')
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
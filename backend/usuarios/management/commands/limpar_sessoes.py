@@ -0,0 +1,45 @@
+"""
+Limpeza de sessões expiradas
+Uso: python manage.py limpar_sessoes [--lote 1000] [--pausa 0.1] [--dry-run]
+
+Remove do banco as sessões expiradas em lotes pequenos (DELETE por chave,
+usando o índice de expire_date), em vez do DELETE único do clearsessions.
+Com SESSION_BACKEND=cache não há nada no banco: o próprio cache expira as chaves.
+Pensado para rodar periodicamente (ex.: cron diário).
+"""
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Remove sessões expiradas em lotes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Sessões por DELETE')
+        parser.add_argument('--pausa', type=float, default=0.1, help='Segundos entre lotes')
+        parser.add_argument('--dry-run', action='store_true', help='Apenas conta, não remove')
+
+    def handle(self, *args, **options):
+        agora = timezone.now()
+        expiradas = Session.objects.filter(expire_date__lt=agora).order_by()
+
+        if options['dry_run']:
+            self.stdout.write(f'{expiradas.count()} sessões expiradas seriam removidas.')
+            return
+
+        total = 0
+        while True:
+            chaves = list(expiradas.values_list('pk', flat=True)[:options['lote']])
+            if not chaves:
+                break
+            # Refaz o filtro de expiração: não remove uma sessão renovada entre a leitura e o DELETE
+            removidas, _ = Session.objects.filter(pk__in=chaves, expire_date__lt=agora).delete()
+            total += removidas
+            self.stdout.write(f'  {total} removidas...')
+            if options['pausa']:
+                time.sleep(options['pausa'])
+
+        self.stdout.write(self.style.SUCCESS(f'{total} sessões removidas.'))
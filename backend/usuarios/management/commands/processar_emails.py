@@ -0,0 +1,32 @@
+"""
+Processamento da fila de e-mails
+Uso: python manage.py processar_emails [--lote 50] [--continuo] [--intervalo 10]
+
+Envia os e-mails prontos da caixa de saída (EmailSaida), reaproveitando uma
+conexão SMTP por lote. Falhas voltam para a fila com backoff exponencial.
+Rodar periodicamente (ex.: cron a cada minuto) ou com --continuo.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from usuarios.fila_email import processar_fila
+
+
+class Command(BaseCommand):
+    help = 'Envia os e-mails pendentes da fila (com retentativas)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=settings.EMAIL_FILA_LOTE, help='E-mails por conexão SMTP')
+        parser.add_argument('--continuo', action='store_true', help='Não termina: verifica a fila a cada --intervalo')
+        parser.add_argument('--intervalo', type=float, default=10, help='Segundos entre verificações (--continuo)')
+
+    def handle(self, *args, **options):
+        while True:
+            enviados, falhas = processar_fila(options['lote'])
+            if enviados or falhas or not options['continuo']:
+                self.stdout.write(f'{enviados} enviados, {falhas} falhas (reagendadas ou descartadas).')
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,36 @@
+"""
+Servidor SMTP local para desenvolvimento (não envia nada para fora)
+Uso: python manage.py smtp_local [--port 1025]
+
+Com MY_EMAIL_HOST=127.0.0.1, MY_EMAIL_PORT=1025 e EMAIL_USE_TLS=False no .env,
+os e-mails da fila são "entregues" aqui e exibidos no console.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from usuarios.smtp_local import ServidorSMTPLocal
+
+
+class Command(BaseCommand):
+    help = 'Sobe um servidor SMTP local que exibe os e-mails recebidos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=1025)
+
+    def handle(self, *args, **options):
+        with ServidorSMTPLocal(options['host'], options['port']) as smtp:
+            self.stdout.write(self.style.SUCCESS(f'📬 SMTP local em {smtp.host}:{smtp.port} (Ctrl+C para sair)'))
+            exibidas = 0
+            try:
+                while True:
+                    time.sleep(0.5)
+                    for mensagem in smtp.mensagens[exibidas:]:
+                        self.stdout.write(f"\n✉️  Para: {mensagem['To']} | Assunto: {mensagem['Subject']}")
+                        corpo = mensagem.get_body(('plain',))
+                        if corpo is not None:
+                            self.stdout.write(corpo.get_content())
+                        exibidas += 1
+            except KeyboardInterrupt:
+                pass
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0004_email_saida'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExclusaoConta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(max_length=150, verbose_name='Username')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('executando', 'Executando'), ('concluida', 'Concluída'), ('falhou', 'Falhou')], default='pendente', max_length=10, verbose_name='Status')),
+                ('etapa', models.CharField(blank=True, max_length=30, verbose_name='Etapa atual')),
+                ('removidos', models.JSONField(default=dict, verbose_name='Linhas removidas')),
+                ('tentativas', models.IntegerField(default=0, verbose_name='Tentativas')),
+                ('proxima_tentativa', models.DateTimeField(verbose_name='Próxima tentativa')),
+                ('ultimo_erro', models.TextField(blank=True, verbose_name='Último erro')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('concluida_em', models.DateTimeField(blank=True, null=True, verbose_name='Concluída em')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='exclusoes', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Exclusão de conta',
+                'verbose_name_plural': 'Exclusões de conta',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('status__in', ['pendente', 'executando'])), fields=['proxima_tentativa'], name='exclusao_conta_pronta_idx')],
+            },
+        ),
+    ]
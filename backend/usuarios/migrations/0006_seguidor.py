@@ -0,0 +1,54 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('usuarios', '0005_exclusao_conta'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Seguidor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+            ],
+            options={
+                'verbose_name': 'Seguidor',
+                'verbose_name_plural': 'Seguidores',
+            },
+        ),
+        migrations.AddField(
+            model_name='usuario',
+            name='seguidores_count',
+            field=models.IntegerField(default=0, verbose_name='Seguidores'),
+        ),
+        migrations.AddIndex(
+            model_name='usuario',
+            index=models.Index(fields=['seguidores_count'], name='usuario_seguidores_idx'),
+        ),
+        migrations.AddField(
+            model_name='seguidor',
+            name='seguido',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='seguidores', to=settings.AUTH_USER_MODEL, verbose_name='Seguido'),
+        ),
+        migrations.AddField(
+            model_name='seguidor',
+            name='seguidor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='seguindo', to=settings.AUTH_USER_MODEL, verbose_name='Seguidor'),
+        ),
+        migrations.AddIndex(
+            model_name='seguidor',
+            index=models.Index(fields=['seguido', 'id'], name='seguidor_seguido_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='seguidor',
+            constraint=models.UniqueConstraint(fields=('seguidor', 'seguido'), name='seguidor_unico'),
+        ),
+    ]
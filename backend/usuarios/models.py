@@ -1,8 +1,10 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+
+from config.modelos import ContadoresMixin
 from momentos.validators import validate_avatar_size, validate_avatar_format
 
-class Usuario(AbstractUser):
+class Usuario(ContadoresMixin, AbstractUser):
     email = models.EmailField(unique=True, verbose_name='E-mail')
     avatar = models.ImageField(
         upload_to='avatars/', 
@@ -17,6 +19,9 @@ class Usuario(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='Atualizado em')
     is_private = models.BooleanField(default=False, verbose_name='Perfil Privado')
+    # Contador desnormalizado, mantido na mesma transação do INSERT/DELETE de Seguidor
+    # (fora do UPDATE de save() completos: config.modelos.ContadoresMixin)
+    seguidores_count = models.IntegerField(default=0, verbose_name='Seguidores')
     password_reset_code = models.CharField(max_length=10, blank=True, null=True)
     password_reset_sent_at = models.DateTimeField(null=True, blank=True)
     password_reset_attempts = models.IntegerField(default=0)
@@ -35,18 +40,134 @@ class Usuario(AbstractUser):
         help_text='Specific permissions for this user.'
     )
 
+    CONTADORES = ('seguidores_count',)
+
     class Meta:
         verbose_name = 'Usuário'
         verbose_name_plural = 'Usuários'
         ordering = ['-created_at']
+        indexes = [
+            # Timeline: autores grandes (lidos por pull, sem fan-out)
+            models.Index(fields=['seguidores_count'], name='usuario_seguidores_idx'),
+        ]
     
     def __str__(self):
         return self.username
-    
+
     @property
     def total_momentos(self):
         return self.momentos.count()
     
     @property
     def total_likes_recebidos(self):
-        return sum(momento.likes.count() for momento in self.momentos.all())
\ No newline at end of file
+        return self.momentos.aggregate(total=models.Sum('likes_count'))['total'] or 0
+
+class Seguidor(models.Model):
+    """Grafo de seguidores: `seguidor` segue `seguido` (timeline em momentos.timeline)"""
+    seguidor = models.ForeignKey(
+        Usuario, on_delete=models.CASCADE, related_name='seguindo', verbose_name='Seguidor'
+    )
+    seguido = models.ForeignKey(
+        Usuario, on_delete=models.CASCADE, related_name='seguidores',
+        db_index=False,  # coberto pelo índice (seguido, id)
+        verbose_name='Seguido'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
+
+    class Meta:
+        verbose_name = 'Seguidor'
+        verbose_name_plural = 'Seguidores'
+        constraints = [
+            models.UniqueConstraint(fields=['seguidor', 'seguido'], name='seguidor_unico'),
+        ]
+        indexes = [
+            # Fan-out: seguidores de um autor, em lotes por pk
+            models.Index(fields=['seguido', 'id'], name='seguidor_seguido_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.seguidor_id} segue {self.seguido_id}'
+
+class EmailSaida(models.Model):
+    """
+    Caixa de saída de e-mails (fila durável). As views apenas inserem aqui;
+    o envio é feito por usuarios.fila_email (thread de tarefas / comando processar_emails).
+    """
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('enviando', 'Enviando'),
+        ('enviado', 'Enviado'),
+        ('falhou', 'Falhou'),
+    ]
+
+    destinatario = models.EmailField(verbose_name='Destinatário')
+    assunto = models.CharField(max_length=200, verbose_name='Assunto')
+    texto = models.TextField(verbose_name='Texto')
+    html = models.TextField(blank=True, verbose_name='HTML')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pendente', verbose_name='Status')
+    tentativas = models.IntegerField(default=0, verbose_name='Tentativas')
+    # Próximo envio permitido (backoff) ou fim do "lease" de quem está enviando
+    proxima_tentativa = models.DateTimeField(verbose_name='Próxima tentativa')
+    ultimo_erro = models.TextField(blank=True, verbose_name='Último erro')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
+    enviado_em = models.DateTimeField(null=True, blank=True, verbose_name='Enviado em')
+
+    class Meta:
+        verbose_name = 'E-mail na fila'
+        verbose_name_plural = 'E-mails na fila'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['proxima_tentativa'],
+                condition=models.Q(status__in=['pendente', 'enviando']),
+                name='email_saida_pronto_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.assunto} -> {self.destinatario} ({self.status})'
+
+class ExclusaoConta(models.Model):
+    """
+    Exclusão de conta em segundo plano (ver usuarios.exclusao). O usuário é
+    ocultado na hora (is_active=False); os dependentes são apagados em lotes
+    e o progresso fica aqui, para retomar de onde parou.
+    """
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('executando', 'Executando'),
+        ('concluida', 'Concluída'),
+        ('falhou', 'Falhou'),
+    ]
+
+    # Vira NULL quando a linha do usuário é finalmente removida
+    usuario = models.ForeignKey(
+        Usuario, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='exclusoes', verbose_name='Usuário'
+    )
+    username = models.CharField(max_length=150, verbose_name='Username')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pendente', verbose_name='Status')
+    etapa = models.CharField(max_length=30, blank=True, verbose_name='Etapa atual')
+    # {etapa: linhas removidas}
+    removidos = models.JSONField(default=dict, verbose_name='Linhas removidas')
+    tentativas = models.IntegerField(default=0, verbose_name='Tentativas')
+    # Próxima execução permitida ou fim do "lease" de quem está executando
+    proxima_tentativa = models.DateTimeField(verbose_name='Próxima tentativa')
+    ultimo_erro = models.TextField(blank=True, verbose_name='Último erro')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='Criado em')
+    concluida_em = models.DateTimeField(null=True, blank=True, verbose_name='Concluída em')
+
+    class Meta:
+        verbose_name = 'Exclusão de conta'
+        verbose_name_plural = 'Exclusões de conta'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['proxima_tentativa'],
+                condition=models.Q(status__in=['pendente', 'executando']),
+                name='exclusao_conta_pronta_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'Exclusão de {self.username} ({self.status})'
@@ -1,9 +1,29 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+from config.replicas import replica
+from momentos.models import Momento
 from momentos.validators import validate_avatar_size
 
 Usuario = get_user_model()
 
+
+def anotar_totais(queryset, user):
+    """
+    Anota os totais do UsuarioSerializer (mesma regra de privacidade) para
+    listas e perfis sem N+1: subqueries avaliadas só nas linhas retornadas.
+    """
+    # O dono conta todos os seus momentos, os demais só os públicos
+    visiveis = Q(is_private=False)
+    if user is not None and user.is_authenticated:
+        visiveis |= Q(usuario_id=user.pk)
+    momentos = Momento.objects.filter(visiveis, usuario=OuterRef('pk')).order_by().values('usuario')
+    return queryset.annotate(
+        momentos_visiveis=Coalesce(Subquery(momentos.annotate(v=Count('pk')).values('v')[:1]), 0),
+        likes_visiveis=Coalesce(Subquery(momentos.annotate(v=Sum('likes_count')).values('v')[:1]), 0),
+    )
+
 class UsuarioSerializer(serializers.ModelSerializer):
     """Serializer básico do usuário (dados públicos)"""
     total_momentos = serializers.SerializerMethodField()
@@ -37,23 +57,63 @@ class UsuarioSerializer(serializers.ModelSerializer):
     
     def get_total_momentos(self, obj):
         """Retorna total de momentos considerando privacidade."""
+        if hasattr(obj, 'momentos_visiveis'):  # ver anotar_totais
+            return obj.momentos_visiveis
         request = self.context.get('request')
         is_owner = request and request.user.is_authenticated and request.user == obj
         
+        # Contadores toleram atraso de replicação
+        momentos = Momento.objects.using(replica()).filter(usuario=obj)
         if is_owner:
-            return obj.momentos.count()
+            return momentos.count()
         else:
-            return obj.momentos.filter(is_private=False).count()
+            return momentos.filter(is_private=False).count()
 
     def get_total_likes_recebidos(self, obj):
         """Retorna total de likes recebidos considerando privacidade."""
+        if hasattr(obj, 'likes_visiveis'):
+            return obj.likes_visiveis
         request = self.context.get('request')
         is_owner = request and request.user.is_authenticated and request.user == obj
         
-        if is_owner:
-            return sum(momento.likes.count() for momento in obj.momentos.all())
-        else:
-            return sum(momento.likes.count() for momento in obj.momentos.filter(is_private=False))
+        momentos = Momento.objects.using(replica()).filter(usuario=obj)
+        if not is_owner:
+            momentos = momentos.filter(is_private=False)
+        return momentos.aggregate(total=Sum('likes_count'))['total'] or 0
+
+class UsuarioSessaoSerializer(UsuarioSerializer):
+    """Usuário logado para o bootstrap do SPA: dados do perfil, sem os agregados (sem consultas extras)"""
+
+    class Meta(UsuarioSerializer.Meta):
+        fields = [
+            'id',
+            'username',
+            'email',
+            'first_name',
+            'last_name',
+            'avatar',
+            'bio',
+            'data_nascimento',
+            'created_at',
+            'is_private'
+        ]
+        read_only_fields = fields
+
+class UsuarioResumoSerializer(serializers.ModelSerializer):
+    """Serializer resumido do usuário (autor aninhado, sem agregados)"""
+    avatar = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Usuario
+        fields = ['id', 'username', 'first_name', 'last_name', 'avatar']
+        read_only_fields = fields
+
+    def get_avatar(self, obj):
+        """Retorna URL completa do avatar."""
+        request = self.context.get('request')
+        if obj.avatar and hasattr(obj.avatar, 'url'):
+            return request.build_absolute_uri(obj.avatar.url) if request else obj.avatar.url
+        return None
 
 class UsuarioCreateSerializer(serializers.ModelSerializer):
     """Serializer para criação de usuário (registro)"""
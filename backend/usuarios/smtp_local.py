@@ -0,0 +1,110 @@
+"""
+Servidor SMTP local mínimo (sem TLS/AUTH), para testes e desenvolvimento
+Localização: backend/usuarios/smtp_local.py
+
+Aceita qualquer mensagem e a guarda em memória; conta as conexões para
+verificar o reaproveitamento da conexão SMTP. Pode recusar destinatários
+ou derrubar conexões para simular falhas.
+
+Uso em testes:
+    with ServidorSMTPLocal() as smtp:
+        ... EMAIL_HOST='127.0.0.1', EMAIL_PORT=smtp.port, EMAIL_USE_TLS=False ...
+        smtp.mensagens  # lista de email.message.EmailMessage
+Uso em dev: python manage.py smtp_local --port 1025
+"""
+import email
+import email.policy
+import socketserver
+import threading
+
+
+class _Sessao(socketserver.StreamRequestHandler):
+    def responder(self, linha):
+        self.wfile.write(linha.encode() + b'\r\n')
+
+    def handle(self):
+        servidor = self.server.smtp
+        with servidor.lock:
+            servidor.conexoes += 1
+        self.responder('220 smtp-local pronto')
+        destinatarios = []
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                return
+            comando = linha.decode('latin-1').strip()
+            verbo = comando[:4].upper()
+
+            if verbo in ('EHLO', 'HELO'):
+                self.wfile.write(b'250-smtp-local\r\n250 8BITMIME\r\n' if verbo == 'EHLO' else b'250 smtp-local\r\n')
+            elif verbo == 'MAIL':
+                destinatarios = []
+                self.responder('250 OK')
+            elif verbo == 'RCPT':
+                destinatario = comando.partition(':')[2].strip().strip('<>')
+                if destinatario in servidor.recusar:
+                    self.responder('550 destinatário recusado')
+                else:
+                    destinatarios.append(destinatario)
+                    self.responder('250 OK')
+            elif verbo == 'DATA':
+                self.responder('354 termine com <CRLF>.<CRLF>')
+                dados = []
+                while True:
+                    parte = self.rfile.readline()
+                    if not parte or parte in (b'.\r\n', b'.\n'):
+                        break
+                    dados.append(parte[1:] if parte.startswith(b'..') else parte)
+                with servidor.lock:
+                    if servidor.derrubar_apos is not None and len(servidor.mensagens) >= servidor.derrubar_apos:
+                        return  # fecha a conexão sem responder
+                    mensagem = email.message_from_bytes(b''.join(dados), policy=email.policy.default)
+                    mensagem['X-Destinatarios'] = ', '.join(destinatarios)
+                    servidor.mensagens.append(mensagem)
+                self.responder('250 OK mensagem aceita')
+            elif verbo == 'RSET':
+                destinatarios = []
+                self.responder('250 OK')
+            elif verbo == 'NOOP':
+                self.responder('250 OK')
+            elif verbo == 'QUIT':
+                self.responder('221 tchau')
+                return
+            else:
+                self.responder('502 comando não implementado')
+
+
+class _ServidorTCP(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class ServidorSMTPLocal:
+    """Servidor SMTP em uma thread; use como context manager."""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.mensagens = []
+        self.conexoes = 0
+        self.recusar = set()
+        # Simula queda: fecha a conexão ao receber a mensagem de índice N
+        self.derrubar_apos = None
+        self.lock = threading.Lock()
+        self._tcp = _ServidorTCP((host, port), _Sessao)
+        self._tcp.smtp = self
+        self.host, self.port = self._tcp.server_address
+        self._thread = None
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._tcp.serve_forever, name='smtp-local', daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        self._tcp.shutdown()
+        self._tcp.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.parar()
@@ -1,3 +1,220 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from momentos.tests import OrcamentoConsultasMixin
+
+from .exclusao import processar_exclusoes
+from .fila_email import enfileirar_email, processar_fila
+from .models import EmailSaida, ExclusaoConta, Usuario
+from .smtp_local import ServidorSMTPLocal
+
+
+def smtp_settings(smtp, **extra):
+    return override_settings(
+        EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+        EMAIL_HOST=smtp.host, EMAIL_PORT=smtp.port, EMAIL_USE_TLS=False, EMAIL_USE_SSL=False,
+        EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='', EMAIL_TIMEOUT=5, **extra
+    )
+
+
+class FilaEmailTests(TestCase):
+    """Caixa de saída: uma conexão SMTP por lote, retentativas com backoff"""
+
+    def setUp(self):
+        self.smtp = ServidorSMTPLocal().iniciar()
+        self.addCleanup(self.smtp.parar)
+
+    def enfileirar(self, total):
+        return [enfileirar_email(f'u{i}@example.com', f'Assunto {i}', f'Código: {i}', f'<p>{i}</p>') for i in range(total)]
+
+    def test_lote_usa_uma_conexao(self):
+        self.enfileirar(5)
+        with smtp_settings(self.smtp):
+            self.assertEqual(processar_fila(tamanho_lote=10), (5, 0))
+
+        self.assertEqual(self.smtp.conexoes, 1)
+        self.assertEqual(len(self.smtp.mensagens), 5)
+        self.assertEqual(self.smtp.mensagens[0]['Subject'], 'Assunto 0')
+        enviados = EmailSaida.objects.filter(status='enviado')
+        self.assertEqual(enviados.count(), 5)
+        # O conteúdo (ex.: código de recuperação) não fica guardado após o envio
+        self.assertFalse(enviados.exclude(texto='').exists())
+
+    def test_servidor_fora_reagenda_com_backoff(self):
+        email, = self.enfileirar(1)
+        self.smtp.parar()
+        with smtp_settings(self.smtp, EMAIL_FILA_BACKOFF_SEGUNDOS=30):
+            self.assertEqual(processar_fila(), (0, 1))
+
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.tentativas), ('pendente', 1))
+        self.assertGreater(email.proxima_tentativa, timezone.now() + timedelta(seconds=20))
+        self.assertTrue(email.ultimo_erro)
+
+        # Ainda no backoff: nada a fazer
+        with smtp_settings(self.smtp):
+            self.assertEqual(processar_fila(), (0, 0))
+
+    def test_esgota_tentativas(self):
+        email, = self.enfileirar(1)
+        EmailSaida.objects.filter(pk=email.pk).update(tentativas=2)
+        self.smtp.parar()
+        with smtp_settings(self.smtp, EMAIL_FILA_MAX_TENTATIVAS=3):
+            processar_fila()
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'falhou')
+        # Sem novo envio, o conteúdo não fica guardado
+        self.assertEqual((email.texto, email.html), ('', ''))
+        self.assertTrue(email.ultimo_erro)
+
+    def test_destinatario_recusado_nao_interrompe_lote(self):
+        self.enfileirar(3)
+        self.smtp.recusar.add('u1@example.com')
+        with smtp_settings(self.smtp):
+            self.assertEqual(processar_fila(), (2, 1))
+        self.assertEqual(self.smtp.conexoes, 1)
+        recusado = EmailSaida.objects.get(destinatario='u1@example.com')
+        self.assertEqual((recusado.status, recusado.texto), ('falhou', ''))
+
+    def test_queda_no_meio_do_lote_reconecta(self):
+        self.enfileirar(4)
+        self.smtp.derrubar_apos = 2
+        with smtp_settings(self.smtp, EMAIL_FILA_BACKOFF_SEGUNDOS=0):
+            enviados, falhas = processar_fila()
+            self.assertEqual(enviados, 2)
+            self.smtp.derrubar_apos = None
+            # Backoff zerado: a falha pode ser retentada de imediato
+            processar_fila()
+        self.assertEqual(EmailSaida.objects.filter(status='enviado').count(), 4)
+        self.assertEqual(len(self.smtp.mensagens), 4)
+
+    def test_lease_expirado_e_reassumido(self):
+        email, = self.enfileirar(1)
+        # Simula um worker que caiu no meio do envio
+        EmailSaida.objects.filter(pk=email.pk).update(
+            status='enviando', tentativas=1, proxima_tentativa=timezone.now() - timedelta(seconds=1)
+        )
+        with smtp_settings(self.smtp):
+            self.assertEqual(processar_fila(), (1, 0))
+
+
+class PasswordResetEnfileiraTests(TestCase):
+    def test_endpoint_enfileira_sem_enviar(self):
+        from django.contrib.auth import get_user_model
+        get_user_model().objects.create_user(username='ana', email='ana@example.com', password='x')
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            resposta = self.client.post('/api/auth/password-reset-code/', {'email': 'ana@example.com'})
+        self.assertEqual(resposta.status_code, 200)
+        email = EmailSaida.objects.get()
+        self.assertEqual((email.destinatario, email.status), ('ana@example.com', 'pendente'))
+        # O processamento fica agendado para depois do commit
+        self.assertEqual(len(callbacks), 1)
+
+
+class SessaoEscritaSobDemandaTests(TestCase):
+    """config.sessoes: sessões inalteradas não são regravadas"""
+
+    def test_sem_mudanca_nao_grava(self):
+        from importlib import import_module
+
+        for backend in ('db', 'cached_db', 'cache'):
+            with self.subTest(backend=backend):
+                SessionStore = import_module(f'config.sessoes.{backend}').SessionStore
+                sessao = SessionStore()
+                sessao['carrinho'] = [1]
+                sessao.save()
+
+                sessao = SessionStore(sessao.session_key)
+                sessao['carrinho'] = [1]  # mesmo valor: modified=True, conteúdo igual
+                with self.assertNumQueries(0):
+                    sessao.save()
+
+                sessao['carrinho'].append(2)  # mudança aninhada também é detectada
+                sessao.save()
+                self.assertEqual(SessionStore(sessao.session_key)['carrinho'], [1, 2])
+
+
+class SeguidoresCountTests(TestCase):
+    """ContadoresMixin: seguidores_count só muda pelos UPDATEs atômicos de momentos.timeline"""
+
+    def test_save_de_instancia_antiga_preserva_o_contador(self):
+        ana = Usuario.objects.create_user(username='ana', email='ana@example.com', seguidores_count=2)
+        antiga = Usuario.objects.get(pk=ana.pk)
+        Usuario.objects.filter(pk=ana.pk).update(seguidores_count=5)  # alguém seguiu nesse meio tempo
+
+        antiga.bio = 'Nova bio'
+        antiga.save()
+        ana.refresh_from_db()
+        self.assertEqual((ana.bio, ana.seguidores_count), ('Nova bio', 5))
+
+        # Pedido explícito (ex.: reconciliação) ainda grava
+        antiga.save(update_fields=['seguidores_count'])
+        ana.refresh_from_db()
+        self.assertEqual(ana.seguidores_count, 2)
+
+        # Instância com campos adiados: o save() não carrega nem grava os adiados
+        parcial = Usuario.objects.only('bio').get(pk=ana.pk)
+        parcial.bio = 'Outra bio'
+        with self.assertNumQueries(1):
+            parcial.save()
+        ana.refresh_from_db()
+        self.assertEqual((ana.bio, ana.seguidores_count), ('Outra bio', 2))
+
+
+@override_settings(EXCLUSAO_CONTA_LOTE=3, EXCLUSAO_CONTA_PAUSA_SEGUNDOS=0)
+class ExclusaoContaTests(TestCase):
+    """usuarios.exclusao: conta oculta na hora, dados apagados em lotes retomáveis"""
+
+    def test_exclusao_em_lotes_sem_derivar_contadores(self):
+        from django.db.models import Count, F, Q
+        from momentos.models import Comentario, Like, Momento, Notificacao
+        from momentos.sintetico import gerar
+
+        gerar(usuarios=8, momentos=30, tags=4, media_likes=5, media_comentarios=2, fracao_privados=0,
+              fracao_momentos_privados=0, seed=3)
+        # O autor com mais likes dados e recebidos
+        alvo = Usuario.objects.annotate(n=Count('likes')).order_by('-n').first()
+        alvo.set_password('segredo')
+        alvo.save()
+        self.assertTrue(Like.objects.filter(usuario=alvo).exists())
+        self.client.force_login(alvo)
+
+        self.assertEqual(self.client.delete('/api/auth/user/', {'password': 'x'}, content_type='application/json').status_code, 400)
+        resposta = self.client.delete('/api/auth/user/', {'password': 'segredo'}, content_type='application/json')
+        self.assertEqual(resposta.status_code, 202)
+
+        # Oculto na hora: perfil, busca e feed
+        self.assertEqual(self.client.get(f'/api/auth/profile/{alvo.username}/').status_code, 404)
+        self.assertFalse(Momento.objects.visible_to(None).filter(usuario=alvo).exists())
+        self.assertEqual(self.client.get(f'/api/auth/search/?search={alvo.username}').data['count'], 0)
+
+        # Interrompida no meio: o progresso fica salvo e a próxima execução retoma
+        self.assertEqual(processar_exclusoes(max_lotes=4), (0, True))
+        exclusao = ExclusaoConta.objects.get()
+        self.assertEqual(exclusao.status, 'pendente')
+        self.assertTrue(exclusao.removidos)
+        self.assertEqual(processar_exclusoes(), (1, False))
+
+        exclusao.refresh_from_db()
+        self.assertEqual((exclusao.status, exclusao.usuario_id), ('concluida', None))
+        self.assertFalse(Usuario.objects.filter(pk=alvo.pk).exists())
+        self.assertFalse(Comentario.objects.filter(Q(usuario_id=alvo.pk) | Q(momento__usuario_id=alvo.pk)).exists())
+        self.assertFalse(Notificacao.objects.filter(Q(usuario_destino_id=alvo.pk) | Q(usuario_origem_id=alvo.pk)).exists())
+        self.assertFalse(Momento.objects.annotate(total=Count('likes')).exclude(total=F('likes_count')).exists())
+
+
+class OrcamentoConsultasUsuariosTests(OrcamentoConsultasMixin, TestCase):
+    """Perfil e busca: O(1) consultas independente de quantos momentos/usuários existem"""
+    CASOS = (
+        ('perfil público (anônimo)', 'anonimo', '/api/auth/profile/{autor}/', 6),
+        ('perfil público', 'leitor', '/api/auth/profile/{autor}/', 9),
+        ('perfil público página 2', 'leitor', '/api/auth/profile/{autor}/?page=2&page_size=1', 9),
+        ('próprio perfil', 'autor', '/api/auth/profile/{autor}/', 9),
+        ('busca de usuários (anônimo)', 'anonimo', '/api/auth/search/?search={autor}', 2),
+        ('busca de usuários', 'leitor', '/api/auth/search/?search={autor}', 4),
+        ('usuário atual', 'autor', '/api/auth/user/', 4),
+        ('bootstrap', 'autor', '/api/auth/bootstrap/', 2),
+    )
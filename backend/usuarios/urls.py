@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
     RegisterView,
@@ -5,7 +6,9 @@ from .views import (
     LogoutView,
     CurrentUserView,
     CSRFTokenView,
+    BootstrapView,
     PublicProfileView,
+    SeguirView,
     UserSearchView,
     SendPasswordResetCodeView,
     VerifyPasswordResetCodeView,
@@ -14,13 +17,22 @@ from .views import (
 
 app_name = 'usuarios'
 
+# Sob ASGI (ASYNC_VIEWS=True), o perfil público usa a view assíncrona
+if settings.ASYNC_VIEWS:
+    from .async_views import PublicProfileAsyncView
+    public_profile = PublicProfileAsyncView.as_view()
+else:
+    public_profile = PublicProfileView.as_view()
+
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
     path('logout/', LogoutView.as_view(), name='logout'),
     path('user/', CurrentUserView.as_view(), name='current-user'),
     path('csrf/', CSRFTokenView.as_view(), name='csrf'),
-    path('profile/<str:username>/', PublicProfileView.as_view(), name='public-profile'),
+    path('bootstrap/', BootstrapView.as_view(), name='bootstrap'),
+    path('profile/<str:username>/', public_profile, name='public-profile'),
+    path('profile/<str:username>/seguir/', SeguirView.as_view(), name='seguir'),
     path('search/', UserSearchView.as_view(), name='user-search'),
     path('password-reset-code/', SendPasswordResetCodeView.as_view(), name='password-reset-code'),
     path('password-reset-verify/', VerifyPasswordResetCodeView.as_view(), name='password-reset-verify'),
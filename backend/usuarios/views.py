@@ -1,24 +1,32 @@
 from rest_framework import status, generics, filters
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated, IsAuthenticatedOrReadOnly
 from django.contrib.auth import authenticate, login, logout, get_user_model
 from django.middleware.csrf import get_token
 from django.views.decorators.csrf import ensure_csrf_cookie
 from django.utils.decorators import method_decorator
+from django.utils.cache import patch_cache_control
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 from momentos.models import Momento
-from momentos.serializers import MomentoListSerializer
+from momentos.condicional import versao_perfil
+from momentos.feed import serializar_feed, valores_feed
+from momentos.timeline import deixar_de_seguir, seguir
 from momentos.views import MomentoPagination
 from rest_framework.pagination import PageNumberPagination
 from .enviar_email import send_password_reset_email
+from .exclusao import solicitar_exclusao
+from .models import Seguidor
 import random
 
 from .serializers import (
     UsuarioSerializer,
+    UsuarioSessaoSerializer,
     UsuarioCreateSerializer,
     UsuarioUpdateSerializer,
-    LoginSerializer
+    LoginSerializer,
+    anotar_totais,
 )
 
 Usuario = get_user_model()
@@ -33,7 +41,9 @@ class RegisterView(APIView):
     def post(self, request):
         serializer = UsuarioCreateSerializer(data=request.data)
         if serializer.is_valid():
-            user = serializer.save()
+            # Atômico: a referência ao avatar deduplicado (momentos/conteudo.py) segue o INSERT
+            with transaction.atomic():
+                user = serializer.save()
             return Response(
                 {
                     'message': 'Usuário criado com sucesso',
@@ -95,6 +105,7 @@ class CurrentUserView(APIView):
     """
     GET /api/auth/user/
     Retorna dados do usuário autenticado
+    DELETE /api/auth/user/ - Exclui a conta (confirmação por senha; remoção em segundo plano)
     """
     permission_classes = [IsAuthenticated]
 
@@ -127,11 +138,27 @@ class CurrentUserView(APIView):
             partial=True
         )
         if serializer.is_valid():
-            serializer.save()
+            with transaction.atomic():
+                serializer.save()
             # Retorna o usuário atualizado
             return Response(UsuarioSerializer(request.user, context={'request': request}).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def delete(self, request):
+        if not request.user.check_password(request.data.get('password', '')):
+            return Response(
+                {'error': 'Senha incorreta'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # A conta some na hora; momentos, likes e comentários são apagados em lotes (usuarios.exclusao)
+        exclusao = solicitar_exclusao(request.user)
+        logout(request)
+        return Response(
+            {'message': 'Conta em exclusão', 'id': exclusao.pk},
+            status=status.HTTP_202_ACCEPTED
+        )
+
 @method_decorator(ensure_csrf_cookie, name='dispatch')
 class CSRFTokenView(APIView):
     """
@@ -143,6 +170,23 @@ class CSRFTokenView(APIView):
     def get(self, request):
         return Response({'csrfToken': get_token(request)})
 
+class BootstrapView(APIView):
+    """
+    GET /api/auth/bootstrap/
+    Carga inicial do SPA em uma única requisição: token CSRF + usuário logado
+    (resumo sem agregados) ou null para visitantes
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        user = None
+        if request.user.is_authenticated:
+            user = UsuarioSessaoSerializer(request.user, context={'request': request}).data
+        response = Response({'csrfToken': get_token(request), 'user': user})
+        # Contém o token e dados do usuário: nunca em cache compartilhado
+        patch_cache_control(response, private=True, no_store=True)
+        return response
+
 class PublicProfileView(APIView):
     """
     GET /api/auth/profile/{username}/
@@ -151,8 +195,15 @@ class PublicProfileView(APIView):
     permission_classes = [AllowAny]
 
     def get(self, request, username):
+        # 0. GET condicional: 304 antes de buscar e serializar perfil e momentos
+        versao = versao_perfil(request, username)
+        if versao is not None:
+            nao_modificado = versao.resposta_304(request)
+            if nao_modificado is not None:
+                return nao_modificado
+
         # 1. Buscar o usuário
-        user = get_object_or_404(Usuario, username=username)
+        user = get_object_or_404(anotar_totais(Usuario.objects.filter(is_active=True), request.user), username=username)
         
         # 1.5. LÓGICA DE PRIVACIDADE: Bloquear acesso se privado e não for o dono
         is_owner = request.user.is_authenticated and request.user == user
@@ -168,35 +219,60 @@ class PublicProfileView(APIView):
         # 2. Buscar e paginar os momentos desse usuário
         pagination = MomentoPagination()
         
-        if user.is_private and not is_owner:
-            # Se o perfil é privado e não é o dono, não mostra nada
-            momentos_queryset = Momento.objects.none()
-        else:
-            # Se o perfil é público OU é o próprio dono vendo
-            momentos_queryset = Momento.objects.filter(usuario=user).order_by('-created_at')
-            
-            # Se não for o dono, filtrar apenas vídeos públicos
-            if not is_owner:
-                momentos_queryset = momentos_queryset.filter(is_private=False)
+        # Momentos do usuário filtrados pela mesma regra de visibilidade do feed
+        momentos_queryset = (
+            Momento.objects.visible_to(request.user)
+            .filter(usuario=user)
+            .select_related('usuario')
+            .prefetch_related('tags')
+            .order_by('-created_at')
+        )
 
         # Paginar o queryset
-        paginated_momentos = pagination.paginate_queryset(momentos_queryset, request)
+        paginated_momentos = pagination.paginate_queryset(valores_feed(momentos_queryset), request)
 
-        # Serializar os momentos paginados
-        momentos_serializer = MomentoListSerializer(
-            paginated_momentos,
-            many=True,
-            context={'request': request}
-        )
+        # Serializar os momentos paginados (caminho rápido, mesma saída do MomentoListSerializer)
+        momentos_data = serializar_feed(paginated_momentos, request)
 
         # 3. Combinar e retornar os dados
         data = {
             'user': user_serializer.data,
             # Retorna a resposta paginada completa (com count, next, previous, results)
-            'momentos': pagination.get_paginated_response(momentos_serializer.data).data
+            'momentos': pagination.get_paginated_response(momentos_data).data
         }
 
-        return Response(data)
+        response = Response(data)
+        return versao.aplicar(response) if versao is not None else response
+
+class SeguirView(APIView):
+    """
+    GET /api/auth/profile/{username}/seguir/ - Se o usuário logado segue o perfil
+    POST /api/auth/profile/{username}/seguir/ - Segue
+    DELETE /api/auth/profile/{username}/seguir/ - Deixa de seguir
+    """
+    permission_classes = [IsAuthenticatedOrReadOnly]
+
+    def resposta(self, request, seguido, status_code=status.HTTP_200_OK):
+        seguindo = request.user.is_authenticated and Seguidor.objects.filter(
+            seguidor=request.user, seguido=seguido
+        ).exists()
+        seguidores = Usuario.objects.filter(pk=seguido.pk).values_list('seguidores_count', flat=True).get()
+        return Response({'seguindo': seguindo, 'seguidores': seguidores}, status=status_code)
+
+    def get(self, request, username):
+        return self.resposta(request, get_object_or_404(Usuario, username=username, is_active=True))
+
+    def post(self, request, username):
+        seguido = get_object_or_404(Usuario, username=username, is_active=True)
+        if seguido.pk == request.user.pk:
+            return Response({'error': 'Você não pode seguir a si mesmo.'}, status=status.HTTP_400_BAD_REQUEST)
+        criado = seguir(request.user, seguido)
+        return self.resposta(request, seguido, status.HTTP_201_CREATED if criado else status.HTTP_200_OK)
+
+    def delete(self, request, username):
+        seguido = get_object_or_404(Usuario, username=username)
+        deixar_de_seguir(request.user, seguido)
+        return self.resposta(request, seguido)
 
 class UserSearchPagination(PageNumberPagination):
     page_size = 5  # Limita a 5 resultados
@@ -209,13 +285,15 @@ class UserSearchView(generics.ListAPIView):
     Busca usuários por username
     """
     permission_classes = [AllowAny]
+    throttle_scope = 'busca_usuarios'
     serializer_class = UsuarioSerializer
     filter_backends = [filters.SearchFilter]
     search_fields = ['username']  # Busca por username__icontains
     pagination_class = UserSearchPagination
 
     def get_queryset(self):
-        return Usuario.objects.all().order_by('username')
+        # Totais anotados: uma consulta para a página inteira, não duas por usuário
+        return anotar_totais(Usuario.objects.filter(is_active=True), self.request.user).order_by('username')
 
     def get_serializer_context(self):
         # Fornece o 'request' ao serializer
@@ -230,6 +308,7 @@ class SendPasswordResetCodeView(APIView):
     Envia um código de recuperação de senha para o email do usuário
     """
     permission_classes = [AllowAny]
+    throttle_scope = 'senha_codigo'
 
     def post(self, request):
         email = request.data.get('email')
@@ -248,14 +327,10 @@ class SendPasswordResetCodeView(APIView):
         from django.utils import timezone
         user.password_reset_sent_at = timezone.now()
         user.password_reset_attempts = 0
-        user.save()
-        # Enviar email usando utilitário centralizado
-        try:
+        with transaction.atomic():
+            user.save()
+            # Enfileira o email (caixa de saída); o envio SMTP acontece após o commit, fora da requisição
             send_password_reset_email(email, code, username=getattr(user, 'username', None))
-        except Exception as e:
-            # Logando erro para debugar
-            print('Erro ao enviar email de recuperação:', e)
-            return Response({'error': 'Erro ao enviar código. Verifique o email informado.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
         return Response({'message': 'Código enviado para o email.'}, status=status.HTTP_200_OK)
 
@@ -266,6 +341,8 @@ class VerifyPasswordResetCodeView(APIView):
     Body esperado: { email, code }
     """
     permission_classes = [AllowAny]
+    # Mesmo escopo do reset: tentativas de adivinhar o código somam nos dois endpoints
+    throttle_scope = 'senha_verificacao'
 
     def post(self, request):
         email = request.data.get('email')
@@ -321,6 +398,7 @@ class ResetPasswordView(APIView):
     Body esperado: { email, code, new_password }
     """
     permission_classes = [AllowAny]
+    throttle_scope = 'senha_verificacao'
 
     def post(self, request):
         email = request.data.get('email')
@@ -80,7 +80,7 @@ const NotificationDropdown = ({ notifications = [], onClose }) => {
                                     {notif.mensagem}
                                 </p>
                                 <span className="notification-time">
-                                    {formatTimeAgo(notif.created_at)}
+                                    {formatTimeAgo(notif.updated_at || notif.created_at)}
                                 </span>
                             </div>
                             {!notif.lida && <div className="unread-dot"></div>}
@@ -22,13 +22,14 @@ export const AuthProvider = ({ children }) => {
 
     const checkAuth = async () => {
         try {
-            // Pegar token CSRF primeiro
-            await authService.getCsrfToken();
-
-            // Buscar dados do usuario
-            const response = await authService.getCurrentUser();
-            setUser(response.data);
-            console.log('Usuario autenticado:', response.data);
+            // Token CSRF + dados do usuario em uma unica requisicao
+            const response = await authService.bootstrap();
+            setUser(response.data.user);
+            if (response.data.user) {
+                console.log('Usuario autenticado:', response.data.user);
+            } else {
+                console.log('Usuario não autenticado');
+            }
         } catch (error) {
             console.log('Usuario não autenticado');
             setUser(null);
@@ -39,7 +40,6 @@ export const AuthProvider = ({ children }) => {
 
     const login = async (credentials) => {
         try {
-            await authService.getCsrfToken();
             const response = await authService.login(credentials);
             setUser(response.data.user);
             console.log('Login bem-sucedido:', response.data.user);
@@ -55,7 +55,6 @@ export const AuthProvider = ({ children }) => {
 
     const register = async (userData) => {
         try {
-            await authService.getCsrfToken();
             await authService.register(userData);
             return { success: true };
         } catch (error) {
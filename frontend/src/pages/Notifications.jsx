@@ -106,7 +106,7 @@ const NotificationsPage = () => {
                                         {notif.mensagem}
                                     </p>
                                     <span className="notification-time">
-                                        {formatTimeAgo(notif.created_at)}
+                                        {formatTimeAgo(notif.updated_at || notif.created_at)}
                                     </span>
                                 </div>
                             </Link>
@@ -6,6 +6,11 @@ import VideoSuggestions from '../components/video/VideoSuggestions';
 import { momentosService } from '../services/api';
 import '../styles/pages/VideoPlayer.css';
 
+// HLS nativo (Safari, iOS, Android): qualidade adaptativa à conexão.
+// Nos demais navegadores, o arquivo original.
+const suportaHlsNativo = () =>
+    document.createElement('video').canPlayType('application/vnd.apple.mpegurl') !== '';
+
 const VideoPlayer = () => {
     const { id } = useParams();
     const navigate = useNavigate();
@@ -51,32 +56,14 @@ const VideoPlayer = () => {
             return;
         }
 
-        // Pega a primeira tag como critério principal
-        const primaryTag = momento.tags[0].slug || momento.tags[0].nome; 
-
         try {
-            const params = {
-                // Filtra pelo slug/nome da tag principal do vídeo atual
-                tag: primaryTag, 
-                // Ordena por popularidade/recente para ter sugestões relevantes
-                sort: 'popular', 
-                page_size: 10
-            };
-            
-            const response = await momentosService.listar(params);
-            
-            const allMomentos = response.data?.results || [];
-            
-            // Filtra: 
-            // 1. Remove o vídeo atual da lista
-            // 2. Garante que pegamos apenas sugestões (máx. 9, pois 1 slot é o atual)
-            const filteredSugestoes = allMomentos
-                .filter(m => m.id !== parseInt(id, 10))
-                .slice(0, 9);
-            
+            // Vizinhos por tags em comum, pré-computados no backend (momentos/relacionados.py)
+            const response = await momentosService.getSuggestions(momento.id);
+            const filteredSugestoes = (response.data || []).slice(0, 9);
+
             setSugestoes(filteredSugestoes);
-            
-            console.log(`✅ Sugestões carregadas para tag: ${primaryTag}. Total: ${filteredSugestoes.length}`);
+
+            console.log(`✅ Sugestões carregadas. Total: ${filteredSugestoes.length}`);
         } catch (error) {
             console.error('Erro ao buscar sugestões:', error);
             setSugestoes([]);
@@ -170,7 +157,10 @@ const VideoPlayer = () => {
                             <div className="video-wrapper">
                                 <video
                                     ref={videoRef}
-                                    src={momento.video}
+                                    {...(momento.hls && suportaHlsNativo()
+                                        // Playlists e segmentos passam pela checagem de privacidade da API (cookie de sessão)
+                                        ? { src: momento.hls, crossOrigin: 'use-credentials' }
+                                        : { src: momento.video })}
                                     controls
                                     autoPlay
                                     className="video-element"
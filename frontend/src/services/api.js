@@ -56,6 +56,10 @@ function getCookie(name) {
 }
 
 async function ensureCsrf() {
+    // O cookie csrftoken já existe (ex.: recebido no bootstrap): nada a buscar
+    if (getCookie('csrftoken')) {
+        return;
+    }
     try {
         const resp = await api.get('/auth/csrf/');
         const token = resp?.data?.csrfToken;
@@ -80,6 +84,8 @@ export const authService = {
     },
     getCurrentUser: () => api.get('/auth/user/'),
     getCsrfToken: () => api.get('/auth/csrf/'),
+    // Carga inicial: token CSRF + usuário logado (ou null) em uma só requisição
+    bootstrap: () => api.get('/auth/bootstrap/'),
     getPublicProfile: (username) => api.get(`/auth/profile/${username}/`),
     searchUsers: (query) => api.get(`/auth/search/`, { params: { search: query } }),
     sendPasswordResetCode: async (email) => { await ensureCsrf(); return api.post('/auth/password-reset-code/', { email }); },